@@ -0,0 +1,4 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""基准测试: 可按刚体数量缩放的场景生成器(scenes)和运行/比较工具(run)"""
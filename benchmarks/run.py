@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+运行基准测试
+
+每个(场景, 刚体数量)在独立的子进程中运行，峰值内存和启动时间不受其他
+用例影响。结果写入JSON文件，可以与保存的基线比较，性能下降超过阈值时
+以非零状态退出。
+
+    python -m benchmarks.run --sizes 10 1000 100000 --output results.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+DEFAULT_STEPS = 200
+WARMUP_STEPS = 10
+TIME_STEP = 1.0 / 60.0
+
+# 比较的指标: 名称 -> 数值越大越好
+METRICS = {
+    'steps_per_sec': True,
+    'peak_rss_mb': False,
+    'startup_ms': False,
+}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _peak_rss_mb() -> Optional[float]:
+    """当前进程的峰值常驻内存(MB)，平台不支持时返回None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux以KB为单位，macOS以字节为单位
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+def run_case(scene: str, size: int, steps: int, backend: str, threads: int = 1, seed: int = 0) -> Dict:
+    """在当前进程中运行一个用例(由子进程调用)"""
+    start = time.perf_counter()
+    from python.physics_binding import native_library
+    native_library()
+    import_time = time.perf_counter() - start
+    from benchmarks.scenes import SCENES
+
+    start = time.perf_counter()
+    world = SCENES[scene](size, backend, seed)
+    build_time = time.perf_counter() - start
+
+    batched = not hasattr(world, 'step_simulation')
+    if not batched:
+        world.set_thread_count(threads)
+    step = (lambda: world.step(TIME_STEP)) if batched else (lambda: world.step_simulation(TIME_STEP, 0))
+    for _ in range(WARMUP_STEPS):
+        step()
+    world.set_profiling(True, steps)
+    start = time.perf_counter()
+    for _ in range(steps):
+        step()
+    elapsed = time.perf_counter() - start
+    profile = world.get_profile()
+
+    phases = ('integrate', 'broadphase', 'narrowphase', 'solve', 'islands', 'sync', 'total')
+    counters = ('pairs', 'contacts')
+    return {
+        'scene': scene,
+        'size': size,
+        'backend': 'numpy' if batched else world.backend,
+        'threads': 1 if batched else world.get_thread_count(),
+        'bodies': int(profile['bodies'][-1]) if len(profile['bodies']) else 0,
+        'steps': steps,
+        'steps_per_sec': steps / elapsed if elapsed > 0.0 else float('inf'),
+        'phase_ms': {name: float(profile[name].mean()) for name in phases},
+        'mean_counters': {name: float(profile[name].mean()) for name in counters},
+        'peak_rss_mb': _peak_rss_mb(),
+        'import_ms': import_time * 1000.0,
+        'build_ms': build_time * 1000.0,
+        'startup_ms': (import_time + build_time) * 1000.0,
+    }
+
+def run_isolated(scene: str, size: int, steps: int, backend: str, threads: int, timeout: float) -> Dict:
+    """在子进程中运行一个用例，子进程的标准输出(引擎日志)被丢弃"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'result.json')
+        command = [sys.executable, '-m', 'benchmarks.run', '--case', scene, str(size),
+                   '--steps', str(steps), '--backend', backend, '--threads', str(threads), '--result-file', path]
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [PROJECT_ROOT, os.environ.get('PYTHONPATH')]))}
+        try:
+            process = subprocess.run(command, cwd=PROJECT_ROOT, env=env, timeout=timeout,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        except subprocess.TimeoutExpired:
+            return {'scene': scene, 'size': size, 'backend': backend, 'threads': threads,
+                    'error': f"超时({timeout:g} s)"}
+        if process.returncode != 0 or not os.path.exists(path):
+            return {'scene': scene, 'size': size, 'backend': backend, 'threads': threads,
+                    'error': process.stderr.strip().splitlines()[-1] if process.stderr.strip() else
+                    f"退出码 {process.returncode}"}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def _key(result: Dict) -> str:
+    # 单线程的结果不带线程数，与旧的基线文件兼容
+    threads = result.get('threads', 1)
+    suffix = f"/x{threads}" if threads != 1 else ""
+    return f"{result['scene']}/{result['size']}/{result['backend']}{suffix}"
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[Dict]:
+    """与基线比较，返回变差超过threshold(相对值)的指标"""
+    reference = {_key(result): result for result in baseline if 'error' not in result}
+    regressions = []
+    for result in results:
+        base = reference.get(_key(result))
+        if base is None or 'error' in result:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append({'case': _key(result), 'metric': metric, 'baseline': old,
+                                    'current': new, 'change': change})
+    return regressions
+
+def _format(result: Dict) -> str:
+    if 'error' in result:
+        return f"{_key(result):<28} 失败: {result['error']}"
+    phases = result['phase_ms']
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "-"
+    return (f"{_key(result):<28} {result['steps_per_sec']:10.1f} 步/秒  "
+            f"步进 {phases['total']:8.3f} ms (粗 {phases['broadphase']:.3f} 细 {phases['narrowphase']:.3f} "
+            f"解 {phases['solve']:.3f})  内存 {rss}  启动 {result['startup_ms']:.0f} ms")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="物理模拟器基准测试")
+    parser.add_argument("--scenes", nargs='+', help="运行的场景，默认为全部")
+    parser.add_argument("--sizes", nargs='+', type=int, default=list(DEFAULT_SIZES), help="刚体数量")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="计时的步数(不包括预热)")
+    parser.add_argument("--backend", type=str, default="auto", choices=["auto", "numpy", "native"],
+                        help="物理步进后端(batch场景总是numpy)")
+    parser.add_argument("--threads", type=int, default=1, help="原生库步进的线程数，0为CPU核数")
+    parser.add_argument("--timeout", type=float, default=600.0, help="单个用例的超时时间(秒)")
+    parser.add_argument("--output", type=str, help="结果保存路径(.json)")
+    parser.add_argument("--baseline", type=str, help="与基线结果(.json)比较")
+    parser.add_argument("--threshold", type=float, default=0.1, help="判定为性能下降的相对变化")
+    parser.add_argument("--case", nargs=2, metavar=('SCENE', 'SIZE'), help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        # 子进程: 运行单个用例
+        result = run_case(args.case[0], int(args.case[1]), args.steps, args.backend, args.threads)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return 0
+
+    # 子进程中的启动时间包括加载物理引擎库，因此只在这里导入场景
+    from benchmarks.scenes import SCENES
+    unknown = set(args.scenes or ()) - set(SCENES)
+    if unknown:
+        parser.error(f"未知的场景: {', '.join(sorted(unknown))}，可选: {', '.join(SCENES)}")
+    args.scenes = args.scenes or list(SCENES)
+
+    results = []
+    for scene in args.scenes:
+        for size in args.sizes:
+            result = run_isolated(scene, size, args.steps, args.backend, args.threads, args.timeout)
+            print(_format(result), flush=True)
+            results.append(result)
+
+    report = {
+        'meta': {
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'steps': args.steps,
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到 {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for item in regressions:
+            print(f"性能下降: {item['case']} {item['metric']} "
+                  f"{item['baseline']:.3f} -> {item['current']:.3f} ({item['change']:+.1%})")
+        if regressions:
+            return 1
+        print(f"与基线相比没有超过{args.threshold:.0%}的性能下降")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+基准测试场景生成器
+
+每个生成器按刚体数量count(不包括地面)构建一个场景，全部使用批量创建接口，
+同样的(count, seed)总是生成同样的场景。返回PhysicsWorld，批量世界场景返回
+BatchedPhysicsWorld。
+"""
+
+import numpy as np
+from typing import Callable, Dict
+
+from python.physics_binding import PhysicsWorld, RigidBody, Vector3
+
+def _ground(world: PhysicsWorld) -> None:
+    world.add_bodies(RigidBody.create_planes(np.array([[0.0, 1.0, 0.0]]), np.zeros(1)))
+
+def _grid(count: int, columns: int) -> np.ndarray:
+    """count个点在xz平面上按columns列排列的整数坐标 (count,2)"""
+    index = np.arange(count)
+    return np.stack([index % columns, index // columns], axis=1).astype(np.float64)
+
+def domino_line(count: int, backend: str = 'auto', seed: int = 0) -> PhysicsWorld:
+    """沿x轴排成一列的多米诺骨牌，第一块被一个球撞倒，依次向后传递"""
+    world = PhysicsWorld(backend=backend)
+    world.initialize()
+    _ground(world)
+    dominos = max(count - 1, 1)
+    positions = np.zeros((dominos, 3))
+    positions[:, 0] = np.arange(dominos) * 1.5
+    positions[:, 1] = 1.0
+    world.add_bodies(RigidBody.create_boxes(np.ones(dominos), positions, np.tile([0.1, 1.0, 0.5], (dominos, 1))))
+    world.add_bodies(RigidBody.create_spheres([5.0], [[-2.0, 1.5, 0.0]], [0.5]))
+    velocities = world.get_velocities().copy()
+    velocities[-1] = (6.0, 0.0, 0.0)
+    world.set_velocities(velocities)
+    return world
+
+def sphere_pile(count: int, backend: str = 'auto', seed: int = 0) -> PhysicsWorld:
+    """从一个竖直柱体中落下、堆积在地面上的球"""
+    world = PhysicsWorld(backend=backend)
+    world.initialize()
+    _ground(world)
+    rng = np.random.default_rng(seed)
+    columns = max(int(np.ceil(np.cbrt(count))), 1)
+    cells = _grid(count, columns)
+    positions = np.stack([cells[:, 0] % columns, 1.0 + cells[:, 1] // columns, cells[:, 1] % columns], axis=1)
+    positions = positions * 1.1 + rng.uniform(-0.05, 0.05, (count, 3))
+    positions[:, 1] += 0.5
+    world.add_bodies(RigidBody.create_spheres(np.ones(count), positions, np.full(count, 0.5)))
+    return world
+
+def box_stack(count: int, backend: str = 'auto', seed: int = 0, height: int = 10) -> PhysicsWorld:
+    """若干座height层高的盒子塔，按网格排列"""
+    world = PhysicsWorld(backend=backend)
+    world.initialize()
+    _ground(world)
+    towers = max(int(np.ceil(count / height)), 1)
+    columns = max(int(np.ceil(np.sqrt(towers))), 1)
+    level = np.arange(count) % height
+    cells = _grid(towers, columns)[np.arange(count) // height]
+    positions = np.stack([cells[:, 0] * 3.0, 0.5 + level * 1.0, cells[:, 1] * 3.0], axis=1)
+    world.add_bodies(RigidBody.create_boxes(np.ones(count), positions, np.full((count, 3), 0.5)))
+    return world
+
+def space(count: int, backend: str = 'auto', seed: int = 0) -> PhysicsWorld:
+    """无重力、稀疏分布且随机运动的球，碰撞很少，主要测试粗检测和积分"""
+    world = PhysicsWorld(backend=backend)
+    world.initialize(Vector3(0.0, 0.0, 0.0))
+    rng = np.random.default_rng(seed)
+    # 保持每个球平均占有约1000立方单位的空间
+    extent = np.cbrt(count * 1000.0) * 0.5
+    positions = rng.uniform(-extent, extent, (count, 3))
+    world.add_bodies(RigidBody.create_spheres(np.ones(count), positions, rng.uniform(0.2, 1.0, count)))
+    world.set_velocities(rng.normal(0.0, 2.0, (count, 3)))
+    world.set_sleeping_enabled(False)
+    return world
+
+def world_batch(count: int, backend: str = 'auto', seed: int = 0, bodies_per_world: int = 10):
+    """count个刚体分布在多个独立的小世界中(每个世界一座bodies_per_world层的盒子塔)"""
+    from python.batched_world import BatchedPhysicsWorld
+
+    template = box_stack(bodies_per_world, 'numpy', seed, height=bodies_per_world)
+    batch = BatchedPhysicsWorld(template, max(count // bodies_per_world, 1))
+    # 每个世界的塔有不同的水平扰动，避免所有世界完全相同
+    rng = np.random.default_rng(seed)
+    positions = np.array(batch.get_positions())
+    positions[:, 1:, [0, 2]] += rng.uniform(-0.05, 0.05, (batch.world_count, bodies_per_world, 2))
+    batch.set_positions(positions)
+    batch.set_reset_state()
+    return batch
+
+# 场景名 -> 生成器
+SCENES: Dict[str, Callable] = {
+    'domino': domino_line,
+    'sphere_pile': sphere_pile,
+    'box_stack': box_stack,
+    'space': space,
+    'batch': world_batch,
+}
@@ -39,8 +39,8 @@ int main() {
     // 清理
     world.removeRigidBody(box);
     world.removeRigidBody(ground);
-    delete box;
-    delete ground;
+    PhysicsSimulator::RigidBody::destroy(box);
+    PhysicsSimulator::RigidBody::destroy(ground);
     
     return 0;
 }
\ No newline at end of file
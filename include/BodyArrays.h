@@ -0,0 +1,35 @@
+#ifndef BODY_ARRAYS_H
+#define BODY_ARRAYS_H
+
+#include <cstddef>
+#include <cstdint>
+
+namespace PhysicsSimulator {
+
+/**
+ * @brief 刚体结构数组（指针均指向PhysicsWorld持有的列）
+ */
+struct BodyArrays {
+    std::size_t count;              ///< 刚体数量
+    const std::int64_t* handles;    ///< 句柄 x1
+    const std::int32_t* bodyTypes;  ///< 刚体类型 x1
+    const float* masses;            ///< 质量 x1
+    const float* inverseInertias;   ///< 局部主惯性矩倒数 x3
+    const std::int32_t* shapeTypes; ///< 形状类型 x1
+    const float* shapeParams;       ///< 形状参数 x4
+    const float* frictions;         ///< 摩擦系数 x1
+    const float* restitutions;      ///< 恢复系数 x1
+    const float* ccdThresholds;     ///< 连续碰撞检测的运动阈值 x1，0表示关闭
+    float* positions;               ///< 位置 x3
+    float* rotations;               ///< 旋转四元数 x4 (x,y,z,w)
+    float* linearVelocities;        ///< 线速度 x3
+    float* angularVelocities;       ///< 角速度 x3
+    float* forces;                  ///< 累积的力 x3
+    float* torques;                 ///< 累积的力矩 x3
+    std::int32_t* sleepIslands;     ///< 休眠岛屿编号 x1，0表示未休眠
+    float* sleepTimes;              ///< 速度持续低于休眠阈值的时间 x1
+};
+
+} // namespace PhysicsSimulator
+
+#endif // BODY_ARRAYS_H
@@ -0,0 +1,104 @@
+#ifndef BROADPHASE_H
+#define BROADPHASE_H
+
+#include "BodyArrays.h"
+#include <cstddef>
+#include <cstdint>
+#include <functional>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+class TaskPool;
+
+/**
+ * @brief 粗检测算法
+ */
+enum class BroadphaseAlgorithm {
+    SWEEP_AND_PRUNE = 0,  ///< 增量扫掠剪枝
+    SPATIAL_HASH = 1      ///< 均匀网格空间哈希
+};
+
+/**
+ * @class Broadphase
+ * @brief 粗检测阶段，根据AABB生成候选碰撞对
+ *
+ * 候选对以行号(a<b)的扁平数组保存，按(a,b)排序，结果与所选算法无关。
+ * 平面不参与排序/哈希，单独与所有AABB做半空间测试。
+ * AABB计算、扫描和按格子配对在线程池中分块并行，各块的结果按块号合并。
+ */
+class Broadphase {
+public:
+    Broadphase();
+
+    /**
+     * @brief 选择算法
+     * @param algorithm 算法
+     * @param cellSize 空间哈希的格子尺寸，不大于0时按最大AABB自动选取
+     */
+    void setAlgorithm(BroadphaseAlgorithm algorithm, float cellSize = 0.0f);
+
+    /**
+     * @brief 获取当前算法
+     */
+    BroadphaseAlgorithm getAlgorithm() const;
+
+    /**
+     * @brief 根据当前刚体状态重建候选对
+     * @param bodies 刚体结构数组
+     * @param pool 线程池
+     * @param dt 时间步长，大于0时快速刚体（见isFastBody()）的AABB沿本步的位移扩展，供连续碰撞检测使用
+     */
+    void update(const BodyArrays& bodies, TaskPool& pool, float dt = 0.0f);
+
+    /**
+     * @brief 获取候选对数组（每对2个行号）
+     */
+    const std::vector<std::int32_t>& getPairs() const;
+
+    /**
+     * @brief 获取候选对数量
+     */
+    std::size_t getPairCount() const;
+
+    /**
+     * @brief 获取上一次update()的耗时（秒）
+     */
+    double getBuildTime() const;
+
+private:
+    /**
+     * @brief 处理[begin, end)并把候选对写入out
+     */
+    typedef std::function<void(std::size_t, std::size_t, std::vector<std::int32_t>&)> PairVisitor;
+
+    void collectPairs(TaskPool& pool, std::size_t count, std::size_t grain, const PairVisitor& visit);
+    void computeAabbs(const BodyArrays& bodies, float dt, TaskPool& pool);
+    void computeAabb(const BodyArrays& bodies, std::size_t i, float dt);
+    void sweepAndPrune(TaskPool& pool);
+    void spatialHash(TaskPool& pool);
+    void planePairs(const BodyArrays& bodies, TaskPool& pool);
+    bool overlaps(std::int32_t a, std::int32_t b) const;
+    void sortPairs();
+
+    BroadphaseAlgorithm m_algorithm;
+    float m_cellSize;
+    std::vector<std::int32_t> m_pairs;
+    double m_buildTime;
+
+    std::vector<float> m_mins;
+    std::vector<float> m_maxs;
+    std::vector<char> m_active;           ///< 是否为动态刚体
+    std::vector<std::int32_t> m_finite;   ///< 非平面刚体的行号
+    std::vector<std::int32_t> m_planes;   ///< 平面的行号
+    std::vector<std::vector<std::int32_t>> m_chunkPairs;   ///< 并行时各块的候选对
+
+    // 扫掠剪枝的帧间状态
+    std::vector<std::int32_t> m_order;
+    std::vector<std::int32_t> m_bodies;
+    int m_axis;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // BROADPHASE_H
@@ -0,0 +1,151 @@
+#ifndef CONTACT_SOLVER_H
+#define CONTACT_SOLVER_H
+
+#include "BodyArrays.h"
+#include "Joints.h"
+#include <cstddef>
+#include <cstdint>
+#include <unordered_map>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+class Narrowphase;
+class TaskPool;
+
+/**
+ * @brief 把接触划分为批次，同一批次内的接触不共享动态刚体
+ *
+ * 每一轮中，每个动态刚体把自己分配给剩余接触中最靠前的一个，
+ * 刚体全部分配给它的接触进入本批次。
+ *
+ * @param bodyA 接触的第一个刚体行号
+ * @param bodyB 接触的第二个刚体行号
+ * @param count 接触数量
+ * @param dynamic 每个刚体是否为动态刚体
+ * @param batches 输出的批次（接触下标）
+ */
+void partitionContacts(const std::int32_t* bodyA, const std::int32_t* bodyB, std::size_t count,
+                       const std::vector<char>& dynamic, std::vector<std::vector<std::size_t>>& batches);
+
+/**
+ * @class ContactSolver
+ * @brief 带接触流形缓存的顺序冲量求解器
+ *
+ * 每个接触点有一个法向约束和两个摩擦约束，按Gauss-Seidel方式迭代。
+ * 关节的约束行在同一个迭代循环中求解：每次迭代先求解关节，再求解法向
+ * 和摩擦约束。关节和接触分别被划分成批次，同一批次内不共享动态刚体，
+ * 求解顺序与Python端的numpy后端一致。关节和接触按动态刚体的连通分量
+ * 分成岛屿，各岛屿在线程池中并行迭代，岛屿内保持上述顺序，结果与线程数无关。
+ * 关节的累积冲量保存在关节结构数组中，下一步作为初值。
+ *
+ * 接触流形按刚体对的句柄缓存，下一帧匹配到的接触点以上一帧的累积冲量
+ * 作为初值(warm starting)，本帧没有接触的刚体对从缓存中移除。
+ */
+class ContactSolver {
+public:
+    ContactSolver();
+
+    /**
+     * @brief 设置迭代次数
+     * @param iterations 迭代次数
+     */
+    void setIterations(int iterations);
+
+    /**
+     * @brief 获取迭代次数
+     */
+    int getIterations() const;
+
+    /**
+     * @brief 开启/关闭warm starting，关闭时清空缓存
+     * @param enabled 是否开启
+     */
+    void setWarmStarting(bool enabled);
+
+    /**
+     * @brief 是否开启warm starting
+     */
+    bool getWarmStarting() const;
+
+    /**
+     * @brief 求解接触和关节，直接修改刚体的线速度和角速度
+     * @param bodies 刚体结构数组
+     * @param contacts 细检测得到的接触
+     * @param joints 关节结构数组，两端刚体的行号需已更新
+     * @param dt 时间步长
+     * @param pool 线程池
+     */
+    void solve(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints, float dt,
+               TaskPool& pool);
+
+    /**
+     * @brief 清空接触流形缓存
+     */
+    void clearCache();
+
+    /**
+     * @brief 缓存中的接触点总数
+     */
+    std::size_t getCachedPointCount() const;
+
+    /**
+     * @brief 导出缓存，每个接触点一行，同一刚体对的接触点相邻
+     * @param handles 输出刚体对的句柄 (N,2)
+     * @param anchors 输出刚体A局部坐标中的接触点 (N,3)
+     * @param impulses 输出法向冲量和世界坐标摩擦冲量 (N,4)
+     */
+    void saveCache(std::int64_t* handles, float* anchors, float* impulses) const;
+
+    /**
+     * @brief 用导出的数据替换缓存，格式与saveCache相同
+     * @param count 接触点数量
+     */
+    void loadCache(std::size_t count, const std::int64_t* handles, const float* anchors, const float* impulses);
+
+    std::size_t getManifoldCount() const;      ///< 当前缓存的接触流形数量
+    std::size_t getWarmStartedCount() const;   ///< 上一次求解中命中缓存的接触点数量
+    std::size_t getBatchCount() const;         ///< 上一次求解的批次数
+    std::size_t getIslandCount() const;        ///< 上一次求解中并行求解的岛屿数
+    double getSolveTime() const;               ///< 上一次求解的耗时（秒）
+
+private:
+    /**
+     * @brief 缓存的接触点：在刚体A局部坐标中的位置和累积冲量
+     */
+    struct CachedPoint {
+        float anchor[3];
+        float normalImpulse;
+        float frictionImpulse[3];   ///< 世界坐标系下的摩擦冲量
+    };
+
+    struct Manifold {
+        std::vector<CachedPoint> points;
+    };
+
+    struct PairKey {
+        std::int64_t a;
+        std::int64_t b;
+        bool operator==(const PairKey& other) const {
+            return a == other.a && b == other.b;
+        }
+    };
+
+    struct PairKeyHash {
+        std::size_t operator()(const PairKey& key) const {
+            return std::hash<std::int64_t>()(key.a) ^ (std::hash<std::int64_t>()(key.b) * 0x9e3779b97f4a7c15ull);
+        }
+    };
+
+    int m_iterations;
+    bool m_warmStarting;
+    std::unordered_map<PairKey, Manifold, PairKeyHash> m_cache;
+    std::size_t m_warmStarted;
+    std::size_t m_batchCount;
+    std::size_t m_islandCount;
+    double m_solveTime;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // CONTACT_SOLVER_H
@@ -0,0 +1,62 @@
+#ifndef CONTINUOUS_COLLISION_H
+#define CONTINUOUS_COLLISION_H
+
+#include "BodyArrays.h"
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+class TaskPool;
+
+/**
+ * @brief 第i个刚体本步是否需要连续碰撞检测
+ *
+ * 开启了CCD（阈值大于0）、未休眠的动态球体或盒体，且本步的位移|v|*dt超过阈值。
+ */
+bool isFastBody(const BodyArrays& bodies, std::size_t i, float dt);
+
+/**
+ * @class ContinuousCollision
+ * @brief 连续碰撞检测，防止高速刚体在一步内穿过薄物体
+ *
+ * 在速度求解之后、位置积分之前调用。粗检测已把快速刚体的AABB沿位移扩展，
+ * 对每个快速刚体，用它的内切球沿相对位移对候选对中的另一个刚体做保守推进
+ * （每次前进 距离/位移长度，距离小于容差时停止），取最早的碰撞时刻，
+ * 把本步的位移截断到该时刻；速度不变，下一步由细检测生成接触。
+ * 目标刚体按当前姿态计算，只支持球体、盒体和平面（与细检测支持的形状一致）。
+ * 各快速刚体在线程池中并行处理，结果与线程数无关。
+ */
+class ContinuousCollision {
+public:
+    ContinuousCollision();
+
+    /**
+     * @brief 截断快速刚体本步的位移
+     * @param bodies 刚体结构数组
+     * @param pairs 粗检测的候选对数组（每对2个行号）
+     * @param pairCount 候选对数量
+     * @param dt 时间步长
+     * @param pool 线程池
+     */
+    void update(const BodyArrays& bodies, const std::int32_t* pairs, std::size_t pairCount, float dt,
+                TaskPool& pool);
+
+    /**
+     * @brief 上一次update()中被截断位移的刚体数量
+     */
+    std::size_t getClampedCount() const;
+
+private:
+    std::vector<std::int32_t> m_fast;         ///< 快速刚体的行号
+    std::vector<std::int32_t> m_fastIndex;    ///< 行号 -> 在m_fast中的下标，-1表示不是快速刚体
+    std::vector<std::size_t> m_offsets;       ///< 各快速刚体的候选刚体在m_candidates中的起止位置
+    std::vector<std::int32_t> m_candidates;
+    std::vector<float> m_fractions;           ///< 各快速刚体本步保留的位移比例
+    std::size_t m_clampedCount;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // CONTINUOUS_COLLISION_H
@@ -0,0 +1,72 @@
+#ifndef INTEGRATOR_H
+#define INTEGRATOR_H
+
+#include "BodyArrays.h"
+#include "Vector3.h"
+
+namespace PhysicsSimulator {
+
+class TaskPool;
+
+/**
+ * @brief 根据形状和质量计算局部主惯性矩倒数
+ * @param shapeType 形状类型（ShapeType的数值）
+ * @param mass 质量，为0时输出0
+ * @param shapeParams 形状参数
+ * @param inverseInertia 输出3个分量
+ */
+void computeInverseInertia(int shapeType, float mass, const float shapeParams[4], float inverseInertia[3]);
+
+/**
+ * @brief 计算世界坐标系下的 I^-1 v = R * diag(invI) * R^T * v
+ * @param rotation 旋转四元数 (x,y,z,w)
+ * @param inverseInertia 局部主惯性矩倒数
+ * @param v 输入向量
+ * @return 结果向量
+ */
+Vector3 applyWorldInverseInertia(const float rotation[4], const float inverseInertia[3], const Vector3& v);
+
+/**
+ * @brief 速度更新：动态刚体受重力和累积的力/力矩作用，静态刚体速度清零，休眠刚体跳过
+ * @param bodies 刚体结构数组
+ * @param gravity 重力
+ * @param dt 时间步长
+ * @param pool 线程池，各行互不依赖，按行分块并行
+ */
+void integrateVelocities(const BodyArrays& bodies, const Vector3& gravity, float dt, TaskPool& pool);
+
+/**
+ * @brief 位置和姿态更新（休眠刚体跳过），四元数重新归一化，力和力矩累加器清零
+ * @param bodies 刚体结构数组
+ * @param dt 时间步长
+ * @param pool 线程池，各行互不依赖，按行分块并行
+ */
+void integratePositions(const BodyArrays& bodies, float dt, TaskPool& pool);
+
+/**
+ * @brief 只更新[begin, end)行的速度
+ */
+void integrateVelocities(const BodyArrays& bodies, const Vector3& gravity, float dt, std::size_t begin,
+                         std::size_t end);
+
+/**
+ * @brief 只更新[begin, end)行的位置和姿态
+ */
+void integratePositions(const BodyArrays& bodies, float dt, std::size_t begin, std::size_t end);
+
+/**
+ * @brief 对所有刚体执行一步半隐式欧拉积分
+ *
+ * 动态刚体受重力和累积的力/力矩作用；运动学刚体按当前速度移动；
+ * 静态刚体保持不动。积分后四元数重新归一化，力和力矩累加器清零。
+ *
+ * @param bodies 刚体结构数组
+ * @param gravity 重力
+ * @param dt 时间步长
+ * @param pool 线程池
+ */
+void integrateBodies(const BodyArrays& bodies, const Vector3& gravity, float dt, TaskPool& pool);
+
+} // namespace PhysicsSimulator
+
+#endif // INTEGRATOR_H
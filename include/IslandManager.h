@@ -0,0 +1,114 @@
+#ifndef ISLAND_MANAGER_H
+#define ISLAND_MANAGER_H
+
+#include "BodyArrays.h"
+#include "Joints.h"
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+class Narrowphase;
+
+/**
+ * @brief 刚体是否参与碰撞检测：未休眠的动态刚体和运动学刚体
+ */
+bool isActiveBody(const BodyArrays& bodies, std::size_t i);
+
+/**
+ * @brief 并查集：计算每个节点所在连通分量的代表（分量中最小的下标）
+ * @param count 节点数量
+ * @param edgeA 边的一端
+ * @param edgeB 边的另一端
+ * @param edgeCount 边数量
+ * @param roots 输出的代表
+ */
+void unionFind(std::size_t count, const std::int32_t* edgeA, const std::int32_t* edgeB,
+               std::size_t edgeCount, std::vector<std::int32_t>& roots);
+
+/**
+ * @class IslandManager
+ * @brief 岛屿构建与刚体休眠
+ *
+ * 动态刚体通过接触和关节连成岛屿。岛屿中所有刚体的速度持续低于阈值
+ * time_to_sleep秒后整个岛屿进入休眠，速度清零，并在sleepIslands列中
+ * 记录岛屿编号。休眠的刚体不参与积分、细检测和求解；当它与活动刚体
+ * 接触或由关节相连时，同一编号的整个岛屿被唤醒。
+ */
+class IslandManager {
+public:
+    IslandManager();
+
+    /**
+     * @brief 开启/关闭休眠，关闭时由调用方唤醒所有刚体
+     * @param enabled 是否开启
+     */
+    void setEnabled(bool enabled);
+
+    /**
+     * @brief 是否开启休眠
+     */
+    bool isEnabled() const;
+
+    /**
+     * @brief 设置休眠参数
+     * @param linearThreshold 线速度阈值
+     * @param angularThreshold 角速度阈值
+     * @param timeToSleep 速度持续低于阈值多久后休眠（秒）
+     */
+    void setSleepParameters(float linearThreshold, float angularThreshold, float timeToSleep);
+
+    /**
+     * @brief 唤醒与活动刚体接触或由关节相连的休眠岛屿
+     * @param bodies 刚体结构数组
+     * @param contacts 细检测得到的接触
+     * @param joints 关节结构数组，两端刚体的行号需已更新
+     * @return 是否有刚体被唤醒
+     */
+    bool wake(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints);
+
+    /**
+     * @brief 唤醒所有刚体
+     * @param bodies 刚体结构数组
+     */
+    void wakeAll(const BodyArrays& bodies);
+
+    /**
+     * @brief 构建岛屿并更新休眠状态（在接触求解之后调用）
+     * @param bodies 刚体结构数组
+     * @param contacts 细检测得到的接触
+     * @param joints 关节结构数组
+     * @param dt 时间步长
+     */
+    void update(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints, float dt);
+
+    /**
+     * @brief 下一个休眠岛屿的编号（保存/恢复快照时使用）
+     */
+    std::int32_t getNextIsland() const;
+
+    /**
+     * @brief 设置下一个休眠岛屿的编号
+     * @param island 岛屿编号（大于0）
+     */
+    void setNextIsland(std::int32_t island);
+
+    std::size_t getIslandCount() const;   ///< 上一次更新时活动岛屿的数量
+    double getBuildTime() const;          ///< 上一次更新的耗时（秒）
+
+private:
+    bool isMovingKinematic(const BodyArrays& bodies, std::size_t i) const;
+
+    bool m_enabled;
+    float m_linearThreshold;
+    float m_angularThreshold;
+    float m_timeToSleep;
+    std::int32_t m_nextIsland;
+    std::size_t m_islandCount;
+    double m_buildTime;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // ISLAND_MANAGER_H
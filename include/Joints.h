@@ -0,0 +1,46 @@
+#ifndef JOINTS_H
+#define JOINTS_H
+
+#include <cstddef>
+#include <cstdint>
+
+namespace PhysicsSimulator {
+
+/**
+ * @enum JointType
+ * @brief 关节类型（数值与Python端python.core.enums.JointType一致）
+ */
+enum class JointType {
+    POINT = 0,      ///< 点对点：两个锚点重合，转动不受限（3行）
+    HINGE = 1,      ///< 铰链：锚点重合，只能绕轴转动（5行）
+    SLIDER = 2,     ///< 滑块：相对姿态不变，只能沿轴平移（5行）
+    DISTANCE = 3    ///< 距离：两个锚点保持固定距离（1行）
+};
+
+/**
+ * @brief 每个关节最多的约束行数，关节的累积冲量按这个宽度存放
+ */
+constexpr int JOINT_MAX_ROWS = 5;
+
+/**
+ * @brief 关节结构数组（指针均指向PhysicsWorld持有的列）
+ *
+ * 锚点和轴都在各自刚体的局部坐标中：第一个刚体的在前3个分量，第二个的在后3个分量。
+ * reference为创建时两个刚体的相对旋转conj(qA)*qB，滑块关节保持它不变。
+ */
+struct JointArrays {
+    std::size_t count;                  ///< 关节数量
+    const std::int64_t* handles;        ///< 关节句柄 x1
+    const std::int32_t* types;          ///< 关节类型 x1
+    const std::int64_t* bodies;         ///< 两端刚体的句柄 x2
+    const float* localAnchors;          ///< 局部锚点 x6
+    const float* localAxes;             ///< 局部轴 x6（铰链的转轴、滑块的滑动方向）
+    const float* references;            ///< 初始相对旋转 x4 (x,y,z,w)
+    const float* lengths;               ///< 距离关节的长度 x1
+    float* impulses;                    ///< 各约束行的累积冲量 x5（warm starting）
+    const std::int32_t* bodyRows;       ///< 两端刚体的行号 x2，刚体不在世界中时为-1
+};
+
+} // namespace PhysicsSimulator
+
+#endif // JOINTS_H
@@ -0,0 +1,99 @@
+#ifndef LOGGER_H
+#define LOGGER_H
+
+#include <atomic>
+#include <sstream>
+#include <string>
+
+namespace PhysicsSimulator {
+
+/**
+ * @brief 日志级别，数值越大输出越多；顺序与Python端python.core.enums.LogLevel一致
+ */
+enum LogLevel {
+    LOG_OFF = 0,        ///< 不输出
+    LOG_ERROR,          ///< 错误
+    LOG_WARN,           ///< 警告（默认级别）
+    LOG_INFO,           ///< 初始化、增删刚体等低频事件
+    LOG_DEBUG,          ///< 刚体创建/销毁和属性设置
+    LOG_TRACE           ///< 每次步进
+};
+
+/**
+ * @brief 日志类别，每个类别有独立的级别；顺序与Python端python.core.enums.LogCategory一致
+ */
+enum LogCategory {
+    LOG_WORLD = 0,      ///< 物理世界
+    LOG_BODY,           ///< 刚体
+    LOG_SOLVER,         ///< 碰撞检测与求解
+    LOG_CATEGORY_COUNT
+};
+
+/**
+ * @brief 编译期的最高日志级别，高于它的PS_LOG语句不会被编译
+ */
+#ifndef PS_LOG_MAX_LEVEL
+#define PS_LOG_MAX_LEVEL ::PhysicsSimulator::LOG_TRACE
+#endif
+
+/**
+ * @class Logger
+ * @brief 按类别和级别过滤的日志
+ *
+ * 级别检查只是一次原子读取和比较；关闭时不格式化消息。开启时消息先写入缓冲区，
+ * 缓冲区写满、写入错误/警告、调用flush()或程序退出时才输出到标准输出。
+ * 初始级别为LOG_WARN，可以用环境变量PS_LOG_LEVEL(0-5)修改。
+ */
+class Logger {
+public:
+    /**
+     * @brief 判断某个类别是否输出该级别的消息
+     */
+    static bool isEnabled(LogCategory category, LogLevel level) {
+        return level <= s_levels[category].load(std::memory_order_relaxed);
+    }
+
+    /**
+     * @brief 设置日志级别
+     * @param category 类别，为LOG_CATEGORY_COUNT时设置所有类别
+     * @param level 级别
+     */
+    static void setLevel(LogCategory category, LogLevel level);
+
+    /**
+     * @brief 获取某个类别的日志级别
+     */
+    static LogLevel getLevel(LogCategory category);
+
+    /**
+     * @brief 写入一条消息（不检查级别，由PS_LOG调用）
+     */
+    static void write(LogCategory category, LogLevel level, const std::string& message);
+
+    /**
+     * @brief 输出缓冲区中的所有消息
+     */
+    static void flush();
+
+private:
+    static std::atomic<int> s_levels[LOG_CATEGORY_COUNT];
+};
+
+} // namespace PhysicsSimulator
+
+/**
+ * @brief 记录一条日志，例如 PS_LOG(LOG_BODY, LOG_DEBUG, "质量: " << mass);
+ *
+ * 级别关闭时不求值消息表达式。
+ */
+#define PS_LOG(category, level, message)                                                    \
+    do {                                                                                    \
+        if ((level) <= PS_LOG_MAX_LEVEL &&                                                  \
+            ::PhysicsSimulator::Logger::isEnabled((category), (level))) {                   \
+            std::ostringstream psLogStream_;                                                \
+            psLogStream_ << message;                                                        \
+            ::PhysicsSimulator::Logger::write((category), (level), psLogStream_.str());     \
+        }                                                                                   \
+    } while (0)
+
+#endif // LOGGER_H
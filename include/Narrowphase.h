@@ -0,0 +1,63 @@
+#ifndef NARROWPHASE_H
+#define NARROWPHASE_H
+
+#include "BodyArrays.h"
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+class TaskPool;
+
+/**
+ * @class Narrowphase
+ * @brief 细检测阶段，对候选对生成接触点
+ *
+ * 候选对先按形状组合分组，各组首尾相接后在线程池中分块并行处理。支持球-球、球-平面、
+ * 盒子-平面、盒子-球和盒子-盒子(分离轴定理)，其余组合暂不生成接触。
+ *
+ * 结果为扁平数组，按候选对的顺序排列，同一对的接触点相邻。
+ * 法线从bodyA指向bodyB，深度为正表示穿透，接触点位于两表面的中点。
+ */
+class Narrowphase {
+public:
+    Narrowphase();
+
+    /**
+     * @brief 对候选对生成接触
+     * @param bodies 刚体结构数组
+     * @param pairs 候选对数组（每对2个行号）
+     * @param pairCount 候选对数量
+     * @param pool 线程池
+     */
+    void update(const BodyArrays& bodies, const std::int32_t* pairs, std::size_t pairCount, TaskPool& pool);
+
+    /**
+     * @brief 获取接触数量
+     */
+    std::size_t getContactCount() const;
+
+    std::int32_t* getBodyA();   ///< 接触的第一个刚体行号 x1
+    std::int32_t* getBodyB();   ///< 接触的第二个刚体行号 x1
+    float* getPoints();         ///< 接触点 x3
+    float* getNormals();        ///< 法线 x3
+    float* getDepths();         ///< 穿透深度 x1
+
+    /**
+     * @brief 获取上一次update()的耗时（秒）
+     */
+    double getBuildTime() const;
+
+private:
+    std::vector<std::int32_t> m_bodyA;
+    std::vector<std::int32_t> m_bodyB;
+    std::vector<float> m_points;
+    std::vector<float> m_normals;
+    std::vector<float> m_depths;
+    double m_buildTime;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // NARROWPHASE_H
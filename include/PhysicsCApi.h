@@ -0,0 +1,327 @@
+#ifndef PHYSICS_C_API_H
+#define PHYSICS_C_API_H
+
+#include <stdint.h>
+
+/**
+ * @file PhysicsCApi.h
+ * @brief 供Python(ctypes)调用的C接口
+ *
+ * 所有批量接口都以连续数组为参数，一次调用处理任意数量的刚体。
+ * 刚体句柄是刚体池中的32位句柄（低22位为槽号，高10位为代数，有效句柄不为0），
+ * 接口中按int64传递。刚体销毁后句柄失效，传入过期句柄的调用不做任何事。
+ */
+
+#ifdef _WIN32
+#define PS_API __declspec(dllexport)
+#else
+#define PS_API __attribute__((visibility("default")))
+#endif
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+/**
+ * @brief 刚体结构数组的列编号，与Python端BODY_COLUMNS的顺序一致
+ */
+enum PSBodyColumn {
+    PS_COLUMN_HANDLES = 0,              ///< int64 x 1
+    PS_COLUMN_POSITIONS = 1,            ///< float x 3
+    PS_COLUMN_ROTATIONS = 2,            ///< float x 4
+    PS_COLUMN_LINEAR_VELOCITIES = 3,    ///< float x 3
+    PS_COLUMN_ANGULAR_VELOCITIES = 4,   ///< float x 3
+    PS_COLUMN_MASSES = 5,               ///< float x 1
+    PS_COLUMN_SHAPE_TYPES = 6,          ///< int32 x 1
+    PS_COLUMN_BODY_TYPES = 7,           ///< int32 x 1
+    PS_COLUMN_SHAPE_PARAMS = 8,         ///< float x 4
+    PS_COLUMN_FORCES = 9,               ///< float x 3
+    PS_COLUMN_TORQUES = 10,             ///< float x 3
+    PS_COLUMN_INVERSE_INERTIAS = 11,    ///< float x 3
+    PS_COLUMN_FRICTIONS = 12,           ///< float x 1
+    PS_COLUMN_RESTITUTIONS = 13,        ///< float x 1
+    PS_COLUMN_SLEEP_ISLANDS = 14,       ///< int32 x 1
+    PS_COLUMN_SLEEP_TIMES = 15,         ///< float x 1
+    PS_COLUMN_CCD_THRESHOLDS = 16       ///< float x 1
+};
+
+/**
+ * @brief 接触数组的列编号，与Python端CONTACT_COLUMNS的顺序一致
+ */
+enum PSContactColumn {
+    PS_CONTACT_BODY_A = 0,              ///< int32 x 1
+    PS_CONTACT_BODY_B = 1,              ///< int32 x 1
+    PS_CONTACT_POINTS = 2,              ///< float x 3
+    PS_CONTACT_NORMALS = 3,             ///< float x 3
+    PS_CONTACT_DEPTHS = 4               ///< float x 1
+};
+
+/**
+ * @brief 关节数组的列编号，与Python端JOINT_COLUMNS的顺序一致
+ */
+enum PSJointColumn {
+    PS_JOINT_HANDLES = 0,               ///< int64 x 1
+    PS_JOINT_TYPES = 1,                 ///< int32 x 1
+    PS_JOINT_BODIES = 2,                ///< int64 x 2
+    PS_JOINT_LOCAL_ANCHORS = 3,         ///< float x 6
+    PS_JOINT_LOCAL_AXES = 4,            ///< float x 6
+    PS_JOINT_REFERENCES = 5,            ///< float x 4
+    PS_JOINT_LENGTHS = 6,               ///< float x 1
+    PS_JOINT_IMPULSES = 7               ///< float x 5
+};
+
+/* 物理世界 */
+PS_API void* ps_world_create(void);
+PS_API void ps_world_destroy(void* world);
+PS_API void ps_world_initialize(void* world, float gravity_x, float gravity_y, float gravity_z);
+PS_API int ps_world_step(void* world, float time_step, int max_sub_steps, float fixed_time_step);
+PS_API int ps_world_body_count(void* world);
+
+/**
+ * @brief 各列预留的行数，刚体数量不超过它时ps_world_column返回的地址不变
+ */
+PS_API int ps_world_body_capacity(void* world);
+
+/**
+ * @brief 获取某一列的首地址，增删刚体后地址失效
+ * @return 列数据首地址，列编号无效时返回NULL
+ */
+PS_API void* ps_world_column(void* world, int column);
+
+/**
+ * @brief 选择粗检测算法
+ * @param algorithm 0为扫掠剪枝，1为空间哈希
+ * @param cell_size 空间哈希的格子尺寸，不大于0时自动选取
+ */
+PS_API void ps_world_set_broadphase(void* world, int algorithm, float cell_size);
+
+/**
+ * @brief 上一次步进得到的候选对，pairs为pair_count x 2的行号数组(a<b)
+ */
+PS_API int ps_world_pair_count(void* world);
+PS_API const int32_t* ps_world_pairs(void* world);
+
+/**
+ * @brief 上一次粗检测的耗时（秒）
+ */
+PS_API double ps_world_broadphase_time(void* world);
+
+/**
+ * @brief 上一次步进得到的接触，按候选对顺序排列
+ *
+ * 法线从body_a指向body_b，深度为正表示穿透。列地址在下一次步进后失效。
+ */
+PS_API int ps_world_contact_count(void* world);
+PS_API void* ps_world_contact_column(void* world, int column);
+
+/**
+ * @brief 上一次细检测的耗时（秒）
+ */
+PS_API double ps_world_narrowphase_time(void* world);
+
+/**
+ * @brief 渲染插值后的状态列，只支持PS_COLUMN_POSITIONS和PS_COLUMN_ROTATIONS，
+ *        地址在下一次步进或增删刚体后失效
+ */
+PS_API void* ps_world_interpolated_column(void* world, int column);
+PS_API float ps_world_interpolation_alpha(void* world);
+
+/**
+ * @brief 设置接触求解器的迭代次数
+ */
+PS_API void ps_world_set_solver_iterations(void* world, int iterations);
+
+/**
+ * @brief 开启/关闭warm starting（关闭时清空接触流形缓存）
+ */
+PS_API void ps_world_set_warm_starting(void* world, int enabled);
+
+/**
+ * @brief 上一次求解的统计：缓存的接触流形数、命中缓存的接触点数、批次数和耗时（秒）
+ */
+PS_API int ps_world_manifold_count(void* world);
+PS_API int ps_world_warm_started_count(void* world);
+PS_API int ps_world_batch_count(void* world);
+PS_API double ps_world_solver_time(void* world);
+
+/**
+ * @brief 接触流形缓存中的接触点数量
+ */
+PS_API int ps_world_cache_point_count(void* world);
+
+/**
+ * @brief 导出接触流形缓存：句柄对(N,2)、刚体A局部坐标中的接触点(N,3)、法向冲量+摩擦冲量(N,4)
+ */
+PS_API void ps_world_save_cache(void* world, int64_t* handles, float* anchors, float* impulses);
+
+/**
+ * @brief 用导出的数据替换接触流形缓存
+ */
+PS_API void ps_world_load_cache(void* world, int count, const int64_t* handles, const float* anchors,
+                                const float* impulses);
+
+/**
+ * @brief 固定步长累加器中剩余的时间，设置时同时重置渲染插值状态
+ */
+PS_API double ps_world_accumulator(void* world);
+PS_API void ps_world_set_accumulator(void* world, double accumulator);
+
+/**
+ * @brief 下一个休眠岛屿的编号
+ */
+PS_API int ps_world_next_island(void* world);
+PS_API void ps_world_set_next_island(void* world, int island);
+
+/**
+ * @brief 开启/关闭休眠，关闭时唤醒所有刚体
+ */
+PS_API void ps_world_set_sleeping(void* world, int enabled);
+
+/**
+ * @brief 设置休眠阈值：线速度、角速度，以及持续低于阈值多久后休眠（秒）
+ */
+PS_API void ps_world_set_sleep_parameters(void* world, float linear_threshold, float angular_threshold,
+                                          float time_to_sleep);
+
+/**
+ * @brief 唤醒所有刚体
+ */
+PS_API void ps_world_wake_all(void* world);
+
+/**
+ * @brief 步进使用的线程数（包括调用线程），设置为0时取硬件线程数；结果与线程数无关
+ */
+PS_API void ps_world_set_thread_count(void* world, int count);
+PS_API int ps_world_thread_count(void* world);
+
+/**
+ * @brief 上一次步进的活动岛屿数量和岛屿构建耗时（秒）
+ */
+PS_API int ps_world_island_count(void* world);
+PS_API double ps_world_island_time(void* world);
+
+/**
+ * @brief 开启/关闭步进性能统计，开启时清空并分配capacity个样本的环形缓冲区
+ */
+PS_API void ps_world_set_profiling(void* world, int enabled, int capacity);
+
+/**
+ * @brief 环形缓冲区中的样本数
+ */
+PS_API int ps_world_profile_count(void* world);
+
+/**
+ * @brief 按时间顺序导出最近的至多max_count个样本：各阶段耗时(N,PROFILE_PHASE_COUNT)（毫秒）
+ *        和计数器(N,PROFILE_COUNTER_COUNT)
+ * @return 导出的样本数N，不超过max_count
+ */
+PS_API int ps_world_profile_copy(void* world, int max_count, float* times, int32_t* counters);
+
+/**
+ * @brief 批量添加刚体
+ * @return 实际添加的数量（已在某个世界中的刚体会被跳过）
+ */
+PS_API int ps_world_add_bodies(void* world, const int64_t* handles, int count);
+
+/**
+ * @brief 批量移除刚体，被移除的行由最后一行填补（不保持原有顺序）
+ * @return 实际移除的数量
+ */
+PS_API int ps_world_remove_bodies(void* world, const int64_t* handles, int count);
+
+/**
+ * @brief 批量添加关节，锚点、轴和相对旋转为两端刚体的局部坐标（见PSJointColumn）
+ * @param out_handles 输出的关节句柄（布局与刚体句柄相同），句柄用完时为0
+ * @return 实际添加的数量
+ */
+PS_API int ps_world_add_joints(void* world, int count, const int32_t* types, const int64_t* bodies,
+                               const float* local_anchors, const float* local_axes, const float* references,
+                               const float* lengths, int64_t* out_handles);
+
+/**
+ * @brief 批量移除关节，被移除的行由最后一行填补
+ * @return 实际移除的数量
+ */
+PS_API int ps_world_remove_joints(void* world, const int64_t* handles, int count);
+
+/**
+ * @brief 关节数量和各列预留的行数，关节数量不超过预留行数时ps_world_joint_column返回的地址不变
+ */
+PS_API int ps_world_joint_count(void* world);
+PS_API int ps_world_joint_capacity(void* world);
+
+/**
+ * @brief 获取关节数组某一列的首地址，增删关节后地址失效
+ * @return 列数据首地址，列编号无效时返回NULL
+ */
+PS_API void* ps_world_joint_column(void* world, int column);
+
+/**
+ * @brief 批量查询关节的行号，句柄无效或已过期时为-1
+ */
+PS_API void ps_world_joint_rows(void* world, const int64_t* handles, int count, int32_t* out_rows);
+
+/* 批量创建刚体，positions/half_extents/normals为count x 3的数组；刚体池已满时句柄为0 */
+PS_API void ps_create_boxes(int count, const float* masses, const float* positions,
+                            const float* half_extents, int64_t* out_handles);
+PS_API void ps_create_spheres(int count, const float* masses, const float* positions,
+                              const float* radii, int64_t* out_handles);
+PS_API void ps_create_planes(int count, const float* normals, const float* constants,
+                             int64_t* out_handles);
+PS_API void ps_destroy_bodies(const int64_t* handles, int count);
+
+/**
+ * @brief 句柄是否指向现存的刚体（刚体销毁后句柄过期）
+ */
+PS_API int ps_body_is_valid(int64_t handle);
+
+/**
+ * @brief 刚体池中现存的刚体数量
+ */
+PS_API int ps_body_live_count(void);
+
+/**
+ * @brief 批量查询刚体在世界结构数组中的行号，不在世界中或句柄无效时为-1
+ */
+PS_API void ps_world_body_rows(void* world, const int64_t* handles, int count, int32_t* out_rows);
+
+/**
+ * @brief 读取单个刚体的某一列（位置、旋转、速度、质量、形状参数、摩擦/恢复系数、CCD阈值）
+ * @param out 输出缓冲区，长度不小于该列的分量数
+ */
+PS_API void ps_body_get(int64_t handle, int column, float* out);
+
+/**
+ * @brief 写入单个刚体的某一列（位置、旋转、速度、摩擦/恢复系数、CCD阈值）
+ */
+PS_API void ps_body_set(int64_t handle, int column, const float* values);
+
+PS_API int ps_body_get_shape_type(int64_t handle);
+PS_API int ps_body_get_body_type(int64_t handle);
+PS_API void ps_body_set_body_type(int64_t handle, int body_type);
+
+/**
+ * @brief 施加力/冲量，rel_pos为相对质心的世界坐标偏移，可以为NULL
+ */
+PS_API void ps_body_apply_force(int64_t handle, const float* force, const float* rel_pos);
+PS_API void ps_body_apply_impulse(int64_t handle, const float* impulse, const float* rel_pos);
+
+/* 日志 */
+
+/**
+ * @brief 设置日志级别(0关闭 1错误 2警告 3信息 4调试 5跟踪)
+ * @param category 类别(0物理世界 1刚体 2求解器)，小于0时设置所有类别
+ */
+PS_API void ps_log_set_level(int category, int level);
+PS_API int ps_log_get_level(int category);
+
+/**
+ * @brief 输出日志缓冲区中的所有消息
+ */
+PS_API void ps_log_flush(void);
+
+#ifdef __cplusplus
+}
+#endif
+
+#endif // PHYSICS_C_API_H
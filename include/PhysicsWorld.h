@@ -3,12 +3,19 @@
 
 #include <vector>
 #include <memory>
+#include <cstddef>
+#include <cstdint>
 
 namespace PhysicsSimulator {
 
 // 前向声明
 class RigidBody;
 class Vector3;
+class Broadphase;
+class Narrowphase;
+class ContactSolver;
+class IslandManager;
+class Profiler;
 
 /**
  * @class PhysicsWorld
@@ -37,10 +44,51 @@ public:
     
     /**
      * @brief 步进模拟
-     * @param timeStep 时间步长
+     *
+     * timeStep累加到内部累加器中，每满fixedTimeStep执行一个固定子步，
+     * 子步数不超过maxSubSteps，超出部分的时间被丢弃，避免慢帧导致
+     * 越来越多的子步(死亡螺旋)。累加器中剩余的时间用于渲染插值。
+     * maxSubSteps为0时直接以timeStep执行一步(可变步长)。
+     *
+     * @param timeStep 经过的时间（通常为一帧的实际耗时）
      * @param maxSubSteps 最大子步数
+     * @param fixedTimeStep 内部固定步长
+     * @return 实际执行的子步数
      */
-    void stepSimulation(float timeStep, int maxSubSteps = 10);
+    int stepSimulation(float timeStep, int maxSubSteps = 10, float fixedTimeStep = 1.0f / 60.0f);
+    
+    /**
+     * @brief 获取渲染插值后的位置数组（每个刚体3个分量）
+     *
+     * 在最后一个子步前后的状态之间按累加器剩余时间插值，
+     * 在下一次步进或增删刚体后失效。
+     * @return 数组首地址
+     */
+    float* getInterpolatedPositions();
+    
+    /**
+     * @brief 获取渲染插值后的旋转数组（每个刚体4个分量）
+     * @return 数组首地址
+     */
+    float* getInterpolatedRotations();
+    
+    /**
+     * @brief 获取插值系数（累加器剩余时间 / 固定步长）
+     * @return 插值系数，范围[0,1)
+     */
+    float getInterpolationAlpha() const;
+    
+    /**
+     * @brief 获取固定步长累加器中剩余的时间
+     * @return 剩余时间（秒）
+     */
+    double getAccumulator() const;
+    
+    /**
+     * @brief 设置累加器中剩余的时间（恢复快照时使用），同时重置渲染插值状态
+     * @param accumulator 剩余时间（秒）
+     */
+    void setAccumulator(double accumulator);
     
     /**
      * @brief 添加刚体到物理世界
@@ -54,6 +102,271 @@ public:
      */
     void removeRigidBody(RigidBody* body);
     
+    /**
+     * @brief 批量添加刚体到物理世界
+     * @param bodies 刚体指针数组
+     * @param count 刚体数量
+     */
+    void addRigidBodies(RigidBody* const* bodies, std::size_t count);
+    
+    /**
+     * @brief 批量从物理世界移除刚体，每个被移除的行由最后一行填补（不保持原有顺序）
+     * @param bodies 刚体指针数组
+     * @param count 刚体数量
+     */
+    void removeRigidBodies(RigidBody* const* bodies, std::size_t count);
+    
+    /**
+     * @brief 获取刚体数量
+     * @return 刚体数量
+     */
+    std::size_t getBodyCount() const;
+    
+    /**
+     * @brief 获取各列预留的行数，刚体数量不超过它时列数组的地址不变
+     * @return 预留的行数
+     */
+    std::size_t getBodyCapacity() const;
+    
+    /**
+     * @brief 获取刚体在结构数组中的行号
+     * @param body 刚体指针
+     * @return 行号，不在世界中时返回-1
+     */
+    int getBodyIndex(const RigidBody* body) const;
+    
+    /**
+     * @brief 按句柄获取刚体在结构数组中的行号（O(1)，不查找哈希表）
+     * @param handle 刚体句柄
+     * @return 行号，不在世界中或句柄已过期时返回-1
+     */
+    int getBodyIndex(std::uint32_t handle) const;
+    
+    /**
+     * @brief 获取位置数组（每个刚体3个分量，增删刚体后指针失效）
+     * @return 数组首地址
+     */
+    float* getPositions();
+    
+    /**
+     * @brief 获取旋转数组（每个刚体4个分量x,y,z,w）
+     * @return 数组首地址
+     */
+    float* getRotations();
+    
+    /**
+     * @brief 获取线速度数组（每个刚体3个分量）
+     * @return 数组首地址
+     */
+    float* getLinearVelocities();
+    
+    /**
+     * @brief 获取角速度数组（每个刚体3个分量）
+     * @return 数组首地址
+     */
+    float* getAngularVelocities();
+    
+    /**
+     * @brief 获取质量数组
+     * @return 数组首地址
+     */
+    float* getMasses();
+    
+    /**
+     * @brief 获取形状类型数组
+     * @return 数组首地址
+     */
+    std::int32_t* getShapeTypes();
+    
+    /**
+     * @brief 获取刚体类型数组
+     * @return 数组首地址
+     */
+    std::int32_t* getBodyTypes();
+    
+    /**
+     * @brief 获取形状参数数组（每个刚体4个分量）
+     * @return 数组首地址
+     */
+    float* getShapeParams();
+    
+    /**
+     * @brief 获取累积力数组（每个刚体3个分量）
+     * @return 数组首地址
+     */
+    float* getForces();
+    
+    /**
+     * @brief 获取累积力矩数组（每个刚体3个分量）
+     * @return 数组首地址
+     */
+    float* getTorques();
+    
+    /**
+     * @brief 获取局部主惯性矩倒数数组（每个刚体3个分量）
+     * @return 数组首地址
+     */
+    float* getInverseInertias();
+    
+    /**
+     * @brief 获取摩擦系数数组
+     * @return 数组首地址
+     */
+    float* getFrictions();
+    
+    /**
+     * @brief 获取恢复系数数组
+     * @return 数组首地址
+     */
+    float* getRestitutions();
+    
+    /**
+     * @brief 获取连续碰撞检测的运动阈值数组（0表示关闭）
+     * @return 数组首地址
+     */
+    float* getCcdThresholds();
+    
+    /**
+     * @brief 获取休眠岛屿编号数组（0表示未休眠）
+     * @return 数组首地址
+     */
+    std::int32_t* getSleepIslands();
+    
+    /**
+     * @brief 获取休眠计时数组
+     * @return 数组首地址
+     */
+    float* getSleepTimes();
+    
+    /**
+     * @brief 获取句柄数组（32位刚体句柄，按int64存放）
+     * @return 数组首地址
+     */
+    std::int64_t* getHandles();
+    
+    /**
+     * @brief 批量添加关节，锚点、轴和相对旋转已换算到两端刚体的局部坐标
+     *
+     * 关节按句柄引用两端的刚体，刚体不在本世界中时关节不起作用；
+     * 两端的休眠岛屿被唤醒。
+     *
+     * @param count 关节数量
+     * @param types 关节类型（JointType的数值）
+     * @param bodies 两端刚体的句柄（每个关节2个）
+     * @param localAnchors 两端的局部锚点（每个关节6个分量）
+     * @param localAxes 两端的局部轴（每个关节6个分量）
+     * @param references 初始相对旋转conj(qA)*qB（每个关节4个分量）
+     * @param lengths 距离关节的长度
+     * @param handles 输出的关节句柄，句柄用完时为0
+     * @return 实际添加的数量
+     */
+    std::size_t addJoints(std::size_t count, const std::int32_t* types, const std::int64_t* bodies,
+                          const float* localAnchors, const float* localAxes, const float* references,
+                          const float* lengths, std::int64_t* handles);
+    
+    /**
+     * @brief 批量移除关节，被移除的行由最后一行填补，两端的休眠岛屿被唤醒
+     * @param handles 关节句柄数组，无效或过期的句柄被忽略
+     * @param count 句柄数量
+     * @return 实际移除的数量
+     */
+    std::size_t removeJoints(const std::int64_t* handles, std::size_t count);
+    
+    /**
+     * @brief 获取关节数量
+     */
+    std::size_t getJointCount() const;
+    
+    /**
+     * @brief 获取关节各列预留的行数，关节数量不超过它时列数组的地址不变
+     */
+    std::size_t getJointCapacity() const;
+    
+    /**
+     * @brief 按句柄获取关节在关节数组中的行号
+     * @param handle 关节句柄
+     * @return 行号，句柄无效或已过期时返回-1
+     */
+    int getJointIndex(std::uint32_t handle) const;
+    
+    /**
+     * @brief 关节数组的各列（增删关节后指针失效），布局见JointArrays
+     */
+    std::int64_t* getJointHandles();
+    std::int32_t* getJointTypes();
+    std::int64_t* getJointBodies();
+    float* getJointLocalAnchors();
+    float* getJointLocalAxes();
+    float* getJointReferences();
+    float* getJointLengths();
+    float* getJointImpulses();
+    
+    /**
+     * @brief 获取粗检测阶段（候选对为上一次步进后的结果）
+     * @return 粗检测对象
+     */
+    Broadphase& getBroadphase();
+    
+    /**
+     * @brief 获取细检测阶段（接触为上一次步进后的结果）
+     * @return 细检测对象
+     */
+    Narrowphase& getNarrowphase();
+    
+    /**
+     * @brief 获取接触求解器
+     * @return 接触求解器
+     */
+    ContactSolver& getContactSolver();
+    
+    /**
+     * @brief 获取岛屿与休眠管理
+     * @return 岛屿管理对象
+     */
+    IslandManager& getIslandManager();
+    
+    /**
+     * @brief 获取步进性能统计
+     * @return 性能统计对象
+     */
+    Profiler& getProfiler();
+    
+    /**
+     * @brief 开启/关闭休眠，关闭时唤醒所有刚体
+     * @param enabled 是否开启
+     */
+    void setSleepingEnabled(bool enabled);
+    
+    /**
+     * @brief 唤醒所有刚体
+     */
+    void wakeAll();
+    
+    /**
+     * @brief 获取未休眠的动态刚体数量
+     */
+    std::size_t getAwakeCount() const;
+    
+    /**
+     * @brief 获取休眠的动态刚体数量
+     */
+    std::size_t getSleepingCount() const;
+    
+    /**
+     * @brief 设置步进使用的线程数（包括调用线程），工作线程常驻到下次修改
+     *
+     * 积分、粗检测、细检测和各岛屿的接触求解在线程池中并行，
+     * 模拟结果与线程数无关。默认为1（不创建工作线程）。
+     *
+     * @param count 线程数，不大于0时取硬件线程数
+     */
+    void setThreadCount(int count);
+    
+    /**
+     * @brief 获取步进使用的线程数
+     */
+    int getThreadCount() const;
+    
     /**
      * @brief 设置重力
      * @param x X轴重力
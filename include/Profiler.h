@@ -0,0 +1,146 @@
+#ifndef PROFILER_H
+#define PROFILER_H
+
+#include <chrono>
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+/**
+ * @brief 计时的阶段，顺序与Python端python.core.profiler.PROFILE_PHASES一致
+ */
+enum ProfilePhase {
+    PROFILE_INTEGRATE = 0,     ///< 速度和位置积分
+    PROFILE_BROADPHASE,        ///< 粗检测
+    PROFILE_NARROWPHASE,       ///< 细检测（包括唤醒后的重新检测）
+    PROFILE_SOLVE,             ///< 接触求解
+    PROFILE_ISLANDS,           ///< 岛屿构建与休眠
+    PROFILE_SYNC,              ///< 保存上一子步状态和渲染插值（Python读取的数组）
+    PROFILE_TOTAL,             ///< 整个stepSimulation
+    PROFILE_PHASE_COUNT
+};
+
+/**
+ * @brief 计数器，顺序与Python端python.core.profiler.PROFILE_COUNTERS一致
+ */
+enum ProfileCounter {
+    PROFILE_BODIES = 0,        ///< 刚体数量
+    PROFILE_PAIRS,             ///< 候选对数量（最后一个子步）
+    PROFILE_CONTACTS,          ///< 接触点数量（最后一个子步）
+    PROFILE_ITERATIONS,        ///< 求解器迭代次数（所有子步之和）
+    PROFILE_SUBSTEPS,          ///< 子步数
+    PROFILE_COUNTER_COUNT
+};
+
+/**
+ * @class Profiler
+ * @brief 每次stepSimulation记录一个样本（各阶段耗时和计数器）到固定大小的环形缓冲区
+ *
+ * 关闭时ScopedTimer不读取时钟，开销只有一次分支判断。
+ */
+class Profiler {
+public:
+    Profiler();
+
+    /**
+     * @brief 开启/关闭性能统计，开启时清空环形缓冲区
+     * @param enabled 是否开启
+     * @param capacity 环形缓冲区保存的样本数
+     */
+    void setEnabled(bool enabled, std::size_t capacity = 240);
+
+    bool isEnabled() const { return m_enabled; }
+
+    /**
+     * @brief 开始一个新样本（每次stepSimulation调用一次）
+     */
+    void beginSample();
+
+    /**
+     * @brief 累加当前样本中某个阶段的耗时
+     * @param phase 阶段
+     * @param seconds 耗时（秒）
+     */
+    void addTime(ProfilePhase phase, double seconds) {
+        m_current.times[phase] += static_cast<float>(seconds * 1000.0);
+    }
+
+    /**
+     * @brief 设置当前样本的计数器
+     */
+    void setCounter(ProfileCounter counter, std::int32_t value) {
+        m_current.counters[counter] = value;
+    }
+
+    /**
+     * @brief 累加当前样本的计数器
+     */
+    void addCounter(ProfileCounter counter, std::int32_t value) {
+        m_current.counters[counter] += value;
+    }
+
+    /**
+     * @brief 结束当前样本并写入环形缓冲区
+     */
+    void endSample();
+
+    /**
+     * @brief 环形缓冲区中的样本数
+     */
+    std::size_t getSampleCount() const;
+
+    /**
+     * @brief 按时间顺序（最旧的在前）导出最近的至多maxCount个样本
+     * @param times 输出各阶段耗时（毫秒），(maxCount, PROFILE_PHASE_COUNT)
+     * @param counters 输出计数器，(maxCount, PROFILE_COUNTER_COUNT)
+     * @param maxCount 输出数组的行数
+     * @return 导出的样本数
+     */
+    std::size_t copySamples(float* times, std::int32_t* counters, std::size_t maxCount) const;
+
+private:
+    struct Sample {
+        float times[PROFILE_PHASE_COUNT];
+        std::int32_t counters[PROFILE_COUNTER_COUNT];
+    };
+
+    bool m_enabled;
+    Sample m_current;
+    std::vector<Sample> m_samples;
+    std::size_t m_next;
+    std::size_t m_count;
+};
+
+/**
+ * @class ScopedTimer
+ * @brief 在作用域结束时把耗时累加到Profiler的某个阶段
+ */
+class ScopedTimer {
+public:
+    ScopedTimer(Profiler& profiler, ProfilePhase phase)
+        : m_profiler(profiler.isEnabled() ? &profiler : nullptr), m_phase(phase) {
+        if (m_profiler) {
+            m_start = std::chrono::steady_clock::now();
+        }
+    }
+
+    ~ScopedTimer() {
+        if (m_profiler) {
+            m_profiler->addTime(m_phase, std::chrono::duration<double>(std::chrono::steady_clock::now() - m_start).count());
+        }
+    }
+
+    ScopedTimer(const ScopedTimer&) = delete;
+    ScopedTimer& operator=(const ScopedTimer&) = delete;
+
+private:
+    Profiler* m_profiler;
+    ProfilePhase m_phase;
+    std::chrono::steady_clock::time_point m_start;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // PROFILER_H
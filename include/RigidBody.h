@@ -2,40 +2,47 @@
 #define RIGID_BODY_H
 
 #include "Vector3.h"
-#include <memory>
+#include <cstddef>
+#include <cstdint>
 #include <string>
 
 namespace PhysicsSimulator {
 
 // 前向声明
 class Quaternion;
+class PhysicsWorld;
+struct BodySlot;
 
 /**
  * @enum BodyType
- * @brief 刚体类型枚举
+ * @brief 刚体类型枚举（数值与Python绑定保持一致）
  */
 enum class BodyType {
-    STATIC,     ///< 静态刚体，不受物理影响
-    DYNAMIC,    ///< 动态刚体，受物理影响
-    KINEMATIC   ///< 运动学刚体，可以移动但不受物理影响
+    DYNAMIC = 0,    ///< 动态刚体，受物理影响
+    STATIC = 1,     ///< 静态刚体，不受物理影响
+    KINEMATIC = 2   ///< 运动学刚体，可以移动但不受物理影响
 };
 
 /**
  * @enum ShapeType
- * @brief 碰撞形状类型枚举
+ * @brief 碰撞形状类型枚举（数值与Python绑定保持一致）
  */
 enum class ShapeType {
-    BOX,        ///< 盒体
-    SPHERE,     ///< 球体
-    CYLINDER,   ///< 圆柱体
-    CAPSULE,    ///< 胶囊体
-    CONE,       ///< 圆锥体
-    PLANE       ///< 平面
+    BOX = 0,        ///< 盒体
+    SPHERE = 1,     ///< 球体
+    CAPSULE = 2,    ///< 胶囊体
+    CYLINDER = 3,   ///< 圆柱体
+    CONE = 4,       ///< 圆锥体
+    PLANE = 5       ///< 平面
 };
 
 /**
  * @class RigidBody
  * @brief 刚体类，表示物理世界中的刚体对象
+ *
+ * 刚体存放在全局的刚体池中，由create*创建、destroy()销毁（不能用new/delete）。
+ * 每个刚体有一个32位句柄（槽号和代数，见SlotMap.h），销毁后句柄失效，
+ * fromHandle()对过期句柄返回nullptr。
  */
 class RigidBody {
 public:
@@ -75,9 +82,29 @@ public:
     static RigidBody* createPlane(const Vector3& normal, float constant);
     
     /**
-     * @brief 析构函数
+     * @brief 销毁刚体，仍在物理世界中的刚体会先被移除，槽归还刚体池
+     * @param body 刚体指针，为nullptr时不做任何事
      */
-    ~RigidBody();
+    static void destroy(RigidBody* body);
+    
+    /**
+     * @brief 按句柄查找刚体
+     * @param handle 刚体句柄
+     * @return 刚体指针，句柄无效或刚体已销毁时为nullptr
+     */
+    static RigidBody* fromHandle(std::uint32_t handle);
+    
+    /**
+     * @brief 刚体池中现存的刚体数量
+     * @return 刚体数量
+     */
+    static std::size_t getLiveCount();
+    
+    /**
+     * @brief 获取刚体句柄
+     * @return 句柄，在刚体销毁前不变
+     */
+    std::uint32_t getHandle() const;
     
     /**
      * @brief 设置位置
@@ -104,17 +131,31 @@ public:
     Quaternion getRotation() const;
     
     /**
-     * @brief 应用力
+     * @brief 应用力，累积到下一次步进时生效
      * @param force 力
      */
     void applyForce(const Vector3& force);
     
     /**
-     * @brief 应用冲量
+     * @brief 在偏离质心的位置应用力，同时产生力矩
+     * @param force 力
+     * @param relPos 相对质心的世界坐标偏移
+     */
+    void applyForce(const Vector3& force, const Vector3& relPos);
+    
+    /**
+     * @brief 应用冲量，立即改变速度
      * @param impulse 冲量
      */
     void applyImpulse(const Vector3& impulse);
     
+    /**
+     * @brief 在偏离质心的位置应用冲量，同时改变角速度
+     * @param impulse 冲量
+     * @param relPos 相对质心的世界坐标偏移
+     */
+    void applyImpulse(const Vector3& impulse, const Vector3& relPos);
+    
     /**
      * @brief 设置线速度
      * @param velocity 线速度
@@ -145,12 +186,39 @@ public:
      */
     void setFriction(float friction);
     
+    /**
+     * @brief 获取摩擦系数
+     * @return 摩擦系数
+     */
+    float getFriction() const;
+    
     /**
      * @brief 设置恢复系数
      * @param restitution 恢复系数
      */
     void setRestitution(float restitution);
     
+    /**
+     * @brief 获取恢复系数
+     * @return 恢复系数
+     */
+    float getRestitution() const;
+    
+    /**
+     * @brief 设置连续碰撞检测的运动阈值
+     *
+     * 一步内的位移超过阈值时，用内切球沿位移做保守推进，位移截断到碰撞时刻，
+     * 防止高速的小物体穿过薄物体。只支持球体和盒体。
+     * @param threshold 运动阈值，不大于0时关闭（默认）
+     */
+    void setCcdMotionThreshold(float threshold);
+    
+    /**
+     * @brief 获取连续碰撞检测的运动阈值
+     * @return 运动阈值，0表示关闭
+     */
+    float getCcdMotionThreshold() const;
+    
     /**
      * @brief 设置刚体类型
      * @param type 刚体类型
@@ -163,6 +231,17 @@ public:
      */
     BodyType getBodyType() const;
     
+    /**
+     * @brief 唤醒刚体（修改位置、速度或施加力/冲量时会自动唤醒）
+     */
+    void wakeUp();
+    
+    /**
+     * @brief 刚体是否处于休眠状态，未加入物理世界时返回false
+     * @return 是否休眠
+     */
+    bool isSleeping() const;
+    
     /**
      * @brief 获取形状类型
      * @return 形状类型
@@ -175,16 +254,67 @@ public:
      */
     float getMass() const;
     
+    /**
+     * @brief 获取形状参数
+     * @param params 输出4个分量：盒体/圆柱体为半尺寸，球体为半径，平面为法线和常数
+     */
+    void getShapeParams(float params[4]) const;
+    
+    /**
+     * @brief 获取局部主惯性矩倒数
+     * @param inverseInertia 输出3个分量
+     */
+    void getInverseInertia(float inverseInertia[3]) const;
+    
+    /**
+     * @brief 获取尚未积分的累积力和力矩
+     * @param force 输出力
+     * @param torque 输出力矩
+     */
+    void getAccumulatedForce(float force[3], float torque[3]) const;
+    
+    /**
+     * @brief 获取所属的物理世界
+     * @return 物理世界指针，未加入世界时为nullptr
+     */
+    PhysicsWorld* getWorld() const;
+    
 private:
+    friend class PhysicsWorld;
+    friend struct BodySlot;
+    
+    class RigidBodyImpl;
+    
     /**
-     * @brief 构造函数
+     * @brief 在刚体池中创建刚体
      * @param shapeType 形状类型
      * @param mass 质量
+     * @param shapeParams 形状参数
+     * @return 刚体指针
      */
-    RigidBody(ShapeType shapeType, float mass);
+    static RigidBody* create(ShapeType shapeType, float mass, const float shapeParams[4]);
     
-    class RigidBodyImpl;
-    std::unique_ptr<RigidBodyImpl> m_impl;
+    /**
+     * @brief 构造函数（由刚体池调用）
+     * @param impl 与刚体存放在同一个槽中的实现
+     */
+    explicit RigidBody(RigidBodyImpl* impl);
+    
+    /**
+     * @brief 析构函数（由destroy()经刚体池调用）
+     */
+    ~RigidBody();
+    
+    RigidBody(const RigidBody&) = delete;
+    RigidBody& operator=(const RigidBody&) = delete;
+    
+    /**
+     * @brief 设置所属的物理世界（由PhysicsWorld调用）
+     * @param world 物理世界指针
+     */
+    void setWorld(PhysicsWorld* world);
+    
+    RigidBodyImpl* m_impl;  ///< 与刚体存放在同一个池槽中，不单独分配
 };
 
 } // namespace PhysicsSimulator
@@ -0,0 +1,172 @@
+#ifndef SLOT_MAP_H
+#define SLOT_MAP_H
+
+#include <atomic>
+#include <cstddef>
+#include <cstdint>
+#include <deque>
+#include <memory>
+#include <mutex>
+#include <new>
+#include <stdexcept>
+#include <utility>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+/**
+ * @brief 32位句柄：低SLOT_INDEX_BITS位为槽号，高位为代数
+ *
+ * 代数从1开始，在1..SLOT_MAX_GENERATION之间循环，因此有效句柄永远不为0。
+ * 布局与Python端python.core.handles一致。
+ */
+typedef std::uint32_t SlotHandle;
+
+constexpr int SLOT_INDEX_BITS = 22;
+constexpr SlotHandle SLOT_INDEX_MASK = (SlotHandle(1) << SLOT_INDEX_BITS) - 1;
+constexpr std::uint32_t SLOT_MAX_GENERATION = (std::uint32_t(1) << (32 - SLOT_INDEX_BITS)) - 1;
+constexpr std::size_t SLOT_CAPACITY = std::size_t(1) << SLOT_INDEX_BITS;
+
+inline std::uint32_t slotIndex(SlotHandle handle) {
+    return handle & SLOT_INDEX_MASK;
+}
+
+inline std::uint32_t slotGeneration(SlotHandle handle) {
+    return handle >> SLOT_INDEX_BITS;
+}
+
+/**
+ * @class SlotMap
+ * @brief 按块分配的对象池，用带代数的32位句柄访问
+ *
+ * 对象原地构造在固定大小的块中，销毁前地址不变。释放的槽按先进先出的顺序重用，
+ * 每次释放代数加1，过期句柄的代数与槽不一致，get()返回nullptr。
+ * 创建和销毁加锁；get()不加锁，调用方需保证它不与同一对象的销毁并发。
+ */
+template <typename T, std::size_t ChunkSize = 1024>
+class SlotMap {
+public:
+    SlotMap() : m_slotCount(0), m_size(0) {
+        // 块指针数组不再重新分配，get()可以与创建并发
+        m_chunks.reserve(SLOT_CAPACITY / ChunkSize);
+    }
+
+    ~SlotMap() {
+        std::size_t count = m_slotCount.load(std::memory_order_relaxed);
+        for (std::size_t i = 0; i < count; ++i) {
+            Slot& s = slot(static_cast<std::uint32_t>(i));
+            if (s.alive) {
+                object(s)->~T();
+            }
+        }
+    }
+
+    SlotMap(const SlotMap&) = delete;
+    SlotMap& operator=(const SlotMap&) = delete;
+
+    /**
+     * @brief 在空闲槽中构造一个对象
+     * @return (句柄, 对象指针)
+     * @throw std::length_error 槽已用完
+     */
+    template <typename... Args>
+    std::pair<SlotHandle, T*> emplace(Args&&... args) {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        std::uint32_t index;
+        if (!m_free.empty()) {
+            index = m_free.front();
+            m_free.pop_front();
+        } else {
+            index = static_cast<std::uint32_t>(m_slotCount.load(std::memory_order_relaxed));
+            if (index >= SLOT_CAPACITY) {
+                throw std::length_error("对象池已满");
+            }
+            if (index % ChunkSize == 0) {
+                std::unique_ptr<Slot[]> chunk(new Slot[ChunkSize]);
+                for (std::size_t i = 0; i < ChunkSize; ++i) {
+                    chunk[i].generation = 1;
+                    chunk[i].alive = false;
+                }
+                m_chunks.push_back(std::move(chunk));
+            }
+            m_slotCount.store(index + 1, std::memory_order_release);
+        }
+        Slot& s = slot(index);
+        T* created;
+        try {
+            created = new (s.storage) T(std::forward<Args>(args)...);
+        } catch (...) {
+            m_free.push_front(index);
+            throw;
+        }
+        s.alive = true;
+        ++m_size;
+        return std::make_pair((s.generation << SLOT_INDEX_BITS) | index, created);
+    }
+
+    /**
+     * @brief 销毁句柄对应的对象
+     * @return 句柄有效时返回true
+     */
+    bool erase(SlotHandle handle) {
+        T* target = get(handle);
+        if (!target) {
+            return false;
+        }
+        // 析构时对象可能访问池(如从物理世界移除自己)，因此在加锁前析构
+        target->~T();
+        std::lock_guard<std::mutex> lock(m_mutex);
+        Slot& s = slot(slotIndex(handle));
+        s.alive = false;
+        s.generation = s.generation % SLOT_MAX_GENERATION + 1;
+        m_free.push_back(slotIndex(handle));
+        --m_size;
+        return true;
+    }
+
+    /**
+     * @brief 查找句柄对应的对象
+     * @return 对象指针，句柄无效或对象已销毁时为nullptr
+     */
+    T* get(SlotHandle handle) const {
+        std::uint32_t index = slotIndex(handle);
+        if (index >= m_slotCount.load(std::memory_order_acquire)) {
+            return nullptr;
+        }
+        Slot& s = slot(index);
+        return s.alive && s.generation == slotGeneration(handle) ? object(s) : nullptr;
+    }
+
+    /**
+     * @brief 现存对象的数量
+     */
+    std::size_t size() const {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        return m_size;
+    }
+
+private:
+    struct Slot {
+        alignas(T) unsigned char storage[sizeof(T)];
+        std::uint32_t generation;   ///< 当前对象的代数（空闲时为下一个对象的代数）
+        bool alive;
+    };
+
+    Slot& slot(std::uint32_t index) const {
+        return m_chunks[index / ChunkSize][index % ChunkSize];
+    }
+
+    static T* object(Slot& s) {
+        return std::launder(reinterpret_cast<T*>(s.storage));
+    }
+
+    mutable std::mutex m_mutex;
+    std::vector<std::unique_ptr<Slot[]>> m_chunks;
+    std::atomic<std::size_t> m_slotCount;   ///< 已分配过的槽数
+    std::deque<std::uint32_t> m_free;       ///< 空闲槽，先进先出
+    std::size_t m_size;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // SLOT_MAP_H
@@ -0,0 +1,88 @@
+#ifndef TASK_POOL_H
+#define TASK_POOL_H
+
+#include <atomic>
+#include <condition_variable>
+#include <cstddef>
+#include <exception>
+#include <functional>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+namespace PhysicsSimulator {
+
+/**
+ * @class TaskPool
+ * @brief 常驻工作线程池，由PhysicsWorld持有
+ *
+ * parallelFor()把[0,count)按grain切成固定的块，工作线程和调用线程一起
+ * 领取块执行，全部完成后返回。块的划分只取决于count和grain，与线程数
+ * 无关；调用方按块号合并各块的结果即可得到与线程数无关的确定性结果。
+ * 线程数为1时不创建工作线程，所有块在调用线程中按顺序执行。
+ * 不支持在任务中再次调用parallelFor()。
+ */
+class TaskPool {
+public:
+    /**
+     * @brief 任务函数，参数为块的起止下标[begin, end)
+     */
+    typedef std::function<void(std::size_t, std::size_t)> Task;
+
+    TaskPool();
+    ~TaskPool();
+
+    TaskPool(const TaskPool&) = delete;
+    TaskPool& operator=(const TaskPool&) = delete;
+
+    /**
+     * @brief 设置线程数（包括调用线程）
+     * @param count 线程数，不大于0时取硬件线程数
+     */
+    void setThreadCount(int count);
+
+    /**
+     * @brief 获取线程数（包括调用线程）
+     */
+    int getThreadCount() const;
+
+    /**
+     * @brief 并行执行task，块数为ceil(count / grain)
+     * @param count 下标数量
+     * @param grain 每块的下标数量
+     * @param task 任务函数，任一块抛出的异常在所有块结束后重新抛出
+     */
+    void parallelFor(std::size_t count, std::size_t grain, const Task& task);
+
+    /**
+     * @brief parallelFor()的块数
+     */
+    static std::size_t chunkCount(std::size_t count, std::size_t grain) {
+        return grain == 0 ? count : (count + grain - 1) / grain;
+    }
+
+private:
+    void stopWorkers();
+    void workerLoop(std::size_t seen);
+    void runChunks();
+
+    std::vector<std::thread> m_workers;
+    std::mutex m_mutex;
+    std::condition_variable m_start;
+    std::condition_variable m_done;
+    std::size_t m_generation;   ///< 每次parallelFor()加1，唤醒工作线程
+    std::size_t m_busy;         ///< 尚未处理完当前任务的工作线程数
+    bool m_stopping;
+
+    // 当前任务
+    const Task* m_task;
+    std::size_t m_count;
+    std::size_t m_grain;
+    std::size_t m_chunks;
+    std::atomic<std::size_t> m_next;
+    std::exception_ptr m_error;
+};
+
+} // namespace PhysicsSimulator
+
+#endif // TASK_POOL_H
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+批量物理世界
+
+把M个结构相同、互相独立的场景变体(不同的重力、质量、初始位置等)保存在
+同一个结构数组中，第w个世界的第i个刚体位于第 w*N+i 行，'worlds'列记录
+所在世界的编号。一次step()用整列运算推进所有世界，粗检测只生成同一世界
+内的候选对，因此各世界之间互不影响。模板世界的关节同样复制到每个世界，
+两端刚体换成同一世界中对应的行。
+"""
+
+import numpy as np
+from typing import Optional, Sequence
+
+from python.core.body_storage import BodyStorage, BODY_COLUMNS
+from python.core.profiler import (
+    DEFAULT_CAPACITY,
+    PROFILE_BODIES,
+    PROFILE_BROADPHASE,
+    PROFILE_CONTACTS,
+    PROFILE_INTEGRATE,
+    PROFILE_ISLANDS,
+    PROFILE_ITERATIONS,
+    PROFILE_NARROWPHASE,
+    PROFILE_PAIRS,
+    PROFILE_SOLVE,
+    PROFILE_SUBSTEPS,
+    StepProfiler,
+    profile_dict,
+)
+from python.collision.broadphase import Broadphase
+from python.collision.ccd import ContinuousCollision
+from python.collision.narrowphase import Narrowphase
+from python.dynamics.contact_solver import ContactSolver
+from python.dynamics.integrator import compute_inverse_inertias, integrate_positions, integrate_velocities
+from python.dynamics.islands import IslandManager
+from python.dynamics.joints import JOINT_COLUMNS
+
+# 在刚体列之外附加世界编号列
+BATCHED_COLUMNS = {**BODY_COLUMNS, 'worlds': (np.int32, 1)}
+
+# reset()恢复的状态列
+RESET_COLUMNS = ('positions', 'rotations', 'linear_velocities', 'angular_velocities', 'forces', 'torques',
+                 'sleep_islands', 'sleep_times')
+
+class BatchedPhysicsWorld:
+    """M个独立物理世界的向量化环境
+
+    每个世界的刚体集合与模板世界相同，状态可以按(M,N,...)整体读写。
+    """
+
+    def __init__(self, template, world_count: int):
+        """以模板物理世界(PhysicsWorld)的当前状态复制出world_count个世界"""
+        if world_count < 1:
+            raise ValueError(f"世界数量必须为正数: {world_count}")
+        source = template._storage
+        self.world_count = world_count
+        self.body_count = source.count
+        rows = world_count * self.body_count
+
+        columns = {name: np.tile(source.view(name), (world_count,) + (1,) * (source.view(name).ndim - 1))
+                   for name in BODY_COLUMNS}
+        # 句柄只在批量世界内部使用(接触缓存按句柄区分刚体对)，重新编号保证唯一
+        columns['handles'] = np.arange(rows, dtype=np.int64)
+        columns['worlds'] = np.repeat(np.arange(world_count, dtype=np.int32), self.body_count)
+        self._storage = BodyStorage(max(rows, 1), columns=BATCHED_COLUMNS)
+        self._storage.append(**columns)
+        self._copy_joints(template)
+
+        gravity = template.gravity
+        self._gravities = np.tile(np.array([gravity.x, gravity.y, gravity.z], dtype=np.float32), (world_count, 1))
+        self.broadphase = Broadphase(template.broadphase.algorithm, template.broadphase.cell_size)
+        self.narrowphase = Narrowphase()
+        self.ccd = ContinuousCollision()
+        self.solver = ContactSolver(template.solver.iterations, template.solver.warm_starting)
+        self.islands = IslandManager(template.islands.linear_threshold, template.islands.angular_threshold,
+                                     template.islands.time_to_sleep)
+        self.islands.enabled = template.islands.enabled
+        self.profiler = StepProfiler()
+        self.set_reset_state()
+
+    def _copy_joints(self, template) -> None:
+        """把模板世界的关节复制到每个世界，两端刚体换成批量世界中的句柄(即行号)"""
+        joints = template._joints
+        rows = template._joint_body_rows()
+        kept = np.flatnonzero((rows >= 0).all(axis=1))
+        self.joint_count = len(kept)
+        count = self.world_count * self.joint_count
+        columns = {name: np.tile(joints.view(name)[kept], (self.world_count,) + (1,) * (joints.view(name).ndim - 1))
+                   for name in JOINT_COLUMNS}
+        columns['handles'] = np.arange(count, dtype=np.int64)
+        offsets = np.repeat(np.arange(self.world_count, dtype=np.int64) * self.body_count, self.joint_count)
+        columns['bodies'] = np.tile(rows[kept], (self.world_count, 1)) + offsets[:, None]
+        self._joints = BodyStorage(max(count, 1), columns=JOINT_COLUMNS)
+        self._joints.append(**columns)
+        # 刚体的句柄与行号相同，两端刚体的行号就是bodies列
+        self._joint_rows = self._joints.view('bodies') if count else None
+
+    def _world_view(self, name: str) -> np.ndarray:
+        """某一列按世界分组的视图 (M,N,...)"""
+        column = self._storage.view(name)
+        return column.reshape((self.world_count, self.body_count) + column.shape[1:])
+
+    def _world_rows(self, worlds: Optional[Sequence[int]]) -> np.ndarray:
+        """若干世界包含的所有行号，worlds为None时为全部"""
+        if worlds is None:
+            return np.arange(self._storage.count)
+        worlds = np.asarray(worlds, dtype=np.int64).reshape(-1)
+        if len(worlds) and (worlds.min() < 0 or worlds.max() >= self.world_count):
+            raise IndexError(f"世界编号超出范围[0, {self.world_count})")
+        return (worlds[:, None] * self.body_count + np.arange(self.body_count)).reshape(-1)
+
+    def _set_world_column(self, name: str, values: np.ndarray) -> None:
+        """整列写入，values可以是(M,N,...)，也可以是广播到所有世界的(N,...)"""
+        view = self._world_view(name)
+        view[...] = np.broadcast_to(np.asarray(values, dtype=view.dtype), view.shape)
+
+    # 步进
+
+    def step(self, time_step: float, steps: int = 1) -> None:
+        """所有世界以固定步长time_step前进steps步"""
+        storage = self._storage
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler:
+            profiler.begin_sample()
+        for _ in range(steps):
+            gravity = self._gravities[storage.view('worlds')]
+            integrate_velocities(storage, gravity, time_step)
+            if profiler:
+                profiler.lap(PROFILE_INTEGRATE)
+            self.broadphase.update(storage, time_step)
+            if profiler:
+                profiler.lap(PROFILE_BROADPHASE)
+            contacts = self.narrowphase.update(storage, self.broadphase.pairs)
+            if profiler:
+                profiler.lap(PROFILE_NARROWPHASE)
+            woken = self.islands.wake(storage, contacts, self._joint_rows)
+            if profiler:
+                profiler.lap(PROFILE_ISLANDS)
+            if woken:
+                contacts = self.narrowphase.update(storage, self.broadphase.pairs)
+                if profiler:
+                    profiler.lap(PROFILE_NARROWPHASE)
+            self.solver.solve(storage, contacts, time_step, self._joints, self._joint_rows)
+            if profiler:
+                profiler.lap(PROFILE_SOLVE)
+            self.islands.update(storage, contacts, time_step, self._joint_rows)
+            if profiler:
+                profiler.lap(PROFILE_ISLANDS)
+            self.ccd.update(storage, self.broadphase.pairs, time_step)
+            integrate_positions(storage, time_step)
+            if profiler:
+                profiler.lap(PROFILE_INTEGRATE)
+                profiler.set_counter(PROFILE_PAIRS, self.broadphase.pair_count)
+                profiler.set_counter(PROFILE_CONTACTS, self.narrowphase.contact_count)
+                profiler.add_counter(PROFILE_ITERATIONS, self.solver.iterations)
+        if profiler:
+            profiler.set_counter(PROFILE_BODIES, storage.count)
+            profiler.set_counter(PROFILE_SUBSTEPS, steps)
+            profiler.end_sample()
+
+    # 参数
+
+    def set_gravity(self, gravity) -> None:
+        """设置重力，(3,)应用到所有世界，(M,3)为每个世界分别设置"""
+        self._gravities[...] = np.broadcast_to(np.asarray(gravity, dtype=np.float32), self._gravities.shape)
+
+    def get_gravities(self) -> np.ndarray:
+        """获取每个世界的重力 (M,3)"""
+        return self._gravities
+
+    def set_masses(self, masses: np.ndarray) -> None:
+        """设置质量 (M,N) 或 (N,)，同时重新计算惯性"""
+        self._set_world_column('masses', masses)
+        storage = self._storage
+        storage.view('inverse_inertias')[...] = compute_inverse_inertias(
+            storage.view('shape_types'), storage.view('masses'), storage.view('shape_params'))
+
+    def set_frictions(self, frictions: np.ndarray) -> None:
+        """设置摩擦系数 (M,N) 或 (N,)"""
+        self._set_world_column('frictions', frictions)
+
+    def set_restitutions(self, restitutions: np.ndarray) -> None:
+        """设置恢复系数 (M,N) 或 (N,)"""
+        self._set_world_column('restitutions', restitutions)
+
+    # 状态读写，get_*返回(M,N,...)的零拷贝视图
+
+    def get_positions(self) -> np.ndarray:
+        """获取所有世界的刚体位置 (M,N,3)"""
+        return self._world_view('positions')
+
+    def get_rotations(self) -> np.ndarray:
+        """获取所有世界的刚体旋转四元数 (M,N,4)"""
+        return self._world_view('rotations')
+
+    def get_velocities(self) -> np.ndarray:
+        """获取所有世界的刚体线速度 (M,N,3)"""
+        return self._world_view('linear_velocities')
+
+    def get_angular_velocities(self) -> np.ndarray:
+        """获取所有世界的刚体角速度 (M,N,3)"""
+        return self._world_view('angular_velocities')
+
+    def set_positions(self, positions: np.ndarray) -> None:
+        """设置位置 (M,N,3) 或 (N,3)"""
+        self._set_world_column('positions', positions)
+        self.wake_all()
+
+    def set_rotations(self, rotations: np.ndarray) -> None:
+        """设置旋转 (M,N,4) 或 (N,4)"""
+        self._set_world_column('rotations', rotations)
+        self.wake_all()
+
+    def set_velocities(self, velocities: np.ndarray) -> None:
+        """设置线速度 (M,N,3) 或 (N,3)"""
+        self._set_world_column('linear_velocities', velocities)
+        self.wake_all()
+
+    def set_angular_velocities(self, velocities: np.ndarray) -> None:
+        """设置角速度 (M,N,3) 或 (N,3)"""
+        self._set_world_column('angular_velocities', velocities)
+        self.wake_all()
+
+    def wake_all(self) -> None:
+        """唤醒所有刚体"""
+        self.islands.wake_all(self._storage)
+
+    # 重置
+
+    def set_reset_state(self) -> None:
+        """把当前状态记为reset()恢复的状态(构造时自动记录一次)"""
+        self._reset_state = {name: self._storage.view(name).copy() for name in RESET_COLUMNS}
+
+    def reset(self, worlds: Optional[Sequence[int]] = None) -> None:
+        """把指定世界(默认全部)恢复到记录的状态，质量、重力等参数保持不变"""
+        rows = self._world_rows(worlds)
+        for name in RESET_COLUMNS:
+            self._storage.view(name)[rows] = self._reset_state[name][rows]
+        self.solver.forget(self._storage.view('handles')[rows])
+        if self.joint_count:
+            worlds = np.arange(self.world_count) if worlds is None else np.asarray(worlds, dtype=np.int64).reshape(-1)
+            joints = (worlds[:, None] * self.joint_count + np.arange(self.joint_count)).reshape(-1)
+            self._joints.view('impulses')[joints] = 0.0
+
+    # 统计
+
+    def set_profiling(self, enabled: bool, capacity: int = DEFAULT_CAPACITY) -> None:
+        """开启/关闭步进性能统计，每次step()记录一个样本"""
+        if capacity < 1:
+            raise ValueError(f"样本数必须为正数: {capacity}")
+        self.profiler.set_enabled(enabled, capacity)
+
+    def get_profile(self) -> dict:
+        """最近若干次step()的性能统计，格式与PhysicsWorld.get_profile()相同"""
+        return profile_dict(*self.profiler.samples())
+
+    def get_contact_counts(self) -> np.ndarray:
+        """上一步每个世界的接触点数量 (M,)"""
+        body_a = self.narrowphase.contacts['body_a']
+        return np.bincount(self._storage.view('worlds')[body_a], minlength=self.world_count)
+
+    def get_sleeping_counts(self) -> np.ndarray:
+        """每个世界中休眠的刚体数量 (M,)"""
+        return np.count_nonzero(self._world_view('sleep_islands'), axis=1)
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+粗检测(broadphase)
+
+根据每个刚体的AABB生成候选碰撞对，提供两种算法：
+- 增量扫掠剪枝(sweep-and-prune)：沿一个轴排序，利用上一帧的顺序
+  (帧间相关性)使排序接近线性
+- 均匀网格空间哈希：适合尺寸相近、分布密集的场景(如多米诺)
+
+平面是无限大的，不参与排序/哈希，单独与所有AABB做半空间测试。
+
+存储中有'worlds'列(批量世界)时，只生成同一世界内的候选对。
+"""
+
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+from python.core.enums import BodyType, ShapeType
+from python.collision.ccd import fast_bodies
+from python.dynamics.integrator import quaternion_to_matrix
+
+# AABB外扩量，让即将接触的刚体提前进入候选对
+AABB_MARGIN = 0.02
+
+def compute_aabbs(storage, margin: float = AABB_MARGIN) -> Tuple[np.ndarray, np.ndarray]:
+    """计算所有刚体的世界坐标AABB，返回(mins, maxs)，形状均为(N,3)
+
+    平面的AABB没有意义，返回值中对应行为无穷大。
+    """
+    positions = storage.view('positions')
+    shape_types = storage.view('shape_types')
+    params = storage.view('shape_params')
+
+    # 局部半尺寸: 盒子为参数本身，圆柱/圆锥为(r,h,r)，胶囊为(r,h+r,r)
+    local = params[:, :3].copy()
+    radial = (shape_types == ShapeType.CYLINDER) | (shape_types == ShapeType.CONE) | \
+             (shape_types == ShapeType.CAPSULE)
+    local[radial, 0] = params[radial, 0]
+    local[radial, 1] = params[radial, 1]
+    local[radial, 2] = params[radial, 0]
+    capsule = shape_types == ShapeType.CAPSULE
+    local[capsule, 1] += params[capsule, 0]
+
+    extents = np.einsum('nij,nj->ni', np.abs(quaternion_to_matrix(storage.view('rotations'))), local)
+    sphere = shape_types == ShapeType.SPHERE
+    extents[sphere] = params[sphere, :1]
+    extents += margin
+
+    plane = shape_types == ShapeType.PLANE
+    extents[plane] = np.inf
+    return positions - extents, positions + extents
+
+def _filter_overlapping(mins: np.ndarray, maxs: np.ndarray, a: np.ndarray,
+                        b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """逐轴剔除AABB不重叠的对，每过一个轴候选集都会缩小"""
+    for axis in range(3):
+        keep = (mins[a, axis] <= maxs[b, axis]) & (mins[b, axis] <= maxs[a, axis])
+        a = a[keep]
+        b = b[keep]
+    return a, b
+
+def _expand_ranges(counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """把每个元素展开counts次，返回(元素下标, 元素内偏移)"""
+    owners = np.repeat(np.arange(len(counts)), counts)
+    starts = np.cumsum(counts) - counts
+    offsets = np.arange(len(owners)) - np.repeat(starts, counts)
+    return owners, offsets
+
+class Broadphase:
+    """粗检测阶段，每次update()后pairs保存候选对(行号, a<b)"""
+
+    SWEEP_AND_PRUNE = 'sap'
+    SPATIAL_HASH = 'hash'
+    ALGORITHMS = (SWEEP_AND_PRUNE, SPATIAL_HASH)
+
+    def __init__(self, algorithm: str = SWEEP_AND_PRUNE, cell_size: Optional[float] = None):
+        self.algorithm = self.SWEEP_AND_PRUNE
+        self.cell_size = cell_size
+        self.set_algorithm(algorithm, cell_size)
+        self.pairs = np.zeros((0, 2), dtype=np.int32)
+        self.build_time = 0.0
+        # 扫掠剪枝的帧间状态
+        self._order: Optional[np.ndarray] = None
+        self._bodies: Optional[np.ndarray] = None
+        self._axis = 0
+
+    def set_algorithm(self, algorithm: str, cell_size: Optional[float] = None) -> None:
+        """选择算法；cell_size仅用于空间哈希，为None时按最大AABB自动选取"""
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"未知的粗检测算法: {algorithm}，可选: {', '.join(self.ALGORITHMS)}")
+        self.algorithm = algorithm
+        self.cell_size = cell_size
+        self._order = None
+
+    @property
+    def pair_count(self) -> int:
+        return len(self.pairs)
+
+    def update(self, storage, dt: float = 0.0) -> np.ndarray:
+        """根据当前刚体状态重建候选对
+
+        dt大于0时快速刚体(见python.collision.ccd)的AABB沿本步的位移扩展，供连续碰撞检测使用。
+        """
+        start = time.perf_counter()
+        n = storage.count
+        pairs = np.zeros((0, 2), dtype=np.int64)
+        if n > 1:
+            mins, maxs = compute_aabbs(storage)
+            fast = fast_bodies(storage, dt)
+            if len(fast):
+                motion = storage.view('linear_velocities')[fast] * dt
+                mins[fast] += np.minimum(motion, 0.0)
+                maxs[fast] += np.maximum(motion, 0.0)
+            shape_types = storage.view('shape_types')
+            worlds = storage.view('worlds') if storage.has_column('worlds') else None
+            active = (storage.view('body_types') == BodyType.DYNAMIC) & (storage.view('masses') > 0.0)
+            plane = shape_types == ShapeType.PLANE
+            finite = np.flatnonzero(~plane)
+
+            if len(finite) > 1:
+                if self.algorithm == self.SWEEP_AND_PRUNE:
+                    a, b = self._sweep_and_prune(mins, maxs, finite, worlds)
+                else:
+                    a, b = self._spatial_hash(mins, maxs, finite, worlds)
+                keep = active[a] | active[b]
+                if worlds is not None:
+                    keep &= worlds[a] == worlds[b]
+                a, b = _filter_overlapping(mins, maxs, a[keep], b[keep])
+                pairs = np.stack([a, b], axis=1)
+
+            planes = np.flatnonzero(plane)
+            if len(planes) and len(finite):
+                pairs = np.concatenate([pairs, self._plane_pairs(storage, mins, maxs, planes,
+                                                                 finite[active[finite]], worlds)])
+
+            # 统一为a<b，按(a,b)排序并去重，保证结果与算法无关
+            key = np.unique(pairs.min(axis=1) * n + pairs.max(axis=1))
+            pairs = np.stack([key // n, key % n], axis=1)
+
+        self.pairs = pairs.astype(np.int32)
+        self.build_time = time.perf_counter() - start
+        return self.pairs
+
+    def _sweep_and_prune(self, mins: np.ndarray, maxs: np.ndarray, bodies: np.ndarray,
+                         worlds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """增量扫掠剪枝
+
+        保留上一帧按最小值排好的顺序，本帧在其基础上做稳定排序。
+        刚体移动不大时输入几乎有序，timsort退化为接近线性的合并。
+        有多个世界时各世界沿扫掠轴错开，不同世界的区间互不重叠。
+        """
+        if self._order is None or not np.array_equal(self._bodies, bodies):
+            # 刚体集合变化时重新选择扫掠轴(中心分布最分散的轴)
+            centers = 0.5 * (mins[bodies] + maxs[bodies])
+            self._axis = int(np.argmax(np.var(centers, axis=0)))
+            self._order = bodies
+            self._bodies = bodies
+
+        low = mins[:, self._axis]
+        high = maxs[:, self._axis]
+        if worlds is not None:
+            stride = float(np.max(high[bodies]) - np.min(low[bodies])) + 1.0
+            offset = worlds * stride
+            low = low + offset
+            high = high + offset
+
+        order = self._order
+        order = order[np.argsort(low[order], kind='stable')]
+        self._order = order
+
+        sorted_min = low[order]
+        sorted_max = high[order]
+        # 对第i个区间，排在它后面且最小值不超过它最大值的区间都与它重叠
+        ends = np.searchsorted(sorted_min, sorted_max, side='right')
+        counts = np.maximum(ends - np.arange(len(order)) - 1, 0)
+        first, offsets = _expand_ranges(counts)
+        return order[first], order[first + 1 + offsets]
+
+    def _spatial_hash(self, mins: np.ndarray, maxs: np.ndarray, bodies: np.ndarray,
+                      worlds: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """均匀网格空间哈希，每个刚体登记到AABB覆盖的所有格子中，世界编号参与哈希"""
+        body_mins = mins[bodies]
+        body_maxs = maxs[bodies]
+        cell = self.cell_size or float(np.max(body_maxs - body_mins))
+        lo = np.floor(body_mins / cell).astype(np.int64)
+        hi = np.floor(body_maxs / cell).astype(np.int64)
+        span = hi - lo + 1
+
+        # 展开为(刚体, 格子)条目
+        owners, offsets = _expand_ranges(np.prod(span, axis=1))
+        sx = span[owners, 0]
+        sy = span[owners, 1]
+        cells = lo[owners] + np.stack([offsets % sx, (offsets // sx) % sy, offsets // (sx * sy)], axis=1)
+        keys = (cells[:, 0] * 73856093) ^ (cells[:, 1] * 19349663) ^ (cells[:, 2] * 83492791)
+        if worlds is not None:
+            keys ^= worlds[bodies[owners]].astype(np.int64) * 50331653
+
+        # 同一格子内的条目两两配对
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        owners = owners[order]
+        ends = np.searchsorted(keys, keys, side='right')
+        counts = ends - np.arange(len(keys)) - 1
+        first, offsets = _expand_ranges(counts)
+        a = bodies[owners[first]]
+        b = bodies[owners[first + 1 + offsets]]
+        distinct = a != b
+        return a[distinct], b[distinct]
+
+    @staticmethod
+    def _plane_pairs(storage, mins: np.ndarray, maxs: np.ndarray, planes: np.ndarray,
+                     bodies: np.ndarray, worlds: Optional[np.ndarray] = None) -> np.ndarray:
+        """平面与AABB的半空间测试"""
+        params = storage.view('shape_params')
+        centers = 0.5 * (mins[bodies] + maxs[bodies])
+        extents = 0.5 * (maxs[bodies] - mins[bodies])
+        if worlds is None:
+            normals = params[planes, :3]
+            # AABB到平面的最近有符号距离，(M,P)
+            distance = centers @ normals.T - params[planes, 3] - extents @ np.abs(normals).T
+            body_index, plane_index = np.nonzero(distance <= 0.0)
+            return np.stack([planes[plane_index], bodies[body_index]], axis=1)
+
+        # 多个世界: 每个刚体只与本世界的平面配对
+        planes = planes[np.argsort(worlds[planes], kind='stable')]
+        plane_worlds = worlds[planes]
+        starts = np.searchsorted(plane_worlds, worlds[bodies], side='left')
+        ends = np.searchsorted(plane_worlds, worlds[bodies], side='right')
+        body_index, offsets = _expand_ranges(ends - starts)
+        plane = planes[starts[body_index] + offsets]
+        normals = params[plane, :3]
+        distance = np.einsum('ij,ij->i', centers[body_index], normals) - params[plane, 3] - \
+            np.einsum('ij,ij->i', extents[body_index], np.abs(normals))
+        keep = distance <= 0.0
+        return np.stack([plane[keep], bodies[body_index[keep]]], axis=1)
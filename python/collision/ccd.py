@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连续碰撞检测(CCD)
+
+与C++端ContinuousCollision一致：开启了CCD(ccd_thresholds大于0)的动态球体或盒体，
+一步内的位移超过阈值时为快速刚体。粗检测把快速刚体的AABB沿位移扩展；速度求解之后，
+用快速刚体的内切球沿相对位移对候选对中的另一个刚体做保守推进，取最早的碰撞时刻，
+把本步的位移截断到该时刻，速度不变，下一步由细检测生成接触。
+"""
+
+import numpy as np
+
+from python.core.enums import BodyType, ShapeType
+from python.dynamics.integrator import quaternion_to_matrix
+
+# 保守推进停止的距离，小于细检测的接触外扩量，下一步一定会生成接触
+CCD_TOLERANCE = 0.01
+# 保守推进的最大迭代次数，用完时取已推进到的时刻(仍然是保守的)
+CCD_MAX_ITERATIONS = 16
+
+def fast_bodies(storage, dt: float) -> np.ndarray:
+    """本步需要连续碰撞检测的刚体行号"""
+    thresholds = storage.view('ccd_thresholds')
+    rows = np.flatnonzero(thresholds > 0.0)
+    if dt <= 0.0 or len(rows) == 0:
+        return rows
+    shape_types = storage.view('shape_types')[rows]
+    keep = (storage.view('sleep_islands')[rows] == 0) & \
+           (storage.view('body_types')[rows] == BodyType.DYNAMIC) & (storage.view('masses')[rows] > 0.0) & \
+           ((shape_types == ShapeType.SPHERE) | (shape_types == ShapeType.BOX))
+    rows = rows[keep]
+    speeds = np.linalg.norm(storage.view('linear_velocities')[rows], axis=1)
+    return rows[speeds * dt > thresholds[rows]]
+
+def swept_radii(storage, rows: np.ndarray) -> np.ndarray:
+    """扫掠用的内切球半径：球体为半径，盒体为最小的半尺寸"""
+    params = storage.view('shape_params')[rows]
+    sphere = storage.view('shape_types')[rows] == ShapeType.SPHERE
+    return np.where(sphere, params[:, 0], params[:, :3].min(axis=1))
+
+def signed_distances(storage, rows: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """点到刚体表面的有符号距离(内部为负)，不支持的形状为无穷大"""
+    shape_types = storage.view('shape_types')[rows]
+    params = storage.view('shape_params')[rows]
+    rel = points - storage.view('positions')[rows]
+    distances = np.full(len(rows), np.inf, dtype=np.float32)
+
+    sphere = shape_types == ShapeType.SPHERE
+    distances[sphere] = np.linalg.norm(rel[sphere], axis=1) - params[sphere, 0]
+    plane = shape_types == ShapeType.PLANE
+    distances[plane] = np.sum(points[plane] * params[plane, :3], axis=1) - params[plane, 3]
+
+    # 盒子: 在局部坐标系中求到各面的距离
+    box = shape_types == ShapeType.BOX
+    if box.any():
+        matrices = quaternion_to_matrix(storage.view('rotations')[rows[box]])
+        local = np.einsum('njk,nj->nk', matrices, rel[box])
+        d = np.abs(local) - params[box, :3]
+        inside = d.max(axis=1)
+        outside = np.linalg.norm(np.maximum(d, 0.0), axis=1)
+        distances[box] = np.where(inside > 0.0, outside, inside)
+    return distances
+
+def time_of_impact(storage, movers: np.ndarray, targets: np.ndarray, dt: float) -> np.ndarray:
+    """快速刚体的内切球沿相对位移到目标刚体的碰撞时刻，范围[0,1]，1表示本步不碰撞
+
+    起点已经接触或穿透时为1，由已有的接触处理。
+    """
+    velocities = storage.view('linear_velocities')
+    moving = (storage.view('sleep_islands')[targets] == 0)[:, None]
+    motion = (velocities[movers] - np.where(moving, velocities[targets], 0.0)) * dt
+    lengths = np.linalg.norm(motion, axis=1)
+    starts = storage.view('positions')[movers]
+    radii = swept_radii(storage, movers)
+
+    times = np.zeros(len(movers), dtype=np.float32)
+    result = np.ones(len(movers), dtype=np.float32)
+    pending = np.flatnonzero(lengths > 0.0)
+    for iteration in range(CCD_MAX_ITERATIONS):
+        if len(pending) == 0:
+            break
+        points = starts[pending] + motion[pending] * times[pending, None]
+        distances = signed_distances(storage, targets[pending], points) - radii[pending]
+        hit = distances <= CCD_TOLERANCE
+        if iteration > 0:
+            result[pending[hit]] = times[pending[hit]]
+        # 距离的减小速度不超过位移长度，前进distance/length不会越过表面
+        times[pending] += np.where(hit, 0.0, distances / lengths[pending])
+        pending = pending[~hit & (times[pending] < 1.0)]
+    result[pending] = times[pending]
+    return result
+
+class ContinuousCollision:
+    """把快速刚体本步的位移截断到最早的碰撞时刻，在速度求解之后、位置积分之前调用"""
+
+    def __init__(self):
+        self.clamped_count = 0
+
+    def update(self, storage, pairs: np.ndarray, dt: float) -> None:
+        """pairs为粗检测的候选对(行号)"""
+        self.clamped_count = 0
+        fast = fast_bodies(storage, dt)
+        if len(fast) == 0 or len(pairs) == 0:
+            return
+        is_fast = np.zeros(storage.count, dtype=bool)
+        is_fast[fast] = True
+        a = pairs[:, 0].astype(np.int64)
+        b = pairs[:, 1].astype(np.int64)
+        movers = np.concatenate([a[is_fast[a]], b[is_fast[b]]])
+        targets = np.concatenate([b[is_fast[a]], a[is_fast[b]]])
+        if len(movers) == 0:
+            return
+
+        fractions = np.ones(storage.count, dtype=np.float32)
+        np.minimum.at(fractions, movers, time_of_impact(storage, movers, targets, dt))
+        clamped = fast[fractions[fast] < 1.0]
+        # 位置先后移v*dt*(1-f)，随后的位置积分结束时刚体正好停在碰撞时刻的位置
+        velocities = storage.view('linear_velocities')[clamped]
+        storage.view('positions')[clamped] -= velocities * (dt * (1.0 - fractions[clamped]))[:, None]
+        self.clamped_count = len(clamped)
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+细检测(narrowphase)
+
+对粗检测给出的候选对计算接触点。候选对先按形状组合分组，每组作为一个
+批次做整列运算，目前支持:
+- 球-球、球-平面、盒子-平面、盒子-球
+- 盒子-盒子: 分离轴定理(15个轴)，面接触时把入射面裁剪到参考面内，
+  边-边接触时取两条边的最近点
+
+其余形状组合(胶囊体、圆柱体、圆锥体)暂不生成接触。
+
+结果以扁平数组保存(列定义见CONTACT_COLUMNS)，按候选对的顺序排列，
+同一对的接触点相邻。法线从body_a指向body_b，深度为正表示穿透，
+接触点位于两表面的中点。
+"""
+
+import time
+import numpy as np
+from typing import Dict, Tuple
+
+from python.core.enums import ShapeType
+from python.dynamics.integrator import quaternion_to_matrix
+from python.dynamics.islands import active_bodies
+
+# 间隙小于该值时也生成接触(深度为负)，让求解器提前处理即将发生的碰撞
+CONTACT_MARGIN = 0.02
+# 每个接触流形最多保留的接触点
+MAX_MANIFOLD_POINTS = 4
+
+# 列定义: 列名 -> (数据类型, 每行分量数)，与C接口中PSContactColumn的顺序一致
+CONTACT_COLUMNS: Dict[str, Tuple[type, int]] = {
+    'body_a': (np.int32, 1),
+    'body_b': (np.int32, 1),
+    'points': (np.float32, 3),
+    'normals': (np.float32, 3),
+    'depths': (np.float32, 1),
+}
+
+# 盒子8个顶点的符号
+_BOX_CORNERS = np.array([[x, y, z] for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], dtype=np.float32)
+# 入射面4个顶点在(u,v)两个轴上的符号，按环绕顺序排列
+_FACE_CORNERS = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]], dtype=np.float32)
+# 参考面矩形的4条边: (固定的二维坐标, 符号)
+_RECT_EDGES = ((0, 1.0), (0, -1.0), (1, 1.0), (1, -1.0))
+
+# 容差
+_EPSILON = 1e-6
+_CLIP_TOLERANCE = 1e-4
+_MANIFOLD_TOLERANCE = 1e-6
+
+Contacts = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+def empty_contacts() -> Dict[str, np.ndarray]:
+    """没有接触时的空数组"""
+    return {name: np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+            for name, (dtype, width) in CONTACT_COLUMNS.items()}
+
+def _dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.einsum('...i,...i->...', a, b)
+
+def _normalize(v: np.ndarray, fallback=(0.0, 1.0, 0.0)) -> np.ndarray:
+    """逐行归一化，长度接近0的行使用fallback"""
+    length = np.linalg.norm(v, axis=-1, keepdims=True)
+    return np.where(length > _EPSILON, v / np.maximum(length, _EPSILON), np.asarray(fallback, dtype=v.dtype))
+
+def _box_axes(storage, rows: np.ndarray) -> np.ndarray:
+    """盒子的局部轴 (M,3,3)，第k行为第k个局部轴的世界方向"""
+    return quaternion_to_matrix(storage.view('rotations')[rows]).transpose(0, 2, 1)
+
+def reduce_manifold(points: np.ndarray, depths: np.ndarray, valid: np.ndarray,
+                    normals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """从每行K个候选点中选出最多4个，使接触面积尽量大
+
+    依次选取: 最深的点、离它最远的点、与前两点构成三角形面积最大的点、
+    在另一侧使四边形面积最大的点。返回(下标(M,4), 是否有效(M,4))。
+    """
+    m = len(depths)
+    rows = np.arange(m)
+
+    score = np.where(valid, depths, -np.inf)
+    i0 = np.argmax(score, axis=1)
+    p0 = points[rows, i0]
+    ok0 = valid[rows, i0]
+
+    score = np.where(valid, np.sum((points - p0[:, None]) ** 2, axis=2), -1.0)
+    i1 = np.argmax(score, axis=1)
+    p1 = points[rows, i1]
+    ok1 = ok0 & (score[rows, i1] > _MANIFOLD_TOLERANCE)
+
+    signed = _dot(np.cross((p1 - p0)[:, None], points - p0[:, None]), normals[:, None])
+    score = np.where(valid, np.abs(signed), -1.0)
+    i2 = np.argmax(score, axis=1)
+    ok2 = ok1 & (score[rows, i2] > _MANIFOLD_TOLERANCE)
+
+    side = np.sign(signed[rows, i2])
+    score = np.where(valid, -side[:, None] * signed, -1.0)
+    i3 = np.argmax(score, axis=1)
+    ok3 = ok2 & (score[rows, i3] > _MANIFOLD_TOLERANCE)
+
+    return np.stack([i0, i1, i2, i3], axis=1), np.stack([ok0, ok1, ok2, ok3], axis=1)
+
+def _manifold_contacts(pair: np.ndarray, a: np.ndarray, b: np.ndarray, points: np.ndarray,
+                       depths: np.ndarray, valid: np.ndarray, normals: np.ndarray) -> Contacts:
+    """把每对的候选点缩减为接触流形并展开为扁平数组"""
+    index, ok = reduce_manifold(points, depths, valid, normals)
+    owner = np.repeat(np.arange(len(pair)), MAX_MANIFOLD_POINTS)[ok.reshape(-1)]
+    flat = index.reshape(-1)[ok.reshape(-1)]
+    return (pair[owner], a[owner], b[owner], points[owner, flat], normals[owner], depths[owner, flat])
+
+def _sphere_sphere(storage, pair: np.ndarray, a: np.ndarray, b: np.ndarray) -> Contacts:
+    positions = storage.view('positions')
+    params = storage.view('shape_params')
+    ra = params[a, 0]
+    rb = params[b, 0]
+    d = positions[b] - positions[a]
+    distance = np.linalg.norm(d, axis=1)
+    normals = _normalize(d)
+    depths = ra + rb - distance
+    points = positions[a] + normals * (ra - 0.5 * depths)[:, None]
+    keep = depths >= -CONTACT_MARGIN
+    return pair[keep], a[keep], b[keep], points[keep], normals[keep], depths[keep]
+
+def _sphere_plane(storage, pair: np.ndarray, sphere: np.ndarray, plane: np.ndarray) -> Contacts:
+    positions = storage.view('positions')
+    params = storage.view('shape_params')
+    radius = params[sphere, 0]
+    n = params[plane, :3]
+    depths = radius - (_dot(positions[sphere], n) - params[plane, 3])
+    points = positions[sphere] - n * (radius - 0.5 * depths)[:, None]
+    keep = depths >= -CONTACT_MARGIN
+    return pair[keep], sphere[keep], plane[keep], points[keep], -n[keep], depths[keep]
+
+def _box_plane(storage, pair: np.ndarray, box: np.ndarray, plane: np.ndarray) -> Contacts:
+    positions = storage.view('positions')
+    params = storage.view('shape_params')
+    axes = _box_axes(storage, box)
+    n = params[plane, :3]
+    # 8个顶点 (M,8,3)
+    vertices = positions[box, None] + np.einsum('ck,mk,mki->mci', _BOX_CORNERS, params[box, :3], axes)
+    depths = params[plane, 3][:, None] - _dot(vertices, n[:, None])
+    points = vertices + n[:, None] * (0.5 * depths)[..., None]
+    return _manifold_contacts(pair, box, plane, points, depths, depths >= -CONTACT_MARGIN, -n)
+
+def _box_sphere(storage, pair: np.ndarray, box: np.ndarray, sphere: np.ndarray) -> Contacts:
+    positions = storage.view('positions')
+    params = storage.view('shape_params')
+    axes = _box_axes(storage, box)
+    half = params[box, :3]
+    radius = params[sphere, 0]
+
+    # 在盒子局部坐标系中求球心的最近点
+    local = np.einsum('mki,mi->mk', axes, positions[sphere] - positions[box])
+    closest = np.clip(local, -half, half)
+    d = local - closest
+    distance = np.linalg.norm(d, axis=1)
+    outside = distance > _EPSILON
+    normals = _normalize(d)
+    depths = radius - distance
+
+    # 球心在盒子内部: 从最近的面推出
+    inside = ~outside
+    if np.any(inside):
+        gap = half[inside] - np.abs(local[inside])
+        axis = np.argmin(gap, axis=1)
+        rows = np.arange(len(axis))
+        sign = np.where(local[inside][rows, axis] >= 0.0, 1.0, -1.0)
+        face_normal = np.zeros((len(axis), 3), dtype=np.float32)
+        face_normal[rows, axis] = sign
+        normals[inside] = face_normal
+        depths[inside] = radius[inside] + gap[rows, axis]
+        surface = local[inside].copy()
+        surface[rows, axis] = sign * half[inside][rows, axis]
+        closest[inside] = surface
+
+    # 盒子表面点与球面点的中点
+    points_local = 0.5 * (closest + local - normals * radius[:, None])
+    points = positions[box] + np.einsum('mk,mki->mi', points_local, axes)
+    normals = np.einsum('mk,mki->mi', normals, axes)
+    keep = depths >= -CONTACT_MARGIN
+    return pair[keep], box[keep], sphere[keep], points[keep], normals[keep], depths[keep]
+
+def _box_box(storage, pair: np.ndarray, a: np.ndarray, b: np.ndarray) -> Contacts:
+    positions = storage.view('positions')
+    params = storage.view('shape_params')
+    m = len(pair)
+    rows = np.arange(m)
+    axes_a = _box_axes(storage, a)
+    axes_b = _box_axes(storage, b)
+    half_a = params[a, :3]
+    half_b = params[b, :3]
+    d = positions[b] - positions[a]
+
+    # 15个候选分离轴: A的3个面法线、B的3个面法线、9个边叉积
+    edges = np.cross(axes_a[:, :, None], axes_b[:, None, :]).reshape(m, 9, 3)
+    axes = np.concatenate([axes_a, axes_b, edges], axis=1)
+    length = np.linalg.norm(axes, axis=2)
+    degenerate = length < 1e-5
+    axes = axes / np.where(degenerate, 1.0, length)[..., None]
+    radius_a = np.einsum('mlk,mk->ml', np.abs(np.einsum('mli,mki->mlk', axes, axes_a)), half_a)
+    radius_b = np.einsum('mlk,mk->ml', np.abs(np.einsum('mli,mki->mlk', axes, axes_b)), half_b)
+    center = np.einsum('mli,mi->ml', axes, d)
+    separation = np.where(degenerate, -np.inf, np.abs(center) - radius_a - radius_b)
+
+    touching = np.max(separation, axis=1) <= CONTACT_MARGIN
+    if not np.any(touching):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, np.zeros((0, 3)), np.zeros((0, 3)), np.zeros(0)
+
+    # 选轴时偏向面轴(先A后B)，避免帧间在几乎相等的轴之间来回切换
+    face_a = np.argmax(separation[:, :3], axis=1)
+    face_b = 3 + np.argmax(separation[:, 3:6], axis=1)
+    edge = 6 + np.argmax(separation[:, 6:], axis=1)
+    sep_a = separation[rows, face_a]
+    sep_b = separation[rows, face_b]
+    sep_e = separation[rows, edge]
+    use_b = sep_b > 0.98 * sep_a + 0.001
+    face = np.where(use_b, face_b, face_a)
+    sep_face = np.where(use_b, sep_b, sep_a)
+    use_edge = sep_e > 0.98 * sep_face + 0.001
+    axis = np.where(use_edge, edge, face)
+    # 法线从A指向B
+    normal = axes[rows, axis] * np.where(center[rows, axis] >= 0.0, 1.0, -1.0)[:, None]
+
+    results = []
+    face_rows = np.flatnonzero(touching & ~use_edge)
+    if len(face_rows):
+        results.append(_box_box_face(pair, a, b, positions, axes_a, axes_b, half_a, half_b,
+                                     face_rows, face[face_rows], normal[face_rows]))
+    edge_rows = np.flatnonzero(touching & use_edge)
+    if len(edge_rows):
+        results.append(_box_box_edge(pair, a, b, positions, axes_a, axes_b, half_a, half_b, edge_rows,
+                                     edge[edge_rows] - 6, normal[edge_rows],
+                                     -separation[edge_rows, edge[edge_rows]]))
+    return tuple(np.concatenate(column) for column in zip(*results))
+
+def _box_box_face(pair, a, b, positions, axes_a, axes_b, half_a, half_b, rows, face, normal) -> Contacts:
+    """面接触: 把入射盒子上最反向的面裁剪到参考面的矩形内"""
+    m = len(rows)
+    index = np.arange(m)
+    on_b = face >= 3
+    k = face % 3
+    # 参考盒子(R)和入射盒子(I)，n_ref从参考盒子指向入射盒子
+    pick = on_b[:, None]
+    center_r = np.where(pick, positions[b[rows]], positions[a[rows]])
+    center_i = np.where(pick, positions[a[rows]], positions[b[rows]])
+    axes_r = np.where(pick[..., None], axes_b[rows], axes_a[rows])
+    axes_i = np.where(pick[..., None], axes_a[rows], axes_b[rows])
+    half_r = np.where(pick, half_b[rows], half_a[rows])
+    half_i = np.where(pick, half_a[rows], half_b[rows])
+    n_ref = np.where(pick, -normal, normal)
+
+    face_center = center_r + n_ref * half_r[index, k][:, None]
+    t1 = axes_r[index, (k + 1) % 3]
+    t2 = axes_r[index, (k + 2) % 3]
+    extent = np.stack([half_r[index, (k + 1) % 3], half_r[index, (k + 2) % 3]], axis=1)
+
+    # 入射面: 法线与n_ref最反向的面
+    dots = np.einsum('mki,mi->mk', axes_i, n_ref)
+    j = np.argmax(np.abs(dots), axis=1)
+    n_inc = axes_i[index, j] * -np.sign(dots[index, j])[:, None]
+    inc_center = center_i + n_inc * half_i[index, j][:, None]
+    u = axes_i[index, (j + 1) % 3] * half_i[index, (j + 1) % 3][:, None]
+    v = axes_i[index, (j + 2) % 3] * half_i[index, (j + 2) % 3][:, None]
+    quad = inc_center[:, None] + _FACE_CORNERS[:, :1] * u[:, None] + _FACE_CORNERS[:, 1:] * v[:, None]
+
+    # 投影到参考面的二维坐标和高度(沿n_ref，负值表示穿透)
+    rel = quad - face_center[:, None]
+    q = np.stack([_dot(rel, t1[:, None]), _dot(rel, t2[:, None])], axis=2)
+    height = _dot(rel, n_ref[:, None])
+
+    # 候选1: 落在参考矩形内的入射面顶点
+    inside = np.all(np.abs(q) <= extent[:, None] + _CLIP_TOLERANCE, axis=2)
+    points = [quad]
+    heights = [height]
+    valid = [inside]
+
+    # 候选2: 落在入射四边形内的参考矩形角点，高度取入射面所在平面
+    corners = _FACE_CORNERS[None] * extent[:, None]
+    q_next = np.roll(q, -1, axis=1)
+    edge_vec = q_next - q
+    area = np.sum(q[..., 0] * q_next[..., 1] - q[..., 1] * q_next[..., 0], axis=1)
+    orient = np.where(area >= 0.0, 1.0, -1.0)
+    cross = edge_vec[:, None, :, 0] * (corners[:, :, None, 1] - q[:, None, :, 1]) - \
+        edge_vec[:, None, :, 1] * (corners[:, :, None, 0] - q[:, None, :, 0])
+    edge_length = np.linalg.norm(edge_vec, axis=2)[:, None]
+    corner_inside = np.all(cross * orient[:, None, None] >= -_CLIP_TOLERANCE * edge_length, axis=2)
+    on_plane = face_center[:, None] + corners[..., :1] * t1[:, None] + corners[..., 1:] * t2[:, None]
+    denom = _dot(n_ref, n_inc)
+    denom = np.where(np.abs(denom) > _EPSILON, denom, -_EPSILON)
+    t = _dot(inc_center[:, None] - on_plane, n_inc[:, None]) / denom[:, None]
+    points.append(on_plane + n_ref[:, None] * t[..., None])
+    heights.append(t)
+    valid.append(corner_inside)
+
+    # 候选3: 入射四边形的边与参考矩形边的交点
+    quad_next = np.roll(quad, -1, axis=1)
+    height_next = np.roll(height, -1, axis=1)
+    for coordinate, sign in _RECT_EDGES:
+        other = 1 - coordinate
+        bound = sign * extent[:, coordinate][:, None]
+        delta = edge_vec[..., coordinate]
+        safe = np.where(np.abs(delta) > _EPSILON, delta, 1.0)
+        s = (bound - q[..., coordinate]) / safe
+        cross_value = q[..., other] + s * edge_vec[..., other]
+        hit = (np.abs(delta) > _EPSILON) & (s >= 0.0) & (s <= 1.0) & \
+            (np.abs(cross_value) <= extent[:, other][:, None] + _CLIP_TOLERANCE)
+        points.append(quad + (quad_next - quad) * s[..., None])
+        heights.append(height + (height_next - height) * s)
+        valid.append(hit)
+
+    points = np.concatenate(points, axis=1)
+    depths = -np.concatenate(heights, axis=1)
+    valid = np.concatenate(valid, axis=1) & (depths >= -CONTACT_MARGIN)
+    # 入射面上的点沿n_ref移动半个深度，得到两表面的中点
+    points = points + n_ref[:, None] * (0.5 * depths)[..., None]
+    return _manifold_contacts(pair[rows], a[rows], b[rows], points.astype(np.float32),
+                              depths.astype(np.float32), valid, normal)
+
+def _box_box_edge(pair, a, b, positions, axes_a, axes_b, half_a, half_b, rows, edge, normal,
+                  depth) -> Contacts:
+    """边-边接触: 取两条支撑边上最近点的中点"""
+    m = len(rows)
+    index = np.arange(m)
+    i = edge // 3
+    j = edge % 3
+    axes_a = axes_a[rows]
+    axes_b = axes_b[rows]
+    half_a = half_a[rows]
+    half_b = half_b[rows]
+
+    # 支撑边: A上沿normal最远、B上沿-normal最远的边
+    sign_a = np.sign(np.einsum('mki,mi->mk', axes_a, normal))
+    sign_b = -np.sign(np.einsum('mki,mi->mk', axes_b, normal))
+    sign_a[index, i] = 0.0
+    sign_b[index, j] = 0.0
+    point_a = positions[a[rows]] + np.einsum('mk,mki->mi', sign_a * half_a, axes_a)
+    point_b = positions[b[rows]] + np.einsum('mk,mki->mi', sign_b * half_b, axes_b)
+    dir_a = axes_a[index, i]
+    dir_b = axes_b[index, j]
+
+    # 两条直线的最近点，参数限制在边长范围内
+    r = point_a - point_b
+    cos = _dot(dir_a, dir_b)
+    c = _dot(dir_a, r)
+    f = _dot(dir_b, r)
+    denom = np.maximum(1.0 - cos * cos, _EPSILON)
+    s = np.clip((cos * f - c) / denom, -half_a[index, i], half_a[index, i])
+    t = np.clip((f - cos * c) / denom, -half_b[index, j], half_b[index, j])
+    points = 0.5 * (point_a + dir_a * s[:, None] + point_b + dir_b * t[:, None])
+    return pair[rows], a[rows], b[rows], points, normal, depth
+
+# 形状组合 -> 处理函数，组合中形状类型数值较小的在前
+_HANDLERS = {
+    (ShapeType.BOX, ShapeType.BOX): _box_box,
+    (ShapeType.BOX, ShapeType.SPHERE): _box_sphere,
+    (ShapeType.BOX, ShapeType.PLANE): _box_plane,
+    (ShapeType.SPHERE, ShapeType.SPHERE): _sphere_sphere,
+    (ShapeType.SPHERE, ShapeType.PLANE): _sphere_plane,
+}
+
+class Narrowphase:
+    """细检测阶段，每次update()后contacts保存扁平的接触数组"""
+
+    def __init__(self):
+        self.contacts = empty_contacts()
+        self.build_time = 0.0
+
+    @property
+    def contact_count(self) -> int:
+        return len(self.contacts['depths'])
+
+    def update(self, storage, pairs: np.ndarray) -> Dict[str, np.ndarray]:
+        """对候选对(行号(M,2))生成接触"""
+        start = time.perf_counter()
+        shape_types = storage.view('shape_types')
+        first = pairs[:, 0].astype(np.int64)
+        second = pairs[:, 1].astype(np.int64)
+        # 两端都不活动(休眠或静态)的候选对跳过
+        active = active_bodies(storage)
+        keep = active[first] | active[second]
+        first = first[keep]
+        second = second[keep]
+        # 让形状类型较小的一方在前
+        swap = shape_types[first] > shape_types[second]
+        first, second = np.where(swap, second, first), np.where(swap, first, second)
+        type_a = shape_types[first]
+        type_b = shape_types[second]
+
+        results = []
+        for (shape_a, shape_b), handler in _HANDLERS.items():
+            group = np.flatnonzero((type_a == shape_a) & (type_b == shape_b))
+            if len(group):
+                results.append(handler(storage, group, first[group], second[group]))
+
+        if results:
+            pair, body_a, body_b, points, normals, depths = (np.concatenate(column) for column in zip(*results))
+            # 按候选对顺序排列，同一对的接触点相邻
+            order = np.argsort(pair, kind='stable')
+            columns = (body_a, body_b, points, normals, depths)
+            self.contacts = {name: np.ascontiguousarray(column[order], dtype=dtype)
+                             for (name, (dtype, _)), column in zip(CONTACT_COLUMNS.items(), columns)}
+        else:
+            self.contacts = empty_contacts()
+
+        self.build_time = time.perf_counter() - start
+        return self.contacts
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import ctypes
+import numpy as np
+from typing import Dict, Iterable, Tuple
+
+from python.core.handles import INDEX_MASK
+
+# 列定义: 列名 -> (数据类型, 每行分量数)
+BODY_COLUMNS: Dict[str, Tuple[type, int]] = {
+    'handles': (np.int64, 1),
+    'positions': (np.float32, 3),
+    'rotations': (np.float32, 4),
+    'linear_velocities': (np.float32, 3),
+    'angular_velocities': (np.float32, 3),
+    'masses': (np.float32, 1),
+    'shape_types': (np.int32, 1),
+    'body_types': (np.int32, 1),
+    'shape_params': (np.float32, 4),
+    'forces': (np.float32, 3),
+    'torques': (np.float32, 3),
+    'inverse_inertias': (np.float32, 3),
+    'frictions': (np.float32, 1),
+    'restitutions': (np.float32, 1),
+    'sleep_islands': (np.int32, 1),
+    'sleep_times': (np.float32, 1),
+    'ccd_thresholds': (np.float32, 1),      # 连续碰撞检测的运动阈值，0表示关闭
+}
+
+# 追加刚体时未给出的列的默认值，其余列为0
+COLUMN_DEFAULTS = {
+    'rotations': (0.0, 0.0, 0.0, 1.0),
+    'frictions': 0.5,
+}
+
+class BodyStorage:
+    """刚体状态的结构数组(SoA)存储
+
+    每一列是一块连续的NumPy数组，第i行对应第i个刚体。
+    通过view()拿到的数组是存储的零拷贝视图，增删刚体后需要重新获取。
+    句柄到行号的映射是按句柄槽号索引的数组(见python.core.handles)，查找不经过字典；
+    删除时空出的行由末尾的行填补，其余行不动。
+    """
+
+    def __init__(self, capacity: int = 64, columns: Dict[str, Tuple[type, int]] = BODY_COLUMNS):
+        self.count = 0
+        self._capacity = 0
+        # 列定义，可以在BODY_COLUMNS之外附加列(如批量世界的世界编号)
+        self._schema = columns
+        self._columns: Dict[str, np.ndarray] = {}
+        # 句柄槽号 -> 行号，不在存储中的槽为-1
+        self._slot_rows = np.full(0, -1, dtype=np.int64)
+        self.reserve(capacity)
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def reserve(self, capacity: int) -> None:
+        """预留容量，按需扩容(复制一次)"""
+        if capacity <= self._capacity:
+            return
+        for name, (dtype, width) in self._schema.items():
+            shape = (capacity,) if width == 1 else (capacity, width)
+            column = np.zeros(shape, dtype=dtype)
+            if name in self._columns:
+                column[:self.count] = self._columns[name][:self.count]
+            self._columns[name] = column
+        self._capacity = capacity
+
+    def view(self, name: str) -> np.ndarray:
+        """获取某一列有效部分的视图"""
+        return self._columns[name][:self.count]
+
+    def column(self, name: str) -> np.ndarray:
+        """获取某一列的完整数组(包含未使用的容量)"""
+        return self._columns[name]
+
+    def has_column(self, name: str) -> bool:
+        """是否有某一列"""
+        return name in self._columns
+
+    def row_of(self, handle: int) -> int:
+        """句柄对应的行号，不存在(或句柄已过期)时返回-1"""
+        slot = handle & INDEX_MASK
+        if slot >= len(self._slot_rows):
+            return -1
+        row = int(self._slot_rows[slot])
+        return row if row >= 0 and self._columns['handles'][row] == handle else -1
+
+    def rows_of(self, handles) -> np.ndarray:
+        """批量查找句柄对应的行号，不存在的为-1"""
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        slots = handles & INDEX_MASK
+        inside = slots < len(self._slot_rows)
+        rows = np.full(len(handles), -1, dtype=np.int64)
+        rows[inside] = self._slot_rows[slots[inside]]
+        found = rows >= 0
+        found[found] = self._columns['handles'][rows[found]] == handles[found]
+        return np.where(found, rows, -1)
+
+    def __contains__(self, handle: int) -> bool:
+        return self.row_of(handle) >= 0
+
+    def append(self, **columns: np.ndarray) -> range:
+        """批量追加刚体，未给出的列按默认值填充
+
+        'handles'列必须给出，其长度决定追加的行数。
+        """
+        handles = np.asarray(columns['handles'], dtype=np.int64).reshape(-1)
+        n = len(handles)
+        start = self.count
+        end = start + n
+        if end > self._capacity:
+            self.reserve(max(end, self._capacity * 2))
+
+        for name, (dtype, width) in self._schema.items():
+            column = self._columns[name]
+            if name in columns:
+                column[start:end] = np.asarray(columns[name], dtype=dtype).reshape(column[start:end].shape)
+            elif name in COLUMN_DEFAULTS:
+                column[start:end] = COLUMN_DEFAULTS[name]
+            else:
+                column[start:end] = 0
+
+        self.count = end
+        slots = handles & INDEX_MASK
+        if n and slots.max() >= len(self._slot_rows):
+            grown = np.full(max(int(slots.max()) + 1, 2 * len(self._slot_rows)), -1, dtype=np.int64)
+            grown[:len(self._slot_rows)] = self._slot_rows
+            self._slot_rows = grown
+        self._slot_rows[slots] = np.arange(start, end)
+        return range(start, end)
+
+    def gather(self, rows: Iterable[int]) -> Dict[str, np.ndarray]:
+        """按行号取出各列数据的副本"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return {name: self._columns[name][rows] for name in self._schema}
+
+    def remove(self, rows: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """按行号删除刚体，空出的行由末尾未被删除的行填补(不保持原有顺序)
+
+        返回(holes, movers)：第movers[i]行移到了第holes[i]行，调用方可以用它
+        同样压缩与行对应的其他数组。
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if len(rows) == 0:
+            return rows, rows
+        count = self.count - len(rows)
+        handles = self._columns['handles']
+        self._slot_rows[handles[rows] & INDEX_MASK] = -1
+
+        # 前count行中被删除的行(空位)，由后面未被删除的行按顺序填补
+        holes = rows[rows < count]
+        tail = np.ones(self.count - count, dtype=bool)
+        tail[rows[rows >= count] - count] = False
+        movers = np.flatnonzero(tail) + count
+        for name in self._schema:
+            column = self._columns[name]
+            column[holes] = column[movers]
+
+        self.count = count
+        self._slot_rows[handles[holes] & INDEX_MASK] = holes
+        return holes, movers
+
+    def clear(self) -> None:
+        """删除所有刚体"""
+        self._slot_rows[self._columns['handles'][:self.count] & INDEX_MASK] = -1
+        self.count = 0
+
+# C接口中各结构数组的函数名: 行数, 预留行数, 列地址, 句柄 -> 行号
+NATIVE_ARRAYS = {
+    'body': ('ps_world_body_count', 'ps_world_body_capacity', 'ps_world_column', 'ps_world_body_rows'),
+    'joint': ('ps_world_joint_count', 'ps_world_joint_capacity', 'ps_world_joint_column', 'ps_world_joint_rows'),
+}
+
+class NativeBodyStorage:
+    """C++物理世界结构数组的零拷贝视图
+
+    数据由原生库持有，这里只把各列包装成NumPy数组。C++端按倍数预留各列，
+    刚体数量不超过预留的行数时地址不变，refresh()只需重新切片；超过时
+    才重新包装地址变化的列。每次结构变化后都要调用refresh()。
+    视图不持有C++的数组，扩容或世界销毁后即失效，只在绑定内部使用。
+    kind为'joint'时包装的是关节数组(columns取JOINT_COLUMNS)。
+    """
+
+    def __init__(self, lib, world_ptr, columns: Dict[str, Tuple[type, int]] = BODY_COLUMNS, kind: str = 'body'):
+        self._world_ptr = world_ptr
+        self._schema = columns
+        count, capacity, column, rows = NATIVE_ARRAYS[kind]
+        self._count = getattr(lib, count)
+        self._capacity = getattr(lib, capacity)
+        self._column = getattr(lib, column)
+        self._rows = getattr(lib, rows)
+        self.count = 0
+        self._reserved = 0
+        self._full: Dict[str, np.ndarray] = {}    # 按预留行数包装的各列
+        self._columns: Dict[str, np.ndarray] = {}
+        self._wrap()
+
+    @property
+    def capacity(self) -> int:
+        return self.count
+
+    def _wrap(self) -> None:
+        """按C++端的行数重新切片，预留的行数变化时重新包装各列"""
+        self.count = self._count(self._world_ptr)
+        reserved = self._capacity(self._world_ptr)
+        for index, (name, (dtype, width)) in enumerate(self._schema.items()):
+            full = self._full.get(name)
+            if full is None or reserved != self._reserved:
+                address = self._column(self._world_ptr, index) if reserved else None
+                shape = (reserved,) if width == 1 else (reserved, width)
+                if not address:
+                    full = np.zeros(shape, dtype=dtype)
+                else:
+                    buffer = (np.ctypeslib.as_ctypes_type(dtype) * (reserved * width)).from_address(address)
+                    full = np.frombuffer(buffer, dtype=dtype).reshape(shape)
+                self._full[name] = full
+            self._columns[name] = full[:self.count]
+        self._reserved = reserved
+
+    def view(self, name: str) -> np.ndarray:
+        """获取某一列的视图"""
+        return self._columns[name]
+
+    def column(self, name: str) -> np.ndarray:
+        """获取某一列的完整数组"""
+        return self._columns[name]
+
+    def has_column(self, name: str) -> bool:
+        """是否有某一列"""
+        return name in self._columns
+
+    def row_of(self, handle: int) -> int:
+        """句柄对应的行号，不存在(或句柄已过期)时返回-1"""
+        return int(self.rows_of([handle])[0])
+
+    def rows_of(self, handles) -> np.ndarray:
+        """批量查找句柄对应的行号(由C++端的槽号数组查找)，不存在的为-1"""
+        handles = np.ascontiguousarray(handles, dtype=np.int64).reshape(-1)
+        rows = np.empty(len(handles), dtype=np.int32)
+        self._rows(self._world_ptr, handles.ctypes.data_as(ctypes.POINTER(ctypes.c_int64)),
+                   len(handles), rows.ctypes.data_as(ctypes.POINTER(ctypes.c_int32)))
+        return rows.astype(np.int64)
+
+    def __contains__(self, handle: int) -> bool:
+        return self.row_of(handle) >= 0
+
+    def refresh(self) -> None:
+        """C++端增删刚体(关节)后重新包装各列"""
+        self._wrap()
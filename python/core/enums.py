@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# 刚体类型
+class BodyType:
+    DYNAMIC = 0
+    STATIC = 1
+    KINEMATIC = 2
+
+# 形状类型
+class ShapeType:
+    BOX = 0
+    SPHERE = 1
+    CAPSULE = 2
+    CYLINDER = 3
+    CONE = 4
+    PLANE = 5
+
+# 原生库的日志级别，数值越大输出越多
+class LogLevel:
+    OFF = 0
+    ERROR = 1
+    WARN = 2
+    INFO = 3
+    DEBUG = 4
+    TRACE = 5
+
+# 原生库的日志类别
+class LogCategory:
+    WORLD = 0
+    BODY = 1
+    SOLVER = 2
+
+# 关节类型
+class JointType:
+    POINT = 0
+    HINGE = 1
+    SLIDER = 2
+    DISTANCE = 3
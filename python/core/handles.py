@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+带代数的32位刚体句柄
+
+布局与C++端SlotMap.h一致: 低22位为槽号，高10位为代数。代数从1开始，每次释放
+槽时加1并在1..MAX_GENERATION之间循环，因此有效句柄永远不为0；槽号相同的过期
+句柄与槽当前的代数不一致，可以被检测出来。释放的槽按先进先出的顺序重用。
+
+纯Python实现用HandlePool分配句柄；原生库的句柄由C++刚体池分配，布局相同。
+"""
+
+import numpy as np
+
+INDEX_BITS = 22
+INDEX_MASK = (1 << INDEX_BITS) - 1
+MAX_GENERATION = (1 << (32 - INDEX_BITS)) - 1
+CAPACITY = 1 << INDEX_BITS
+
+def handle_index(handles) -> np.ndarray:
+    """句柄的槽号"""
+    return np.asarray(handles, dtype=np.int64) & INDEX_MASK
+
+def handle_generation(handles) -> np.ndarray:
+    """句柄的代数"""
+    return np.asarray(handles, dtype=np.int64) >> INDEX_BITS
+
+class HandlePool:
+    """句柄分配器，分配和释放都是整批的数组运算"""
+
+    def __init__(self):
+        # 按倍数预留，前_count个槽已经使用过
+        self._generations = np.ones(0, dtype=np.int64)   # 每个槽当前(空闲时为下一个)的代数
+        self._alive = np.zeros(0, dtype=bool)
+        self._count = 0
+        # 空闲槽的先进先出队列: _free[_head:_tail]
+        self._free = np.zeros(0, dtype=np.int64)
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._alive))
+
+    def allocate(self, n: int) -> np.ndarray:
+        """分配n个句柄"""
+        reused = min(n, self._tail - self._head)
+        slots = self._free[self._head:self._head + reused]
+        self._head += reused
+        fresh = n - reused
+        if fresh:
+            start = self._count
+            if start + fresh > CAPACITY:
+                raise MemoryError(f"刚体数量超过上限: {CAPACITY}")
+            if start + fresh > len(self._generations):
+                self._reserve(min(max(start + fresh, 2 * len(self._generations), 64), CAPACITY))
+            self._count = start + fresh
+            slots = np.concatenate([slots, np.arange(start, start + fresh, dtype=np.int64)])
+        self._alive[slots] = True
+        return (self._generations[slots] << INDEX_BITS) | slots
+
+    def release(self, handles) -> np.ndarray:
+        """释放句柄，返回其中有效(此前未释放)的句柄"""
+        handles = np.unique(np.asarray(handles, dtype=np.int64).reshape(-1))
+        handles = handles[self.is_valid(handles)]
+        slots = handles & INDEX_MASK
+        self._alive[slots] = False
+        self._generations[slots] = self._generations[slots] % MAX_GENERATION + 1
+        self._push_free(slots)
+        return handles
+
+    def is_valid(self, handles) -> np.ndarray:
+        """每个句柄是否指向现存的刚体"""
+        handles = np.asarray(handles, dtype=np.int64)
+        slots = handles & INDEX_MASK
+        inside = (handles > 0) & (slots < self._count)
+        slots = np.where(inside, slots, 0)
+        if not self._count:
+            return np.zeros(handles.shape, dtype=bool)
+        return inside & self._alive[slots] & (self._generations[slots] == handles >> INDEX_BITS)
+
+    def _reserve(self, capacity: int) -> None:
+        """扩容到capacity个槽(复制一次)，新槽的代数从1开始"""
+        generations = np.ones(capacity, dtype=np.int64)
+        alive = np.zeros(capacity, dtype=bool)
+        generations[:self._count] = self._generations[:self._count]
+        alive[:self._count] = self._alive[:self._count]
+        self._generations, self._alive = generations, alive
+
+    def _push_free(self, slots: np.ndarray) -> None:
+        if self._tail + len(slots) > len(self._free):
+            # 先把队列移到开头，仍然不够时扩容
+            pending = self._free[self._head:self._tail]
+            size = max(len(pending) + len(slots), 2 * len(pending), 64)
+            if size > len(self._free):
+                self._free = np.zeros(size, dtype=np.int64)
+            self._free[:len(pending)] = pending
+            self._head, self._tail = 0, len(pending)
+        self._free[self._tail:self._tail + len(slots)] = slots
+        self._tail += len(slots)
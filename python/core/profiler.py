@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+步进性能统计
+
+每次step_simulation()记录一个样本: 各阶段的耗时(毫秒)和若干计数器，保存在
+固定大小的环形缓冲区中，内存占用不随运行时间增长。阶段和计数器的顺序与C++端
+Profiler.h中的ProfilePhase/ProfileCounter一致，两个后端的结果格式相同。
+关闭时步进循环只多一次布尔判断，不读取时钟。
+"""
+
+import time
+import numpy as np
+from typing import Dict, Tuple
+
+# 计时的阶段(毫秒)，total为整个step_simulation
+PROFILE_PHASES = ('integrate', 'broadphase', 'narrowphase', 'solve', 'islands', 'sync', 'total')
+# 计数器: pairs/contacts取最后一个子步，iterations为所有子步之和
+PROFILE_COUNTERS = ('bodies', 'pairs', 'contacts', 'iterations', 'substeps')
+
+(PROFILE_INTEGRATE, PROFILE_BROADPHASE, PROFILE_NARROWPHASE, PROFILE_SOLVE,
+ PROFILE_ISLANDS, PROFILE_SYNC, PROFILE_TOTAL) = range(len(PROFILE_PHASES))
+(PROFILE_BODIES, PROFILE_PAIRS, PROFILE_CONTACTS, PROFILE_ITERATIONS,
+ PROFILE_SUBSTEPS) = range(len(PROFILE_COUNTERS))
+
+DEFAULT_CAPACITY = 240
+
+class StepProfiler:
+    """numpy后端的性能统计，对应C++端的Profiler"""
+
+    def __init__(self):
+        self.enabled = False
+        self._times = np.zeros((0, len(PROFILE_PHASES)), dtype=np.float32)
+        self._counters = np.zeros((0, len(PROFILE_COUNTERS)), dtype=np.int32)
+        self._current_times = [0.0] * len(PROFILE_PHASES)
+        self._current_counters = [0] * len(PROFILE_COUNTERS)
+        self._next = 0
+        self._count = 0
+        self._start = 0.0
+        self._last = 0.0
+
+    def set_enabled(self, enabled: bool, capacity: int = DEFAULT_CAPACITY) -> None:
+        """开启/关闭统计，开启时清空环形缓冲区"""
+        self.enabled = enabled
+        capacity = max(int(capacity), 1) if enabled else 0
+        self._times = np.zeros((capacity, len(PROFILE_PHASES)), dtype=np.float32)
+        self._counters = np.zeros((capacity, len(PROFILE_COUNTERS)), dtype=np.int32)
+        self._next = 0
+        self._count = 0
+
+    def begin_sample(self) -> None:
+        """开始一个新样本，同时开始计时"""
+        self._current_times = [0.0] * len(PROFILE_PHASES)
+        self._current_counters = [0] * len(PROFILE_COUNTERS)
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, phase: int) -> None:
+        """把距上一次lap(或begin_sample)的时间累加到phase"""
+        now = time.perf_counter()
+        self._current_times[phase] += (now - self._last) * 1000.0
+        self._last = now
+
+    def set_counter(self, counter: int, value: int) -> None:
+        self._current_counters[counter] = value
+
+    def add_counter(self, counter: int, value: int) -> None:
+        self._current_counters[counter] += value
+
+    def end_sample(self) -> None:
+        """结束当前样本并写入环形缓冲区"""
+        capacity = len(self._times)
+        if not capacity:
+            return
+        self._current_times[PROFILE_TOTAL] = (time.perf_counter() - self._start) * 1000.0
+        self._times[self._next] = self._current_times
+        self._counters[self._next] = self._current_counters
+        self._next = (self._next + 1) % capacity
+        self._count = min(self._count + 1, capacity)
+
+    def samples(self) -> Tuple[np.ndarray, np.ndarray]:
+        """按时间顺序(最旧的在前)返回(耗时(N,阶段数), 计数器(N,计数器数))的拷贝"""
+        order = (np.arange(self._count) + self._next - self._count) % max(len(self._times), 1)
+        return self._times[order], self._counters[order]
+
+def profile_dict(times: np.ndarray, counters: np.ndarray) -> Dict[str, np.ndarray]:
+    """把样本数组按阶段/计数器名称拆分为 名称 -> (N,) 数组"""
+    profile = {name: times[:, i] for i, name in enumerate(PROFILE_PHASES)}
+    profile.update({name: counters[:, i] for i, name in enumerate(PROFILE_COUNTERS)})
+    return profile
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+物理世界快照格式
+
+快照是一段连续的字节: 头部之后依次是BODY_COLUMNS中每一列的原始数据
+(按列顺序，每列N行)、接触流形缓存(句柄对、局部接触点、冲量)，最后是两端刚体
+都在世界中的关节(句柄、类型、两端刚体的行号、累积冲量)。
+引擎本身不使用随机数，因此快照中没有随机数状态。
+"""
+
+import struct
+import numpy as np
+from typing import Dict, Tuple
+
+from python.core.body_storage import BODY_COLUMNS
+from python.dynamics.joints import JOINT_ROWS
+
+MAGIC = b'PSSNAP01'
+VERSION = 3
+
+# 魔数, 版本, 刚体数量, 缓存接触点数量, 关节数量, 累加器, 重力(3), 下一个岛屿编号
+_HEADER = struct.Struct('<8sIIqqd3fi')
+
+# 接触流形缓存的列: 名称 -> (类型, 宽度)，与ContactSolver._cache一致
+CACHE_COLUMNS = {
+    'handles': (np.int64, 2),
+    'anchors': (np.float32, 3),
+    'impulses': (np.float32, 4),
+}
+
+# 关节的列: 关节本身不在快照中重建，恢复时只核对并写回warm starting用的累积冲量
+JOINT_STATE_COLUMNS = {
+    'handles': (np.int64, 1),
+    'joint_types': (np.int32, 1),
+    'body_rows': (np.int64, 2),
+    'impulses': (np.float32, JOINT_ROWS),
+}
+
+def _column_bytes(dtype, width: int, count: int) -> int:
+    return np.dtype(dtype).itemsize * width * count
+
+def snapshot_size(body_count: int, cache_count: int, joint_count: int = 0) -> int:
+    """快照的字节数"""
+    size = _HEADER.size
+    for group, count in ((BODY_COLUMNS, body_count), (CACHE_COLUMNS, cache_count),
+                         (JOINT_STATE_COLUMNS, joint_count)):
+        size += sum(_column_bytes(dtype, width, count) for dtype, width in group.values())
+    return size
+
+def pack_snapshot(columns: Dict[str, np.ndarray], cache: Dict[str, np.ndarray], joints: Dict[str, np.ndarray],
+                  accumulator: float, gravity: Tuple[float, float, float], next_island: int) -> bytearray:
+    """把刚体列、接触缓存、关节状态和步进状态打包为一段连续字节"""
+    body_count = len(columns['handles'])
+    cache_count = len(cache['handles'])
+    joint_count = len(joints['handles'])
+    buffer = bytearray(snapshot_size(body_count, cache_count, joint_count))
+    _HEADER.pack_into(buffer, 0, MAGIC, VERSION, body_count, cache_count, joint_count, accumulator, *gravity,
+                      next_island)
+    offset = _HEADER.size
+    for group, source, count in ((BODY_COLUMNS, columns, body_count), (CACHE_COLUMNS, cache, cache_count),
+                                 (JOINT_STATE_COLUMNS, joints, joint_count)):
+        for name, (dtype, width) in group.items():
+            size = _column_bytes(dtype, width, count)
+            target = np.frombuffer(buffer, dtype=dtype, count=count * width, offset=offset)
+            target[...] = np.asarray(source[name], dtype=dtype).reshape(-1)
+            offset += size
+    return buffer
+
+def unpack_snapshot(buffer) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray], Dict[str, np.ndarray], Dict]:
+    """解析快照，返回(刚体列, 接触缓存, 关节状态, 步进状态)，数组是buffer上的零拷贝视图"""
+    buffer = memoryview(buffer).cast('B')
+    if len(buffer) < _HEADER.size:
+        raise ValueError("快照数据不完整")
+    magic, version, body_count, cache_count, joint_count, accumulator, gx, gy, gz, next_island = \
+        _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("不是有效的物理世界快照")
+    if len(buffer) != snapshot_size(body_count, cache_count, joint_count):
+        raise ValueError("快照数据长度与头部不符")
+    offset = _HEADER.size
+    parsed = []
+    for group, count in ((BODY_COLUMNS, body_count), (CACHE_COLUMNS, cache_count),
+                         (JOINT_STATE_COLUMNS, joint_count)):
+        arrays = {}
+        for name, (dtype, width) in group.items():
+            column = np.frombuffer(buffer, dtype=dtype, count=count * width, offset=offset)
+            arrays[name] = column.reshape(count, width) if width > 1 else column
+            offset += _column_bytes(dtype, width, count)
+        parsed.append(arrays)
+    state = {'accumulator': accumulator, 'gravity': (gx, gy, gz), 'next_island': next_island}
+    return parsed[0], parsed[1], parsed[2], state
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+轨迹记录文件
+
+文件由头部、若干数据块和末尾的索引组成:
+    头部: 魔数、版本、刚体数量、每块帧数，以及句柄、形状类型、形状参数
+          (回放时不需要重新创建刚体即可绘制)
+    数据块: 每块保存chunk_frames帧，内容为每帧的时间(float64)和
+            每个刚体的位置、旋转、线速度、角速度(float32, 13个分量)，
+            可以用zlib压缩
+    索引: 每个数据块的偏移、大小和起始帧，文件最后16字节为索引偏移和结束魔数
+
+记录时数据块由后台线程压缩并写入，队列长度有限，步进循环只在磁盘跟不上时
+等待，内存占用不随记录时长增长。读取时用mmap映射整个文件，任意帧的访问
+都是O(1)，未压缩的数据块直接返回零拷贝视图。
+"""
+
+import mmap
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+from typing import Dict, List, Optional
+
+MAGIC = b'PSTRAJ01'
+END_MAGIC = b'PSTRJEND'
+VERSION = 1
+
+# 每帧每个刚体记录的列及其宽度，顺序即文件中的顺序
+STATE_COLUMNS = (
+    ('positions', 3),
+    ('rotations', 4),
+    ('linear_velocities', 3),
+    ('angular_velocities', 3),
+)
+STATE_WIDTH = sum(width for _, width in STATE_COLUMNS)
+
+_HEADER = struct.Struct('<8sIIII')          # 魔数, 版本, 刚体数量, 每块帧数, 状态宽度
+_FOOTER = struct.Struct('<q8s')             # 索引偏移, 结束魔数
+_INDEX_HEADER = struct.Struct('<qq')        # 数据块数量, 总帧数
+INDEX_DTYPE = np.dtype([
+    ('offset', '<i8'),
+    ('size', '<i8'),
+    ('first_frame', '<i8'),
+    ('start_time', '<f8'),
+    ('frames', '<i4'),
+    ('compressed', '<i4'),
+])
+
+class TrajectoryRecorder:
+    """把每帧的刚体状态流式写入轨迹文件"""
+
+    def __init__(self, path: str, handles: np.ndarray, shape_types: np.ndarray, shape_params: np.ndarray,
+                 chunk_frames: int = 64, compress: bool = False, max_pending: int = 4):
+        """handles/shape_types/shape_params为记录开始时场景中的刚体，记录过程中刚体数量不能改变"""
+        if chunk_frames < 1:
+            raise ValueError(f"每块帧数必须为正数: {chunk_frames}")
+        self.path = path
+        self.body_count = len(handles)
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.frame_count = 0
+        self.time = 0.0
+
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(MAGIC, VERSION, self.body_count, chunk_frames, STATE_WIDTH))
+        self._file.write(np.ascontiguousarray(handles, dtype='<i8').tobytes())
+        self._file.write(np.ascontiguousarray(shape_types, dtype='<i4').tobytes())
+        self._file.write(np.ascontiguousarray(shape_params, dtype='<f4').reshape(-1, 4).tobytes())
+
+        self._index: List[tuple] = []
+        self._error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._write_loop, name='TrajectoryRecorder', daemon=True)
+        self._thread.start()
+        self._new_chunk()
+
+    def _new_chunk(self) -> None:
+        self._times = np.empty(self.chunk_frames, dtype='<f8')
+        self._states = np.empty((self.chunk_frames, self.body_count, STATE_WIDTH), dtype='<f4')
+        self._filled = 0
+
+    def record(self, dt: float, positions: np.ndarray, rotations: np.ndarray,
+               velocities: np.ndarray, angular_velocities: np.ndarray) -> None:
+        """记录一帧，dt为距上一帧的模拟时间"""
+        self._check_error()
+        if len(positions) != self.body_count:
+            raise ValueError(f"记录过程中刚体数量发生变化: {self.body_count} -> {len(positions)}")
+        self.time += dt
+        frame = self._states[self._filled]
+        start = 0
+        for values, (_, width) in zip((positions, rotations, velocities, angular_velocities), STATE_COLUMNS):
+            frame[:, start:start + width] = values
+            start += width
+        self._times[self._filled] = self.time
+        self._filled += 1
+        self.frame_count += 1
+        if self._filled == self.chunk_frames:
+            self._submit()
+
+    def _submit(self) -> None:
+        """把当前数据块交给后台线程(队列满时等待)"""
+        if self._filled:
+            first_frame = self.frame_count - self._filled
+            self._queue.put((first_frame, self._filled, self._times, self._states))
+            self._new_chunk()
+
+    def _write_loop(self) -> None:
+        """后台线程: 压缩并写入数据块"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            first_frame, frames, times, states = item
+            try:
+                payload = times[:frames].tobytes() + states[:frames].tobytes()
+                if self.compress:
+                    payload = zlib.compress(payload, 1)
+                offset = self._file.tell()
+                self._file.write(payload)
+                self._index.append((offset, len(payload), first_frame, times[0], frames, int(self.compress)))
+            except BaseException as e:
+                self._error = e
+
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"写入轨迹文件失败: {self._error}")
+
+    def close(self) -> None:
+        """写入剩余的帧和索引并关闭文件"""
+        if self._file.closed:
+            return
+        self._submit()
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._check_error()
+            index = np.array(self._index, dtype=INDEX_DTYPE)
+            index_offset = self._file.tell()
+            self._file.write(_INDEX_HEADER.pack(len(index), self.frame_count))
+            self._file.write(index.tobytes())
+            self._file.write(_FOOTER.pack(index_offset, END_MAGIC))
+        finally:
+            self._file.close()
+
+    def __enter__(self) -> 'TrajectoryRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+class TrajectoryReader:
+    """以mmap方式读取轨迹文件，支持任意帧的随机访问"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"轨迹文件为空: {path}")
+
+        magic, version, body_count, chunk_frames, width = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or width != STATE_WIDTH:
+            self.close()
+            raise ValueError(f"不是有效的轨迹文件: {path}")
+        index_offset, end_magic = _FOOTER.unpack_from(self._map, len(self._map) - _FOOTER.size)
+        if end_magic != END_MAGIC:
+            self.close()
+            raise ValueError(f"轨迹文件不完整(记录未正常结束): {path}")
+
+        self.body_count = body_count
+        self.chunk_frames = chunk_frames
+        offset = _HEADER.size
+        self.handles = np.frombuffer(self._map, dtype='<i8', count=body_count, offset=offset)
+        offset += body_count * 8
+        self.shape_types = np.frombuffer(self._map, dtype='<i4', count=body_count, offset=offset)
+        offset += body_count * 4
+        self.shape_params = np.frombuffer(self._map, dtype='<f4', count=body_count * 4,
+                                          offset=offset).reshape(body_count, 4)
+
+        chunk_count, self.frame_count = _INDEX_HEADER.unpack_from(self._map, index_offset)
+        self._index = np.frombuffer(self._map, dtype=INDEX_DTYPE, count=chunk_count,
+                                    offset=index_offset + _INDEX_HEADER.size)
+        self._cached_chunk = -1
+        self._cached = None
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def _chunk(self, chunk: int):
+        """数据块的(时间, 状态)，压缩的数据块解压后缓存最近一个"""
+        if chunk == self._cached_chunk:
+            return self._cached
+        offset, size, _, _, frames, compressed = self._index[chunk].tolist()
+        if compressed:
+            buffer = zlib.decompress(self._map[offset:offset + size])
+            offset = 0
+        else:
+            buffer = self._map
+        times = np.frombuffer(buffer, dtype='<f8', count=frames, offset=offset)
+        states = np.frombuffer(buffer, dtype='<f4', count=frames * self.body_count * STATE_WIDTH,
+                               offset=offset + frames * 8).reshape(frames, self.body_count, STATE_WIDTH)
+        self._cached_chunk = chunk
+        self._cached = (times, states)
+        return self._cached
+
+    def _locate(self, frame: int):
+        if frame < 0:
+            frame += self.frame_count
+        if not 0 <= frame < self.frame_count:
+            raise IndexError(f"帧号超出范围: {frame}")
+        # 除最后一块外每块都是chunk_frames帧
+        return self._chunk(frame // self.chunk_frames), frame % self.chunk_frames
+
+    def time(self, frame: int) -> float:
+        """第frame帧的模拟时间"""
+        (times, _), i = self._locate(frame)
+        return float(times[i])
+
+    def state(self, frame: int) -> np.ndarray:
+        """第frame帧的完整状态 (N,13)"""
+        (_, states), i = self._locate(frame)
+        return states[i]
+
+    def frame(self, frame: int) -> Dict[str, np.ndarray]:
+        """第frame帧的状态，按列名拆分"""
+        state = self.state(frame)
+        columns = {}
+        start = 0
+        for name, width in STATE_COLUMNS:
+            columns[name] = state[:, start:start + width]
+            start += width
+        return columns
+
+    def find_frame(self, time: float) -> int:
+        """模拟时间不超过time的最后一帧"""
+        if self.frame_count == 0:
+            raise IndexError("轨迹文件中没有帧")
+        chunk = max(int(np.searchsorted(self._index['start_time'], time, side='right')) - 1, 0)
+        times, _ = self._chunk(chunk)
+        return int(self._index['first_frame'][chunk]) + max(int(np.searchsorted(times, time, side='right')) - 1, 0)
+
+    def close(self) -> None:
+        # 先释放引用mmap的数组视图
+        self.handles = self.shape_types = self.shape_params = self._index = None
+        self._cached = None
+        try:
+            self._map.close()
+        except BufferError:
+            # 调用者仍持有零拷贝视图，映射在视图释放后由垃圾回收关闭
+            pass
+        self._file.close()
+
+    def __enter__(self) -> 'TrajectoryReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+顺序冲量接触求解器
+
+每个接触点有一个法向约束和两个切向(摩擦)约束，按Gauss-Seidel方式迭代。
+为了整列计算，接触先被划分成若干批次，同一批次内任意两个接触不共享
+动态刚体，于是一个批次可以一次性求解，结果与逐个求解完全相同。
+
+关节的约束行(见python.dynamics.joints)在同一个迭代循环中求解: 每次迭代先按批次
+求解关节，再求解法向约束和摩擦。关节的累积冲量保存在关节数组中，下一步作为初值。
+
+接触流形按刚体对的句柄缓存，保存每个接触点在刚体A局部坐标中的位置
+和累积冲量。下一帧匹配到的接触点以这些冲量作为初值(warm starting)，
+本帧没有接触的刚体对从缓存中移除。
+"""
+
+import time
+import numpy as np
+from typing import Dict, List, Optional
+
+from python.core.enums import BodyType, JointType
+from python.dynamics.integrator import quaternion_to_matrix
+from python.dynamics.joints import JOINT_ROWS, quaternion_conjugate, quaternion_multiply
+
+# 位置修正系数和允许的穿透量
+BAUMGARTE = 0.2
+PENETRATION_SLOP = 0.005
+# 法向相对速度低于该值时才产生反弹
+RESTITUTION_THRESHOLD = 1.0
+# 两帧接触点在刚体A局部坐标中的距离小于该值时视为同一个点
+MATCH_DISTANCE = 0.05
+# 关节的warm starting冲量按该比例施加，完全施加时刚性链条中由位置修正带入的冲量会逐步放大
+JOINT_WARM_STARTING = 0.85
+
+def partition_contacts(body_a: np.ndarray, body_b: np.ndarray, dynamic: np.ndarray) -> List[np.ndarray]:
+    """把接触划分为批次，同一批次内的接触不共享动态刚体
+
+    每一轮中，每个动态刚体把自己"分配"给剩余接触中最靠前的一个，
+    刚体全部分配给它的接触进入本批次。每轮至少选出剩余的第一个接触。
+    """
+    batches = []
+    remaining = np.arange(len(body_a))
+    while len(remaining):
+        a = body_a[remaining]
+        b = body_b[remaining]
+        local = np.arange(len(remaining))
+        dyn_a = dynamic[a]
+        dyn_b = dynamic[b]
+        end_contact = np.concatenate([local[dyn_a], local[dyn_b]])
+        end_body = np.concatenate([a[dyn_a], b[dyn_b]])
+
+        # 每个刚体在剩余接触中第一次出现的位置
+        order = np.lexsort((end_contact, end_body))
+        sorted_body = end_body[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_body[1:] != sorted_body[:-1]
+        claimed = np.bincount(end_contact[order][first], minlength=len(remaining))
+
+        selected = claimed == dyn_a.astype(np.int64) + dyn_b
+        batches.append(remaining[selected])
+        remaining = remaining[~selected]
+    return batches
+
+def tangent_basis(normals: np.ndarray):
+    """由法线构造两个正交的切向量"""
+    t1 = np.where((np.abs(normals[:, 0]) > 0.57)[:, None],
+                  np.stack([normals[:, 1], -normals[:, 0], np.zeros(len(normals))], axis=1),
+                  np.stack([np.zeros(len(normals)), normals[:, 2], -normals[:, 1]], axis=1))
+    t1 /= np.linalg.norm(t1, axis=1, keepdims=True)
+    t2 = np.cross(normals, t1)
+    return t1.astype(np.float32), t2.astype(np.float32)
+
+class ContactSolver:
+    """带接触流形缓存的顺序冲量求解器"""
+
+    def __init__(self, iterations: int = 10, warm_starting: bool = True):
+        self.iterations = iterations
+        self.warm_starting = warm_starting
+        # 接触流形缓存，每行一个接触点
+        self._cache: Dict[str, np.ndarray] = {
+            'handle_a': np.zeros(0, dtype=np.int64),
+            'handle_b': np.zeros(0, dtype=np.int64),
+            'anchors': np.zeros((0, 3), dtype=np.float32),
+            'impulses': np.zeros((0, 4), dtype=np.float32),  # 法向冲量 + 世界坐标摩擦冲量
+        }
+        self.manifold_count = 0
+        self.warm_started = 0
+        self.batch_count = 0
+        self.solve_time = 0.0
+
+    def clear_cache(self) -> None:
+        """清空接触流形缓存"""
+        for name, column in self._cache.items():
+            self._cache[name] = column[:0]
+        self.manifold_count = 0
+
+    def forget(self, handles: np.ndarray) -> None:
+        """从缓存中移除涉及这些刚体的接触点(刚体被重置或瞬移后旧冲量不再有意义)"""
+        drop = np.isin(self._cache['handle_a'], handles) | np.isin(self._cache['handle_b'], handles)
+        if drop.any():
+            self._cache = {name: column[~drop] for name, column in self._cache.items()}
+
+    def solve(self, storage, contacts: Dict[str, np.ndarray], dt: float, joints=None,
+              joint_rows: Optional[np.ndarray] = None) -> None:
+        """求解接触和关节，直接修改存储中的线速度和角速度
+
+        joints为关节存储(列见JOINT_COLUMNS)，joint_rows为两端刚体的行号 (J,2)，不在世界中的为-1。
+        """
+        start = time.perf_counter()
+        count = len(contacts['depths'])
+        joint_count = 0 if joints is None else joints.count
+        if count == 0 or dt <= 0.0:
+            self.clear_cache()
+        if (count == 0 and joint_count == 0) or dt <= 0.0:
+            self.warm_started = 0
+            self.batch_count = 0
+            self.solve_time = time.perf_counter() - start
+            return
+
+        a = contacts['body_a'].astype(np.int64)
+        b = contacts['body_b'].astype(np.int64)
+        normals = contacts['normals']
+        depths = contacts['depths']
+        points = contacts['points']
+
+        positions = storage.view('positions')
+        linear = storage.view('linear_velocities')
+        angular = storage.view('angular_velocities')
+        masses = storage.view('masses')
+        dynamic = (storage.view('body_types') == BodyType.DYNAMIC) & (masses > 0.0) & \
+            (storage.view('sleep_islands') == 0)
+        inv_mass = np.where(dynamic, 1.0 / np.where(dynamic, masses, 1.0), 0.0).astype(np.float32)
+
+        # 世界坐标系下的惯性张量逆 R * diag(invI) * R^T，非动态刚体为0
+        rotation = quaternion_to_matrix(storage.view('rotations'))
+        inv_inertia = storage.view('inverse_inertias') * dynamic[:, None]
+        world_inv_inertia = np.einsum('nij,nj,nkj->nik', rotation, inv_inertia, rotation)
+
+        ra = points - positions[a]
+        rb = points - positions[b]
+        t1, t2 = tangent_basis(normals)
+        # 三个约束方向: 法线、两个切向 (K,3,3)
+        directions = np.stack([normals, t1, t2], axis=1)
+        ra_x_d = np.cross(ra[:, None], directions)
+        rb_x_d = np.cross(rb[:, None], directions)
+        angular_a = np.einsum('kij,kdj->kdi', world_inv_inertia[a], ra_x_d)
+        angular_b = np.einsum('kij,kdj->kdi', world_inv_inertia[b], rb_x_d)
+        im_a = inv_mass[a]
+        im_b = inv_mass[b]
+        k = (im_a + im_b)[:, None] + np.sum(ra_x_d * angular_a, axis=2) + np.sum(rb_x_d * angular_b, axis=2)
+        effective_mass = np.where(k > 0.0, 1.0 / np.where(k > 0.0, k, 1.0), 0.0)
+
+        # 摩擦系数取几何平均，恢复系数取较大值
+        frictions = storage.view('frictions')
+        restitutions = storage.view('restitutions')
+        friction = np.sqrt(frictions[a] * frictions[b])
+        restitution = np.maximum(restitutions[a], restitutions[b])
+
+        # 法向目标速度: 穿透时做位置修正；有间隙时允许在本步内恰好闭合；
+        # 碰撞速度足够大且本步会接触时按恢复系数反弹
+        vn = self._relative_velocity(linear, angular, a, b, normals, ra_x_d[:, 0], rb_x_d[:, 0])
+        target = np.where(depths > 0.0, BAUMGARTE / dt * np.maximum(depths - PENETRATION_SLOP, 0.0),
+                          depths / dt)
+        bounce = (vn < -RESTITUTION_THRESHOLD) & (vn * dt <= depths)
+        target = np.where(bounce, np.maximum(target, -restitution * vn), target).astype(np.float32)
+
+        handle_a = storage.view('handles')[a]
+        handle_b = storage.view('handles')[b]
+        rotation_a = rotation[a]
+        anchors = np.einsum('kji,kj->ki', rotation_a, ra).astype(np.float32)
+        impulses = np.zeros((count, 3), dtype=np.float32)
+        self.warm_started = 0
+        if self.warm_starting:
+            cached = self._match(handle_a, handle_b, anchors)
+            found = cached >= 0
+            self.warm_started = int(np.count_nonzero(found))
+            if self.warm_started:
+                old = self._cache['impulses'][cached[found]]
+                impulses[found, 0] = old[:, 0]
+                impulses[found, 1] = np.sum(old[:, 1:] * t1[found], axis=1)
+                impulses[found, 2] = np.sum(old[:, 1:] * t2[found], axis=1)
+                world = np.einsum('kd,kdi->ki', impulses, directions)
+                np.add.at(linear, a, -im_a[:, None] * world)
+                np.add.at(angular, a, -np.einsum('kd,kdi->ki', impulses, angular_a))
+                np.add.at(linear, b, im_b[:, None] * world)
+                np.add.at(angular, b, np.einsum('kd,kdi->ki', impulses, angular_b))
+
+        rows = None
+        if joint_count:
+            rows = self._joint_rows(storage, joints, joint_rows, dynamic, inv_mass, rotation, world_inv_inertia, dt)
+        joint_batches = []
+        if rows is not None:
+            # 先施加关节的warm starting冲量
+            ja, jb, impulse = rows['a'], rows['b'], rows['impulses']
+            np.add.at(linear, ja, -rows['im_a'][:, None] * np.einsum('jr,jri->ji', impulse, rows['linear']))
+            np.add.at(angular, ja, -np.einsum('jr,jri->ji', impulse, rows['angular_a']))
+            np.add.at(linear, jb, rows['im_b'][:, None] * np.einsum('jr,jri->ji', impulse, rows['linear']))
+            np.add.at(angular, jb, np.einsum('jr,jri->ji', impulse, rows['angular_b']))
+            joint_batches = partition_contacts(ja, jb, dynamic)
+
+        batches = partition_contacts(a, b, dynamic)
+        self.batch_count = len(batches) + len(joint_batches)
+        # 每次迭代先求解关节，再求解全部法向约束，最后求解摩擦，摩擦上限使用本次迭代的法向冲量
+        for _ in range(self.iterations):
+            for batch in joint_batches:
+                self._solve_joint_batch(batch, rows, linear, angular)
+            for axes in ((0,), (1, 2)):
+                for batch in batches:
+                    self._solve_batch(batch, axes, a, b, linear, angular, directions, ra_x_d, rb_x_d, angular_a,
+                                      angular_b, im_a, im_b, effective_mass, target, friction, impulses)
+        if rows is not None:
+            joints.view('impulses')[rows['joints']] = rows['impulses']
+
+        # 更新缓存(本帧没有接触的刚体对被移除)
+        friction_impulse = impulses[:, 1:2] * t1 + impulses[:, 2:3] * t2
+        self._cache = {
+            'handle_a': handle_a,
+            'handle_b': handle_b,
+            'anchors': anchors,
+            'impulses': np.concatenate([impulses[:, :1], friction_impulse], axis=1).astype(np.float32),
+        }
+        changes = np.flatnonzero((handle_a[1:] != handle_a[:-1]) | (handle_b[1:] != handle_b[:-1]))
+        self.manifold_count = len(changes) + 1 if count else 0
+        self.solve_time = time.perf_counter() - start
+
+    @staticmethod
+    def _relative_velocity(linear, angular, a, b, direction, ra_x_d, rb_x_d) -> np.ndarray:
+        """接触点处B相对A的速度在direction上的分量"""
+        return np.sum((linear[b] - linear[a]) * direction, axis=1) + \
+            np.sum(angular[b] * rb_x_d, axis=1) - np.sum(angular[a] * ra_x_d, axis=1)
+
+    @staticmethod
+    def _solve_batch(batch, axes, a, b, linear, angular, directions, ra_x_d, rb_x_d, angular_a, angular_b,
+                     im_a, im_b, effective_mass, target, friction, impulses) -> None:
+        """求解一个批次中axes指定的约束方向，批次内的接触互不共享动态刚体"""
+        ba = a[batch]
+        bb = b[batch]
+        va = linear[ba]
+        wa = angular[ba]
+        vb = linear[bb]
+        wb = angular[bb]
+        ima = im_a[batch, None]
+        imb = im_b[batch, None]
+
+        for d in axes:
+            direction = directions[batch, d]
+            rel = np.sum((vb - va) * direction, axis=1) + np.sum(wb * rb_x_d[batch, d], axis=1) - \
+                np.sum(wa * ra_x_d[batch, d], axis=1)
+            old = impulses[batch, d]
+            if d == 0:
+                new = np.maximum(old + effective_mass[batch, 0] * (target[batch] - rel), 0.0)
+            else:
+                limit = friction[batch] * impulses[batch, 0]
+                new = np.clip(old - effective_mass[batch, d] * rel, -limit, limit)
+            impulses[batch, d] = new
+            delta = (new - old)[:, None]
+            va -= ima * delta * direction
+            wa -= delta * angular_a[batch, d]
+            vb += imb * delta * direction
+            wb += delta * angular_b[batch, d]
+
+        linear[ba] = va
+        angular[ba] = wa
+        linear[bb] = vb
+        angular[bb] = wb
+
+    def _joint_rows(self, storage, joints, joint_rows, dynamic, inv_mass, rotation, world_inv_inertia,
+                    dt: float) -> Optional[Dict[str, np.ndarray]]:
+        """把参与求解的关节展开成约束行，每个关节JOINT_ROWS行，没有参与求解的关节时返回None
+
+        参与求解的关节两端都在世界中，且至少一端是活动的动态刚体。线性行沿linear方向，
+        角度行的linear为0；相对速度为 (vB - vA)·linear + wB·jacobian_b - wA·jacobian_a。
+        """
+        ids = np.flatnonzero((joint_rows >= 0).all(axis=1) & (joint_rows[:, 0] != joint_rows[:, 1]))
+        a = joint_rows[ids, 0].astype(np.int64)
+        b = joint_rows[ids, 1].astype(np.int64)
+        keep = dynamic[a] | dynamic[b]
+        ids, a, b = ids[keep], a[keep], b[keep]
+        count = len(ids)
+        if count == 0:
+            return None
+
+        types = joints.view('joint_types')[ids]
+        anchors = joints.view('local_anchors')[ids]
+        local_axes = joints.view('local_axes')[ids]
+        positions = storage.view('positions')
+        ra = np.einsum('jik,jk->ji', rotation[a], anchors[:, :3])
+        rb = np.einsum('jik,jk->ji', rotation[b], anchors[:, 3:])
+        separation = (positions[b] + rb) - (positions[a] + ra)
+        axis_a = np.einsum('jik,jk->ji', rotation[a], local_axes[:, :3])
+        t1, t2 = tangent_basis(axis_a / np.linalg.norm(axis_a, axis=1, keepdims=True))
+        eye = np.eye(3, dtype=np.float32)
+
+        linear = np.zeros((count, JOINT_ROWS, 3), dtype=np.float32)
+        jacobian_a = np.zeros((count, JOINT_ROWS, 3), dtype=np.float32)
+        jacobian_b = np.zeros((count, JOINT_ROWS, 3), dtype=np.float32)
+        error = np.zeros((count, JOINT_ROWS), dtype=np.float32)
+        used = np.zeros((count, JOINT_ROWS), dtype=bool)
+
+        # 点对点和铰链: 两个锚点的世界坐标之差为0
+        point = (types == JointType.POINT) | (types == JointType.HINGE)
+        linear[point, :3] = eye
+        jacobian_a[point, :3] = np.cross(ra[point, None], eye)
+        jacobian_b[point, :3] = np.cross(rb[point, None], eye)
+        error[point, :3] = separation[point]
+        used[point, :3] = True
+
+        # 铰链: 两端的轴保持平行，只约束绕两个垂直于轴的方向的相对转动
+        hinge = types == JointType.HINGE
+        axis_b = np.einsum('jik,jk->ji', rotation[b[hinge]], local_axes[hinge, 3:])
+        tangents = np.stack([t1[hinge], t2[hinge]], axis=1)
+        jacobian_a[hinge, 3:] = tangents
+        jacobian_b[hinge, 3:] = tangents
+        error[hinge, 3:] = np.einsum('ji,jri->jr', np.cross(axis_a[hinge], axis_b), tangents)
+        used[hinge, 3:] = True
+
+        # 滑块: 姿态误差 qB * conj(reference) * conj(qA) 为0(取w非负的一半)，
+        # 锚点之差垂直于轴的分量为0，A的力臂取到B的锚点
+        slider = types == JointType.SLIDER
+        rotations = storage.view('rotations')
+        references = joints.view('references')[ids[slider]]
+        relative = quaternion_multiply(rotations[b[slider]], quaternion_conjugate(references))
+        relative = quaternion_multiply(relative, quaternion_conjugate(rotations[a[slider]]))
+        sign = np.where(relative[:, 3] < 0.0, -2.0, 2.0)
+        jacobian_a[slider, :3] = eye
+        jacobian_b[slider, :3] = eye
+        error[slider, :3] = sign[:, None] * relative[:, :3]
+        tangents = np.stack([t1[slider], t2[slider]], axis=1)
+        linear[slider, 3:] = tangents
+        jacobian_a[slider, 3:] = np.cross((separation[slider] + ra[slider])[:, None], tangents)
+        jacobian_b[slider, 3:] = np.cross(rb[slider, None], tangents)
+        error[slider, 3:] = np.einsum('ji,jri->jr', separation[slider], tangents)
+        used[slider] = True
+
+        # 距离: 锚点间的距离等于长度
+        distance_joint = types == JointType.DISTANCE
+        sep = separation[distance_joint]
+        distance = np.linalg.norm(sep, axis=1)
+        direction = np.where((distance > 1e-6)[:, None], sep / np.where(distance > 1e-6, distance, 1.0)[:, None],
+                             eye[0])
+        linear[distance_joint, 0] = direction
+        jacobian_a[distance_joint, 0] = np.cross(ra[distance_joint], direction)
+        jacobian_b[distance_joint, 0] = np.cross(rb[distance_joint], direction)
+        error[distance_joint, 0] = distance - joints.view('lengths')[ids[distance_joint]]
+        used[distance_joint, 0] = True
+
+        angular_a = np.einsum('jik,jrk->jri', world_inv_inertia[a], jacobian_a).astype(np.float32)
+        angular_b = np.einsum('jik,jrk->jri', world_inv_inertia[b], jacobian_b).astype(np.float32)
+        im_a = inv_mass[a]
+        im_b = inv_mass[b]
+        k = (im_a + im_b)[:, None] * np.sum(linear * linear, axis=2) + np.sum(jacobian_a * angular_a, axis=2) + \
+            np.sum(jacobian_b * angular_b, axis=2)
+        valid = used & (k > 0.0)
+        effective_mass = np.where(valid, 1.0 / np.where(valid, k, 1.0), 0.0).astype(np.float32)
+        if self.warm_starting:
+            impulses = JOINT_WARM_STARTING * joints.view('impulses')[ids]
+        else:
+            impulses = np.zeros((count, JOINT_ROWS))
+        return {
+            'joints': ids,
+            'a': a,
+            'b': b,
+            'linear': linear,
+            'angular_a': angular_a,
+            'angular_b': angular_b,
+            'jacobian_a': jacobian_a,
+            'jacobian_b': jacobian_b,
+            'im_a': im_a,
+            'im_b': im_b,
+            'effective_mass': effective_mass,
+            'target': (-BAUMGARTE / dt * error).astype(np.float32),
+            'impulses': np.where(valid, impulses, 0.0).astype(np.float32),
+        }
+
+    @staticmethod
+    def _solve_joint_batch(batch, rows, linear, angular) -> None:
+        """求解一个批次中关节的所有约束行(双边约束，冲量不限制范围)，批次内的关节互不共享动态刚体"""
+        ba = rows['a'][batch]
+        bb = rows['b'][batch]
+        va = linear[ba]
+        wa = angular[ba]
+        vb = linear[bb]
+        wb = angular[bb]
+        ima = rows['im_a'][batch, None]
+        imb = rows['im_b'][batch, None]
+        impulses = rows['impulses']
+
+        for r in range(JOINT_ROWS):
+            mass = rows['effective_mass'][batch, r]
+            if not mass.any():
+                continue
+            direction = rows['linear'][batch, r]
+            rel = np.sum((vb - va) * direction, axis=1) + np.sum(wb * rows['jacobian_b'][batch, r], axis=1) - \
+                np.sum(wa * rows['jacobian_a'][batch, r], axis=1)
+            delta = mass * (rows['target'][batch, r] - rel)
+            impulses[batch, r] += delta
+            delta = delta[:, None]
+            va -= ima * delta * direction
+            wa -= delta * rows['angular_a'][batch, r]
+            vb += imb * delta * direction
+            wb += delta * rows['angular_b'][batch, r]
+
+        linear[ba] = va
+        angular[ba] = wa
+        linear[bb] = vb
+        angular[bb] = wb
+
+    def _match(self, handle_a: np.ndarray, handle_b: np.ndarray, anchors: np.ndarray) -> np.ndarray:
+        """为每个新接触点在缓存中找同一刚体对里最近的旧接触点，找不到时为-1"""
+        old_a = self._cache['handle_a']
+        old_b = self._cache['handle_b']
+        matched = np.full(len(handle_a), -1, dtype=np.int64)
+        if len(old_a) == 0:
+            return matched
+
+        # 给新旧刚体对统一编号
+        pairs = np.concatenate([np.stack([old_a, old_b], axis=1), np.stack([handle_a, handle_b], axis=1)])
+        _, ids = np.unique(pairs, axis=0, return_inverse=True)
+        ids = ids.reshape(-1)
+        old_ids = ids[:len(old_a)]
+        new_ids = ids[len(old_a):]
+        order = np.argsort(old_ids, kind='stable')
+        sorted_ids = old_ids[order]
+        first = np.searchsorted(sorted_ids, new_ids, side='left')
+        last = np.searchsorted(sorted_ids, new_ids, side='right')
+        width = int(np.max(last - first))
+        if width == 0:
+            return matched
+
+        # 每个新接触点与同一刚体对的所有旧接触点比较距离
+        candidates = first[:, None] + np.arange(width)
+        valid = candidates < last[:, None]
+        old_rows = order[np.minimum(candidates, len(order) - 1)]
+        distance = np.sum((self._cache['anchors'][old_rows] - anchors[:, None]) ** 2, axis=2)
+        distance = np.where(valid, distance, np.inf)
+        best = np.argmin(distance, axis=1)
+        rows = np.arange(len(handle_a))
+        found = distance[rows, best] < MATCH_DISTANCE * MATCH_DISTANCE
+        matched[found] = old_rows[rows, best][found]
+        return matched
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+NumPy积分器
+
+所有计算都以整列数组为单位完成，不存在逐刚体的Python循环。
+"""
+
+import numpy as np
+from typing import Tuple
+
+from python.core.enums import BodyType, ShapeType
+
+def compute_inverse_inertias(shape_types: np.ndarray, masses: np.ndarray,
+                             shape_params: np.ndarray) -> np.ndarray:
+    """根据形状和质量计算局部坐标系下的主惯性矩倒数 (N,3)，质量为0时为0"""
+    shape_types = np.asarray(shape_types)
+    masses = np.asarray(masses, dtype=np.float32)
+    p = np.asarray(shape_params, dtype=np.float32)
+    inertia = np.zeros((len(masses), 3), dtype=np.float32)
+
+    # 盒子: 参数为半尺寸
+    box = shape_types == ShapeType.BOX
+    sq = p[:, :3] ** 2
+    inertia[box] = (masses[box, None] / 3.0) * np.stack(
+        [sq[box, 1] + sq[box, 2], sq[box, 0] + sq[box, 2], sq[box, 0] + sq[box, 1]], axis=1)
+
+    # 球体: 参数为半径
+    sphere = shape_types == ShapeType.SPHERE
+    inertia[sphere] = (0.4 * masses[sphere] * sq[sphere, 0])[:, None]
+
+    # 圆柱体/胶囊体: 沿Y轴，参数为(半径, 半高)；胶囊体按圆柱体近似
+    for shape in (ShapeType.CYLINDER, ShapeType.CAPSULE):
+        mask = shape_types == shape
+        r2 = sq[mask, 0]
+        h2 = sq[mask, 1]
+        side = masses[mask] * (3.0 * r2 + 4.0 * h2) / 12.0
+        inertia[mask] = np.stack([side, 0.5 * masses[mask] * r2, side], axis=1)
+
+    # 圆锥体: 沿Y轴，参数为(半径, 半高)，相对质心
+    cone = shape_types == ShapeType.CONE
+    r2 = sq[cone, 0]
+    h2 = 4.0 * sq[cone, 1]
+    side = masses[cone] * (0.15 * r2 + 0.0375 * h2)
+    inertia[cone] = np.stack([side, 0.3 * masses[cone] * r2, side], axis=1)
+
+    with np.errstate(divide='ignore'):
+        inverse = np.where(inertia > 0.0, 1.0 / inertia, 0.0)
+    return inverse.astype(np.float32)
+
+def quaternion_to_matrix(q: np.ndarray) -> np.ndarray:
+    """四元数(x,y,z,w)批量转换为旋转矩阵 (N,3,3)"""
+    x, y, z, w = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    return np.stack([
+        np.stack([1 - 2 * (yy + zz), 2 * (xy - wz), 2 * (xz + wy)], axis=1),
+        np.stack([2 * (xy + wz), 1 - 2 * (xx + zz), 2 * (yz - wx)], axis=1),
+        np.stack([2 * (xz - wy), 2 * (yz + wx), 1 - 2 * (xx + yy)], axis=1),
+    ], axis=1)
+
+def apply_world_inverse_inertia(rotations: np.ndarray, inverse_inertias: np.ndarray,
+                                vectors: np.ndarray) -> np.ndarray:
+    """计算 R * diag(invI) * R^T * v，即世界坐标系下的I^-1 v"""
+    r = quaternion_to_matrix(rotations)
+    local = np.einsum('nji,nj->ni', r, vectors) * inverse_inertias
+    return np.einsum('nij,nj->ni', r, local)
+
+def integrate_quaternions(rotations: np.ndarray, angular_velocities: np.ndarray,
+                          dt: float) -> None:
+    """按 dq/dt = 0.5 * (w,0) * q 原地积分并重新归一化"""
+    qv = rotations[:, :3]
+    qw = rotations[:, 3:4]
+    w = angular_velocities
+    dv = qw * w + np.cross(w, qv)
+    dw = -np.einsum('ni,ni->n', w, qv)[:, None]
+    rotations[:, :3] += 0.5 * dt * dv
+    rotations[:, 3:4] += 0.5 * dt * dw
+    norm = np.linalg.norm(rotations, axis=1, keepdims=True)
+    rotations /= np.where(norm > 0.0, norm, 1.0)
+
+def interpolate_states(previous_positions: np.ndarray, previous_rotations: np.ndarray, positions: np.ndarray,
+                       rotations: np.ndarray, alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """在两组状态之间插值，位置线性插值，旋转归一化线性插值(nlerp)"""
+    alpha = np.float32(alpha)
+    out_positions = previous_positions + (positions - previous_positions) * alpha
+    # 取同一半球的四元数，避免绕远路
+    sign = np.where(np.einsum('ij,ij->i', previous_rotations, rotations) < 0.0, -1.0, 1.0).astype(np.float32)
+    out_rotations = previous_rotations + (rotations * sign[:, None] - previous_rotations) * alpha
+    norm = np.linalg.norm(out_rotations, axis=1, keepdims=True)
+    out_rotations = np.where(norm > 0.0, out_rotations / np.where(norm > 0.0, norm, 1.0), rotations)
+    return out_positions, out_rotations
+
+def _awake_rows(storage):
+    """未休眠刚体的行，全部未休眠时返回slice(None)以直接使用视图"""
+    awake = storage.view('sleep_islands') == 0
+    return slice(None) if awake.all() else np.flatnonzero(awake)
+
+def integrate_velocities(storage, gravity, dt: float) -> None:
+    """速度更新: 动态刚体受重力和累积的力/力矩作用，静态刚体速度清零，休眠刚体跳过"""
+    if storage.count == 0:
+        return
+
+    rows = _awake_rows(storage)
+    linear = storage.view('linear_velocities')[rows]
+    angular = storage.view('angular_velocities')[rows]
+    forces = storage.view('forces')[rows]
+    body_types = storage.view('body_types')[rows]
+    masses = storage.view('masses')[rows]
+
+    dynamic = (body_types == BodyType.DYNAMIC) & (masses > 0.0)
+    static = ~dynamic & (body_types != BodyType.KINEMATIC)
+    inv_mass = np.where(dynamic, 1.0 / np.where(dynamic, masses, 1.0), 0.0).astype(np.float32)
+
+    # 重力可以是(3,)，也可以是每个刚体一行的(N,3)(批量世界中每个世界的重力不同)
+    g = np.asarray(gravity, dtype=np.float32)
+    if g.ndim == 2:
+        g = g[rows]
+    linear += (dynamic[:, None] * g + forces * inv_mass[:, None]) * dt
+    angular += apply_world_inverse_inertia(storage.view('rotations')[rows], storage.view('inverse_inertias')[rows],
+                                           storage.view('torques')[rows]) * dt
+    linear[static] = 0.0
+    angular[static] = 0.0
+    if not isinstance(rows, slice):
+        storage.view('linear_velocities')[rows] = linear
+        storage.view('angular_velocities')[rows] = angular
+
+def integrate_positions(storage, dt: float) -> None:
+    """位置和姿态更新(休眠刚体跳过)，结束后清空力和力矩累加器"""
+    if storage.count == 0:
+        return
+
+    rows = _awake_rows(storage)
+    storage.view('positions')[rows] += storage.view('linear_velocities')[rows] * dt
+    rotations = storage.view('rotations')[rows]
+    integrate_quaternions(rotations, storage.view('angular_velocities')[rows], dt)
+    if not isinstance(rows, slice):
+        storage.view('rotations')[rows] = rotations
+
+    storage.view('forces')[...] = 0.0
+    storage.view('torques')[...] = 0.0
+
+def integrate_bodies(storage, gravity, dt: float) -> None:
+    """对存储中的所有刚体执行一步半隐式欧拉积分
+
+    动态刚体受重力和累积的力/力矩作用；运动学刚体按当前速度移动但不受力；
+    静态刚体保持不动，速度清零。积分结束后清空力和力矩累加器。
+    先更新速度再用新速度更新位置，两步之间可以插入约束求解。
+    """
+    integrate_velocities(storage, gravity, dt)
+    integrate_positions(storage, dt)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+岛屿构建与刚体休眠
+
+动态刚体通过接触和关节连成岛屿(并查集)。岛屿中所有刚体的速度持续低于阈值
+time_to_sleep秒后整个岛屿进入休眠：速度清零，sleep_islands列记录岛屿编号。
+休眠的刚体不参与积分、细检测和求解；当它与活动刚体接触或由关节相连时，
+编号相同的整个岛屿被唤醒。
+"""
+
+import time
+import numpy as np
+from typing import Optional, Tuple
+
+from python.core.enums import BodyType
+
+# 默认休眠阈值
+LINEAR_SLEEP_THRESHOLD = 0.05
+ANGULAR_SLEEP_THRESHOLD = 0.05
+TIME_TO_SLEEP = 0.5
+
+def union_find(count: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """并查集: 返回每个节点所在连通分量的代表(分量中最小的下标)
+
+    整列实现: 每轮把每条边两端的根中较大的一个挂到较小的一个上，
+    再用指针跳跃压缩路径，直到所有边两端的根相同。
+    """
+    parent = np.arange(count)
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    while len(a):
+        root_a = parent[a]
+        root_b = parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        a, b, root_a, root_b = a[differ], b[differ], root_a[differ], root_b[differ]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent
+
+def linked_bodies(contacts, joint_rows: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """接触和关节两端的刚体行号，关节中不在世界中的刚体(行号为-1)被跳过"""
+    a = contacts['body_a'].astype(np.int64)
+    b = contacts['body_b'].astype(np.int64)
+    if joint_rows is not None and len(joint_rows):
+        linked = joint_rows[(joint_rows >= 0).all(axis=1)]
+        a = np.concatenate([a, linked[:, 0]])
+        b = np.concatenate([b, linked[:, 1]])
+    return a, b
+
+def dynamic_bodies(storage) -> np.ndarray:
+    """动态刚体(质量为正)的掩码"""
+    return (storage.view('body_types') == BodyType.DYNAMIC) & (storage.view('masses') > 0.0)
+
+def active_bodies(storage) -> np.ndarray:
+    """参与碰撞检测的刚体: 未休眠的动态刚体和运动学刚体"""
+    return (dynamic_bodies(storage) & (storage.view('sleep_islands') == 0)) | \
+        (storage.view('body_types') == BodyType.KINEMATIC)
+
+class IslandManager:
+    """岛屿构建与休眠管理，每一步先wake()再在求解后update()"""
+
+    def __init__(self, linear_threshold: float = LINEAR_SLEEP_THRESHOLD,
+                 angular_threshold: float = ANGULAR_SLEEP_THRESHOLD, time_to_sleep: float = TIME_TO_SLEEP):
+        self.enabled = True
+        self.linear_threshold = linear_threshold
+        self.angular_threshold = angular_threshold
+        self.time_to_sleep = time_to_sleep
+        self.island_count = 0
+        self.build_time = 0.0
+        self._next_island = 1
+
+    def _restless(self, storage) -> np.ndarray:
+        """速度超过休眠阈值的刚体"""
+        linear = storage.view('linear_velocities')
+        angular = storage.view('angular_velocities')
+        return (np.einsum('ij,ij->i', linear, linear) > self.linear_threshold ** 2) | \
+            (np.einsum('ij,ij->i', angular, angular) > self.angular_threshold ** 2)
+
+    def _moving_kinematic(self, storage) -> np.ndarray:
+        return (storage.view('body_types') == BodyType.KINEMATIC) & self._restless(storage)
+
+    def wake(self, storage, contacts, joint_rows: Optional[np.ndarray] = None) -> bool:
+        """唤醒与活动刚体(未休眠的动态刚体或运动中的运动学刚体)接触或由关节相连的休眠岛屿，
+        返回是否有刚体被唤醒；joint_rows为关节两端的刚体行号 (J,2)"""
+        islands = storage.view('sleep_islands')
+        if not self.enabled or not islands.any():
+            return False
+        a, b = linked_bodies(contacts, joint_rows)
+        if len(a) == 0:
+            return False
+
+        source = (dynamic_bodies(storage) & (islands == 0)) | self._moving_kinematic(storage)
+        hit = np.concatenate([islands[b[source[a]]], islands[a[source[b]]]])
+        hit = hit[hit != 0]
+        if len(hit) == 0:
+            return False
+
+        woken = np.isin(islands, hit)
+        islands[woken] = 0
+        storage.view('sleep_times')[woken] = 0.0
+        return True
+
+    @staticmethod
+    def wake_bodies(storage, rows: np.ndarray) -> None:
+        """唤醒这些行的刚体所在的整个休眠岛屿"""
+        islands = storage.view('sleep_islands')
+        hit = islands[rows]
+        hit = hit[hit != 0]
+        if len(hit):
+            woken = np.isin(islands, hit)
+            islands[woken] = 0
+            storage.view('sleep_times')[woken] = 0.0
+
+    @staticmethod
+    def wake_all(storage) -> None:
+        """唤醒所有刚体"""
+        storage.view('sleep_islands')[...] = 0
+        storage.view('sleep_times')[...] = 0.0
+
+    def update(self, storage, contacts, dt: float, joint_rows: Optional[np.ndarray] = None) -> None:
+        """构建岛屿并更新休眠状态(在接触求解之后调用)"""
+        start = time.perf_counter()
+        self.island_count = 0
+        if not self.enabled or storage.count == 0:
+            self.build_time = time.perf_counter() - start
+            return
+
+        islands = storage.view('sleep_islands')
+        times = storage.view('sleep_times')
+        awake = dynamic_bodies(storage) & (islands == 0)
+        restless = self._restless(storage)
+
+        # 岛屿只由两端都是动态刚体的接触和关节连接；与运动中的运动学刚体相连的刚体不能休眠
+        a, b = linked_bodies(contacts, joint_rows)
+        moving = self._moving_kinematic(storage)
+        restless[b[moving[a]]] = True
+        restless[a[moving[b]]] = True
+        times[awake] = np.where(restless[awake], 0.0, times[awake] + dt)
+
+        link = awake[a] & awake[b]
+        roots = union_find(storage.count, a[link], b[link])
+        members = np.flatnonzero(awake)
+        island_roots, island_of = np.unique(roots[members], return_inverse=True)
+        island_of = island_of.reshape(-1)
+        self.island_count = len(island_roots)
+
+        # 岛屿中休眠计时的最小值达到阈值时整个岛屿休眠，按代表(最小行号)的顺序编号
+        shortest = np.full(len(island_roots), np.inf)
+        np.minimum.at(shortest, island_of, times[members])
+        ready = shortest >= self.time_to_sleep
+        if ready.any():
+            ids = np.cumsum(ready) - 1 + self._next_island
+            sleepers = ready[island_of]
+            rows = members[sleepers]
+            islands[rows] = ids[island_of[sleepers]]
+            storage.view('linear_velocities')[rows] = 0.0
+            storage.view('angular_velocities')[rows] = 0.0
+            self._next_island += int(ready.sum())
+
+        self.build_time = time.perf_counter() - start
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+关节的结构数组存储
+
+关节按句柄引用两端的刚体，锚点和轴保存在各自刚体的局部坐标中，创建时由世界坐标换算。
+每一步每个关节展开成JOINT_ROWS个约束行(未使用的行有效质量为0)，与接触在同一个迭代
+循环中求解(见python.dynamics.contact_solver)。列的顺序与C++端PSJointColumn一致。
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+from python.core.enums import JointType
+
+# 每个关节最多的约束行数: 点对点3行，铰链和滑块5行，距离1行
+JOINT_ROWS = 5
+
+# 列定义: 列名 -> (数据类型, 每行分量数)；两端刚体的数据依次排列(A在前)
+JOINT_COLUMNS: Dict[str, Tuple[type, int]] = {
+    'handles': (np.int64, 1),
+    'joint_types': (np.int32, 1),
+    'bodies': (np.int64, 2),            # 两端刚体的句柄
+    'local_anchors': (np.float32, 6),
+    'local_axes': (np.float32, 6),      # 铰链的转轴、滑块的滑动方向
+    'references': (np.float32, 4),      # 创建时的相对旋转conj(qA)*qB
+    'lengths': (np.float32, 1),         # 距离关节的长度
+    'impulses': (np.float32, JOINT_ROWS),   # 各约束行的累积冲量(warm starting)
+}
+
+JOINT_TYPES = (JointType.POINT, JointType.HINGE, JointType.SLIDER, JointType.DISTANCE)
+
+# 未给出轴时的默认值
+DEFAULT_AXIS = (0.0, 0.0, 1.0)
+
+def quaternion_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """四元数(x,y,z,w)批量相乘 a*b"""
+    ax, ay, az, aw = a[:, 0], a[:, 1], a[:, 2], a[:, 3]
+    bx, by, bz, bw = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    return np.stack([
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+        aw * bw - ax * bx - ay * by - az * bz,
+    ], axis=1)
+
+def quaternion_conjugate(q: np.ndarray) -> np.ndarray:
+    """单位四元数的逆"""
+    return q * np.array([-1.0, -1.0, -1.0, 1.0], dtype=q.dtype)
+
+def rotate_vectors(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """用四元数批量旋转向量"""
+    u = q[:, :3]
+    t = 2.0 * np.cross(u, v)
+    return v + q[:, 3:4] * t + np.cross(u, t)
+
+def joint_frames(positions_a: np.ndarray, rotations_a: np.ndarray, positions_b: np.ndarray,
+                 rotations_b: np.ndarray, anchors_a: np.ndarray, anchors_b: np.ndarray,
+                 axes: np.ndarray) -> Dict[str, np.ndarray]:
+    """由两端刚体的当前状态和世界坐标的锚点、轴计算关节的局部坐标列
+
+    返回local_anchors、local_axes、references和lengths(锚点间的当前距离)。
+    """
+    norms = np.linalg.norm(axes, axis=1, keepdims=True)
+    if np.any(norms == 0.0):
+        raise ValueError("关节的轴不能为零向量")
+    axes = axes / norms
+    inverse_a = quaternion_conjugate(rotations_a)
+    inverse_b = quaternion_conjugate(rotations_b)
+    return {
+        'local_anchors': np.concatenate([rotate_vectors(inverse_a, anchors_a - positions_a),
+                                         rotate_vectors(inverse_b, anchors_b - positions_b)], axis=1),
+        'local_axes': np.concatenate([rotate_vectors(inverse_a, axes), rotate_vectors(inverse_b, axes)], axis=1),
+        'references': quaternion_multiply(inverse_a, rotations_b),
+        'lengths': np.linalg.norm(anchors_b - anchors_a, axis=1),
+    }
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+无界面批量运行(ensemble)
+
+把一个JSON描述的多组场景参数分发到进程池中运行。每个工作进程启动时加载
+一次物理引擎库并连接到共享内存，之后连续处理多个场景；场景的采样轨迹
+(位置和旋转)直接写入共享内存中预先分配好的区域，进程之间只传递很小的
+运行摘要。单个场景抛出异常只会让该场景失败；工作进程崩溃时未完成的
+场景逐个在单独的进程池中重试，只有真正导致崩溃的场景被记为失败。
+
+spec.json 格式:
+    {
+        "defaults": {"bodies": 16, "steps": 600, "gravity": [0, -9.81, 0]},
+        "runs": [{"name": "moon", "gravity": [0, -1.62, 0]}, {"name": "earth"}]
+    }
+"""
+
+import json
+import time
+import traceback
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+# 场景参数的默认值
+DEFAULT_PARAMETERS = {
+    'bodies': 16,                # 盒子数量，按网格排列
+    'spacing': 3.0,              # 网格间距
+    'height': 10.0,              # 初始高度
+    'half_extents': [1.0, 1.0, 1.0],
+    'mass': 1.0,
+    'friction': 0.5,
+    'restitution': 0.2,
+    'jitter': 0.0,               # 水平位置随机扰动幅度
+    'seed': 0,
+    'gravity': [0.0, -9.81, 0.0],
+    'steps': 600,
+    'time_step': 1.0 / 60.0,
+    'record_every': 60,          # 每隔多少步采样一帧
+    'backend': 'auto',
+    'broadphase': 'sap',
+    'solver_iterations': 10,
+    'warm_starting': True,
+    'sleeping': True,
+}
+
+# 每个刚体每帧记录的数值: 位置(3) + 旋转四元数(4)
+STATE_WIDTH = 7
+
+# 工作进程内的共享内存连接
+_shared: Optional[shared_memory.SharedMemory] = None
+
+def load_spec(path: str) -> List[Dict]:
+    """读取spec文件，返回合并了默认值的场景参数列表"""
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    defaults = {**DEFAULT_PARAMETERS, **spec.get('defaults', {})}
+    runs = []
+    for index, run in enumerate(spec.get('runs', [{}])):
+        unknown = set(run) - set(DEFAULT_PARAMETERS) - {'name'}
+        if unknown:
+            raise ValueError(f"场景{index}包含未知参数: {', '.join(sorted(unknown))}")
+        runs.append({'name': f"run{index}", **defaults, **run})
+    names = [run['name'] for run in runs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"场景名称重复: {', '.join(duplicates)}")
+    return runs
+
+def frame_count(params: Dict) -> int:
+    """场景采样的帧数(包括初始状态)"""
+    return int(params['steps']) // max(int(params['record_every']), 1) + 1
+
+def body_count(params: Dict) -> int:
+    """场景中的刚体数量(包括地面)"""
+    return int(params['bodies']) + 1
+
+def _init_worker(shared_name: str) -> None:
+    """工作进程初始化: 加载物理引擎库并连接共享内存"""
+    global _shared
+    from python.physics_binding import native_library
+    native_library()  # 加载原生库，之后的场景复用
+    _shared = shared_memory.SharedMemory(name=shared_name)
+
+def build_scene(params: Dict):
+    """按参数创建地面加网格排列的盒子"""
+    from python.physics_binding import PhysicsWorld, RigidBody, Vector3
+
+    world = PhysicsWorld(backend=params['backend'])
+    world.initialize(Vector3(*params['gravity']))
+    world.set_broadphase(params['broadphase'])
+    world.set_solver_iterations(int(params['solver_iterations']))
+    world.set_warm_starting(bool(params['warm_starting']))
+    world.set_sleeping_enabled(bool(params['sleeping']))
+
+    world.add_rigid_body(RigidBody.create_plane(Vector3(0, 1, 0), 0.0))
+    count = int(params['bodies'])
+    side = int(np.ceil(np.sqrt(max(count, 1))))
+    index = np.arange(count)
+    positions = np.stack([(index % side) * params['spacing'], np.full(count, params['height']),
+                          (index // side) * params['spacing']], axis=1)
+    if params['jitter'] > 0.0:
+        rng = np.random.default_rng(params['seed'])
+        positions[:, [0, 2]] += rng.uniform(-params['jitter'], params['jitter'], (count, 2))
+    boxes = RigidBody.create_boxes(np.full(count, params['mass']), positions,
+                                   np.tile(params['half_extents'], (count, 1)))
+    for handle in boxes:
+        body = RigidBody(int(handle))
+        body.set_friction(params['friction'])
+        body.set_restitution(params['restitution'])
+    world.add_bodies(boxes)
+    return world
+
+def _destroy_scene(world) -> None:
+    """移除并销毁场景中的刚体"""
+    from python.physics_binding import RigidBody
+
+    handles = world.get_handles().copy()
+    world.remove_bodies(handles)
+    RigidBody.destroy_bodies(handles)
+
+def run_scenario(index: int, params: Dict, offset: int) -> Dict:
+    """运行一个场景，采样轨迹写入共享内存从offset(元素偏移)开始的区域"""
+    start = time.perf_counter()
+    try:
+        frames = np.ndarray((frame_count(params), body_count(params), STATE_WIDTH), dtype=np.float32,
+                            buffer=_shared.buf, offset=offset * 4)
+        world = build_scene(params)
+        try:
+            record_every = max(int(params['record_every']), 1)
+            frame = 0
+            for step in range(int(params['steps']) + 1):
+                if step % record_every == 0:
+                    frames[frame, :, :3] = world.get_positions()
+                    frames[frame, :, 3:] = world.get_rotations()
+                    frame += 1
+                if step < params['steps']:
+                    world.step_simulation(params['time_step'], 0)
+            summary = {'awake_count': world.get_awake_count(), 'sleeping_count': world.get_sleeping_count()}
+        finally:
+            _destroy_scene(world)
+        return {'index': index, 'name': params['name'], 'ok': True, 'error': None,
+                'elapsed': time.perf_counter() - start, **summary}
+    except Exception:
+        return {'index': index, 'name': params['name'], 'ok': False, 'error': traceback.format_exc(),
+                'elapsed': time.perf_counter() - start}
+
+def run_ensemble(runs: List[Dict], workers: Optional[int] = None, retries: int = 1,
+                 progress=print) -> Dict:
+    """在进程池中运行所有场景
+
+    返回 {'summaries': 每个场景的摘要, 'trajectories': 场景名 -> (帧数,刚体数,7)}，
+    失败场景的轨迹不包含在结果中。
+    """
+    sizes = [frame_count(params) * body_count(params) * STATE_WIDTH for params in runs]
+    offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+    shared = shared_memory.SharedMemory(create=True, size=max(int(offsets[-1]) * 4, 1))
+    summaries: List[Optional[Dict]] = [None] * len(runs)
+
+    def run_pool(indices: List[int], max_workers: Optional[int]) -> None:
+        """在一个进程池中运行indices中的场景，工作进程崩溃时受影响的场景摘要保持为None"""
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(shared.name,)) as pool:
+            futures = {pool.submit(run_scenario, i, runs[i], int(offsets[i])): i for i in indices}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    summaries[i] = future.result()
+                except BrokenProcessPool:
+                    continue
+                done = sum(summary is not None for summary in summaries)
+                state = f"{summaries[i]['elapsed']:.2f} s" if summaries[i]['ok'] else "失败"
+                progress(f"[{done}/{len(runs)}] {runs[i]['name']}: {state}")
+
+    try:
+        pending = list(range(len(runs)))
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt == 0:
+                run_pool(pending, workers)
+            else:
+                # 崩溃的进程池中无法区分是哪个场景导致的，重试时每个场景单独一个进程池
+                for i in pending:
+                    run_pool([i], 1)
+            pending = [i for i in pending if summaries[i] is None]
+        for i in pending:
+            summaries[i] = {'index': i, 'name': runs[i]['name'], 'ok': False,
+                            'error': "工作进程异常退出", 'elapsed': 0.0}
+            progress(f"[{len(runs)}] {runs[i]['name']}: 工作进程异常退出")
+
+        data = np.ndarray((int(offsets[-1]),), dtype=np.float32, buffer=shared.buf)
+        trajectories = {}
+        for i, params in enumerate(runs):
+            if summaries[i]['ok']:
+                shape = (frame_count(params), body_count(params), STATE_WIDTH)
+                trajectories[params['name']] = data[offsets[i]:offsets[i + 1]].reshape(shape).copy()
+        del data
+    finally:
+        shared.close()
+        shared.unlink()
+    return {'summaries': summaries, 'trajectories': trajectories}
+
+def save_results(path: str, results: Dict) -> None:
+    """把轨迹和摘要保存为npz文件"""
+    arrays = {f"trajectory/{name}": frames for name, frames in results['trajectories'].items()}
+    arrays['summaries'] = np.array(json.dumps(results['summaries'], ensure_ascii=False))
+    np.savez_compressed(path, **arrays)
@@ -9,7 +9,6 @@ import numpy as np
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from python.physics_binding import Vector3, Quaternion, RigidBody, PhysicsWorld
-from python.renderer.gl_renderer import GLRenderer
 
 def run_domino():
     """运行多米诺骨牌示例"""
@@ -36,16 +35,18 @@ def run_domino():
     # 创建一个球体作为触发器
     ball = RigidBody.create_sphere(
         5.0,  # 质量
-        Vector3(-3.0, 5.0, 0.0),  # 位置
-        0.5  # 半径
+        Vector3(-3.0, 1.0, 0.0),  # 位置
+        0.25  # 半径
     )
     world.add_rigid_body(ball)
     
-    # 给球体一个初始速度
-    # 在实际的物理引擎中应该有设置速度的方法
-    # 这里只是示意，实际实现可能不同
+    # 把球高速掷向骨牌: 每步的位移超过骨牌厚度，开启连续碰撞检测防止穿过骨牌
+    ball.set_linear_velocity(Vector3(50.0, 0.0, 0.0))
+    ball.set_ccd_motion_threshold(0.25)
     
     # 创建渲染器
+    # OpenGL只在显示窗口时导入
+    from python.renderer.gl_renderer import GLRenderer
     renderer = GLRenderer(title="多米诺骨牌示例")
     renderer.set_physics_world(world)
     renderer.run()
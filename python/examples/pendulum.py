@@ -8,8 +8,8 @@ import numpy as np
 
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from python.core.enums import JointType
 from python.physics_binding import Vector3, Quaternion, RigidBody, PhysicsWorld
-from python.renderer.gl_renderer import GLRenderer
 
 def run_pendulum():
     """运行单摆示例"""
@@ -29,7 +29,13 @@ def run_pendulum():
     pendulum = RigidBody.create_sphere(1.0, Vector3(0, 5, 0), 1.0)
     world.add_rigid_body(pendulum)
     
+    # 摆锤通过固定点处的点对点关节悬挂在固定点上，给一个初速度让它摆起来
+    world.add_constraint(JointType.POINT, anchor, pendulum, Vector3(0, 10, 0))
+    pendulum.set_linear_velocity(Vector3(4, 0, 0))
+    
     # 创建渲染器
+    # OpenGL只在显示窗口时导入
+    from python.renderer.gl_renderer import GLRenderer
     renderer = GLRenderer(title="单摆示例")
     renderer.set_physics_world(world)
     renderer.run()
@@ -10,49 +10,141 @@ def main():
     parser = argparse.ArgumentParser(description="物理模拟器图形界面")
     parser.add_argument("--headless", action="store_true", help="无界面模式")
     parser.add_argument("--example", type=str, help="运行示例场景")
+    parser.add_argument("--backend", type=str, default="auto", choices=["auto", "numpy", "native"],
+                        help="物理步进后端")
+    parser.add_argument("--bodies", type=int, default=1, help="无界面模式下的盒子数量")
+    parser.add_argument("--broadphase", type=str, default="sap", choices=["sap", "hash"],
+                        help="粗检测算法: sap(扫掠剪枝) 或 hash(空间哈希)")
+    parser.add_argument("--threads", type=int, default=1, help="原生库步进的线程数，0为CPU核数")
+    parser.add_argument("--record", type=str, help="无界面模式下把轨迹记录到文件")
+    parser.add_argument("--compress", action="store_true", help="压缩记录的轨迹数据块")
+    parser.add_argument("--replay", type=str, help="回放轨迹文件(不运行物理模拟)")
+    parser.add_argument("--ensemble", type=str, help="批量运行spec.json中描述的场景")
+    parser.add_argument("--workers", type=int, default=None, help="批量运行的工作进程数，默认为CPU核数")
+    parser.add_argument("--output", type=str, help="批量运行结果保存路径(.npz)")
+    parser.add_argument("--profile-startup", action="store_true", help="打印启动过程中各模块的导入耗时")
+    parser.add_argument("--log-level", type=str, choices=["off", "error", "warn", "info", "debug", "trace"],
+                        help="原生物理引擎的日志级别，默认为warn(或环境变量PS_LOG_LEVEL)")
     args = parser.parse_args()
     
     # 添加项目根目录到路径
-    project_root = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     sys.path.append(project_root)
     
-    if args.headless:
+    # 各模式只在需要时导入numpy、原生库、OpenGL和tkinter
+    from python.startup_profile import StartupProfiler
+    startup = StartupProfiler()
+    if args.profile_startup:
+        startup.install()
+    
+    def startup_done():
+        """启动完成(进入模拟或界面循环之前)，打印启动耗时"""
+        if args.profile_startup:
+            startup.uninstall()
+            print(startup.report())
+    
+    if args.log_level:
+        from python.physics_binding import set_log_level
+        set_log_level(args.log_level)
+    
+    if args.ensemble:
+        # 批量运行模式
+        import time
+        from python.ensemble import load_spec, run_ensemble, save_results
+        
+        runs = load_spec(args.ensemble)
+        startup_done()
+        print(f"批量运行 {len(runs)} 个场景...")
+        start = time.perf_counter()
+        results = run_ensemble(runs, args.workers)
+        failed = [summary for summary in results['summaries'] if not summary['ok']]
+        print(f"完成: {len(runs) - len(failed)}/{len(runs)}, 总耗时: {time.perf_counter() - start:.2f} s")
+        for summary in failed:
+            print(f"场景 {summary['name']} 失败:\n{summary['error']}")
+        if args.output:
+            save_results(args.output, results)
+            print(f"结果已保存到 {args.output}")
+    
+    elif args.headless:
         # 无界面模式
-        from python.physics_binding import PhysicsWorld, RigidBody, Vector3
+        import time
+        import numpy as np
+        from python.physics_binding import PhysicsWorld, RigidBody, Vector3, flush_log, native_library
         
         print("运行无界面模拟...")
-        world = PhysicsWorld()
-        world.initialize()
-        
-        # 创建地面
-        ground = RigidBody.create_plane(Vector3(0, 1, 0), 0.0)
-        world.add_rigid_body(ground)
-        
-        # 创建盒子
-        box = RigidBody.create_box(1.0, Vector3(0, 10, 0), Vector3(1, 1, 1))
-        world.add_rigid_body(box)
+        with startup.stage("加载原生库"):
+            native_library()
+        with startup.stage("创建场景"):
+            world = PhysicsWorld(backend=args.backend)
+            world.initialize()
+            world.set_broadphase(args.broadphase)
+            world.set_thread_count(args.threads)
+            
+            # 创建地面
+            ground = RigidBody.create_plane(Vector3(0, 1, 0), 0.0)
+            world.add_rigid_body(ground)
+            
+            # 批量创建盒子，按网格排列
+            count = max(args.bodies, 1)
+            side = int(np.ceil(np.sqrt(count)))
+            index = np.arange(count)
+            positions = np.stack([(index % side) * 3.0, np.full(count, 10.0), (index // side) * 3.0], axis=1)
+            boxes = RigidBody.create_boxes(np.ones(count), positions, np.ones((count, 3)))
+            world.add_bodies(boxes)
+            box = RigidBody(int(boxes[0]), world)
+        startup_done()
+        print(f"后端: {world.backend}, 刚体数量: {world.get_body_count()}")
+        if args.record:
+            world.start_recording(args.record, compress=args.compress)
         
         # 模拟10秒
         time_step = 1.0 / 60.0
+        start = time.perf_counter()
         for i in range(600):
             world.step_simulation(time_step)
             
             # 每60帧打印一次位置
             if i % 60 == 0:
+                flush_log()
                 pos = box.get_position()
-                print(f"第{i//60}秒: 盒子位置 ({pos.x}, {pos.y}, {pos.z})")
+                stats = world.get_broadphase_stats()
+                contacts = world.get_narrowphase_stats()
+                solver = world.get_solver_stats()
+                islands = world.get_island_stats()
+                print(f"第{i//60}秒: 盒子位置 ({pos.x}, {pos.y}, {pos.z}), "
+                      f"候选对: {stats['pair_count']}, 粗检测: {stats['build_time_ms']:.3f} ms, "
+                      f"接触: {contacts['contact_count']}, 细检测: {contacts['build_time_ms']:.3f} ms, "
+                      f"warm start: {solver['warm_started']}, 求解: {solver['solve_time_ms']:.3f} ms, "
+                      f"活动/休眠: {islands['awake_count']}/{islands['sleeping_count']}")
+        elapsed = time.perf_counter() - start
+        print(f"平均每步耗时: {elapsed / 600 * 1000.0:.3f} ms")
+        if args.record:
+            world.stop_recording()
+            print(f"轨迹已保存到 {args.record}")
         
         # 清理
-        world.remove_rigid_body(box)
+        world.remove_bodies(boxes)
         world.remove_rigid_body(ground)
     
+    elif args.replay:
+        # 回放轨迹
+        from python.core.trajectory import TrajectoryReader
+        from python.renderer.gl_renderer import GLRenderer
+        
+        renderer = GLRenderer(title="轨迹回放")
+        renderer.set_replay(TrajectoryReader(args.replay))
+        startup_done()
+        renderer.run()
+    
     elif args.example:
         # 运行示例场景
         if args.example == "pendulum":
             from examples.pendulum import run_pendulum
+            startup_done()
             run_pendulum()
         elif args.example == "domino":
             from examples.domino import run_domino
+            startup_done()
             run_domino()
         else:
             print(f"未知示例: {args.example}")
@@ -64,6 +156,7 @@ def main():
         
         root = tk.Tk()
         app = PhysicsSimulatorUI(root)
+        startup_done()
         root.mainloop()
 
 if __name__ == "__main__":
@@ -2,32 +2,241 @@
 # -*- coding: utf-8 -*-
 
 import ctypes
+import functools
 import os
 import sys
+import weakref
 import numpy as np
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, TYPE_CHECKING
 
-# 加载共享库
-def load_library():
-    """加载物理引擎共享库"""
-    # 确定库文件路径
+from python.core.body_storage import BodyStorage, NativeBodyStorage, BODY_COLUMNS
+from python.core.handles import HandlePool
+from python.core.enums import BodyType, JointType, LogCategory, LogLevel, ShapeType
+from python.collision.broadphase import Broadphase
+from python.collision.ccd import ContinuousCollision
+from python.collision.narrowphase import Narrowphase, CONTACT_COLUMNS, empty_contacts
+from python.dynamics.integrator import (
+    apply_world_inverse_inertia,
+    compute_inverse_inertias,
+    integrate_positions,
+    integrate_velocities,
+    interpolate_states,
+)
+from python.dynamics.contact_solver import ContactSolver
+from python.dynamics.islands import IslandManager, dynamic_bodies
+from python.dynamics.joints import DEFAULT_AXIS, JOINT_COLUMNS, JOINT_TYPES, joint_frames
+from python.core.snapshot import CACHE_COLUMNS, JOINT_STATE_COLUMNS, pack_snapshot, unpack_snapshot
+from python.core.profiler import (
+    DEFAULT_CAPACITY,
+    PROFILE_BODIES,
+    PROFILE_BROADPHASE,
+    PROFILE_CONTACTS,
+    PROFILE_COUNTERS,
+    PROFILE_INTEGRATE,
+    PROFILE_ISLANDS,
+    PROFILE_ITERATIONS,
+    PROFILE_NARROWPHASE,
+    PROFILE_PAIRS,
+    PROFILE_PHASES,
+    PROFILE_SOLVE,
+    PROFILE_SUBSTEPS,
+    PROFILE_SYNC,
+    StepProfiler,
+    profile_dict,
+)
+
+if TYPE_CHECKING:
+    from python.core.trajectory import TrajectoryRecorder
+
+@functools.lru_cache(maxsize=None)
+def library_path() -> str:
+    """物理引擎共享库的路径(只查找一次)"""
     if sys.platform.startswith('linux'):
-        lib_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../build/libPhysicsSimulator.so'))
+        name = 'libPhysicsSimulator.so'
     elif sys.platform == 'darwin':
-        lib_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../build/libPhysicsSimulator.dylib'))
+        name = 'libPhysicsSimulator.dylib'
     elif sys.platform == 'win32':
-        lib_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../build/PhysicsSimulator.dll'))
+        name = 'PhysicsSimulator.dll'
     else:
         raise RuntimeError(f"不支持的平台: {sys.platform}")
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'build', name))
+
+# 加载共享库
+def load_library():
+    """加载物理引擎共享库"""
+    lib_path = library_path()
     
     # 检查库文件是否存在
     if not os.path.exists(lib_path):
         raise FileNotFoundError(f"找不到物理引擎库文件: {lib_path}")
     
     try:
-        return ctypes.CDLL(lib_path)
+        lib = ctypes.CDLL(lib_path)
     except Exception as e:
         raise RuntimeError(f"加载物理引擎库失败: {e}")
+    
+    _declare_api(lib)
+    return lib
+
+def _declare_api(lib) -> None:
+    """声明C接口的参数和返回值类型"""
+    c_float_p = ctypes.POINTER(ctypes.c_float)
+    c_int64_p = ctypes.POINTER(ctypes.c_int64)
+    signatures = {
+        'ps_world_create': ([], ctypes.c_void_p),
+        'ps_world_destroy': ([ctypes.c_void_p], None),
+        'ps_world_initialize': ([ctypes.c_void_p, ctypes.c_float, ctypes.c_float, ctypes.c_float], None),
+        'ps_world_step': ([ctypes.c_void_p, ctypes.c_float, ctypes.c_int, ctypes.c_float], ctypes.c_int),
+        'ps_world_interpolated_column': ([ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+        'ps_world_interpolation_alpha': ([ctypes.c_void_p], ctypes.c_float),
+        'ps_world_body_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_body_capacity': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_column': ([ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+        'ps_world_set_broadphase': ([ctypes.c_void_p, ctypes.c_int, ctypes.c_float], None),
+        'ps_world_pair_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_pairs': ([ctypes.c_void_p], ctypes.c_void_p),
+        'ps_world_broadphase_time': ([ctypes.c_void_p], ctypes.c_double),
+        'ps_world_contact_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_contact_column': ([ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+        'ps_world_narrowphase_time': ([ctypes.c_void_p], ctypes.c_double),
+        'ps_world_set_solver_iterations': ([ctypes.c_void_p, ctypes.c_int], None),
+        'ps_world_set_warm_starting': ([ctypes.c_void_p, ctypes.c_int], None),
+        'ps_world_manifold_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_warm_started_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_batch_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_solver_time': ([ctypes.c_void_p], ctypes.c_double),
+        'ps_world_cache_point_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_save_cache': ([ctypes.c_void_p, c_int64_p, c_float_p, c_float_p], None),
+        'ps_world_load_cache': ([ctypes.c_void_p, ctypes.c_int, c_int64_p, c_float_p, c_float_p], None),
+        'ps_world_accumulator': ([ctypes.c_void_p], ctypes.c_double),
+        'ps_world_set_accumulator': ([ctypes.c_void_p, ctypes.c_double], None),
+        'ps_world_next_island': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_set_next_island': ([ctypes.c_void_p, ctypes.c_int], None),
+        'ps_world_set_sleeping': ([ctypes.c_void_p, ctypes.c_int], None),
+        'ps_world_set_sleep_parameters': ([ctypes.c_void_p, ctypes.c_float, ctypes.c_float, ctypes.c_float], None),
+        'ps_world_wake_all': ([ctypes.c_void_p], None),
+        'ps_world_set_thread_count': ([ctypes.c_void_p, ctypes.c_int], None),
+        'ps_world_thread_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_island_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_island_time': ([ctypes.c_void_p], ctypes.c_double),
+        'ps_world_set_profiling': ([ctypes.c_void_p, ctypes.c_int, ctypes.c_int], None),
+        'ps_world_profile_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_profile_copy': ([ctypes.c_void_p, ctypes.c_int, c_float_p, ctypes.POINTER(ctypes.c_int32)],
+                                  ctypes.c_int),
+        'ps_world_add_bodies': ([ctypes.c_void_p, c_int64_p, ctypes.c_int], ctypes.c_int),
+        'ps_world_remove_bodies': ([ctypes.c_void_p, c_int64_p, ctypes.c_int], ctypes.c_int),
+        'ps_world_add_joints': ([ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int32), c_int64_p, c_float_p,
+                                 c_float_p, c_float_p, c_float_p, c_int64_p], ctypes.c_int),
+        'ps_world_remove_joints': ([ctypes.c_void_p, c_int64_p, ctypes.c_int], ctypes.c_int),
+        'ps_world_joint_count': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_joint_capacity': ([ctypes.c_void_p], ctypes.c_int),
+        'ps_world_joint_column': ([ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+        'ps_world_joint_rows': ([ctypes.c_void_p, c_int64_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int32)], None),
+        'ps_create_boxes': ([ctypes.c_int, c_float_p, c_float_p, c_float_p, c_int64_p], None),
+        'ps_create_spheres': ([ctypes.c_int, c_float_p, c_float_p, c_float_p, c_int64_p], None),
+        'ps_create_planes': ([ctypes.c_int, c_float_p, c_float_p, c_int64_p], None),
+        'ps_destroy_bodies': ([c_int64_p, ctypes.c_int], None),
+        'ps_body_is_valid': ([ctypes.c_int64], ctypes.c_int),
+        'ps_body_live_count': ([], ctypes.c_int),
+        'ps_world_body_rows': ([ctypes.c_void_p, c_int64_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int32)], None),
+        'ps_body_get': ([ctypes.c_int64, ctypes.c_int, c_float_p], None),
+        'ps_body_set': ([ctypes.c_int64, ctypes.c_int, c_float_p], None),
+        'ps_body_get_shape_type': ([ctypes.c_int64], ctypes.c_int),
+        'ps_body_get_body_type': ([ctypes.c_int64], ctypes.c_int),
+        'ps_body_set_body_type': ([ctypes.c_int64, ctypes.c_int], None),
+        'ps_body_apply_force': ([ctypes.c_int64, c_float_p, c_float_p], None),
+        'ps_body_apply_impulse': ([ctypes.c_int64, c_float_p, c_float_p], None),
+        'ps_log_set_level': ([ctypes.c_int, ctypes.c_int], None),
+        'ps_log_get_level': ([ctypes.c_int], ctypes.c_int),
+        'ps_log_flush': ([], None),
+    }
+    for name, (argtypes, restype) in signatures.items():
+        func = getattr(lib, name)
+        func.argtypes = argtypes
+        func.restype = restype
+
+def _try_load_library():
+    """尝试加载共享库，库文件不存在时返回None并使用纯Python实现"""
+    try:
+        return load_library()
+    except (FileNotFoundError, RuntimeError):
+        return None
+
+# 原生库在第一次创建物理世界或刚体时加载(native_library())，只导入本模块不加载
+_lib = None
+_lib_loaded = False
+
+def native_library():
+    """获取原生库，第一次调用时加载；库文件不存在时返回None(使用纯Python实现)"""
+    global _lib, _lib_loaded
+    if not _lib_loaded:
+        _lib = _try_load_library()
+        _lib_loaded = True
+        if _lib is not None:
+            for category, level in _log_levels.items():
+                _lib.ps_log_set_level(category, level)
+    return _lib
+
+# 原生库加载前设置的日志级别，类别(-1为所有类别) -> 级别，加载时按设置顺序生效
+_log_levels = {}
+
+def _log_value(value, names, kind: str) -> int:
+    """把名称('debug'、'solver'等)或数值转换为日志级别/类别的数值"""
+    if isinstance(value, str):
+        if not hasattr(names, value.upper()):
+            raise ValueError(f"未知的日志{kind}: {value}")
+        return getattr(names, value.upper())
+    return int(value)
+
+def set_log_level(level, category=None) -> None:
+    """设置原生库的日志级别
+
+    level为LogLevel中的值或名称(off/error/warn/info/debug/trace)，category为
+    LogCategory中的值或名称(world/body/solver)，为None时设置所有类别。设置所有类别时
+    同时写入环境变量PS_LOG_LEVEL，由子进程(批量运行、基准测试)继承。原生库尚未加载时
+    不会因此加载，级别在加载时生效；纯Python实现不输出日志。
+    """
+    level = _log_value(level, LogLevel, "级别")
+    if not LogLevel.OFF <= level <= LogLevel.TRACE:
+        raise ValueError(f"日志级别超出范围: {level}")
+    if category is None:
+        category = -1
+        _log_levels.clear()
+        os.environ['PS_LOG_LEVEL'] = str(level)
+    else:
+        category = _log_value(category, LogCategory, "类别")
+        if not LogCategory.WORLD <= category <= LogCategory.SOLVER:
+            raise ValueError(f"日志类别超出范围: {category}")
+    _log_levels.pop(category, None)
+    _log_levels[category] = level
+    if _lib is not None:
+        _lib.ps_log_set_level(category, level)
+
+def get_log_level(category=LogCategory.WORLD) -> int:
+    """获取原生库某个类别的日志级别，原生库不可用时返回LogLevel.OFF"""
+    lib = native_library()
+    if lib is None:
+        return LogLevel.OFF
+    return lib.ps_log_get_level(_log_value(category, LogCategory, "类别"))
+
+def flush_log() -> None:
+    """输出原生库日志缓冲区中的消息"""
+    if _lib is not None:
+        _lib.ps_log_flush()
+
+# 列名 -> C接口中的列编号
+_COLUMN_IDS = {name: index for index, name in enumerate(BODY_COLUMNS)}
+
+def _float_array(values, width: int) -> np.ndarray:
+    """转换为连续的float32数组，形状(N,width)"""
+    return np.ascontiguousarray(values, dtype=np.float32).reshape(-1, width)
+
+def _handle_array(handles) -> np.ndarray:
+    """转换为连续的int64句柄数组"""
+    return np.ascontiguousarray(handles, dtype=np.int64).reshape(-1)
+
+def _ptr(array: np.ndarray, ctype=ctypes.c_float):
+    return array.ctypes.data_as(ctypes.POINTER(ctype))
 
 # 向量类
 class Vector3:
@@ -68,95 +277,1112 @@ class Quaternion:
         """从NumPy数组创建Quaternion"""
         return cls(array[0], array[1], array[2], array[3])
 
-# 刚体类型
-class BodyType:
-    DYNAMIC = 0
-    STATIC = 1
-    KINEMATIC = 2
-
-# 形状类型
-class ShapeType:
-    BOX = 0
-    SPHERE = 1
-    CAPSULE = 2
-    CYLINDER = 3
-    CONE = 4
-    PLANE = 5
-
-# 刚体类
+# 纯Python实现的句柄分配器(与C++刚体池的句柄布局相同)
+_handle_pool = HandlePool()
+
+def _allocate_handles(n: int) -> np.ndarray:
+    """分配n个新的刚体句柄"""
+    return _handle_pool.allocate(n)
+
+def _check_created(handles: np.ndarray) -> np.ndarray:
+    """原生库的刚体池已满时句柄为0，销毁已创建的刚体并抛出MemoryError"""
+    if len(handles) and not handles.all():
+        RigidBody.destroy_bodies(handles[handles != 0])
+        raise MemoryError("刚体数量超过刚体池的上限")
+    return handles
+
+# 现存的物理世界，销毁仍在世界中的刚体时要从所在的世界中移除(原生库中同步各世界的存储)
+_worlds = weakref.WeakSet()
+
+# 纯Python实现中，尚未加入物理世界的刚体同样按结构数组存放，加入世界时整行拷贝
+_detached_bodies = BodyStorage()
+
+def _create_detached(shape_type: int, masses, positions, shape_params) -> np.ndarray:
+    """在未加入世界的存储中批量创建刚体"""
+    masses = np.asarray(masses, dtype=np.float32).reshape(-1)
+    shape_types = np.full(len(masses), shape_type, dtype=np.int32)
+    handles = _allocate_handles(len(masses))
+    _detached_bodies.append(
+        handles=handles,
+        positions=positions,
+        masses=masses,
+        shape_types=shape_types,
+        body_types=np.where(masses > 0.0, BodyType.DYNAMIC, BodyType.STATIC),
+        shape_params=shape_params,
+        inverse_inertias=compute_inverse_inertias(shape_types, masses, shape_params),
+    )
+    return handles
+
+# 刚体类: 只是一个句柄，状态都在物理世界(或未加入世界的存储)中
 class RigidBody:
-    def __init__(self, ptr):
-        self.ptr = ptr
+    __slots__ = ('handle', '_world')
+    
+    def __init__(self, handle: int, world: Optional['PhysicsWorld'] = None):
+        self.handle = handle  # 32位刚体句柄(槽号和代数)
+        self._world = world
+    
+    def __eq__(self, other):
+        return isinstance(other, RigidBody) and self.handle == other.handle
+    
+    def __hash__(self):
+        return hash(self.handle)
+    
+    def __repr__(self):
+        return f"RigidBody({self.handle:#x})"
+    
+    def is_valid(self) -> bool:
+        """句柄是否指向现存的刚体，刚体销毁后句柄过期"""
+        if _lib is not None:
+            return bool(_lib.ps_body_is_valid(self.handle))
+        return bool(_handle_pool.is_valid(self.handle))
+    
+    def _native_handle(self) -> int:
+        """原生库中的句柄，刚体已销毁时抛出RuntimeError"""
+        if not _lib.ps_body_is_valid(self.handle):
+            raise RuntimeError(f"无效的刚体句柄: {self.handle}")
+        return self.handle
+    
+    def _locate(self) -> Tuple[Optional[BodyStorage], int]:
+        """查找刚体状态所在的存储和行号，原生库中未加入世界的刚体返回(None, -1)"""
+        if self._world is not None:
+            row = self._world._storage.row_of(self.handle)
+            if row >= 0:
+                return self._world._storage, row
+        if _lib is not None:
+            self._native_handle()
+            return None, -1
+        row = _detached_bodies.row_of(self.handle)
+        if row < 0:
+            raise RuntimeError(f"无效的刚体句柄: {self.handle}")
+        return _detached_bodies, row
+    
+    def _get(self, name: str) -> np.ndarray:
+        storage, row = self._locate()
+        if storage is None:
+            width = BODY_COLUMNS[name][1]
+            out = np.zeros(width, dtype=np.float32)
+            _lib.ps_body_get(self.handle, _COLUMN_IDS[name], _ptr(out))
+            return out if width > 1 else out[0]
+        return storage.column(name)[row]
+    
+    def _set(self, name: str, value) -> None:
+        storage, row = self._locate()
+        if storage is None:
+            values = np.ascontiguousarray(value, dtype=np.float32)
+            _lib.ps_body_set(self.handle, _COLUMN_IDS[name], _ptr(values))
+            return
+        storage.column(name)[row] = value
+        self._wake(storage, row)
+    
+    @staticmethod
+    def _wake(storage: BodyStorage, row: int) -> None:
+        storage.column('sleep_islands')[row] = 0
+        storage.column('sleep_times')[row] = 0.0
+    
+    def wake_up(self) -> None:
+        """唤醒刚体，修改状态或施加力/冲量时会自动唤醒"""
+        storage, row = self._locate()
+        if storage is not None:
+            self._wake(storage, row)
+    
+    def is_sleeping(self) -> bool:
+        """刚体是否处于休眠状态"""
+        storage, row = self._locate()
+        return storage is not None and bool(storage.column('sleep_islands')[row])
     
     def get_position(self) -> Vector3:
         """获取刚体位置"""
-        # 这里应该调用C++库中的函数，这里用模拟实现
-        # 实际应该通过ctypes调用C++函数
-        return Vector3(0, 0, 0)  # 模拟返回值
+        return Vector3(*self._get('positions').tolist())
     
     def get_rotation(self) -> Quaternion:
         """获取刚体旋转"""
-        return Quaternion()  # 模拟返回值
+        return Quaternion(*self._get('rotations').tolist())
     
     def set_position(self, position: Vector3) -> None:
         """设置刚体位置"""
-        pass  # 模拟实现
+        self._set('positions', (position.x, position.y, position.z))
     
     def set_rotation(self, rotation: Quaternion) -> None:
         """设置刚体旋转"""
-        pass  # 模拟实现
+        self._set('rotations', (rotation.x, rotation.y, rotation.z, rotation.w))
+    
+    def get_linear_velocity(self) -> Vector3:
+        """获取线速度"""
+        return Vector3(*self._get('linear_velocities').tolist())
+    
+    def set_linear_velocity(self, velocity: Vector3) -> None:
+        """设置线速度"""
+        self._set('linear_velocities', (velocity.x, velocity.y, velocity.z))
+    
+    def get_angular_velocity(self) -> Vector3:
+        """获取角速度"""
+        return Vector3(*self._get('angular_velocities').tolist())
+    
+    def set_angular_velocity(self, velocity: Vector3) -> None:
+        """设置角速度"""
+        self._set('angular_velocities', (velocity.x, velocity.y, velocity.z))
+    
+    def set_friction(self, friction: float) -> None:
+        """设置摩擦系数，接触的摩擦系数取两者的几何平均"""
+        self._set('frictions', friction)
+    
+    def get_friction(self) -> float:
+        """获取摩擦系数"""
+        return float(self._get('frictions'))
+    
+    def set_restitution(self, restitution: float) -> None:
+        """设置恢复系数，接触的恢复系数取两者中的较大值"""
+        self._set('restitutions', restitution)
+    
+    def get_restitution(self) -> float:
+        """获取恢复系数"""
+        return float(self._get('restitutions'))
+    
+    def set_ccd_motion_threshold(self, threshold: float) -> None:
+        """设置连续碰撞检测的运动阈值，不大于0时关闭(默认)
+
+        一步内的位移超过阈值时，用内切球沿位移做保守推进，位移截断到碰撞时刻，
+        防止高速的小物体穿过薄物体。只支持球体和盒体。
+        """
+        self._set('ccd_thresholds', max(float(threshold), 0.0))
+    
+    def get_ccd_motion_threshold(self) -> float:
+        """获取连续碰撞检测的运动阈值，0表示关闭"""
+        return float(self._get('ccd_thresholds'))
+
+    def get_mass(self) -> float:
+        """获取质量"""
+        return float(self._get('masses'))
+    
+    def get_shape_params(self) -> np.ndarray:
+        """获取形状参数"""
+        return np.array(self._get('shape_params'), dtype=np.float32)
+    
+    def get_shape_type(self) -> int:
+        """获取形状类型"""
+        storage, row = self._locate()
+        if storage is None:
+            return _lib.ps_body_get_shape_type(self.handle)
+        return int(storage.column('shape_types')[row])
+    
+    def get_body_type(self) -> int:
+        """获取刚体类型"""
+        if _lib is not None:
+            return _lib.ps_body_get_body_type(self._native_handle())
+        storage, row = self._locate()
+        return int(storage.column('body_types')[row])
+    
+    def set_body_type(self, body_type: int) -> None:
+        """设置刚体类型"""
+        if _lib is not None:
+            _lib.ps_body_set_body_type(self._native_handle(), body_type)
+            return
+        storage, row = self._locate()
+        storage.column('body_types')[row] = body_type
+        self._wake(storage, row)
     
     def apply_force(self, force: Vector3, rel_pos: Optional[Vector3] = None) -> None:
-        """施加力"""
-        pass  # 模拟实现
+        """施加力，累积到下一次步进时生效；rel_pos为相对质心的世界坐标偏移"""
+        f = np.array([force.x, force.y, force.z], dtype=np.float32)
+        r = None if rel_pos is None else np.array([rel_pos.x, rel_pos.y, rel_pos.z], dtype=np.float32)
+        if _lib is not None:
+            _lib.ps_body_apply_force(self._native_handle(), _ptr(f), None if r is None else _ptr(r))
+            return
+        storage, row = self._locate()
+        self._wake(storage, row)
+        storage.column('forces')[row] += f
+        if r is not None:
+            storage.column('torques')[row] += np.cross(r, f)
     
     def apply_impulse(self, impulse: Vector3, rel_pos: Optional[Vector3] = None) -> None:
-        """施加冲量"""
-        pass  # 模拟实现
+        """施加冲量，立即改变速度；rel_pos为相对质心的世界坐标偏移"""
+        j = np.array([impulse.x, impulse.y, impulse.z], dtype=np.float32)
+        r = None if rel_pos is None else np.array([rel_pos.x, rel_pos.y, rel_pos.z], dtype=np.float32)
+        if _lib is not None:
+            _lib.ps_body_apply_impulse(self._native_handle(), _ptr(j), None if r is None else _ptr(r))
+            return
+        storage, row = self._locate()
+        self._wake(storage, row)
+        mass = storage.column('masses')[row]
+        if storage.column('body_types')[row] != BodyType.DYNAMIC or mass <= 0.0:
+            return
+        storage.column('linear_velocities')[row] += j / mass
+        if r is not None:
+            storage.column('angular_velocities')[row] += apply_world_inverse_inertia(
+                storage.column('rotations')[row:row + 1],
+                storage.column('inverse_inertias')[row:row + 1],
+                np.cross(r, j)[None, :])[0]
+    
+    # 批量创建接口，参数均为NumPy数组，返回int64句柄数组
+    
+    @staticmethod
+    def create_boxes(masses: np.ndarray, positions: np.ndarray, half_extents: np.ndarray) -> np.ndarray:
+        """批量创建盒子刚体，positions和half_extents为(N,3)数组"""
+        masses = np.ascontiguousarray(masses, dtype=np.float32).reshape(-1)
+        positions = _float_array(positions, 3)
+        half_extents = _float_array(half_extents, 3)
+        if native_library() is None:
+            shape_params = np.zeros((len(masses), 4), dtype=np.float32)
+            shape_params[:, :3] = half_extents
+            return _create_detached(ShapeType.BOX, masses, positions, shape_params)
+        handles = np.empty(len(masses), dtype=np.int64)
+        _lib.ps_create_boxes(len(masses), _ptr(masses), _ptr(positions), _ptr(half_extents),
+                             _ptr(handles, ctypes.c_int64))
+        return _check_created(handles)
+    
+    @staticmethod
+    def create_spheres(masses: np.ndarray, positions: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """批量创建球体刚体，positions为(N,3)数组，radii为(N,)数组"""
+        masses = np.ascontiguousarray(masses, dtype=np.float32).reshape(-1)
+        positions = _float_array(positions, 3)
+        radii = np.ascontiguousarray(radii, dtype=np.float32).reshape(-1)
+        if native_library() is None:
+            shape_params = np.zeros((len(masses), 4), dtype=np.float32)
+            shape_params[:, 0] = radii
+            return _create_detached(ShapeType.SPHERE, masses, positions, shape_params)
+        handles = np.empty(len(masses), dtype=np.int64)
+        _lib.ps_create_spheres(len(masses), _ptr(masses), _ptr(positions), _ptr(radii),
+                               _ptr(handles, ctypes.c_int64))
+        return _check_created(handles)
+    
+    @staticmethod
+    def create_planes(normals: np.ndarray, constants: np.ndarray) -> np.ndarray:
+        """批量创建平面刚体，normals为(N,3)数组，constants为(N,)数组"""
+        normals = _float_array(normals, 3)
+        constants = np.ascontiguousarray(constants, dtype=np.float32).reshape(-1)
+        if native_library() is None:
+            shape_params = np.concatenate([normals, constants[:, None]], axis=1)
+            # 平面位置取法线方向上距原点constant处的点
+            return _create_detached(ShapeType.PLANE, np.zeros(len(normals)),
+                                    normals * constants[:, None], shape_params)
+        handles = np.empty(len(normals), dtype=np.int64)
+        _lib.ps_create_planes(len(normals), _ptr(normals), _ptr(constants),
+                              _ptr(handles, ctypes.c_int64))
+        return _check_created(handles)
+    
+    @staticmethod
+    def destroy_bodies(handles: np.ndarray) -> None:
+        """批量销毁刚体，句柄随之过期；已销毁或无效的句柄被忽略
+
+        仍在世界中的刚体会先从世界中移除。
+        """
+        handles = _handle_array(handles)
+        if native_library() is None:
+            for world in list(_worlds):
+                world.remove_bodies(handles)
+            rows = _detached_bodies.rows_of(handles)
+            _handle_pool.release(_detached_bodies.view('handles')[rows[rows >= 0]])
+            _detached_bodies.remove(rows[rows >= 0])
+            return
+        _lib.ps_destroy_bodies(_ptr(handles, ctypes.c_int64), len(handles))
+        # C++端已从所在的世界中移除这些刚体，重新包装各世界的结构数组
+        for world in list(_worlds):
+            if world.ptr is not None:
+                world._storage.refresh()
+                world._joints.refresh()
     
     @staticmethod
     def create_box(mass: float, position: Vector3, half_extents: Vector3) -> 'RigidBody':
         """创建盒子刚体"""
-        # 模拟实现
-        return RigidBody(None)
+        handles = RigidBody.create_boxes([mass], [(position.x, position.y, position.z)],
+                                         [(half_extents.x, half_extents.y, half_extents.z)])
+        return RigidBody(int(handles[0]))
     
     @staticmethod
     def create_sphere(mass: float, position: Vector3, radius: float) -> 'RigidBody':
         """创建球体刚体"""
-        # 模拟实现
-        return RigidBody(None)
+        handles = RigidBody.create_spheres([mass], [(position.x, position.y, position.z)], [radius])
+        return RigidBody(int(handles[0]))
     
     @staticmethod
     def create_plane(normal: Vector3, constant: float) -> 'RigidBody':
         """创建平面刚体"""
-        # 模拟实现
-        return RigidBody(None)
+        handles = RigidBody.create_planes([(normal.x, normal.y, normal.z)], [constant])
+        return RigidBody(int(handles[0]))
 
 # 物理世界类
 class PhysicsWorld:
-    def __init__(self):
+    # 可选的步进后端: auto在原生库可用时使用native，否则使用numpy
+    BACKENDS = ('auto', 'numpy', 'native')
+    
+    def __init__(self, backend: str = 'auto'):
         self.ptr = None
-        self.bodies = []
+        self.gravity = Vector3(0, -9.81, 0)
+        if native_library() is not None:
+            self.ptr = _lib.ps_world_create()
+            self._storage = NativeBodyStorage(_lib, self.ptr)
+            self._joints = NativeBodyStorage(_lib, self.ptr, JOINT_COLUMNS, 'joint')
+        else:
+            self._storage = BodyStorage()
+            self._joints = BodyStorage(columns=JOINT_COLUMNS)
+        # 纯Python实现的关节句柄，每个世界单独分配
+        self._joint_handles = HandlePool()
+        self.broadphase = Broadphase()
+        self.narrowphase = Narrowphase()
+        self.ccd = ContinuousCollision()
+        self.solver = ContactSolver()
+        self.islands = IslandManager()
+        self.profiler = StepProfiler()
+        # 固定步长的累加器和渲染插值状态(numpy后端)
+        self._accumulator = 0.0
+        self._alpha = 0.0
+        self._previous: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._recorder: Optional['TrajectoryRecorder'] = None
+        # fork()为新世界创建的刚体，随世界一起销毁(纯Python实现中归还句柄)
+        self._owned_handles: Optional[np.ndarray] = None
+        self._owned_ptr = None
+        self.thread_count = 1
+        self.backend = 'numpy'
+        self.set_backend(backend)
+        _worlds.add(self)
+    
+    def set_backend(self, backend: str) -> None:
+        """选择步进后端
+
+        numpy后端直接在刚体结构数组上做整列运算，原生库存在时同样可用
+        (此时操作的是C++数组的零拷贝视图)；native后端由C++完成步进。
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"未知的后端: {backend}，可选: {', '.join(self.BACKENDS)}")
+        if backend == 'auto':
+            backend = 'native' if _lib is not None else 'numpy'
+        if backend == 'native' and _lib is None:
+            raise RuntimeError("物理引擎库未加载，无法使用native后端")
+        self.backend = backend
+    
+    def set_broadphase(self, algorithm: str, cell_size: Optional[float] = None) -> None:
+        """选择粗检测算法: 'sap'(增量扫掠剪枝) 或 'hash'(均匀网格空间哈希)
+
+        cell_size仅用于空间哈希，为None时按最大AABB自动选取。
+        """
+        self.broadphase.set_algorithm(algorithm, cell_size)
+        if self.ptr is not None:
+            _lib.ps_world_set_broadphase(self.ptr, Broadphase.ALGORITHMS.index(algorithm), cell_size or 0.0)
+    
+    def set_solver_iterations(self, iterations: int) -> None:
+        """设置接触求解器的迭代次数"""
+        if iterations < 1:
+            raise ValueError(f"迭代次数必须为正数: {iterations}")
+        self.solver.iterations = iterations
+        if self.ptr is not None:
+            _lib.ps_world_set_solver_iterations(self.ptr, iterations)
+    
+    def set_warm_starting(self, enabled: bool) -> None:
+        """开启/关闭warm starting，关闭时同时清空接触流形缓存"""
+        self.solver.warm_starting = enabled
+        if not enabled:
+            self.solver.clear_cache()
+        if self.ptr is not None:
+            _lib.ps_world_set_warm_starting(self.ptr, int(enabled))
+    
+    def set_sleeping_enabled(self, enabled: bool) -> None:
+        """开启/关闭休眠，关闭时唤醒所有刚体"""
+        self.islands.enabled = enabled
+        if not enabled:
+            self.islands.wake_all(self._storage)
+        if self.ptr is not None:
+            _lib.ps_world_set_sleeping(self.ptr, int(enabled))
+    
+    def set_sleep_parameters(self, linear_threshold: float, angular_threshold: float,
+                             time_to_sleep: float) -> None:
+        """设置休眠阈值: 岛屿中所有刚体的线速度和角速度持续time_to_sleep秒低于阈值后休眠"""
+        if linear_threshold < 0.0 or angular_threshold < 0.0 or time_to_sleep < 0.0:
+            raise ValueError("休眠参数不能为负数")
+        self.islands.linear_threshold = linear_threshold
+        self.islands.angular_threshold = angular_threshold
+        self.islands.time_to_sleep = time_to_sleep
+        if self.ptr is not None:
+            _lib.ps_world_set_sleep_parameters(self.ptr, linear_threshold, angular_threshold, time_to_sleep)
+    
+    def set_thread_count(self, count: int) -> None:
+        """设置原生库步进使用的线程数(包括调用线程)，为0时取CPU核数
+
+        积分、粗检测、细检测和各岛屿的接触求解并行执行，模拟结果与线程数无关。
+        numpy后端不受影响。
+        """
+        if count < 0:
+            raise ValueError(f"线程数不能为负数: {count}")
+        if self.ptr is not None:
+            _lib.ps_world_set_thread_count(self.ptr, count)
+            count = _lib.ps_world_thread_count(self.ptr)
+        self.thread_count = count
+    
+    def get_thread_count(self) -> int:
+        """原生库步进使用的线程数"""
+        return self.thread_count
+    
+    def wake_all(self) -> None:
+        """唤醒所有刚体"""
+        self.islands.wake_all(self._storage)
+    
+    def __del__(self):
+        if getattr(self, '_recorder', None) is not None:
+            self.stop_recording()
+        if self.ptr is not None and _lib is not None:
+            _lib.ps_world_destroy(self.ptr)
+            self.ptr = None
+            owned = getattr(self, '_owned_handles', None)
+            if owned is not None and len(owned):
+                # 指针在fork()时取好，解释器退出时这里不能再触发导入
+                _lib.ps_destroy_bodies(self._owned_ptr, len(owned))
+        elif getattr(self, '_owned_handles', None) is not None:
+            _handle_pool.release(self._owned_handles)
     
     def initialize(self, gravity: Vector3 = Vector3(0, -9.81, 0)) -> None:
         """初始化物理世界"""
-        # 模拟实现
-        pass
+        self.gravity = gravity
+        if self.ptr is not None:
+            _lib.ps_world_initialize(self.ptr, gravity.x, gravity.y, gravity.z)
     
     def add_rigid_body(self, body: RigidBody) -> None:
         """添加刚体到物理世界"""
-        self.bodies.append(body)
+        self.add_bodies([body.handle])
+        body._world = self
     
     def remove_rigid_body(self, body: RigidBody) -> None:
-        """从物理世界移除刚体"""
-        if body in self.bodies:
-            self.bodies.remove(body)
+        """从物理世界移除刚体，O(1)"""
+        self.remove_bodies([body.handle])
+    
+    def add_bodies(self, handles: np.ndarray) -> None:
+        """批量添加刚体，handles为create_*返回的句柄数组"""
+        handles = _handle_array(handles)
+        if self.ptr is not None:
+            _lib.ps_world_add_bodies(self.ptr, _ptr(handles, ctypes.c_int64), len(handles))
+            self._storage.refresh()
+            return
+        rows = _detached_bodies.rows_of(handles)
+        rows = rows[rows >= 0]
+        if len(rows):
+            state = _detached_bodies.gather(rows)
+            if self._previous is not None and len(self._previous[0]) != self._storage.count:
+                self._previous = None
+            self._storage.append(**state)
+            _detached_bodies.remove(rows)
+            # 新刚体的上一状态取当前状态，已有刚体的插值不受影响
+            if self._previous is not None:
+                self._previous = (np.concatenate([self._previous[0], state['positions']]),
+                                  np.concatenate([self._previous[1], state['rotations']]))
+    
+    def remove_bodies(self, handles: np.ndarray) -> None:
+        """批量移除刚体，被移除的刚体保留状态，可以再次加入
+
+        空出的行由末尾的刚体填补，其余刚体的行号不变。
+        """
+        handles = _handle_array(handles)
+        if self.ptr is not None:
+            _lib.ps_world_remove_bodies(self.ptr, _ptr(handles, ctypes.c_int64), len(handles))
+            self._storage.refresh()
+            return
+        rows = self._storage.rows_of(handles)
+        rows = rows[rows >= 0]
+        if len(rows):
+            # 活动的动态刚体只与活动的刚体接触，移除它不影响休眠的岛屿；
+            # 移除静态、运动学或休眠的刚体时不知道哪些休眠的刚体依靠它支撑，全部唤醒
+            storage = self._storage
+            dynamic = (storage.column('body_types')[rows] == BodyType.DYNAMIC) & (storage.column('masses')[rows] > 0.0)
+            if not dynamic.all() or storage.column('sleep_islands')[rows].any():
+                self.islands.wake_all(storage)
+            _detached_bodies.append(**storage.gather(rows))
+            if self._previous is not None and len(self._previous[0]) != storage.count:
+                self._previous = None
+            holes, movers = storage.remove(rows)
+            if self._previous is not None:
+                for previous in self._previous:
+                    previous[holes] = previous[movers]
+                self._previous = (self._previous[0][:storage.count], self._previous[1][:storage.count])
+    
+    def add_constraint(self, joint_type: int, body_a: RigidBody, body_b: RigidBody, anchor_a: Vector3,
+                       anchor_b: Optional[Vector3] = None, axis: Optional[Vector3] = None) -> int:
+        """在两个刚体之间添加一个关节，返回关节句柄，参数见add_constraints()"""
+        anchors_b = None if anchor_b is None else [(anchor_b.x, anchor_b.y, anchor_b.z)]
+        axes = None if axis is None else [(axis.x, axis.y, axis.z)]
+        handles = self.add_constraints(joint_type, [body_a.handle], [body_b.handle],
+                                       [(anchor_a.x, anchor_a.y, anchor_a.z)], anchors_b, axes)
+        return int(handles[0])
+    
+    def add_constraints(self, joint_types, bodies_a: np.ndarray, bodies_b: np.ndarray, anchors_a: np.ndarray,
+                        anchors_b: Optional[np.ndarray] = None, axes: Optional[np.ndarray] = None) -> np.ndarray:
+        """批量添加关节，返回关节句柄数组 (J,)
+
+        joint_types为JointType中的值(标量或(J,)数组)，bodies_a/bodies_b为两端刚体的句柄，
+        两端刚体必须已加入本世界。anchors_a/anchors_b为世界坐标的锚点 (J,3)，anchors_b默认与
+        anchors_a相同；axes为世界坐标的铰链转轴或滑块方向 (J,3)，默认为z轴。锚点和轴按两端刚体
+        的当前状态换算到局部坐标，距离关节的长度取两个锚点的当前距离。
+        关节与接触在同一个迭代循环中求解，两端刚体之间的碰撞不会被屏蔽。
+        """
+        bodies_a = _handle_array(bodies_a)
+        bodies_b = _handle_array(bodies_b)
+        count = len(bodies_a)
+        joint_types = np.broadcast_to(np.asarray(joint_types, dtype=np.int32), (count,))
+        if not np.isin(joint_types, JOINT_TYPES).all():
+            raise ValueError(f"未知的关节类型: {sorted(set(joint_types.tolist()) - set(JOINT_TYPES))}")
+        anchors_a = _float_array(anchors_a, 3)
+        anchors_b = anchors_a if anchors_b is None else _float_array(anchors_b, 3)
+        axes = _float_array(DEFAULT_AXIS if axes is None else axes, 3)
+        if len(bodies_b) != count or len(anchors_a) != count or len(anchors_b) != count:
+            raise ValueError("关节参数的数量不一致")
+        rows_a = self._storage.rows_of(bodies_a)
+        rows_b = self._storage.rows_of(bodies_b)
+        if (rows_a < 0).any() or (rows_b < 0).any():
+            raise ValueError("关节两端的刚体必须已加入物理世界")
+
+        positions = self._storage.view('positions')
+        rotations = self._storage.view('rotations')
+        frames = joint_frames(positions[rows_a], rotations[rows_a], positions[rows_b], rotations[rows_b],
+                              anchors_a, anchors_b, np.broadcast_to(axes, (count, 3)))
+        return self._append_joints(joint_types, np.stack([bodies_a, bodies_b], axis=1), **frames)
+    
+    def _append_joints(self, joint_types: np.ndarray, bodies: np.ndarray, local_anchors: np.ndarray,
+                       local_axes: np.ndarray, references: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """按局部坐标的列添加关节，两端刚体所在的休眠岛屿被唤醒"""
+        columns = {
+            'joint_types': np.ascontiguousarray(joint_types, dtype=np.int32),
+            'bodies': np.ascontiguousarray(bodies, dtype=np.int64).reshape(-1, 2),
+            'local_anchors': _float_array(local_anchors, 6),
+            'local_axes': _float_array(local_axes, 6),
+            'references': _float_array(references, 4),
+            'lengths': np.ascontiguousarray(lengths, dtype=np.float32).reshape(-1),
+        }
+        count = len(columns['joint_types'])
+        if self.ptr is not None:
+            handles = np.empty(count, dtype=np.int64)
+            _lib.ps_world_add_joints(self.ptr, count, _ptr(columns['joint_types'], ctypes.c_int32),
+                                     _ptr(columns['bodies'], ctypes.c_int64), _ptr(columns['local_anchors']),
+                                     _ptr(columns['local_axes']), _ptr(columns['references']),
+                                     _ptr(columns['lengths']), _ptr(handles, ctypes.c_int64))
+            self._joints.refresh()
+            if len(handles) and not handles.all():
+                self.remove_constraints(handles[handles != 0])
+                raise MemoryError("关节数量超过上限")
+            return handles
+        handles = self._joint_handles.allocate(count)
+        self._joints.append(handles=handles, **columns)
+        rows = self._storage.rows_of(columns['bodies'].reshape(-1))
+        self.islands.wake_bodies(self._storage, rows[rows >= 0])
+        return handles
+    
+    def remove_constraint(self, handle: int) -> None:
+        """移除一个关节"""
+        self.remove_constraints([handle])
+    
+    def remove_constraints(self, handles: np.ndarray) -> None:
+        """批量移除关节，无效或已移除的句柄被忽略；两端刚体所在的休眠岛屿被唤醒"""
+        handles = _handle_array(handles)
+        if self.ptr is not None:
+            _lib.ps_world_remove_joints(self.ptr, _ptr(handles, ctypes.c_int64), len(handles))
+            self._joints.refresh()
+            return
+        rows = self._joints.rows_of(handles)
+        rows = np.unique(rows[rows >= 0])
+        if len(rows):
+            bodies = self._storage.rows_of(self._joints.view('bodies')[rows].reshape(-1))
+            self.islands.wake_bodies(self._storage, bodies[bodies >= 0])
+            self._joint_handles.release(self._joints.view('handles')[rows])
+            self._joints.remove(rows)
+    
+    def get_constraint_count(self) -> int:
+        """获取关节数量"""
+        return self._joints.count
+    
+    def get_constraints(self) -> dict:
+        """获取所有关节，列名见JOINT_COLUMNS，值为各列的副本
+
+        bodies为两端刚体的句柄，local_anchors/local_axes为两端刚体局部坐标中的锚点和轴，
+        impulses为上一步各约束行的累积冲量。
+        """
+        return {name: self._joints.view(name).copy() for name in JOINT_COLUMNS}
+    
+    def _joint_body_rows(self) -> np.ndarray:
+        """关节两端刚体当前的行号 (J,2)，不在世界中的为-1"""
+        bodies = self._joints.view('bodies')
+        return self._storage.rows_of(bodies.reshape(-1)).reshape(-1, 2)
+    
+    def step_simulation(self, time_step: float, max_sub_steps: int = 10,
+                        fixed_time_step: float = 1.0 / 60.0) -> int:
+        """步进模拟，返回实际执行的子步数
+
+        time_step(通常为一帧的实际耗时)累加到内部累加器中，每满fixed_time_step执行一个固定子步。
+        子步数不超过max_sub_steps，超出部分的时间被丢弃，慢帧不会引发越来越多的子步；
+        累加器中剩余的时间用于渲染插值(get_interpolated_positions/rotations)。
+        max_sub_steps为0时直接以time_step执行一步(可变步长)。
+        native后端在C++中步进时释放GIL(ctypes.CDLL的调用都会释放)，其他Python线程可以同时运行。
+        """
+        if self.backend == 'native':
+            sub_steps = _lib.ps_world_step(self.ptr, time_step, max_sub_steps, fixed_time_step)
+        else:
+            sub_steps = self._step_numpy(time_step, max_sub_steps, fixed_time_step)
+        if self._recorder is not None and sub_steps:
+            dt = sub_steps * fixed_time_step if max_sub_steps > 0 else time_step
+            self._recorder.record(dt, self._storage.view('positions'), self._storage.view('rotations'),
+                                  self._storage.view('linear_velocities'),
+                                  self._storage.view('angular_velocities'))
+        return sub_steps
+    
+    def _step_numpy(self, time_step: float, max_sub_steps: int, fixed_time_step: float) -> int:
+        """numpy后端的固定步长累加器"""
+        sub_steps = 0
+        if max_sub_steps > 0:
+            self._accumulator += time_step
+            if fixed_time_step > 0.0 and self._accumulator >= fixed_time_step:
+                sub_steps = int(self._accumulator / fixed_time_step)
+                self._accumulator -= sub_steps * fixed_time_step
+        else:
+            fixed_time_step = time_step
+            self._accumulator = 0.0
+            sub_steps = 1 if time_step > 0.0 else 0
+            max_sub_steps = 1
+
+        # 超出最大子步数的时间直接丢弃
+        clamped = min(sub_steps, max_sub_steps)
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler:
+            profiler.begin_sample()
+        for i in range(clamped):
+            if i == clamped - 1:
+                self._previous = (self._storage.view('positions').copy(), self._storage.view('rotations').copy())
+                if profiler:
+                    profiler.lap(PROFILE_SYNC)
+            self._single_step(fixed_time_step, profiler)
+        self._alpha = self._accumulator / fixed_time_step if fixed_time_step > 0.0 else 0.0
+        if profiler:
+            profiler.set_counter(PROFILE_BODIES, self._storage.count)
+            profiler.set_counter(PROFILE_SUBSTEPS, clamped)
+            profiler.end_sample()
+        return clamped
+    
+    def _single_step(self, time_step: float, profiler: Optional[StepProfiler] = None) -> None:
+        """numpy后端的一个固定子步，profiler不为None时记录各阶段耗时"""
+        gravity = (self.gravity.x, self.gravity.y, self.gravity.z)
+        integrate_velocities(self._storage, gravity, time_step)
+        if profiler:
+            profiler.lap(PROFILE_INTEGRATE)
+        self.broadphase.update(self._storage, time_step)
+        if profiler:
+            profiler.lap(PROFILE_BROADPHASE)
+        contacts = self.narrowphase.update(self._storage, self.broadphase.pairs)
+        if profiler:
+            profiler.lap(PROFILE_NARROWPHASE)
+        joint_rows = self._joint_body_rows()
+        woken = self.islands.wake(self._storage, contacts, joint_rows)
+        if profiler:
+            profiler.lap(PROFILE_ISLANDS)
+        if woken:
+            # 被唤醒的刚体之间及其与静态刚体的接触需要重新生成
+            contacts = self.narrowphase.update(self._storage, self.broadphase.pairs)
+            if profiler:
+                profiler.lap(PROFILE_NARROWPHASE)
+        self.solver.solve(self._storage, contacts, time_step, self._joints, joint_rows)
+        if profiler:
+            profiler.lap(PROFILE_SOLVE)
+        self.islands.update(self._storage, contacts, time_step, joint_rows)
+        if profiler:
+            profiler.lap(PROFILE_ISLANDS)
+        self.ccd.update(self._storage, self.broadphase.pairs, time_step)
+        integrate_positions(self._storage, time_step)
+        if profiler:
+            profiler.lap(PROFILE_INTEGRATE)
+            profiler.set_counter(PROFILE_PAIRS, self.broadphase.pair_count)
+            profiler.set_counter(PROFILE_CONTACTS, self.narrowphase.contact_count)
+            profiler.add_counter(PROFILE_ITERATIONS, self.solver.iterations)
+    
+    def start_recording(self, path: str, chunk_frames: int = 64, compress: bool = False) -> None:
+        """开始把每次step_simulation()后的刚体状态记录到轨迹文件
+
+        记录过程中不能增删刚体。文件用python.core.trajectory.TrajectoryReader读取。
+        """
+        from python.core.trajectory import TrajectoryRecorder
+        
+        self.stop_recording()
+        self._recorder = TrajectoryRecorder(path, self._storage.view('handles'), self._storage.view('shape_types'),
+                                            self._storage.view('shape_params'), chunk_frames, compress)
+    
+    def stop_recording(self) -> None:
+        """结束记录，写入索引并关闭文件"""
+        if self._recorder is not None:
+            recorder, self._recorder = self._recorder, None
+            recorder.close()
+    
+    def is_recording(self) -> bool:
+        """是否正在记录轨迹"""
+        return self._recorder is not None
+    
+    def snapshot(self) -> bytearray:
+        """保存完整的刚体状态、接触流形缓存、关节的累积冲量和步进状态，返回一段连续的字节
+
+        快照可以用restore()恢复到本世界，或恢复到刚体数量、形状和关节相同的世界(例如fork()的结果)。
+        """
+        columns = {name: self._storage.view(name) for name in BODY_COLUMNS}
+        if self.backend == 'native':
+            count = _lib.ps_world_cache_point_count(self.ptr)
+            cache = {name: np.empty((count, width), dtype=dtype) for name, (dtype, width) in CACHE_COLUMNS.items()}
+            _lib.ps_world_save_cache(self.ptr, _ptr(cache['handles'], ctypes.c_int64), _ptr(cache['anchors']),
+                                     _ptr(cache['impulses']))
+            accumulator = _lib.ps_world_accumulator(self.ptr)
+            next_island = _lib.ps_world_next_island(self.ptr)
+        else:
+            cached = self.solver._cache
+            cache = {
+                'handles': np.stack([cached['handle_a'], cached['handle_b']], axis=1),
+                'anchors': cached['anchors'],
+                'impulses': cached['impulses'],
+            }
+            accumulator = self._accumulator
+            next_island = self.islands._next_island
+        gravity = (self.gravity.x, self.gravity.y, self.gravity.z)
+        return pack_snapshot(columns, cache, self._joint_state(), accumulator, gravity, next_island)
+    
+    def _joint_state(self) -> dict:
+        """两端刚体都在世界中的关节的快照列(见JOINT_STATE_COLUMNS)，rows为这些关节在本世界中的行号"""
+        rows = self._joint_body_rows()
+        active = np.flatnonzero((rows >= 0).all(axis=1))
+        joints = {name: self._joints.view(name)[active] for name in JOINT_STATE_COLUMNS if name != 'body_rows'}
+        joints['body_rows'] = rows[active]
+        joints['rows'] = active
+        return joints
     
-    def step_simulation(self, time_step: float, max_sub_steps: int = 10) -> None:
-        """步进模拟"""
-        # 模拟实现
-        pass
+    def restore(self, buffer) -> None:
+        """从snapshot()的结果恢复状态
+
+        快照中的刚体按行对应到本世界的刚体，刚体数量和形状类型必须一致；关节按顺序对应，
+        类型和两端刚体的行号必须一致。
+        """
+        columns, cache, joints, state = unpack_snapshot(buffer)
+        storage = self._storage
+        if len(columns['handles']) != storage.count or \
+                not np.array_equal(columns['shape_types'], storage.view('shape_types')):
+            raise ValueError("快照中的刚体与当前世界不一致")
+        current = self._joint_state()
+        if not np.array_equal(joints['joint_types'], current['joint_types']) or \
+                not np.array_equal(joints['body_rows'], current['body_rows']):
+            raise ValueError("快照中的关节与当前世界不一致")
+        self._joints.view('impulses')[current['rows']] = joints['impulses']
+        for name in BODY_COLUMNS:
+            if name != 'handles':
+                storage.view(name)[...] = columns[name]
+
+        # 快照中的句柄按行换成本世界的句柄；缓存中可能还有已移除刚体的流形，丢弃
+        handles = storage.view('handles')
+        order = np.argsort(columns['handles'])
+        sorted_handles = columns['handles'][order]
+        index = np.searchsorted(sorted_handles, cache['handles'])
+        found = index < len(sorted_handles)
+        found[found] = sorted_handles[index[found]] == cache['handles'][found]
+        found = found.all(axis=1)
+        rows = order[index[found]]
+        cache_handles = np.ascontiguousarray(handles[rows].reshape(-1, 2), dtype=np.int64)
+        anchors = np.ascontiguousarray(cache['anchors'][found])
+        impulses = np.ascontiguousarray(cache['impulses'][found])
+        self.solver._cache = {
+            'handle_a': cache_handles[:, 0].copy(),
+            'handle_b': cache_handles[:, 1].copy(),
+            'anchors': anchors.copy(),
+            'impulses': impulses.copy(),
+        }
+        self.solver.manifold_count = len(np.unique(cache_handles, axis=0))
+        self.islands._next_island = state['next_island']
+        self._accumulator = state['accumulator']
+        self._alpha = 0.0
+        self._previous = None
+        self.gravity = Vector3(*state['gravity'])
+        if self.ptr is not None:
+            _lib.ps_world_initialize(self.ptr, *state['gravity'])
+            _lib.ps_world_load_cache(self.ptr, len(cache_handles), _ptr(cache_handles, ctypes.c_int64),
+                                     _ptr(anchors), _ptr(impulses))
+            _lib.ps_world_set_next_island(self.ptr, state['next_island'])
+            _lib.ps_world_set_accumulator(self.ptr, state['accumulator'])
+    
+    def fork(self) -> 'PhysicsWorld':
+        """复制出一个独立的物理世界，用于从当前时刻分支模拟
+
+        新世界中的刚体是新创建的(句柄不同)，按行与本世界一一对应，关节随之复制(句柄也不同)；
+        原生库中这些刚体归新世界所有，随新世界一起销毁，不要单独销毁它们。
+        """
+        world = PhysicsWorld(self.backend)
+        world.set_broadphase(self.broadphase.algorithm, self.broadphase.cell_size)
+        world.set_solver_iterations(self.solver.iterations)
+        world.set_warm_starting(self.solver.warm_starting)
+        world.set_sleeping_enabled(self.islands.enabled)
+        world.set_sleep_parameters(self.islands.linear_threshold, self.islands.angular_threshold,
+                                   self.islands.time_to_sleep)
+        world.set_thread_count(self.thread_count)
+
+        storage = self._storage
+        count = storage.count
+        if world.ptr is None:
+            # 纯Python实现: 每列一次整体拷贝
+            columns = {name: storage.view(name).copy() for name in BODY_COLUMNS}
+            columns['handles'] = _allocate_handles(count)
+            world._owned_handles = columns['handles']
+            world._storage.append(**columns)
+        else:
+            # 原生库: 按形状类型批量创建刚体，按原来的行顺序加入世界，状态由restore()整列写入
+            shape_types = storage.view('shape_types')
+            shape_params = storage.view('shape_params')
+            handles = np.zeros(count, dtype=np.int64)
+            for shape_type in np.unique(shape_types).tolist():
+                rows = np.flatnonzero(shape_types == shape_type)
+                params = shape_params[rows]
+                if shape_type == ShapeType.BOX:
+                    created = RigidBody.create_boxes(storage.view('masses')[rows], storage.view('positions')[rows],
+                                                     params[:, :3])
+                elif shape_type == ShapeType.SPHERE:
+                    created = RigidBody.create_spheres(storage.view('masses')[rows],
+                                                       storage.view('positions')[rows], params[:, 0])
+                elif shape_type == ShapeType.PLANE:
+                    created = RigidBody.create_planes(params[:, :3], params[:, 3])
+                else:
+                    RigidBody.destroy_bodies(handles[handles != 0])
+                    raise ValueError(f"不支持复制的形状类型: {shape_type}")
+                handles[rows] = created
+            world._owned_handles = handles
+            world._owned_ptr = _ptr(handles, ctypes.c_int64)
+            world.add_bodies(handles)
+        self._fork_joints(world)
+        world.restore(self.snapshot())
+        return world
+    
+    def _fork_joints(self, world: 'PhysicsWorld') -> None:
+        """把关节复制到fork()出的世界，两端刚体的句柄换成新世界中同一行的刚体"""
+        joints = self._joints
+        if joints.count == 0:
+            return
+        rows = self._joint_body_rows()
+        kept = np.flatnonzero((rows >= 0).all(axis=1))
+        bodies = world._storage.view('handles')[rows[kept]]
+        world._append_joints(joints.view('joint_types')[kept], bodies, joints.view('local_anchors')[kept],
+                             joints.view('local_axes')[kept], joints.view('references')[kept],
+                             joints.view('lengths')[kept])
+        world._joints.view('impulses')[:] = joints.view('impulses')[kept]
+    
+    def get_interpolation_alpha(self) -> float:
+        """插值系数: 累加器剩余时间 / 固定步长，范围[0,1)"""
+        if self.backend == 'native':
+            return float(_lib.ps_world_interpolation_alpha(self.ptr))
+        return self._alpha
+    
+    def _interpolated_state(self) -> Tuple[np.ndarray, np.ndarray]:
+        positions = self._storage.view('positions')
+        rotations = self._storage.view('rotations')
+        if self.backend == 'native':
+            count = self._storage.count
+            columns = []
+            for name, width in (('positions', 3), ('rotations', 4)):
+                address = _lib.ps_world_interpolated_column(self.ptr, _COLUMN_IDS[name])
+                if count == 0 or not address:
+                    columns.append(self._storage.view(name))
+                    continue
+                buffer = (ctypes.c_float * (count * width)).from_address(address)
+                columns.append(np.frombuffer(buffer, dtype=np.float32).reshape(count, width))
+            return columns[0], columns[1]
+        # 增删刚体后行号改变，上一状态失效
+        if self._previous is None or self._previous[0].shape != positions.shape:
+            return positions, rotations
+        return interpolate_states(self._previous[0], self._previous[1], positions, rotations, self._alpha)
+    
+    def get_interpolated_positions(self) -> np.ndarray:
+        """获取用于渲染的插值位置 (N,3)，在最后一个子步前后的状态之间按累加器剩余时间插值"""
+        return self._interpolated_state()[0].copy()
+    
+    def get_interpolated_rotations(self) -> np.ndarray:
+        """获取用于渲染的插值旋转四元数 (N,4)"""
+        return self._interpolated_state()[1].copy()
+    
+    def get_broadphase_pairs(self) -> np.ndarray:
+        """获取上一步粗检测得到的候选对 (M,2)，元素为行号且a<b"""
+        if self.backend == 'native':
+            count = _lib.ps_world_pair_count(self.ptr)
+            if count == 0:
+                return np.zeros((0, 2), dtype=np.int32)
+            buffer = (ctypes.c_int32 * (count * 2)).from_address(_lib.ps_world_pairs(self.ptr))
+            return np.frombuffer(buffer, dtype=np.int32).reshape(count, 2).copy()
+        return self.broadphase.pairs
+    
+    def get_contacts(self) -> dict:
+        """获取上一步细检测得到的接触，列名见CONTACT_COLUMNS
+
+        body_a/body_b为行号，normals从body_a指向body_b，depths为正表示穿透。
+        """
+        if self.backend != 'native':
+            return self.narrowphase.contacts
+        count = _lib.ps_world_contact_count(self.ptr)
+        if count == 0:
+            return empty_contacts()
+        contacts = {}
+        for index, (name, (dtype, width)) in enumerate(CONTACT_COLUMNS.items()):
+            ctype = np.ctypeslib.as_ctypes_type(dtype)
+            buffer = (ctype * (count * width)).from_address(_lib.ps_world_contact_column(self.ptr, index))
+            column = np.frombuffer(buffer, dtype=dtype).copy()
+            contacts[name] = column.reshape(count, width) if width > 1 else column
+        return contacts
+    
+    def get_broadphase_stats(self) -> dict:
+        """获取上一步粗检测的统计: 算法、候选对数量、构建耗时(毫秒)"""
+        if self.backend == 'native':
+            pair_count = _lib.ps_world_pair_count(self.ptr)
+            build_time = _lib.ps_world_broadphase_time(self.ptr)
+        else:
+            pair_count = self.broadphase.pair_count
+            build_time = self.broadphase.build_time
+        return {
+            'algorithm': self.broadphase.algorithm,
+            'pair_count': pair_count,
+            'build_time_ms': build_time * 1000.0,
+        }
+    
+    def get_solver_stats(self) -> dict:
+        """获取上一步接触求解的统计: 迭代次数、接触流形数、warm starting命中的接触点数、
+        批次数、耗时(毫秒)"""
+        if self.backend == 'native':
+            manifold_count = _lib.ps_world_manifold_count(self.ptr)
+            warm_started = _lib.ps_world_warm_started_count(self.ptr)
+            batch_count = _lib.ps_world_batch_count(self.ptr)
+            solve_time = _lib.ps_world_solver_time(self.ptr)
+        else:
+            manifold_count = self.solver.manifold_count
+            warm_started = self.solver.warm_started
+            batch_count = self.solver.batch_count
+            solve_time = self.solver.solve_time
+        return {
+            'iterations': self.solver.iterations,
+            'warm_starting': self.solver.warm_starting,
+            'manifold_count': manifold_count,
+            'warm_started': warm_started,
+            'batch_count': batch_count,
+            'solve_time_ms': solve_time * 1000.0,
+        }
+    
+    def get_narrowphase_stats(self) -> dict:
+        """获取上一步细检测的统计: 接触数量、耗时(毫秒)"""
+        if self.backend == 'native':
+            contact_count = _lib.ps_world_contact_count(self.ptr)
+            build_time = _lib.ps_world_narrowphase_time(self.ptr)
+        else:
+            contact_count = self.narrowphase.contact_count
+            build_time = self.narrowphase.build_time
+        return {
+            'contact_count': contact_count,
+            'build_time_ms': build_time * 1000.0,
+        }
+    
+    def get_awake_count(self) -> int:
+        """获取未休眠的动态刚体数量"""
+        return int(np.count_nonzero(dynamic_bodies(self._storage) & (self._storage.view('sleep_islands') == 0)))
+    
+    def get_sleeping_count(self) -> int:
+        """获取休眠的动态刚体数量"""
+        return int(np.count_nonzero(dynamic_bodies(self._storage) & (self._storage.view('sleep_islands') != 0)))
+    
+    def get_island_stats(self) -> dict:
+        """获取上一步的岛屿统计: 是否开启休眠、活动岛屿数量、未休眠/休眠的动态刚体数量、耗时(毫秒)"""
+        if self.backend == 'native':
+            island_count = _lib.ps_world_island_count(self.ptr)
+            build_time = _lib.ps_world_island_time(self.ptr)
+        else:
+            island_count = self.islands.island_count
+            build_time = self.islands.build_time
+        return {
+            'enabled': self.islands.enabled,
+            'island_count': island_count,
+            'awake_count': self.get_awake_count(),
+            'sleeping_count': self.get_sleeping_count(),
+            'build_time_ms': build_time * 1000.0,
+        }
+    
+    def set_profiling(self, enabled: bool, capacity: int = DEFAULT_CAPACITY) -> None:
+        """开启/关闭步进性能统计，开启时清空并保留最近capacity次step_simulation()的样本"""
+        if capacity < 1:
+            raise ValueError(f"样本数必须为正数: {capacity}")
+        self.profiler.set_enabled(enabled, capacity)
+        if self.ptr is not None:
+            _lib.ps_world_set_profiling(self.ptr, int(enabled), capacity)
+    
+    def is_profiling(self) -> bool:
+        """是否开启了步进性能统计"""
+        return self.profiler.enabled
+    
+    def get_profile(self) -> dict:
+        """获取最近若干次step_simulation()的性能统计，按时间顺序(最旧的在前)
+
+        返回 名称 -> (N,)数组: 各阶段耗时(毫秒, float32)
+        integrate/broadphase/narrowphase/solve/islands/sync/total，
+        以及计数器(int32) bodies/pairs/contacts/iterations/substeps。
+        """
+        if self.backend == 'native':
+            count = _lib.ps_world_profile_count(self.ptr)
+            times = np.zeros((count, len(PROFILE_PHASES)), dtype=np.float32)
+            counters = np.zeros((count, len(PROFILE_COUNTERS)), dtype=np.int32)
+            if count:
+                # 两次调用之间可能有其他线程步进，按分配的行数导出
+                count = _lib.ps_world_profile_copy(self.ptr, count, _ptr(times), _ptr(counters, ctypes.c_int32))
+                times, counters = times[:count], counters[:count]
+        else:
+            times, counters = self.profiler.samples()
+        return profile_dict(times, counters)
     
     def get_rigid_bodies(self) -> List[RigidBody]:
         """获取所有刚体"""
-        return self.bodies
\ No newline at end of file
+        return [RigidBody(handle, self) for handle in self._storage.view('handles').tolist()]
+    
+    def get_body_count(self) -> int:
+        """获取刚体数量"""
+        return self._storage.count
+    
+    def get_handles(self) -> np.ndarray:
+        """获取所有刚体句柄 (N,)"""
+        return self._storage.view('handles').copy()
+    
+    # 批量状态读写
+    # get_*返回各列的副本(一次拷贝, float32, 形状(N,3)或(N,4))，不随世界的增删或销毁失效；
+    # 原生库中存储的零拷贝视图指向C++的数组，只在内部使用
+    
+    def get_positions(self) -> np.ndarray:
+        """获取所有刚体位置 (N,3)"""
+        return self._storage.view('positions').copy()
+    
+    def get_rotations(self) -> np.ndarray:
+        """获取所有刚体旋转四元数 (N,4)，分量顺序为x,y,z,w"""
+        return self._storage.view('rotations').copy()
+    
+    def get_velocities(self) -> np.ndarray:
+        """获取所有刚体线速度 (N,3)"""
+        return self._storage.view('linear_velocities').copy()
+    
+    def get_angular_velocities(self) -> np.ndarray:
+        """获取所有刚体角速度 (N,3)"""
+        return self._storage.view('angular_velocities').copy()
+    
+    def get_shape_types(self) -> np.ndarray:
+        """获取所有刚体形状类型 (N,)"""
+        return self._storage.view('shape_types').copy()
+    
+    def get_shape_params(self) -> np.ndarray:
+        """获取所有刚体形状参数 (N,4)，盒子为半尺寸，球体为半径，平面为法线和常数"""
+        return self._storage.view('shape_params').copy()
+    
+    def _set_column(self, name: str, values: np.ndarray) -> None:
+        """整列写入(一次拷贝)"""
+        view = self._storage.view(name)
+        values = np.asarray(values, dtype=view.dtype)
+        if values.shape != view.shape:
+            raise ValueError(f"数组形状不匹配: 期望{view.shape}, 实际{values.shape}")
+        # 状态被修改的刚体需要唤醒
+        changed = np.any((view != values).reshape(len(view), -1), axis=1)
+        view[...] = values
+        self._storage.view('sleep_islands')[changed] = 0
+        self._storage.view('sleep_times')[changed] = 0.0
+    
+    def set_positions(self, positions: np.ndarray) -> None:
+        """设置所有刚体位置 (N,3)"""
+        self._set_column('positions', positions)
+    
+    def set_rotations(self, rotations: np.ndarray) -> None:
+        """设置所有刚体旋转四元数 (N,4)"""
+        self._set_column('rotations', rotations)
+    
+    def set_velocities(self, velocities: np.ndarray) -> None:
+        """设置所有刚体线速度 (N,3)"""
+        self._set_column('linear_velocities', velocities)
+    
+    def set_angular_velocities(self, velocities: np.ndarray) -> None:
+        """设置所有刚体角速度 (N,3)"""
+        self._set_column('angular_velocities', velocities)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+视锥剔除和细节层次(LOD)
+
+所有计算都是对整个场景的向量化运算: 每个刚体用包围球表示，与相机视锥的
+6个平面比较得到可见性；可见刚体按包围球投影到屏幕上的半径(像素)选择网格的
+细节层次。
+"""
+
+import numpy as np
+from typing import Sequence, Tuple
+
+from python.core.enums import ShapeType
+
+# 细节层次的像素阈值: 投影半径大于LOD_PIXELS[i]时使用第i级，否则使用最后一级
+LOD_PIXELS = (40.0, 10.0)
+LOD_LEVELS = len(LOD_PIXELS) + 1
+
+# 球体每一级的(经线数, 纬线数)，圆柱/圆锥每一级的分段数
+SPHERE_LODS = ((20, 20), (12, 10), (6, 5))
+RADIAL_LODS = (24, 12, 6)
+
+def camera_vectors(azimuth: float, elevation: float, distance: float,
+                   target: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """与GLRenderer.set_camera相同的相机，返回(位置, 前方, 右方, 上方)"""
+    az = np.radians(azimuth)
+    el = np.radians(elevation)
+    eye = distance * np.array([np.cos(el) * np.cos(az), np.sin(el), np.cos(el) * np.sin(az)])
+    forward = np.asarray(target, dtype=np.float64) - eye
+    forward /= max(np.linalg.norm(forward), 1e-9)
+    right = np.cross(forward, (0.0, 1.0, 0.0))
+    right /= max(np.linalg.norm(right), 1e-9)
+    up = np.cross(right, forward)
+    return eye, forward, right, up
+
+def frustum_planes(eye: np.ndarray, forward: np.ndarray, right: np.ndarray, up: np.ndarray,
+                   fov_y: float, aspect: float, near: float, far: float) -> np.ndarray:
+    """视锥的6个平面 (6,4)，法线指向视锥内部，点x在内部当且仅当 n·x + d >= 0"""
+    tan_y = np.tan(np.radians(fov_y) * 0.5)
+    tan_x = tan_y * aspect
+    normals = np.array([
+        forward,                                    # 近平面
+        -forward,                                   # 远平面
+        forward * tan_x + right,                    # 左
+        forward * tan_x - right,                    # 右
+        forward * tan_y + up,                       # 下
+        forward * tan_y - up,                       # 上
+    ])
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    offsets = -normals @ eye
+    offsets[0] -= near
+    offsets[1] += far
+    return np.concatenate([normals, offsets[:, None]], axis=1)
+
+def bounding_radii(shape_types: np.ndarray, shape_params: np.ndarray) -> np.ndarray:
+    """每个刚体(按渲染尺寸)的包围球半径"""
+    radii = np.linalg.norm(shape_params[:, :3], axis=1)
+    sphere = shape_types == ShapeType.SPHERE
+    radii[sphere] = shape_params[sphere, 0]
+    radial = (shape_types == ShapeType.CYLINDER) | (shape_types == ShapeType.CONE)
+    radii[radial] = np.hypot(shape_params[radial, 0], shape_params[radial, 1])
+    capsule = shape_types == ShapeType.CAPSULE
+    radii[capsule] = shape_params[capsule, 0] + shape_params[capsule, 1]
+    # 平面画成10x0.01x10的薄板
+    radii[shape_types == ShapeType.PLANE] = np.hypot(5.0, 5.0)
+    return radii
+
+def visible_bodies(positions: np.ndarray, radii: np.ndarray, planes: np.ndarray) -> np.ndarray:
+    """包围球与视锥相交的刚体 (布尔数组)"""
+    distances = positions @ planes[:, :3].T + planes[:, 3]
+    return np.all(distances >= -radii[:, None], axis=1)
+
+def lod_levels(positions: np.ndarray, radii: np.ndarray, eye: np.ndarray, fov_y: float,
+               viewport_height: int) -> np.ndarray:
+    """按包围球投影到屏幕上的半径(像素)选择细节层次，0为最精细"""
+    distances = np.maximum(np.linalg.norm(positions - eye, axis=1), 1e-6)
+    pixels = radii / (distances * np.tan(np.radians(fov_y) * 0.5)) * (viewport_height * 0.5)
+    levels = np.full(len(radii), LOD_LEVELS - 1, dtype=np.int32)
+    for level, threshold in reversed(list(enumerate(LOD_PIXELS))):
+        levels[pixels > threshold] = level
+    return levels
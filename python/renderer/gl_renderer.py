@@ -5,13 +5,16 @@ import numpy as np
 from OpenGL.GL import *
 from OpenGL.GLU import *
 from OpenGL.GLUT import *
+import os
 import sys
 import time
 from typing import List, Tuple, Dict, Any, Optional
 
 # 导入物理引擎绑定
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from physics_binding import Vector3, Quaternion, RigidBody, PhysicsWorld, ShapeType
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from python.physics_binding import Vector3, Quaternion, RigidBody, PhysicsWorld, ShapeType
+from python.renderer.culling import (SPHERE_LODS, bounding_radii, camera_vectors, frustum_planes, lod_levels,
+                                     visible_bodies)
 
 class GLRenderer:
     """OpenGL渲染器类"""
@@ -24,6 +27,8 @@ class GLRenderer:
         
         # 物理世界
         self.physics_world = None
+        # 独立的模拟线程(SimulationLoop)，设置后渲染器只读取它发布的帧，不再自己步进
+        self.simulation = None
         
         # 渲染对象
         self.render_objects = {}
@@ -33,6 +38,17 @@ class GLRenderer:
         self.camera_azimuth = 45.0
         self.camera_elevation = 30.0
         self.camera_target = [0.0, 0.0, 0.0]
+        self.fov_y = 45.0
+        self.near = 0.1
+        self.far = 100.0
+        
+        # 视锥剔除和细节层次
+        self.culling = True
+        self.drawn_count = 0
+        self.culled_count = 0
+        
+        # 步进性能统计叠加层
+        self.show_profile = False
         
         # 鼠标状态
         self.mouse_buttons = [False, False, False]
@@ -43,9 +59,21 @@ class GLRenderer:
         self.frame_count = 0
         self.fps = 0
         
-        # 物理模拟参数
+        # 物理模拟参数: 按实际经过的时间推进，内部以time_step为固定步长
         self.time_step = 1.0 / 60.0
+        self.max_sub_steps = 5
+        self.last_step_time = None
         self.paused = False
+        
+        # 回放模式: 从轨迹文件读取状态，不运行物理模拟
+        self.replay = None
+        self.replay_frame = 0
+        self.replay_time = 0.0
+        self.replay_speed = 1.0
+        
+        # 实例化渲染路径，OpenGL不支持时回退到立即模式
+        self.use_instancing = True
+        self.instanced = None
     
     def init_gl(self):
         """初始化OpenGL"""
@@ -65,6 +93,20 @@ class GLRenderer:
         glLightfv(GL_LIGHT0, GL_AMBIENT, light_ambient)
         glLightfv(GL_LIGHT0, GL_DIFFUSE, light_diffuse)
         glLightfv(GL_LIGHT0, GL_SPECULAR, light_specular)
+        
+        if self.use_instancing:
+            try:
+                from python.renderer.instanced import InstancedRenderer
+                self.instanced = InstancedRenderer()
+            except Exception as e:
+                print(f"实例化渲染不可用，使用立即模式: {e}")
+                self.instanced = None
+    
+    def disable_instancing(self, error: Exception):
+        """实例化绘制出错时恢复GL状态并永久改用立即模式"""
+        print(f"实例化渲染失败，改用立即模式: {error}")
+        self.instanced.reset_state()
+        self.instanced = None
     
     def resize(self, width: int, height: int):
         """窗口大小改变回调"""
@@ -73,7 +115,7 @@ class GLRenderer:
         glViewport(0, 0, width, height)
         glMatrixMode(GL_PROJECTION)
         glLoadIdentity()
-        gluPerspective(45.0, width / height, 0.1, 100.0)
+        gluPerspective(self.fov_y, width / max(height, 1), self.near, self.far)
         glMatrixMode(GL_MODELVIEW)
     
     def set_camera(self):
@@ -138,9 +180,10 @@ class GLRenderer:
         glutSolidCube(1.0)
         glPopMatrix()
     
-    def draw_sphere(self, radius: float):
-        """绘制球体"""
-        glutSolidSphere(radius, 20, 20)
+    def draw_sphere(self, radius: float, level: int = 0):
+        """绘制球体，level为细节层次"""
+        slices, stacks = SPHERE_LODS[level]
+        glutSolidSphere(radius, slices, stacks)
     
     def draw_plane(self):
         """绘制平面"""
@@ -149,34 +192,100 @@ class GLRenderer:
         glutSolidCube(1.0)
         glPopMatrix()
     
-    def draw_rigid_body(self, body: RigidBody):
-        """绘制刚体"""
-        # 获取刚体位置和旋转
-        pos = body.get_position()
-        rot = body.get_rotation()
-        
+    def draw_body(self, shape_type: int, position, rotation, shape_params, level: int = 0):
+        """按形状类型、位置、旋转和形状参数绘制一个刚体"""
         # 设置变换
         glPushMatrix()
-        glTranslatef(pos.x, pos.y, pos.z)
+        glTranslatef(position[0], position[1], position[2])
         
-        # 应用旋转 (四元数转换为旋转矩阵)
-        # 简化实现，实际应该使用四元数转换为旋转矩阵
+        # 应用旋转 (四元数转换为轴角)
+        x, y, z, w = rotation
+        w = max(-1.0, min(1.0, w))
+        s = np.sqrt(max(1.0 - w * w, 0.0))
+        if s > 1e-6:
+            glRotatef(np.degrees(2.0 * np.arccos(w)), x / s, y / s, z / s)
         
         # 根据刚体类型绘制不同形状
-        shape_type = ShapeType.BOX  # 假设为盒子，实际应从刚体获取
-        
         if shape_type == ShapeType.BOX:
             glColor3f(0.8, 0.2, 0.2)
-            self.draw_box(Vector3(1.0, 1.0, 1.0))  # 假设尺寸，实际应从刚体获取
+            self.draw_box(Vector3(shape_params[0], shape_params[1], shape_params[2]))
         elif shape_type == ShapeType.SPHERE:
             glColor3f(0.2, 0.8, 0.2)
-            self.draw_sphere(1.0)  # 假设半径，实际应从刚体获取
+            self.draw_sphere(shape_params[0], level)
         elif shape_type == ShapeType.PLANE:
             glColor3f(0.5, 0.5, 0.5)
             self.draw_plane()
         
         glPopMatrix()
     
+    def draw_rigid_body(self, body: RigidBody):
+        """绘制刚体"""
+        pos = body.get_position()
+        rot = body.get_rotation()
+        self.draw_body(body.get_shape_type(), (pos.x, pos.y, pos.z),
+                       (rot.x, rot.y, rot.z, rot.w), body.get_shape_params())
+    
+    def cull(self, positions, shape_types, shape_params):
+        """对整个场景做视锥剔除，返回(可见刚体的行号, 每个可见刚体的细节层次)"""
+        radii = bounding_radii(shape_types, shape_params)
+        eye, forward, right, up = camera_vectors(self.camera_azimuth, self.camera_elevation,
+                                                 self.camera_distance, self.camera_target)
+        if self.culling:
+            planes = frustum_planes(eye, forward, right, up, self.fov_y, self.width / max(self.height, 1),
+                                    self.near, self.far)
+            rows = np.flatnonzero(visible_bodies(positions, radii, planes))
+        else:
+            rows = np.arange(len(positions))
+        levels = lod_levels(positions[rows], radii[rows], eye, self.fov_y, self.height)
+        return rows, levels
+    
+    def draw_state(self, positions, rotations, shape_types, shape_params):
+        """按整个场景的状态数组绘制所有刚体: 先剔除视锥外的刚体，优先使用实例化渲染"""
+        positions = np.asarray(positions)
+        shape_types = np.asarray(shape_types)
+        shape_params = np.asarray(shape_params)
+        rows, levels = self.cull(positions, shape_types, shape_params)
+        self.drawn_count = len(rows)
+        self.culled_count = len(positions) - len(rows)
+        positions = positions[rows]
+        rotations = np.asarray(rotations)[rows]
+        shape_types = shape_types[rows]
+        shape_params = shape_params[rows]
+        
+        if self.use_instancing and self.instanced is not None:
+            try:
+                self.instanced.draw(positions, rotations, shape_types, shape_params, levels)
+                return
+            except Exception as e:
+                self.disable_instancing(e)
+        
+        # 立即模式: 逐个刚体绘制
+        positions = positions.tolist()
+        rotations = rotations.tolist()
+        shape_types = shape_types.tolist()
+        shape_params = shape_params.tolist()
+        levels = levels.tolist()
+        for i in range(len(positions)):
+            self.draw_body(shape_types[i], positions[i], rotations[i], shape_params[i], levels[i])
+    
+    def draw_replay_frame(self):
+        """绘制回放的当前帧"""
+        reader = self.replay
+        frame = reader.frame(self.replay_frame)
+        self.draw_state(frame['positions'], frame['rotations'], reader.shape_types, reader.shape_params)
+    
+    def draw_simulation_frame(self):
+        """绘制模拟线程最近一次发布的完整帧"""
+        frame = self.simulation.frames.acquire()
+        if frame is not None:
+            self.draw_state(frame.positions, frame.rotations, frame.shape_types, frame.shape_params)
+    
+    def draw_bodies(self):
+        """一次性读取整个场景的状态数组(渲染插值后)并绘制所有刚体"""
+        world = self.physics_world
+        self.draw_state(world.get_interpolated_positions(), world.get_interpolated_rotations(),
+                        world.get_shape_types(), world.get_shape_params())
+    
     def display(self):
         """显示回调"""
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
@@ -185,20 +294,58 @@ class GLRenderer:
         self.set_camera()
         
         # 绘制网格和坐标轴
-        self.draw_grid()
-        self.draw_axes()
+        if self.use_instancing and self.instanced is not None:
+            try:
+                self.instanced.draw_lines('grid')
+                self.instanced.draw_lines('axes')
+            except Exception as e:
+                self.disable_instancing(e)
+        if not (self.use_instancing and self.instanced is not None):
+            self.draw_grid()
+            self.draw_axes()
         
         # 绘制所有刚体
-        if self.physics_world:
-            for body in self.physics_world.get_rigid_bodies():
-                self.draw_rigid_body(body)
+        if self.replay is not None and len(self.replay):
+            self.draw_replay_frame()
+        elif self.simulation is not None:
+            self.draw_simulation_frame()
+        elif self.physics_world:
+            self.draw_bodies()
         
         # 显示帧率
         self.calculate_fps()
-        self.display_text(f"FPS: {self.fps:.1f}", 10, 20)
+        mode = "实例化" if self.use_instancing and self.instanced is not None else "立即模式"
+        self.display_text(f"FPS: {self.fps:.1f} ({mode})", 10, 20)
+        self.display_text(f"绘制: {self.drawn_count} 剔除: {self.culled_count}", 10, 60)
+        if self.replay is not None and len(self.replay):
+            self.display_text(f"回放: {self.replay_frame + 1}/{len(self.replay)} "
+                              f"t={self.replay.time(self.replay_frame):.2f}s x{self.replay_speed:g}", 10, 40)
+        if self.show_profile and self.physics_world and self.replay is None:
+            self.draw_profile()
         
         glutSwapBuffers()
     
+    def draw_profile(self):
+        """显示最近若干次步进各阶段的平均耗时和计数器"""
+        if self.simulation is not None:
+            # 世界由模拟线程步进，只读取随帧发布的样本
+            frame = self.simulation.frames.acquire()
+            profile = frame.profile if frame is not None else None
+        else:
+            profile = self.physics_world.get_profile()
+        if profile is None or not len(profile['total']):
+            self.display_text("性能统计: 等待样本", 10, 80)
+            return
+        mean = {name: float(values.mean()) for name, values in profile.items()}
+        self.display_text(f"步进: {mean['total']:.2f} ms (最近{len(profile['total'])}次平均, "
+                          f"最大 {float(profile['total'].max()):.2f} ms)", 10, 80)
+        phases = ('integrate', 'broadphase', 'narrowphase', 'solve', 'islands', 'sync')
+        for i, name in enumerate(phases):
+            self.display_text(f"  {name:<12}{mean[name]:8.3f} ms", 10, 100 + i * 20)
+        self.display_text(f"刚体: {int(profile['bodies'][-1])} 候选对: {int(profile['pairs'][-1])} "
+                          f"接触: {int(profile['contacts'][-1])} 迭代: {int(profile['iterations'][-1])} "
+                          f"子步: {mean['substeps']:.1f}", 10, 100 + len(phases) * 20)
+    
     def calculate_fps(self):
         """计算帧率"""
         current_time = time.time()
@@ -233,18 +380,46 @@ class GLRenderer:
         glEnable(GL_LIGHTING)
     
     def idle(self):
-        """空闲回调"""
-        if self.physics_world and not self.paused:
-            self.physics_world.step_simulation(self.time_step)
+        """空闲回调: 以上一帧的实际耗时推进模拟"""
+        now = time.perf_counter()
+        elapsed = self.time_step if self.last_step_time is None else now - self.last_step_time
+        self.last_step_time = now
+        if self.replay is not None:
+            if not self.paused and len(self.replay):
+                self.replay_time += elapsed * self.replay_speed
+                self.replay_frame = self.replay.find_frame(self.replay_time)
+        elif self.simulation is not None:
+            pass
+        elif self.physics_world and not self.paused:
+            self.physics_world.step_simulation(elapsed, self.max_sub_steps, self.time_step)
         glutPostRedisplay()
     
     def keyboard(self, key, x, y):
         """键盘回调"""
         if key == b' ':
             self.paused = not self.paused
+            if self.simulation is not None:
+                self.simulation.paused = self.paused
+        elif key == b'c':
+            # 开关视锥剔除
+            self.culling = not self.culling
+        elif key == b'p':
+            # 开关步进性能统计叠加层，关闭时同时停止统计
+            self.set_profiling(not self.show_profile)
+        elif key == b'i':
+            # 切换实例化渲染/立即模式
+            self.use_instancing = not self.use_instancing
         elif key == b'r':
             # 重置模拟
-            pass
+            if self.replay is not None:
+                self.seek_replay(0)
+        elif self.replay is not None and key in (b',', b'.'):
+            # 逐帧后退/前进(暂停回放)
+            self.paused = True
+            self.seek_replay(self.replay_frame + (1 if key == b'.' else -1))
+        elif self.replay is not None and key in (b'[', b']'):
+            # 回放速度减半/加倍
+            self.replay_speed *= 2.0 if key == b']' else 0.5
         elif key == b'q' or key == b'\x1b':  # ESC键
             sys.exit(0)
     
@@ -285,6 +460,35 @@ class GLRenderer:
         """设置物理世界"""
         self.physics_world = world
     
+    def set_simulation(self, simulation):
+        """使用独立的模拟线程，simulation为SimulationLoop"""
+        self.simulation = simulation
+        self.physics_world = simulation.world
+        self.paused = simulation.paused
+    
+    def set_profiling(self, enabled: bool):
+        """开关性能统计叠加层和物理世界的步进统计"""
+        self.show_profile = enabled
+        if self.physics_world is None:
+            return
+        if self.simulation is not None:
+            # 统计缓冲区由模拟线程写入，在两步之间切换
+            self.simulation.submit(self.physics_world.set_profiling, enabled)
+        else:
+            self.physics_world.set_profiling(enabled)
+    
+    def set_replay(self, reader):
+        """进入回放模式，reader为TrajectoryReader"""
+        self.replay = reader
+        self.seek_replay(0)
+    
+    def seek_replay(self, frame: int):
+        """跳转到回放的第frame帧"""
+        if self.replay is None or not len(self.replay):
+            return
+        self.replay_frame = min(max(frame, 0), len(self.replay) - 1)
+        self.replay_time = self.replay.time(self.replay_frame)
+    
     def run(self):
         """运行渲染循环"""
         # 初始化GLUT
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+实例化渲染
+
+每种形状类型一组静态网格VBO(单位盒子、单位球、单位圆柱和圆锥，曲面形状
+按细节层次各有几级)，每帧把可见刚体的位置、旋转和缩放整体写入一个实例
+缓冲区，按(形状, 网格, 细节层次)排序后每组一次glDrawArraysInstanced。
+胶囊体展开为一个圆柱和两个球。顶点着色器用四元数旋转顶点并计算与固定管线相同的
+漫反射光照。网格和坐标轴也缓存在VBO中。
+
+需要OpenGL 3.3(或ARB_instanced_arrays/ARB_draw_instanced)，创建失败时
+GLRenderer回退到立即模式。
+"""
+
+import ctypes
+import numpy as np
+from OpenGL.GL import *
+from OpenGL.GL import shaders
+from typing import Dict, Tuple
+
+from python.core.enums import ShapeType
+from python.renderer.culling import RADIAL_LODS, SPHERE_LODS
+
+# 每个实例: 位置(3) + 旋转四元数(4) + 缩放(3)
+INSTANCE_WIDTH = 10
+
+# 形状颜色，与立即模式的draw_body一致
+SHAPE_COLORS = {
+    ShapeType.BOX: (0.8, 0.2, 0.2),
+    ShapeType.SPHERE: (0.2, 0.8, 0.2),
+    ShapeType.PLANE: (0.5, 0.5, 0.5),
+    ShapeType.CAPSULE: (0.8, 0.6, 0.2),
+    ShapeType.CYLINDER: (0.2, 0.4, 0.8),
+    ShapeType.CONE: (0.7, 0.2, 0.7),
+}
+
+# 网格编号，平面使用盒子网格
+MESH_BOX, MESH_SPHERE, MESH_CYLINDER, MESH_CONE = range(4)
+_SHAPE_MESHES = {
+    ShapeType.BOX: MESH_BOX,
+    ShapeType.PLANE: MESH_BOX,
+    ShapeType.SPHERE: MESH_SPHERE,
+    ShapeType.CYLINDER: MESH_CYLINDER,
+    ShapeType.CONE: MESH_CONE,
+}
+
+_VERTEX_SHADER = """
+#version 120
+attribute vec3 vertex;
+attribute vec3 normal;
+attribute vec3 instance_position;
+attribute vec4 instance_rotation;
+attribute vec3 instance_scale;
+uniform vec3 color;
+varying vec3 shaded;
+
+vec3 rotate(vec4 q, vec3 v) {
+    vec3 t = 2.0 * cross(q.xyz, v);
+    return v + q.w * t + cross(q.xyz, t);
+}
+
+void main() {
+    vec3 world = rotate(instance_rotation, vertex * instance_scale) + instance_position;
+    vec3 n = rotate(instance_rotation, normal / instance_scale);
+    vec4 eye = gl_ModelViewMatrix * vec4(world, 1.0);
+    vec3 eye_normal = normalize(gl_NormalMatrix * n);
+    vec3 light = normalize(gl_LightSource[0].position.xyz - eye.xyz);
+    float diffuse = max(dot(eye_normal, light), 0.0);
+    shaded = color * (gl_LightSource[0].ambient.rgb + gl_LightSource[0].diffuse.rgb * diffuse);
+    gl_Position = gl_ProjectionMatrix * eye;
+}
+"""
+
+_FRAGMENT_SHADER = """
+#version 120
+varying vec3 shaded;
+
+void main() {
+    gl_FragColor = vec4(shaded, 1.0);
+}
+"""
+
+def box_mesh() -> np.ndarray:
+    """单位盒子(边长1)的三角形网格，每个顶点为位置(3)+法线(3)"""
+    vertices = []
+    for axis in range(3):
+        for sign in (-1.0, 1.0):
+            normal = np.zeros(3)
+            normal[axis] = sign
+            u = np.zeros(3)
+            v = np.zeros(3)
+            u[(axis + 1) % 3] = 1.0
+            v[(axis + 2) % 3] = 1.0
+            if sign < 0.0:
+                u, v = v, u
+            center = normal * 0.5
+            corners = [center + 0.5 * (su * u + sv * v) for su, sv in ((-1, -1), (1, -1), (1, 1), (-1, 1))]
+            for index in (0, 1, 2, 0, 2, 3):
+                vertices.append(np.concatenate([corners[index], normal]))
+    return np.array(vertices, dtype=np.float32)
+
+def sphere_mesh(slices: int = 20, stacks: int = 20) -> np.ndarray:
+    """单位球的三角形网格，每个顶点为位置(3)+法线(3)"""
+    theta = np.linspace(0.0, np.pi, stacks + 1)
+    phi = np.linspace(0.0, 2.0 * np.pi, slices + 1)
+    points = np.stack([
+        np.sin(theta)[:, None] * np.cos(phi)[None, :],
+        np.cos(theta)[:, None] * np.ones_like(phi)[None, :],
+        np.sin(theta)[:, None] * np.sin(phi)[None, :],
+    ], axis=-1)
+    i, j = np.meshgrid(np.arange(stacks), np.arange(slices), indexing='ij')
+    quads = np.stack([points[i, j], points[i, j + 1], points[i + 1, j + 1], points[i + 1, j]], axis=2)
+    triangles = quads[:, :, [0, 1, 2, 0, 2, 3]].reshape(-1, 3)
+    return np.concatenate([triangles, triangles], axis=1).astype(np.float32)
+
+def _ring(segments: int) -> np.ndarray:
+    angles = np.linspace(0.0, 2.0 * np.pi, segments + 1)
+    return np.stack([np.cos(angles), np.zeros_like(angles), np.sin(angles)], axis=1)
+
+def _fan(center: np.ndarray, ring: np.ndarray, normal: np.ndarray) -> list:
+    """以center为中心的三角扇(端面)"""
+    vertices = []
+    for k in range(len(ring) - 1):
+        for point in (center, ring[k + 1], ring[k]) if normal[1] > 0 else (center, ring[k], ring[k + 1]):
+            vertices.append(np.concatenate([point, normal]))
+    return vertices
+
+def cylinder_mesh(segments: int = 24) -> np.ndarray:
+    """单位圆柱(半径1，y从-1到1)的三角形网格，每个顶点为位置(3)+法线(3)"""
+    ring = _ring(segments)
+    top = ring + (0.0, 1.0, 0.0)
+    bottom = ring - (0.0, 1.0, 0.0)
+    vertices = []
+    for k in range(segments):
+        quad = (bottom[k], top[k], top[k + 1], bottom[k + 1])
+        normals = (ring[k], ring[k], ring[k + 1], ring[k + 1])
+        for index in (0, 1, 2, 0, 2, 3):
+            vertices.append(np.concatenate([quad[index], normals[index]]))
+    vertices += _fan(np.array([0.0, 1.0, 0.0]), top, np.array([0.0, 1.0, 0.0]))
+    vertices += _fan(np.array([0.0, -1.0, 0.0]), bottom, np.array([0.0, -1.0, 0.0]))
+    return np.array(vertices, dtype=np.float32)
+
+def cone_mesh(segments: int = 24) -> np.ndarray:
+    """单位圆锥(底面半径1，y=-1处为底面，y=1处为顶点)的三角形网格"""
+    ring = _ring(segments)
+    bottom = ring - (0.0, 1.0, 0.0)
+    apex = np.array([0.0, 1.0, 0.0])
+    # 侧面法线: 径向与竖直方向按斜率合成
+    side_normals = ring * 2.0 + (0.0, 1.0, 0.0)
+    side_normals /= np.linalg.norm(side_normals, axis=1, keepdims=True)
+    vertices = []
+    for k in range(segments):
+        apex_normal = 0.5 * (side_normals[k] + side_normals[k + 1])
+        for point, normal in ((bottom[k], side_normals[k]), (apex, apex_normal), (bottom[k + 1], side_normals[k + 1])):
+            vertices.append(np.concatenate([point, normal]))
+    vertices += _fan(np.array([0.0, -1.0, 0.0]), bottom, np.array([0.0, -1.0, 0.0]))
+    return np.array(vertices, dtype=np.float32)
+
+def grid_lines(size: int = 10, step: float = 1.0) -> np.ndarray:
+    """地面网格的线段端点，每个顶点为位置(3)+颜色(3)"""
+    ticks = np.arange(-size, size + 1) * step
+    extent = size * step
+    lines = []
+    for t in ticks:
+        lines += [(t, 0.0, -extent), (t, 0.0, extent), (-extent, 0.0, t), (extent, 0.0, t)]
+    lines = np.array(lines, dtype=np.float32)
+    return np.concatenate([lines, np.full_like(lines, 0.5)], axis=1)
+
+def axis_lines(length: float = 5.0) -> np.ndarray:
+    """坐标轴的线段端点(X红、Y绿、Z蓝)，每个顶点为位置(3)+颜色(3)"""
+    vertices = []
+    for axis in range(3):
+        end = np.zeros(3)
+        end[axis] = length
+        color = np.zeros(3)
+        color[axis] = 1.0
+        vertices += [np.concatenate([np.zeros(3), color]), np.concatenate([end, color])]
+    return np.array(vertices, dtype=np.float32)
+
+def instance_scales(shape_types: np.ndarray, shape_params: np.ndarray) -> np.ndarray:
+    """按形状参数计算每个实例的缩放 (N,3)"""
+    scales = np.ones((len(shape_types), 3), dtype=np.float32)
+    box = shape_types == ShapeType.BOX
+    scales[box] = shape_params[box, :3] * 2.0
+    sphere = shape_types == ShapeType.SPHERE
+    scales[sphere] = shape_params[sphere, :1]
+    radial = (shape_types == ShapeType.CYLINDER) | (shape_types == ShapeType.CONE)
+    scales[radial] = shape_params[radial][:, [0, 1, 0]]
+    # 平面与立即模式一样画成10x0.01x10的薄板
+    scales[shape_types == ShapeType.PLANE] = (10.0, 0.01, 10.0)
+    return scales
+
+def _rotate(rotations: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+    """用四元数(x,y,z,w)旋转向量"""
+    q = rotations[:, :3]
+    t = 2.0 * np.cross(q, vectors)
+    return vectors + rotations[:, 3:4] * t + np.cross(q, t)
+
+def build_instances(positions: np.ndarray, rotations: np.ndarray, shape_types: np.ndarray,
+                    shape_params: np.ndarray, levels: np.ndarray):
+    """生成实例数据，返回(实例(K,10), [(形状, 网格, 细节层次, 起始, 数量)])
+
+    实例按(形状, 网格, 细节层次)排序，每组对应一次实例化绘制。盒子和平面只有一级网格。
+    """
+    shape_types = np.asarray(shape_types)
+    positions = np.asarray(positions, dtype=np.float32)
+    rotations = np.asarray(rotations, dtype=np.float32)
+    shape_params = np.asarray(shape_params, dtype=np.float32)
+    known = np.isin(shape_types, list(_SHAPE_MESHES))
+    rows = np.flatnonzero(known)
+    meshes = np.array([_SHAPE_MESHES[t] for t in shape_types[rows].tolist()], dtype=np.int32)
+    parts = [(rows, shape_types[rows], meshes, positions[rows], instance_scales(shape_types[rows], shape_params[rows]))]
+
+    # 胶囊体: 中间的圆柱加两端的球
+    capsules = np.flatnonzero(shape_types == ShapeType.CAPSULE)
+    if len(capsules):
+        radius = shape_params[capsules, 0:1]
+        half_height = shape_params[capsules, 1:2]
+        axis = _rotate(rotations[capsules], np.tile((0.0, 1.0, 0.0), (len(capsules), 1))) * half_height
+        types = np.full(len(capsules), ShapeType.CAPSULE, dtype=shape_types.dtype)
+        parts.append((capsules, types, np.full(len(capsules), MESH_CYLINDER, dtype=np.int32),
+                      positions[capsules], np.concatenate([radius, half_height, radius], axis=1)))
+        for sign in (1.0, -1.0):
+            parts.append((capsules, types, np.full(len(capsules), MESH_SPHERE, dtype=np.int32),
+                          positions[capsules] + sign * axis, np.repeat(radius, 3, axis=1)))
+
+    source = np.concatenate([part[0] for part in parts])
+    types = np.concatenate([part[1] for part in parts])
+    meshes = np.concatenate([part[2] for part in parts])
+    instance_levels = np.where(meshes == MESH_BOX, 0, np.asarray(levels)[source])
+    key = (types.astype(np.int64) * 4 + meshes) * 8 + instance_levels
+    order = np.argsort(key, kind='stable')
+
+    instances = np.empty((len(order), INSTANCE_WIDTH), dtype=np.float32)
+    instances[:, 0:3] = np.concatenate([part[3] for part in parts])[order]
+    instances[:, 3:7] = rotations[source[order]]
+    instances[:, 7:10] = np.concatenate([part[4] for part in parts])[order]
+    keys, starts, counts = np.unique(key[order], return_index=True, return_counts=True)
+    groups = [(k // 32, (k // 8) % 4, k % 8, start, count)
+              for k, start, count in zip(keys.tolist(), starts.tolist(), counts.tolist())]
+    return instances, groups
+
+class InstancedRenderer:
+    """保留模式的实例化渲染路径，必须在OpenGL上下文创建之后构造"""
+
+    def __init__(self):
+        self.program = shaders.compileProgram(
+            shaders.compileShader(_VERTEX_SHADER, GL_VERTEX_SHADER),
+            shaders.compileShader(_FRAGMENT_SHADER, GL_FRAGMENT_SHADER),
+        )
+        self.attributes = {name: glGetAttribLocation(self.program, name) for name in
+                           ('vertex', 'normal', 'instance_position', 'instance_rotation', 'instance_scale')}
+        self.color_location = glGetUniformLocation(self.program, 'color')
+
+        # 静态网格: (网格, 细节层次) -> (VBO, 顶点数)
+        self.meshes: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        box = box_mesh()
+        self.meshes[(MESH_BOX, 0)] = (self._static_buffer(box), len(box))
+        for level, (slices, stacks) in enumerate(SPHERE_LODS):
+            mesh = sphere_mesh(slices, stacks)
+            self.meshes[(MESH_SPHERE, level)] = (self._static_buffer(mesh), len(mesh))
+        for level, segments in enumerate(RADIAL_LODS):
+            for kind, build in ((MESH_CYLINDER, cylinder_mesh), (MESH_CONE, cone_mesh)):
+                mesh = build(segments)
+                self.meshes[(kind, level)] = (self._static_buffer(mesh), len(mesh))
+        self.lines = {name: (self._static_buffer(vertices), len(vertices))
+                      for name, vertices in (('grid', grid_lines()), ('axes', axis_lines()))}
+        self.instance_buffer = glGenBuffers(1)
+        self.instance_capacity = 0
+
+    @staticmethod
+    def _static_buffer(data: np.ndarray) -> int:
+        buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        return buffer
+
+    def draw_lines(self, name: str) -> None:
+        """绘制缓存的线段('grid'或'axes')，使用固定管线"""
+        buffer, count = self.lines[name]
+        stride = 6 * 4
+        glDisable(GL_LIGHTING)
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(3, GL_FLOAT, stride, ctypes.c_void_p(0))
+        glColorPointer(3, GL_FLOAT, stride, ctypes.c_void_p(12))
+        glDrawArrays(GL_LINES, 0, count)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glEnable(GL_LIGHTING)
+
+    def draw(self, positions: np.ndarray, rotations: np.ndarray, shape_types: np.ndarray,
+             shape_params: np.ndarray, levels: np.ndarray) -> None:
+        """用(已剔除的)状态数组绘制刚体，levels为每个刚体的细节层次"""
+        if len(shape_types) == 0:
+            return
+        instances, groups = build_instances(positions, rotations, shape_types, shape_params, levels)
+        if len(instances) == 0:
+            return
+
+        # 实例数据整体上传，容量不足时重新分配
+        glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+        if instances.nbytes > self.instance_capacity:
+            self.instance_capacity = instances.nbytes * 2
+            glBufferData(GL_ARRAY_BUFFER, self.instance_capacity, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_ARRAY_BUFFER, 0, instances.nbytes, instances)
+
+        glUseProgram(self.program)
+        attributes = self.attributes
+        for name in attributes.values():
+            glEnableVertexAttribArray(name)
+        for name in ('instance_position', 'instance_rotation', 'instance_scale'):
+            glVertexAttribDivisor(attributes[name], 1)
+
+        stride = INSTANCE_WIDTH * 4
+        for shape_type, mesh_kind, level, start, instance_count in groups:
+            mesh, vertex_count = self.meshes[(mesh_kind, level)]
+            glBindBuffer(GL_ARRAY_BUFFER, mesh)
+            glVertexAttribPointer(attributes['vertex'], 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(0))
+            glVertexAttribPointer(attributes['normal'], 3, GL_FLOAT, GL_FALSE, 24, ctypes.c_void_p(12))
+            # 没有baseInstance时通过偏移属性指针选择本组实例
+            base = start * stride
+            glBindBuffer(GL_ARRAY_BUFFER, self.instance_buffer)
+            glVertexAttribPointer(attributes['instance_position'], 3, GL_FLOAT, GL_FALSE, stride,
+                                  ctypes.c_void_p(base))
+            glVertexAttribPointer(attributes['instance_rotation'], 4, GL_FLOAT, GL_FALSE, stride,
+                                  ctypes.c_void_p(base + 12))
+            glVertexAttribPointer(attributes['instance_scale'], 3, GL_FLOAT, GL_FALSE, stride,
+                                  ctypes.c_void_p(base + 28))
+            glUniform3f(self.color_location, *SHAPE_COLORS[shape_type])
+            glDrawArraysInstanced(GL_TRIANGLES, 0, vertex_count, instance_count)
+
+        for name in ('instance_position', 'instance_rotation', 'instance_scale'):
+            glVertexAttribDivisor(attributes[name], 0)
+        for name in attributes.values():
+            glDisableVertexAttribArray(name)
+        glUseProgram(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def reset_state(self) -> None:
+        """绘制中途出错后尽量恢复固定管线状态，单个调用失败不影响其余恢复"""
+        calls = [lambda name=name: glVertexAttribDivisor(name, 0) for name in self.attributes.values()]
+        calls += [lambda name=name: glDisableVertexAttribArray(name) for name in self.attributes.values()]
+        calls += [lambda: glUseProgram(0), lambda: glBindBuffer(GL_ARRAY_BUFFER, 0),
+                  lambda: glDisableClientState(GL_COLOR_ARRAY), lambda: glDisableClientState(GL_VERTEX_ARRAY),
+                  lambda: glEnable(GL_LIGHTING)]
+        for call in calls:
+            try:
+                call()
+            except Exception:
+                pass
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+场景文件
+
+场景按列保存在一个NPZ文件中: 每个刚体属性是一个数组(形状类型、质量、位置、
+旋转、形状参数、速度、材质等)，另外包含一个JSON清单(格式版本、刚体数量、
+重力和自定义信息)。清单也可以另存为单独的JSON文件，其中"data"字段指向NPZ
+文件，加载时可以直接打开清单。
+
+加载时按块批量创建刚体并加入世界，每块只调用一次create_*和add_bodies，
+然后整列写入其余状态，不逐个创建刚体。
+"""
+
+import json
+import os
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from python.core.enums import BodyType, ShapeType
+
+FORMAT = 'PhysicsSimulatorScene'
+VERSION = 1
+
+# 场景文件中的列: 名称 -> (数据类型, 宽度)；必需列之外的列缺失时使用创建时的默认值
+SCENE_COLUMNS = {
+    'shape_types': (np.int32, 1),
+    'body_types': (np.int32, 1),
+    'masses': (np.float32, 1),
+    'positions': (np.float32, 3),
+    'rotations': (np.float32, 4),
+    'shape_params': (np.float32, 4),
+    'linear_velocities': (np.float32, 3),
+    'angular_velocities': (np.float32, 3),
+    'frictions': (np.float32, 1),
+    'restitutions': (np.float32, 1),
+    'ccd_thresholds': (np.float32, 1),
+}
+REQUIRED_COLUMNS = ('shape_types', 'positions', 'shape_params')
+
+# 创建刚体后直接写入世界的状态列
+STATE_COLUMNS = ('body_types', 'positions', 'rotations', 'linear_velocities', 'angular_velocities',
+                 'frictions', 'restitutions', 'ccd_thresholds')
+
+# 可以批量创建的形状
+SUPPORTED_SHAPES = (ShapeType.BOX, ShapeType.SPHERE, ShapeType.PLANE)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+def scene_columns(world) -> Dict[str, np.ndarray]:
+    """从物理世界拷贝场景文件需要的所有列"""
+    storage = world._storage
+    return {name: storage.view(name).copy() for name in SCENE_COLUMNS}
+
+def write_scene(path: str, columns: Dict[str, np.ndarray], gravity=(0.0, -9.81, 0.0),
+                metadata: Optional[Dict] = None, manifest_path: Optional[str] = None,
+                compress: bool = False) -> Dict:
+    """把按列组织的场景写入NPZ文件，返回清单
+
+    manifest_path不为None时同时把清单写入单独的JSON文件。
+    """
+    count = _validate(columns)
+    manifest = {
+        'format': FORMAT,
+        'version': VERSION,
+        'body_count': count,
+        'gravity': [float(g) for g in gravity],
+        'columns': [name for name in SCENE_COLUMNS if name in columns],
+        **(metadata or {}),
+    }
+    arrays = {name: np.ascontiguousarray(columns[name], dtype=SCENE_COLUMNS[name][0])
+              for name in manifest['columns']}
+    arrays['manifest'] = np.array(json.dumps(manifest, ensure_ascii=False))
+    with open(path, 'wb') as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+    if manifest_path is not None:
+        data = os.path.relpath(os.path.abspath(path), os.path.dirname(os.path.abspath(manifest_path)))
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({**manifest, 'data': data}, f, ensure_ascii=False, indent=2)
+    return manifest
+
+def save_scene(world, path: str, metadata: Optional[Dict] = None, manifest_path: Optional[str] = None,
+               compress: bool = False) -> Dict:
+    """把物理世界中的所有刚体保存为场景文件，返回清单"""
+    gravity = (world.gravity.x, world.gravity.y, world.gravity.z)
+    return write_scene(path, scene_columns(world), gravity, metadata, manifest_path, compress)
+
+def read_scene(path: str) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """读取场景文件(NPZ或清单JSON)，返回(列, 清单)"""
+    override = {}
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            override = json.load(f)
+        if 'data' not in override:
+            raise ValueError(f"场景清单缺少data字段: {path}")
+        path = os.path.join(os.path.dirname(os.path.abspath(path)), override.pop('data'))
+    with np.load(path, allow_pickle=False) as data:
+        if 'manifest' not in data:
+            raise ValueError(f"不是场景文件: {path}")
+        manifest = {**json.loads(str(data['manifest'])), **override}
+        if manifest.get('format') != FORMAT:
+            raise ValueError(f"不是场景文件: {path}")
+        if manifest.get('version', 0) > VERSION:
+            raise ValueError(f"不支持的场景文件版本: {manifest['version']}")
+        columns = {name: data[name] for name in SCENE_COLUMNS if name in data}
+    _validate(columns)
+    return columns, manifest
+
+def create_bodies(columns: Dict[str, np.ndarray], start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+    """按场景中[start, stop)行批量创建刚体(尚未加入世界)，返回与行顺序一致的句柄"""
+    from python.physics_binding import RigidBody
+
+    stop = len(columns['shape_types']) if stop is None else stop
+    shape_types = columns['shape_types'][start:stop]
+    params = columns['shape_params'][start:stop]
+    positions = columns['positions'][start:stop]
+    masses = columns['masses'][start:stop] if 'masses' in columns else np.ones(stop - start, dtype=np.float32)
+    handles = np.zeros(stop - start, dtype=np.int64)
+    for shape in np.unique(shape_types):
+        rows = np.flatnonzero(shape_types == shape)
+        if shape == ShapeType.BOX:
+            handles[rows] = RigidBody.create_boxes(masses[rows], positions[rows], params[rows, :3])
+        elif shape == ShapeType.SPHERE:
+            handles[rows] = RigidBody.create_spheres(masses[rows], positions[rows], params[rows, 0])
+        elif shape == ShapeType.PLANE:
+            handles[rows] = RigidBody.create_planes(params[rows, :3], params[rows, 3])
+    return handles
+
+def add_bodies(world, handles: np.ndarray, columns: Dict[str, np.ndarray], start: int = 0) -> None:
+    """把create_bodies()创建的刚体加入世界，并写入从场景第start行开始的状态列"""
+    storage = world._storage
+    first = storage.count
+    world.add_bodies(handles)
+    rows = slice(first, first + len(handles))
+    for name in STATE_COLUMNS:
+        if name in columns:
+            values = columns[name][start:start + len(handles)]
+            storage.view(name)[rows] = values.reshape(storage.view(name)[rows].shape)
+
+def load_scene(path: str, world=None, backend: str = 'auto', chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """把场景文件中的刚体加入world(为None时新建物理世界并设置重力)，返回物理世界"""
+    from python.physics_binding import PhysicsWorld, Vector3
+
+    columns, manifest = read_scene(path)
+    if world is None:
+        world = PhysicsWorld(backend=backend)
+        world.initialize(Vector3(*manifest.get('gravity', (0.0, -9.81, 0.0))))
+    count = len(columns['shape_types'])
+    for start in range(0, count, max(chunk_size, 1)):
+        stop = min(start + chunk_size, count)
+        add_bodies(world, create_bodies(columns, start, stop), columns, start)
+    return world
+
+def _validate(columns: Dict[str, np.ndarray]) -> int:
+    """检查列是否完整、长度是否一致以及形状是否支持，返回刚体数量"""
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"场景缺少必需的列: {', '.join(missing)}")
+    count = len(columns['shape_types'])
+    for name, values in columns.items():
+        width = SCENE_COLUMNS[name][1]
+        if len(values) != count or (width > 1 and np.shape(values)[1:] != (width,)):
+            raise ValueError(f"列{name}的形状不正确: {np.shape(values)}")
+    unsupported = set(np.unique(columns['shape_types']).tolist()) - set(SUPPORTED_SHAPES)
+    if unsupported:
+        raise ValueError(f"不支持的形状类型: {sorted(unsupported)}")
+    if 'body_types' in columns:
+        valid = (BodyType.DYNAMIC, BodyType.STATIC, BodyType.KINEMATIC)
+        if not np.isin(columns['body_types'], valid).all():
+            raise ValueError("刚体类型不正确")
+    return count
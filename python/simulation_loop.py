@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+独立的模拟线程
+
+SimulationLoop在自己的线程中按实际经过的时间推进物理世界，每步完成后把
+渲染需要的状态(插值后的位置和旋转、形状，开启统计时还有性能样本)发布到FrameBuffer。渲染器只读取
+最近一次完整发布的帧，不直接访问物理世界。其他线程(Tk界面等)对世界的修改
+通过submit()放入命令队列，由模拟线程在两步之间执行。
+
+native后端的步进通过ctypes调用，调用期间释放GIL，渲染线程和界面线程
+可以同时运行。
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, Optional
+
+class Frame:
+    """一帧渲染状态，数组在槽位中复用"""
+
+    def __init__(self):
+        self.count = 0
+        self.step = 0                 # 发布时已完成的步进次数
+        self.time = 0.0               # 发布时的模拟时间
+        self.handles = np.zeros(0, dtype=np.int64)
+        self.positions = np.zeros((0, 3), dtype=np.float32)
+        self.rotations = np.zeros((0, 4), dtype=np.float32)
+        self.shape_types = np.zeros(0, dtype=np.int32)
+        self.shape_params = np.zeros((0, 4), dtype=np.float32)
+        self.profile: Optional[Dict[str, np.ndarray]] = None    # 未开启性能统计时为None
+
+    def fill(self, world, step: int, sim_time: float) -> None:
+        """从物理世界拷贝状态，刚体数量变化时重新分配数组"""
+        count = world.get_body_count()
+        if count != self.count:
+            self.count = count
+            self.handles = np.zeros(count, dtype=np.int64)
+            self.positions = np.zeros((count, 3), dtype=np.float32)
+            self.rotations = np.zeros((count, 4), dtype=np.float32)
+            self.shape_types = np.zeros(count, dtype=np.int32)
+            self.shape_params = np.zeros((count, 4), dtype=np.float32)
+        if count:
+            self.handles[...] = world.get_handles()
+            self.positions[...] = world.get_interpolated_positions()
+            self.rotations[...] = world.get_interpolated_rotations()
+            self.shape_types[...] = world.get_shape_types()
+            self.shape_params[...] = world.get_shape_params()
+        self.profile = world.get_profile() if world.is_profiling() else None
+        self.step = step
+        self.time = sim_time
+
+class FrameBuffer:
+    """单写单读的三缓冲，不使用锁
+
+    写入方总是写入既不是最新帧、也不是读取方正在使用的槽位，写完后发布为最新帧；
+    读取方标记正在使用的槽位后再确认它仍是最新帧，确认失败则重试。
+    (依赖CPython中单个属性读写的原子性)
+    """
+
+    def __init__(self):
+        self._slots = [Frame(), Frame(), Frame()]
+        self._latest = -1
+        self._reading = -1
+
+    def write(self, fill: Callable[[Frame], None]) -> None:
+        """写入方: 用fill填充一个空闲槽位并发布"""
+        busy = (self._latest, self._reading)
+        index = next(i for i in range(3) if i not in busy)
+        fill(self._slots[index])
+        self._latest = index
+
+    def acquire(self) -> Optional[Frame]:
+        """读取方: 获取最近一次完整发布的帧，在下一次acquire()之前保持不变"""
+        while True:
+            index = self._latest
+            if index < 0:
+                return None
+            self._reading = index
+            if self._latest == index:
+                return self._slots[index]
+
+class SimulationLoop:
+    """在独立线程中推进物理世界并发布渲染帧"""
+
+    def __init__(self, world, fixed_time_step: float = 1.0 / 60.0, max_sub_steps: int = 5):
+        self.world = world
+        self.fixed_time_step = fixed_time_step
+        self.max_sub_steps = max_sub_steps
+        self.paused = False
+        self.frames = FrameBuffer()
+        self.step_count = 0
+        self.sim_time = 0.0
+        self.step_time = 0.0          # 上一次step_simulation的耗时（秒）
+        self._commands: queue.SimpleQueue = queue.SimpleQueue()
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, command: Callable, *args) -> None:
+        """把对世界的修改放入命令队列，在模拟线程的两步之间执行"""
+        self._commands.put((command, args))
+
+    def start(self) -> None:
+        """启动模拟线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, name='SimulationLoop', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """停止模拟线程，队列中剩余的命令在线程退出前执行"""
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _apply_commands(self) -> bool:
+        """执行队列中的所有命令，返回是否执行了命令"""
+        applied = False
+        while True:
+            try:
+                command, args = self._commands.get_nowait()
+            except queue.Empty:
+                return applied
+            try:
+                command(*args)
+            except Exception as e:
+                print(f"模拟命令执行失败: {e}")
+            applied = True
+
+    def _publish(self) -> None:
+        self.frames.write(lambda frame: frame.fill(self.world, self.step_count, self.sim_time))
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        self._apply_commands()
+        self._publish()
+        while self._running.is_set():
+            changed = self._apply_commands()
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            if not self.paused:
+                start = time.perf_counter()
+                sub_steps = self.world.step_simulation(elapsed, self.max_sub_steps, self.fixed_time_step)
+                self.step_time = time.perf_counter() - start
+                self.step_count += sub_steps
+                self.sim_time += sub_steps * self.fixed_time_step
+                changed = changed or sub_steps > 0
+            if changed:
+                self._publish()
+            # 等到下一个固定步长
+            time.sleep(max(self.fixed_time_step - (time.perf_counter() - now), 0.001))
+        self._apply_commands()
+        self._publish()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析(main.py --profile-startup)
+
+替换builtins.__import__，记录每个模块第一次导入的总耗时和自身耗时(减去
+其中嵌套导入的模块)，另外可以用stage()记录加载原生库、创建场景等阶段。
+report()按顶层包汇总，并列出自身耗时最长的模块。
+"""
+
+import builtins
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+class StartupProfiler:
+    """记录导入和启动阶段的耗时"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.modules: Dict[str, Tuple[float, float]] = {}   # 模块名 -> (总耗时, 自身耗时)
+        self.stages: List[Tuple[str, float]] = []
+        self._original_import = None
+        self._children: List[float] = []                     # 当前正在导入的模块中嵌套导入的耗时
+
+    def install(self) -> None:
+        """开始记录导入耗时"""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        """停止记录导入耗时"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and not fromlist and name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        count = len(sys.modules)
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._children.pop()
+            if len(sys.modules) > count:
+                # 模块执行完后被重新放到sys.modules的末尾，最后一个就是这次导入的模块
+                loaded = next(reversed(sys.modules))
+                if loaded not in self.modules:
+                    self.modules[loaded] = (elapsed, max(elapsed - nested, 0.0))
+            if self._children:
+                self._children[-1] += time.perf_counter() - start
+
+    @contextmanager
+    def stage(self, name: str):
+        """记录一个启动阶段的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    def report(self, top: int = 15) -> str:
+        """按顶层包汇总的导入耗时、各阶段耗时和自身耗时最长的模块"""
+        packages = defaultdict(float)
+        for name, (_, self_time) in self.modules.items():
+            packages[name.split('.')[0]] += self_time
+        lines = [f"启动耗时: {(time.perf_counter() - self.start) * 1000.0:.1f} ms",
+                 f"导入 (按顶层包，合计 {sum(packages.values()) * 1000.0:.1f} ms):"]
+        for package, elapsed in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+            lines.append(f"  {package:<32}{elapsed * 1000.0:8.1f} ms")
+        if self.stages:
+            lines.append("阶段:")
+            for name, elapsed in self.stages:
+                lines.append(f"  {name:<32}{elapsed * 1000.0:8.1f} ms")
+        lines.append(f"自身耗时最长的{top}个模块:")
+        slowest = sorted(self.modules.items(), key=lambda item: -item[1][1])[:top]
+        for name, (total, self_time) in slowest:
+            lines.append(f"  {name:<32}{self_time * 1000.0:8.1f} ms (含子模块 {total * 1000.0:.1f} ms)")
+        return "\n".join(lines)
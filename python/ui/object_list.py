@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+虚拟化的对象列表
+
+对象数据按列保存在NumPy数组中(句柄、形状类型、位置、质量)，Treeview只包含
+当前可见的若干行，滚动时复用这些行并改写其内容。增删对象是整列的数组操作，
+不逐行插入或删除Treeview条目；选中状态按句柄保存，与行号无关。
+"""
+
+import tkinter as tk
+from tkinter import ttk
+import numpy as np
+from typing import Sequence
+
+from python.core.enums import ShapeType
+
+# 形状类型 -> 列表中显示的名称
+SHAPE_NAMES = {
+    ShapeType.BOX: "盒子",
+    ShapeType.SPHERE: "球体",
+    ShapeType.CAPSULE: "胶囊",
+    ShapeType.CYLINDER: "圆柱",
+    ShapeType.CONE: "圆锥",
+    ShapeType.PLANE: "平面",
+}
+
+class VirtualObjectList(ttk.Frame):
+    """只为可见行创建条目的对象列表"""
+
+    COLUMNS = ("类型", "位置", "质量")
+
+    def __init__(self, master, **kwargs):
+        super().__init__(master, **kwargs)
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", selectmode="extended")
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._handles = np.zeros(0, dtype=np.int64)
+        self._shape_types = np.zeros(0, dtype=np.int32)
+        self._positions = np.zeros((0, 3), dtype=np.float32)
+        self._masses = np.zeros(0, dtype=np.float32)
+        self._selected = set()
+        self._offset = 0
+        self._capacity = 1
+        self._items = []                # 当前可见的Treeview条目
+
+        self.tree.bind("<Configure>", self._on_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_by(-3) or "break")
+        self.tree.bind("<Button-5>", lambda event: self._scroll_by(3) or "break")
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    # 数据
+
+    def append(self, handles, shape_types, positions, masses) -> None:
+        """在末尾批量添加对象"""
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        self._handles = np.concatenate([self._handles, handles])
+        self._shape_types = np.concatenate([self._shape_types, np.asarray(shape_types, dtype=np.int32).reshape(-1)])
+        self._positions = np.concatenate([self._positions, np.asarray(positions, dtype=np.float32).reshape(-1, 3)])
+        self._masses = np.concatenate([self._masses, np.asarray(masses, dtype=np.float32).reshape(-1)])
+        self.refresh()
+
+    def remove(self, handles: Sequence[int]) -> None:
+        """按句柄批量移除对象"""
+        handles = np.asarray(handles, dtype=np.int64).reshape(-1)
+        keep = ~np.isin(self._handles, handles)
+        self._handles = self._handles[keep]
+        self._shape_types = self._shape_types[keep]
+        self._positions = self._positions[keep]
+        self._masses = self._masses[keep]
+        self._selected.difference_update(handles.tolist())
+        self.refresh()
+
+    def clear(self) -> None:
+        """移除所有对象"""
+        self.remove(self._handles)
+
+    def handles(self) -> np.ndarray:
+        """所有对象的句柄"""
+        return self._handles.copy()
+
+    def selected_handles(self) -> np.ndarray:
+        """选中对象的句柄"""
+        return np.fromiter(self._selected, dtype=np.int64, count=len(self._selected))
+
+    def visible_handles(self) -> np.ndarray:
+        """当前可见行的句柄"""
+        return self._handles[self._offset:self._offset + len(self._items)].copy()
+
+    def update_positions(self, handles: np.ndarray, positions: np.ndarray) -> None:
+        """用整体状态数组中的位置更新可见行的对象"""
+        if not len(handles) or not len(self._items):
+            return
+        rows = np.arange(self._offset, self._offset + len(self._items))
+        order = np.argsort(handles)
+        sorted_handles = handles[order]
+        index = np.minimum(np.searchsorted(sorted_handles, self._handles[rows]), len(sorted_handles) - 1)
+        found = sorted_handles[index] == self._handles[rows]
+        self._positions[rows[found]] = positions[order[index[found]]]
+        self.refresh()
+
+    # 显示
+
+    def refresh(self) -> None:
+        """按当前的滚动位置重绘可见行"""
+        count = len(self._handles)
+        self._offset = max(min(self._offset, count - self._capacity), 0)
+        visible = min(self._capacity, count - self._offset)
+        while len(self._items) < visible:
+            self._items.append(self.tree.insert("", "end"))
+        if len(self._items) > visible:
+            self.tree.delete(*self._items[visible:])
+            del self._items[visible:]
+
+        selected = []
+        for i, item in enumerate(self._items):
+            row = self._offset + i
+            x, y, z = self._positions[row].tolist()
+            values = (SHAPE_NAMES.get(int(self._shape_types[row]), "未知"), f"({x:.1f}, {y:.1f}, {z:.1f})",
+                      f"{float(self._masses[row]):g}")
+            if self.tree.item(item, "values") != values:
+                self.tree.item(item, values=values)
+            if int(self._handles[row]) in self._selected:
+                selected.append(item)
+
+        # 选中事件在之后处理，此时读取到的选中状态与_selected一致
+        self.tree.selection_set(selected)
+        if count:
+            self.scrollbar.set(self._offset / count, (self._offset + visible) / count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_select(self, event) -> None:
+        selection = set(self.tree.selection())
+        for i, item in enumerate(self._items):
+            handle = int(self._handles[self._offset + i])
+            if item in selection:
+                self._selected.add(handle)
+            else:
+                self._selected.discard(handle)
+
+    def _on_configure(self, event) -> None:
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # 减去表头的高度
+        capacity = max((event.height - row_height - 4) // row_height, 1)
+        if capacity != self._capacity:
+            self._capacity = capacity
+            self.refresh()
+
+    def _on_wheel(self, event) -> str:
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_by(self, rows: int) -> None:
+        self._offset += rows
+        self.refresh()
+
+    def _on_scroll(self, *args) -> None:
+        """滚动条回调: ('moveto', 比例) 或 ('scroll', 数量, 'units'/'pages')"""
+        count = len(self._handles)
+        if args[0] == 'moveto':
+            self._offset = int(float(args[1]) * count)
+        elif args[0] == 'scroll':
+            step = self._capacity if args[2] == 'pages' else 1
+            self._offset += int(args[1]) * step
+        self.refresh()
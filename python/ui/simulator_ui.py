@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
+import queue
 import sys
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -12,11 +13,16 @@ import numpy as np
 # 添加项目根目录到路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from python.physics_binding import Vector3, Quaternion, RigidBody, PhysicsWorld, BodyType, ShapeType
-from python.renderer.gl_renderer import GLRenderer
+from python.simulation_loop import SimulationLoop
+from python.ui.object_list import VirtualObjectList
+from python import scene_file
 
 class PhysicsSimulatorUI:
     """物理模拟器UI类"""
     
+    # 对象列表中可见行位置的刷新间隔（毫秒）
+    LIST_REFRESH_MS = 250
+    
     def __init__(self, root):
         """初始化UI"""
         self.root = root
@@ -27,6 +33,10 @@ class PhysicsSimulatorUI:
         self.physics_world = PhysicsWorld()
         self.physics_world.initialize()
         
+        # 物理世界只在模拟线程中修改，界面的操作通过命令队列提交
+        self.simulation = SimulationLoop(self.physics_world)
+        self.simulation.start()
+        
         # 创建渲染器
         self.renderer = None
         self.render_thread = None
@@ -34,11 +44,24 @@ class PhysicsSimulatorUI:
         # 创建UI组件
         self.create_widgets()
         
-        # 示例对象列表
-        self.objects = []
+        # 定时从模拟线程读取可见对象的位置
+        self._position_capture = None
+        # 模拟线程创建或清除刚体后对对象列表的修改，按执行顺序由界面线程在刷新时应用
+        self._list_updates: queue.SimpleQueue = queue.SimpleQueue()
+        self.root.after(self.LIST_REFRESH_MS, self.update_object_list)
     
     def create_widgets(self):
         """创建UI组件"""
+        # 菜单栏
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="打开场景…", command=self.open_scene)
+        file_menu.add_command(label="保存场景…", command=self.save_scene)
+        file_menu.add_separator()
+        file_menu.add_command(label="退出", command=self.root.quit)
+        menubar.add_cascade(label="文件", menu=file_menu)
+        self.root.config(menu=menubar)
+        
         # 创建主框架
         main_frame = ttk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -130,10 +153,7 @@ class PhysicsSimulatorUI:
         list_frame = ttk.LabelFrame(control_frame, text="对象列表")
         list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        self.object_list = ttk.Treeview(list_frame, columns=("类型", "位置", "质量"), show="headings")
-        self.object_list.heading("类型", text="类型")
-        self.object_list.heading("位置", text="位置")
-        self.object_list.heading("质量", text="质量")
+        self.object_list = VirtualObjectList(list_frame)
         self.object_list.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # 删除对象按钮
@@ -170,44 +190,125 @@ class PhysicsSimulatorUI:
         """创建物理对象"""
         obj_type = self.obj_type.get()
         position = Vector3(self.pos_x.get(), self.pos_y.get(), self.pos_z.get())
+        size = Vector3(self.size_x.get(), self.size_y.get(), self.size_z.get())
         mass = self.mass.get()
         
-        body = None
-        
         if obj_type == "盒子":
-            half_extents = Vector3(self.size_x.get(), self.size_y.get(), self.size_z.get())
-            body = RigidBody.create_box(mass, position, half_extents)
-            obj_info = {"type": "盒子", "position": position, "half_extents": half_extents, "mass": mass}
-        
+            shape_type = ShapeType.BOX
+            create = lambda: RigidBody.create_box(mass, position, size)
         elif obj_type == "球体":
-            radius = self.size_x.get()
-            body = RigidBody.create_sphere(mass, position, radius)
-            obj_info = {"type": "球体", "position": position, "radius": radius, "mass": mass}
-        
+            shape_type = ShapeType.SPHERE
+            create = lambda: RigidBody.create_sphere(mass, position, size.x)
         elif obj_type == "平面":
-            normal = Vector3(self.size_x.get(), self.size_y.get(), self.size_z.get())
-            constant = 0.0  # 平面常数，通常为0
-            body = RigidBody.create_plane(normal, constant)
-            obj_info = {"type": "平面", "normal": normal, "constant": constant, "mass": 0.0}
+            shape_type = ShapeType.PLANE
+            mass = 0.0
+            create = lambda: RigidBody.create_plane(size, 0.0)  # 平面常数，通常为0
+        else:
+            return
         
-        if body:
+        def add():
+            # 创建和加入都在模拟线程中完成，句柄池和未加入世界的存储只由模拟线程修改
+            body = create()
             self.physics_world.add_rigid_body(body)
-            self.objects.append((body, obj_info))
-            
-            # 更新对象列表
-            pos_str = f"({position.x:.1f}, {position.y:.1f}, {position.z:.1f})"
-            self.object_list.insert("", "end", values=(obj_type, pos_str, mass))
+            self._list_updates.put((self.object_list.append, ([body.handle], [shape_type],
+                                                              [(position.x, position.y, position.z)], [mass])))
+        
+        self.simulation.submit(add)
+    
+    def open_scene(self):
+        """从场景文件加载刚体，替换当前场景"""
+        path = filedialog.askopenfilename(title="打开场景", filetypes=[("场景文件", "*.npz *.json"), ("所有文件", "*.*")])
+        if not path:
+            return
+        try:
+            columns, manifest = scene_file.read_scene(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("错误", f"无法打开场景: {e}")
+            return
+        gravity = Vector3(*manifest.get('gravity', (0.0, -9.81, 0.0)))
+        self.gravity_x.set(gravity.x)
+        self.gravity_y.set(gravity.y)
+        self.gravity_z.set(gravity.z)
+        self.reset_simulation()
+        
+        def load():
+            # 刚体的创建和加入都由模拟线程完成
+            handles = scene_file.create_bodies(columns)
+            scene_file.add_bodies(self.physics_world, handles, columns)
+            masses = columns['masses'] if 'masses' in columns else np.ones(len(handles))
+            self._list_updates.put((self.object_list.append,
+                                    (handles, columns['shape_types'], columns['positions'], masses)))
+        
+        self.simulation.submit(load)
+    
+    def save_scene(self):
+        """把当前场景中的所有刚体保存为场景文件"""
+        path = filedialog.asksaveasfilename(title="保存场景", defaultextension=".npz",
+                                            filetypes=[("场景文件", "*.npz")])
+        if not path:
+            return
+        # 在模拟线程的两步之间拷贝状态，保证保存的是同一步的完整状态
+        captured = {}
+        done = threading.Event()
+        
+        def capture():
+            world = self.physics_world
+            captured['columns'] = scene_file.scene_columns(world)
+            captured['gravity'] = (world.gravity.x, world.gravity.y, world.gravity.z)
+            done.set()
+        
+        self.simulation.submit(capture)
+        if not done.wait(5.0):
+            messagebox.showerror("错误", "模拟线程没有响应，场景未保存")
+            return
+        try:
+            scene_file.write_scene(path, captured['columns'], captured['gravity'])
+        except OSError as e:
+            messagebox.showerror("错误", f"无法保存场景: {e}")
     
     def delete_object(self):
         """删除选中的物理对象"""
-        selected = self.object_list.selection()
-        if selected:
-            index = self.object_list.index(selected[0])
-            if 0 <= index < len(self.objects):
-                body, _ = self.objects[index]
-                self.physics_world.remove_rigid_body(body)
-                del self.objects[index]
-                self.object_list.delete(selected[0])
+        handles = self.object_list.selected_handles()
+        if len(handles):
+            self.simulation.submit(self._destroy_bodies, handles)
+            self.object_list.remove(handles)
+    
+    def _destroy_bodies(self, handles):
+        """在模拟线程中把刚体移出世界并销毁，释放它们的槽位"""
+        self.physics_world.remove_bodies(handles)
+        RigidBody.destroy_bodies(handles)
+    
+    def update_object_list(self):
+        """定时刷新对象列表中可见行的位置
+
+        位置由模拟线程在两步之间拷贝(只拷贝可见的对象)，界面线程在下一次刷新时读取，
+        不等待模拟线程。模拟线程中新建或清除的对象也在这里加入或移出列表。
+        """
+        while True:
+            try:
+                update, args = self._list_updates.get_nowait()
+            except queue.Empty:
+                break
+            update(*args)
+        capture = self._position_capture
+        if capture is not None and capture.get('done'):
+            self.object_list.update_positions(capture['handles'], capture['positions'])
+            capture = None
+        if capture is None:
+            visible = self.object_list.visible_handles()
+            if len(visible):
+                capture = {'visible': visible}
+                self.simulation.submit(self._capture_positions, capture)
+        self._position_capture = capture
+        self.root.after(self.LIST_REFRESH_MS, self.update_object_list)
+    
+    def _capture_positions(self, capture):
+        """在模拟线程中拷贝可见对象的句柄和位置"""
+        handles = self.physics_world.get_handles()
+        found = np.isin(handles, capture['visible'])
+        capture['handles'] = handles[found]
+        capture['positions'] = self.physics_world.get_positions()[found]
+        capture['done'] = True
     
     def start_renderer(self):
         """启动渲染器"""
@@ -222,32 +323,37 @@ class PhysicsSimulatorUI:
     
     def run_renderer(self):
         """运行渲染器"""
+        # OpenGL在第一次打开渲染窗口时才导入
+        from python.renderer.gl_renderer import GLRenderer
         self.renderer = GLRenderer()
-        self.renderer.set_physics_world(self.physics_world)
+        self.renderer.set_simulation(self.simulation)
         self.renderer.run()
     
     def start_simulation(self):
         """开始模拟"""
+        self.simulation.paused = False
         if self.renderer:
             self.renderer.paused = False
     
     def pause_simulation(self):
         """暂停模拟"""
+        self.simulation.paused = True
         if self.renderer:
             self.renderer.paused = True
     
     def reset_simulation(self):
         """重置模拟"""
-        # 清除所有对象
-        for body, _ in self.objects:
-            self.physics_world.remove_rigid_body(body)
+        gravity = Vector3(self.gravity_x.get(), self.gravity_y.get(), self.gravity_z.get())
         
-        self.objects.clear()
-        self.object_list.delete(*self.object_list.get_children())
+        def reset():
+            # 清除世界中的所有对象，包括尚未出现在列表中的
+            self._destroy_bodies(self.physics_world.get_handles())
+            self._list_updates.put((self.object_list.clear, ()))
+            # 重新初始化物理世界
+            self.physics_world.initialize(gravity)
         
-        # 重新初始化物理世界
-        gravity = Vector3(self.gravity_x.get(), self.gravity_y.get(), self.gravity_z.get())
-        self.physics_world.initialize(gravity)
+        self.simulation.submit(reset)
+        self.object_list.clear()
 
 def main():
     """主函数"""
@@ -0,0 +1,339 @@
+#include "Broadphase.h"
+#include "ContinuousCollision.h"
+#include "RigidBody.h"
+#include "TaskPool.h"
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// AABB外扩量，让即将接触的刚体提前进入候选对
+const float AABB_MARGIN = 0.02f;
+// 并行时每块的刚体数量和格子数量
+const std::size_t BODY_GRAIN = 256;
+const std::size_t CELL_GRAIN = 256;
+
+/**
+ * @brief 四元数(x,y,z,w)转旋转矩阵（行主序）
+ */
+void toMatrix(const float q[4], float m[9]) {
+    float x = q[0], y = q[1], z = q[2], w = q[3];
+    m[0] = 1.0f - 2.0f * (y * y + z * z);
+    m[1] = 2.0f * (x * y - z * w);
+    m[2] = 2.0f * (x * z + y * w);
+    m[3] = 2.0f * (x * y + z * w);
+    m[4] = 1.0f - 2.0f * (x * x + z * z);
+    m[5] = 2.0f * (y * z - x * w);
+    m[6] = 2.0f * (x * z - y * w);
+    m[7] = 2.0f * (y * z + x * w);
+    m[8] = 1.0f - 2.0f * (x * x + y * y);
+}
+
+std::uint64_t cellKey(std::int64_t x, std::int64_t y, std::int64_t z) {
+    return static_cast<std::uint64_t>((x * 73856093) ^ (y * 19349663) ^ (z * 83492791));
+}
+
+void addPair(std::vector<std::int32_t>& pairs, std::int32_t a, std::int32_t b) {
+    pairs.push_back(std::min(a, b));
+    pairs.push_back(std::max(a, b));
+}
+
+} // namespace
+
+Broadphase::Broadphase()
+    : m_algorithm(BroadphaseAlgorithm::SWEEP_AND_PRUNE), m_cellSize(0.0f), m_buildTime(0.0), m_axis(0) {
+}
+
+void Broadphase::setAlgorithm(BroadphaseAlgorithm algorithm, float cellSize) {
+    m_algorithm = algorithm;
+    m_cellSize = cellSize;
+    m_order.clear();
+    m_bodies.clear();
+}
+
+BroadphaseAlgorithm Broadphase::getAlgorithm() const {
+    return m_algorithm;
+}
+
+const std::vector<std::int32_t>& Broadphase::getPairs() const {
+    return m_pairs;
+}
+
+std::size_t Broadphase::getPairCount() const {
+    return m_pairs.size() / 2;
+}
+
+double Broadphase::getBuildTime() const {
+    return m_buildTime;
+}
+
+void Broadphase::update(const BodyArrays& bodies, TaskPool& pool, float dt) {
+    auto start = std::chrono::steady_clock::now();
+    m_pairs.clear();
+
+    if (bodies.count > 1) {
+        computeAabbs(bodies, dt, pool);
+        if (m_finite.size() > 1) {
+            if (m_algorithm == BroadphaseAlgorithm::SWEEP_AND_PRUNE) {
+                sweepAndPrune(pool);
+            } else {
+                spatialHash(pool);
+            }
+        }
+        if (!m_planes.empty() && !m_finite.empty()) {
+            planePairs(bodies, pool);
+        }
+        sortPairs();
+    }
+
+    m_buildTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+void Broadphase::collectPairs(TaskPool& pool, std::size_t count, std::size_t grain, const PairVisitor& visit) {
+    // 各块的候选对按块号顺序合并，结果与线程数无关
+    std::size_t chunks = TaskPool::chunkCount(count, grain);
+    if (m_chunkPairs.size() < chunks) {
+        m_chunkPairs.resize(chunks);
+    }
+    pool.parallelFor(count, grain, [&](std::size_t begin, std::size_t end) {
+        std::vector<std::int32_t>& out = m_chunkPairs[begin / grain];
+        out.clear();
+        visit(begin, end, out);
+    });
+    for (std::size_t c = 0; c < chunks; ++c) {
+        m_pairs.insert(m_pairs.end(), m_chunkPairs[c].begin(), m_chunkPairs[c].end());
+    }
+}
+
+void Broadphase::computeAabbs(const BodyArrays& bodies, float dt, TaskPool& pool) {
+    std::size_t n = bodies.count;
+    m_mins.resize(n * 3);
+    m_maxs.resize(n * 3);
+    m_active.resize(n);
+    m_finite.clear();
+    m_planes.clear();
+
+    pool.parallelFor(n, BODY_GRAIN, [&](std::size_t begin, std::size_t end) {
+        for (std::size_t i = begin; i < end; ++i) {
+            computeAabb(bodies, i, dt);
+        }
+    });
+    for (std::size_t i = 0; i < n; ++i) {
+        bool plane = static_cast<ShapeType>(bodies.shapeTypes[i]) == ShapeType::PLANE;
+        (plane ? m_planes : m_finite).push_back(static_cast<std::int32_t>(i));
+    }
+}
+
+void Broadphase::computeAabb(const BodyArrays& bodies, std::size_t i, float dt) {
+    m_active[i] = bodies.bodyTypes[i] == static_cast<std::int32_t>(BodyType::DYNAMIC) && bodies.masses[i] > 0.0f;
+
+    ShapeType shape = static_cast<ShapeType>(bodies.shapeTypes[i]);
+    if (shape == ShapeType::PLANE) {
+        return;
+    }
+
+    const float* params = bodies.shapeParams + i * 4;
+    float extents[3];
+    if (shape == ShapeType::SPHERE) {
+        extents[0] = extents[1] = extents[2] = params[0];
+    } else {
+        // 局部半尺寸: 盒子为参数本身，圆柱/圆锥为(r,h,r)，胶囊为(r,h+r,r)
+        float local[3] = {params[0], params[1], params[2]};
+        if (shape == ShapeType::CYLINDER || shape == ShapeType::CONE || shape == ShapeType::CAPSULE) {
+            local[2] = params[0];
+        }
+        if (shape == ShapeType::CAPSULE) {
+            local[1] += params[0];
+        }
+        float m[9];
+        toMatrix(bodies.rotations + i * 4, m);
+        for (int r = 0; r < 3; ++r) {
+            extents[r] = std::fabs(m[r * 3]) * local[0] +
+                         std::fabs(m[r * 3 + 1]) * local[1] +
+                         std::fabs(m[r * 3 + 2]) * local[2];
+        }
+    }
+
+    for (int k = 0; k < 3; ++k) {
+        float center = bodies.positions[i * 3 + k];
+        m_mins[i * 3 + k] = center - extents[k] - AABB_MARGIN;
+        m_maxs[i * 3 + k] = center + extents[k] + AABB_MARGIN;
+    }
+    if (dt > 0.0f && isFastBody(bodies, i, dt)) {
+        for (int k = 0; k < 3; ++k) {
+            float motion = bodies.linearVelocities[i * 3 + k] * dt;
+            (motion < 0.0f ? m_mins : m_maxs)[i * 3 + k] += motion;
+        }
+    }
+}
+
+bool Broadphase::overlaps(std::int32_t a, std::int32_t b) const {
+    for (int k = 0; k < 3; ++k) {
+        if (m_mins[a * 3 + k] > m_maxs[b * 3 + k] || m_mins[b * 3 + k] > m_maxs[a * 3 + k]) {
+            return false;
+        }
+    }
+    return true;
+}
+
+void Broadphase::sortPairs() {
+    // 按(a,b)排序并去重，保证结果与算法无关
+    std::vector<std::uint64_t> keys(m_pairs.size() / 2);
+    for (std::size_t i = 0; i < keys.size(); ++i) {
+        keys[i] = (static_cast<std::uint64_t>(m_pairs[i * 2]) << 32) |
+                  static_cast<std::uint32_t>(m_pairs[i * 2 + 1]);
+    }
+    std::sort(keys.begin(), keys.end());
+    keys.erase(std::unique(keys.begin(), keys.end()), keys.end());
+
+    m_pairs.resize(keys.size() * 2);
+    for (std::size_t i = 0; i < keys.size(); ++i) {
+        m_pairs[i * 2] = static_cast<std::int32_t>(keys[i] >> 32);
+        m_pairs[i * 2 + 1] = static_cast<std::int32_t>(keys[i] & 0xffffffffu);
+    }
+}
+
+void Broadphase::sweepAndPrune(TaskPool& pool) {
+    if (m_order.empty() || m_bodies != m_finite) {
+        // 刚体集合变化时重新选择扫掠轴(中心分布最分散的轴)
+        double sum[3] = {0.0, 0.0, 0.0};
+        double sumSq[3] = {0.0, 0.0, 0.0};
+        for (std::int32_t i : m_finite) {
+            for (int k = 0; k < 3; ++k) {
+                double c = 0.5 * (m_mins[i * 3 + k] + m_maxs[i * 3 + k]);
+                sum[k] += c;
+                sumSq[k] += c * c;
+            }
+        }
+        double count = static_cast<double>(m_finite.size());
+        double best = -1.0;
+        for (int k = 0; k < 3; ++k) {
+            double variance = sumSq[k] / count - (sum[k] / count) * (sum[k] / count);
+            if (variance > best) {
+                best = variance;
+                m_axis = k;
+            }
+        }
+        m_order = m_finite;
+        m_bodies = m_finite;
+    }
+
+    // 在上一帧顺序的基础上做插入排序，刚体移动不大时接近线性
+    const int axis = m_axis;
+    for (std::size_t i = 1; i < m_order.size(); ++i) {
+        std::int32_t body = m_order[i];
+        float key = m_mins[body * 3 + axis];
+        std::size_t j = i;
+        while (j > 0 && m_mins[m_order[j - 1] * 3 + axis] > key) {
+            m_order[j] = m_order[j - 1];
+            --j;
+        }
+        m_order[j] = body;
+    }
+
+    // 排序后各刚体的扫描互不依赖，按排序位置分块并行
+    collectPairs(pool, m_order.size(), BODY_GRAIN,
+                 [&](std::size_t begin, std::size_t end, std::vector<std::int32_t>& out) {
+        for (std::size_t i = begin; i < end; ++i) {
+            std::int32_t a = m_order[i];
+            float last = m_maxs[a * 3 + axis];
+            for (std::size_t j = i + 1; j < m_order.size(); ++j) {
+                std::int32_t b = m_order[j];
+                if (m_mins[b * 3 + axis] > last) {
+                    break;
+                }
+                if ((m_active[a] || m_active[b]) && overlaps(a, b)) {
+                    addPair(out, a, b);
+                }
+            }
+        }
+    });
+}
+
+void Broadphase::spatialHash(TaskPool& pool) {
+    float cell = m_cellSize;
+    if (cell <= 0.0f) {
+        for (std::int32_t i : m_finite) {
+            for (int k = 0; k < 3; ++k) {
+                cell = std::max(cell, m_maxs[i * 3 + k] - m_mins[i * 3 + k]);
+            }
+        }
+    }
+
+    // 每个刚体登记到AABB覆盖的所有格子中
+    std::vector<std::pair<std::uint64_t, std::int32_t>> entries;
+    entries.reserve(m_finite.size() * 8);
+    for (std::int32_t i : m_finite) {
+        std::int64_t lo[3];
+        std::int64_t hi[3];
+        for (int k = 0; k < 3; ++k) {
+            lo[k] = static_cast<std::int64_t>(std::floor(m_mins[i * 3 + k] / cell));
+            hi[k] = static_cast<std::int64_t>(std::floor(m_maxs[i * 3 + k] / cell));
+        }
+        for (std::int64_t x = lo[0]; x <= hi[0]; ++x) {
+            for (std::int64_t y = lo[1]; y <= hi[1]; ++y) {
+                for (std::int64_t z = lo[2]; z <= hi[2]; ++z) {
+                    entries.emplace_back(cellKey(x, y, z), i);
+                }
+            }
+        }
+    }
+
+    // 每个格子在排序后的条目中的起点，最后附加一个终点
+    std::sort(entries.begin(), entries.end());
+    std::vector<std::size_t> cells;
+    for (std::size_t i = 0; i < entries.size(); ++i) {
+        if (i == 0 || entries[i].first != entries[i - 1].first) {
+            cells.push_back(i);
+        }
+    }
+    cells.push_back(entries.size());
+
+    // 同一格子内的条目两两配对，各格子互不依赖，按格子分块并行
+    collectPairs(pool, cells.size() - 1, CELL_GRAIN,
+                 [&](std::size_t first, std::size_t last, std::vector<std::int32_t>& out) {
+        for (std::size_t cell = first; cell < last; ++cell) {
+            std::size_t begin = cells[cell];
+            std::size_t end = cells[cell + 1];
+            for (std::size_t i = begin; i < end; ++i) {
+                for (std::size_t j = i + 1; j < end; ++j) {
+                    std::int32_t a = entries[i].second;
+                    std::int32_t b = entries[j].second;
+                    if (a != b && (m_active[a] || m_active[b]) && overlaps(a, b)) {
+                        addPair(out, a, b);
+                    }
+                }
+            }
+        }
+    });
+}
+
+void Broadphase::planePairs(const BodyArrays& bodies, TaskPool& pool) {
+    // 平面与AABB的半空间测试，按刚体分块并行
+    collectPairs(pool, m_finite.size(), BODY_GRAIN,
+                 [&](std::size_t begin, std::size_t end, std::vector<std::int32_t>& out) {
+        for (std::int32_t p : m_planes) {
+            const float* plane = bodies.shapeParams + p * 4;
+            for (std::size_t f = begin; f < end; ++f) {
+                std::int32_t i = m_finite[f];
+                if (!m_active[i]) {
+                    continue;
+                }
+                float distance = -plane[3];
+                for (int k = 0; k < 3; ++k) {
+                    float center = 0.5f * (m_mins[i * 3 + k] + m_maxs[i * 3 + k]);
+                    float extent = 0.5f * (m_maxs[i * 3 + k] - m_mins[i * 3 + k]);
+                    distance += center * plane[k] - extent * std::fabs(plane[k]);
+                }
+                if (distance <= 0.0f) {
+                    addPair(out, p, i);
+                }
+            }
+        }
+    });
+}
+
+} // namespace PhysicsSimulator
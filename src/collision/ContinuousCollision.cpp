@@ -0,0 +1,188 @@
+#include "ContinuousCollision.h"
+#include "RigidBody.h"
+#include "TaskPool.h"
+#include "Vector3.h"
+#include <algorithm>
+#include <cmath>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// 保守推进停止的距离，小于细检测的接触外扩量，下一步一定会生成接触
+const float CCD_TOLERANCE = 0.01f;
+// 保守推进的最大迭代次数，用完时取已推进到的时刻（仍然是保守的）
+const int CCD_MAX_ITERATIONS = 16;
+// 并行时每块的快速刚体数量
+const std::size_t FAST_GRAIN = 16;
+
+Vector3 vec3(const float* v) {
+    return Vector3(v[0], v[1], v[2]);
+}
+
+/**
+ * @brief 扫掠用的内切球半径：球体为半径，盒体为最小的半尺寸
+ */
+float sweptRadius(const BodyArrays& bodies, std::size_t i) {
+    const float* params = bodies.shapeParams + i * 4;
+    if (static_cast<ShapeType>(bodies.shapeTypes[i]) == ShapeType::SPHERE) {
+        return params[0];
+    }
+    return std::min(params[0], std::min(params[1], params[2]));
+}
+
+/**
+ * @brief 点到刚体表面的有符号距离（内部为负），不支持的形状返回无穷大
+ */
+float signedDistance(const BodyArrays& bodies, std::int32_t row, const Vector3& point) {
+    const float* params = bodies.shapeParams + row * 4;
+    Vector3 rel = point - vec3(bodies.positions + row * 3);
+    switch (static_cast<ShapeType>(bodies.shapeTypes[row])) {
+        case ShapeType::SPHERE:
+            return rel.length() - params[0];
+        case ShapeType::PLANE:
+            return point.dot(vec3(params)) - params[3];
+        case ShapeType::BOX: {
+            // 在盒子局部坐标系中求到各面的距离
+            const float* q = bodies.rotations + row * 4;
+            float x = q[0], y = q[1], z = q[2], w = q[3];
+            Vector3 axes[3] = {
+                Vector3(1.0f - 2.0f * (y * y + z * z), 2.0f * (x * y + z * w), 2.0f * (x * z - y * w)),
+                Vector3(2.0f * (x * y - z * w), 1.0f - 2.0f * (x * x + z * z), 2.0f * (y * z + x * w)),
+                Vector3(2.0f * (x * z + y * w), 2.0f * (y * z - x * w), 1.0f - 2.0f * (x * x + y * y)),
+            };
+            float outside = 0.0f;
+            float inside = -INFINITY;
+            for (int k = 0; k < 3; ++k) {
+                float d = std::fabs(rel.dot(axes[k])) - params[k];
+                outside += d > 0.0f ? d * d : 0.0f;
+                inside = std::max(inside, d);
+            }
+            return inside > 0.0f ? std::sqrt(outside) : inside;
+        }
+        default:
+            return INFINITY;
+    }
+}
+
+/**
+ * @brief 快速刚体a的内切球沿相对位移到刚体b的碰撞时刻，范围[0,1]，1表示本步不碰撞
+ *
+ * 起点已经接触或穿透时返回1，由已有的接触处理。
+ */
+float timeOfImpact(const BodyArrays& bodies, std::int32_t a, std::int32_t b, float dt) {
+    Vector3 motion = vec3(bodies.linearVelocities + a * 3);
+    if (bodies.sleepIslands[b] == 0) {
+        motion = motion - vec3(bodies.linearVelocities + b * 3);
+    }
+    motion = motion * dt;
+    float length = motion.length();
+    if (length <= 0.0f) {
+        return 1.0f;
+    }
+    Vector3 start = vec3(bodies.positions + a * 3);
+    float radius = sweptRadius(bodies, a);
+    float t = 0.0f;
+    for (int iteration = 0; iteration < CCD_MAX_ITERATIONS; ++iteration) {
+        float distance = signedDistance(bodies, b, start + motion * t) - radius;
+        if (distance <= CCD_TOLERANCE) {
+            return iteration == 0 ? 1.0f : t;
+        }
+        // 距离的减小速度不超过位移长度，前进distance/length不会越过表面
+        t += distance / length;
+        if (t >= 1.0f) {
+            return 1.0f;
+        }
+    }
+    return t;
+}
+
+} // namespace
+
+bool isFastBody(const BodyArrays& bodies, std::size_t i, float dt) {
+    float threshold = bodies.ccdThresholds[i];
+    if (threshold <= 0.0f || bodies.sleepIslands[i] != 0 ||
+        bodies.bodyTypes[i] != static_cast<std::int32_t>(BodyType::DYNAMIC) || bodies.masses[i] <= 0.0f) {
+        return false;
+    }
+    ShapeType shape = static_cast<ShapeType>(bodies.shapeTypes[i]);
+    if (shape != ShapeType::SPHERE && shape != ShapeType::BOX) {
+        return false;
+    }
+    return vec3(bodies.linearVelocities + i * 3).length() * dt > threshold;
+}
+
+ContinuousCollision::ContinuousCollision() : m_clampedCount(0) {
+}
+
+std::size_t ContinuousCollision::getClampedCount() const {
+    return m_clampedCount;
+}
+
+void ContinuousCollision::update(const BodyArrays& bodies, const std::int32_t* pairs, std::size_t pairCount,
+                                 float dt, TaskPool& pool) {
+    m_clampedCount = 0;
+    m_fast.clear();
+    if (dt <= 0.0f) {
+        return;
+    }
+    m_fastIndex.assign(bodies.count, -1);
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        if (isFastBody(bodies, i, dt)) {
+            m_fastIndex[i] = static_cast<std::int32_t>(m_fast.size());
+            m_fast.push_back(static_cast<std::int32_t>(i));
+        }
+    }
+    if (m_fast.empty()) {
+        return;
+    }
+
+    // 按快速刚体整理候选刚体（CSR）
+    m_offsets.assign(m_fast.size() + 1, 0);
+    for (std::size_t p = 0; p < pairCount; ++p) {
+        for (int end = 0; end < 2; ++end) {
+            std::int32_t index = m_fastIndex[pairs[p * 2 + end]];
+            if (index >= 0) {
+                ++m_offsets[index + 1];
+            }
+        }
+    }
+    for (std::size_t k = 0; k < m_fast.size(); ++k) {
+        m_offsets[k + 1] += m_offsets[k];
+    }
+    m_candidates.resize(m_offsets.back());
+    std::vector<std::size_t> fill(m_offsets.begin(), m_offsets.end() - 1);
+    for (std::size_t p = 0; p < pairCount; ++p) {
+        for (int end = 0; end < 2; ++end) {
+            std::int32_t index = m_fastIndex[pairs[p * 2 + end]];
+            if (index >= 0) {
+                m_candidates[fill[index]++] = pairs[p * 2 + 1 - end];
+            }
+        }
+    }
+
+    m_fractions.assign(m_fast.size(), 1.0f);
+    pool.parallelFor(m_fast.size(), FAST_GRAIN, [&](std::size_t begin, std::size_t end) {
+        for (std::size_t k = begin; k < end; ++k) {
+            for (std::size_t c = m_offsets[k]; c < m_offsets[k + 1]; ++c) {
+                m_fractions[k] = std::min(m_fractions[k], timeOfImpact(bodies, m_fast[k], m_candidates[c], dt));
+            }
+        }
+    });
+
+    // 位置先后移v*dt*(1-f)，随后的位置积分结束时刚体正好停在碰撞时刻的位置
+    for (std::size_t k = 0; k < m_fast.size(); ++k) {
+        float fraction = m_fractions[k];
+        if (fraction >= 1.0f) {
+            continue;
+        }
+        float* p = bodies.positions + m_fast[k] * 3;
+        const float* v = bodies.linearVelocities + m_fast[k] * 3;
+        for (int axis = 0; axis < 3; ++axis) {
+            p[axis] -= v[axis] * dt * (1.0f - fraction);
+        }
+        ++m_clampedCount;
+    }
+}
+
+} // namespace PhysicsSimulator
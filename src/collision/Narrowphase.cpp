@@ -0,0 +1,589 @@
+#include "Narrowphase.h"
+#include "IslandManager.h"
+#include "RigidBody.h"
+#include "TaskPool.h"
+#include "Vector3.h"
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// 间隙小于该值时也生成接触(深度为负)，让求解器提前处理即将发生的碰撞
+const float CONTACT_MARGIN = 0.02f;
+// 每个接触流形最多保留的接触点
+const int MAX_MANIFOLD_POINTS = 4;
+// 并行时每块的候选对数量
+const std::size_t PAIR_GRAIN = 128;
+
+const float EPSILON = 1e-6f;
+const float CLIP_TOLERANCE = 1e-4f;
+const float MANIFOLD_TOLERANCE = 1e-6f;
+
+// 入射面4个顶点在(u,v)两个轴上的符号，按环绕顺序排列
+const float FACE_CORNERS[4][2] = {{1.0f, 1.0f}, {-1.0f, 1.0f}, {-1.0f, -1.0f}, {1.0f, -1.0f}};
+
+struct Contact {
+    std::size_t pair;
+    std::int32_t bodyA;
+    std::int32_t bodyB;
+    Vector3 point;
+    Vector3 normal;
+    float depth;
+};
+
+/**
+ * @brief 接触候选点
+ */
+struct Candidate {
+    Vector3 point;
+    float depth;
+};
+
+Vector3 vec3(const float* v) {
+    return Vector3(v[0], v[1], v[2]);
+}
+
+Vector3 normalizeOr(const Vector3& v, const Vector3& fallback) {
+    float length = v.length();
+    return length > EPSILON ? v / length : fallback;
+}
+
+float sign(float x) {
+    return x > 0.0f ? 1.0f : (x < 0.0f ? -1.0f : 0.0f);
+}
+
+/**
+ * @brief 盒子的3个局部轴在世界坐标系中的方向
+ */
+void boxAxes(const float q[4], Vector3 axes[3]) {
+    float x = q[0], y = q[1], z = q[2], w = q[3];
+    axes[0].set(1.0f - 2.0f * (y * y + z * z), 2.0f * (x * y + z * w), 2.0f * (x * z - y * w));
+    axes[1].set(2.0f * (x * y - z * w), 1.0f - 2.0f * (x * x + z * z), 2.0f * (y * z + x * w));
+    axes[2].set(2.0f * (x * z + y * w), 2.0f * (y * z - x * w), 1.0f - 2.0f * (x * x + y * y));
+}
+
+/**
+ * @brief 盒子形状的只读视图
+ */
+struct Box {
+    Vector3 center;
+    Vector3 axes[3];
+    float half[3];
+
+    Box(const BodyArrays& bodies, std::int32_t row) : center(vec3(bodies.positions + row * 3)) {
+        boxAxes(bodies.rotations + row * 4, axes);
+        for (int k = 0; k < 3; ++k) {
+            half[k] = bodies.shapeParams[row * 4 + k];
+        }
+    }
+
+    float radius(const Vector3& axis) const {
+        return half[0] * std::fabs(axis.dot(axes[0])) +
+               half[1] * std::fabs(axis.dot(axes[1])) +
+               half[2] * std::fabs(axis.dot(axes[2]));
+    }
+};
+
+/**
+ * @brief 从候选点中选出最多4个，使接触面积尽量大
+ *
+ * 依次选取: 最深的点、离它最远的点、与前两点构成三角形面积最大的点、
+ * 在另一侧使四边形面积最大的点。
+ */
+int reduceManifold(const std::vector<Candidate>& candidates, const Vector3& normal, int selected[4]) {
+    if (candidates.empty()) {
+        return 0;
+    }
+    int count = 0;
+    int i0 = 0;
+    for (std::size_t i = 1; i < candidates.size(); ++i) {
+        if (candidates[i].depth > candidates[i0].depth) {
+            i0 = static_cast<int>(i);
+        }
+    }
+    selected[count++] = i0;
+    const Vector3& p0 = candidates[i0].point;
+
+    int i1 = 0;
+    float best = -1.0f;
+    for (std::size_t i = 0; i < candidates.size(); ++i) {
+        float score = (candidates[i].point - p0).lengthSquared();
+        if (score > best) {
+            best = score;
+            i1 = static_cast<int>(i);
+        }
+    }
+    if (best <= MANIFOLD_TOLERANCE) {
+        return count;
+    }
+    selected[count++] = i1;
+    Vector3 edge = candidates[i1].point - p0;
+
+    int i2 = 0;
+    float signed2 = 0.0f;
+    best = -1.0f;
+    for (std::size_t i = 0; i < candidates.size(); ++i) {
+        float area = edge.cross(candidates[i].point - p0).dot(normal);
+        if (std::fabs(area) > best) {
+            best = std::fabs(area);
+            signed2 = area;
+            i2 = static_cast<int>(i);
+        }
+    }
+    if (best <= MANIFOLD_TOLERANCE) {
+        return count;
+    }
+    selected[count++] = i2;
+
+    int i3 = 0;
+    float side = sign(signed2);
+    best = -1.0f;
+    for (std::size_t i = 0; i < candidates.size(); ++i) {
+        float score = -side * edge.cross(candidates[i].point - p0).dot(normal);
+        if (score > best) {
+            best = score;
+            i3 = static_cast<int>(i);
+        }
+    }
+    if (best <= MANIFOLD_TOLERANCE) {
+        return count;
+    }
+    selected[count++] = i3;
+    return count;
+}
+
+/**
+ * @brief 把候选点缩减为接触流形并追加到结果中
+ */
+void addManifold(std::vector<Contact>& out, std::size_t pair, std::int32_t a, std::int32_t b,
+                 const std::vector<Candidate>& candidates, const Vector3& normal) {
+    int selected[MAX_MANIFOLD_POINTS];
+    int count = reduceManifold(candidates, normal, selected);
+    for (int i = 0; i < count; ++i) {
+        const Candidate& c = candidates[selected[i]];
+        out.push_back({pair, a, b, c.point, normal, c.depth});
+    }
+}
+
+void sphereSphere(const BodyArrays& bodies, std::size_t pair, std::int32_t a, std::int32_t b,
+                  std::vector<Contact>& out) {
+    Vector3 pa = vec3(bodies.positions + a * 3);
+    Vector3 pb = vec3(bodies.positions + b * 3);
+    float ra = bodies.shapeParams[a * 4];
+    float rb = bodies.shapeParams[b * 4];
+    Vector3 d = pb - pa;
+    float distance = d.length();
+    Vector3 normal = normalizeOr(d, Vector3(0.0f, 1.0f, 0.0f));
+    float depth = ra + rb - distance;
+    if (depth >= -CONTACT_MARGIN) {
+        out.push_back({pair, a, b, pa + normal * (ra - 0.5f * depth), normal, depth});
+    }
+}
+
+void spherePlane(const BodyArrays& bodies, std::size_t pair, std::int32_t sphere, std::int32_t plane,
+                 std::vector<Contact>& out) {
+    Vector3 center = vec3(bodies.positions + sphere * 3);
+    float radius = bodies.shapeParams[sphere * 4];
+    Vector3 n = vec3(bodies.shapeParams + plane * 4);
+    float depth = radius - (center.dot(n) - bodies.shapeParams[plane * 4 + 3]);
+    if (depth >= -CONTACT_MARGIN) {
+        out.push_back({pair, sphere, plane, center - n * (radius - 0.5f * depth), n * -1.0f, depth});
+    }
+}
+
+void boxPlane(const BodyArrays& bodies, std::size_t pair, std::int32_t box, std::int32_t plane,
+              std::vector<Contact>& out) {
+    Box b(bodies, box);
+    Vector3 n = vec3(bodies.shapeParams + plane * 4);
+    float constant = bodies.shapeParams[plane * 4 + 3];
+
+    std::vector<Candidate> candidates;
+    for (int x = -1; x <= 1; x += 2) {
+        for (int y = -1; y <= 1; y += 2) {
+            for (int z = -1; z <= 1; z += 2) {
+                Vector3 vertex = b.center + b.axes[0] * (x * b.half[0]) + b.axes[1] * (y * b.half[1]) +
+                                 b.axes[2] * (z * b.half[2]);
+                float depth = constant - vertex.dot(n);
+                if (depth >= -CONTACT_MARGIN) {
+                    candidates.push_back({vertex + n * (0.5f * depth), depth});
+                }
+            }
+        }
+    }
+    addManifold(out, pair, box, plane, candidates, n * -1.0f);
+}
+
+void boxSphere(const BodyArrays& bodies, std::size_t pair, std::int32_t box, std::int32_t sphere,
+               std::vector<Contact>& out) {
+    Box b(bodies, box);
+    float radius = bodies.shapeParams[sphere * 4];
+
+    // 在盒子局部坐标系中求球心的最近点
+    Vector3 rel = vec3(bodies.positions + sphere * 3) - b.center;
+    float local[3];
+    float closest[3];
+    for (int k = 0; k < 3; ++k) {
+        local[k] = rel.dot(b.axes[k]);
+        closest[k] = std::max(-b.half[k], std::min(b.half[k], local[k]));
+    }
+    Vector3 d(local[0] - closest[0], local[1] - closest[1], local[2] - closest[2]);
+    float distance = d.length();
+    Vector3 normal;
+    float depth;
+    if (distance > EPSILON) {
+        normal = d / distance;
+        depth = radius - distance;
+    } else {
+        // 球心在盒子内部: 从最近的面推出
+        int axis = 0;
+        for (int k = 1; k < 3; ++k) {
+            if (b.half[k] - std::fabs(local[k]) < b.half[axis] - std::fabs(local[axis])) {
+                axis = k;
+            }
+        }
+        float s = local[axis] >= 0.0f ? 1.0f : -1.0f;
+        float n[3] = {0.0f, 0.0f, 0.0f};
+        n[axis] = s;
+        normal.set(n[0], n[1], n[2]);
+        depth = radius + b.half[axis] - std::fabs(local[axis]);
+        for (int k = 0; k < 3; ++k) {
+            closest[k] = local[k];
+        }
+        closest[axis] = s * b.half[axis];
+    }
+    if (depth < -CONTACT_MARGIN) {
+        return;
+    }
+
+    // 盒子表面点与球面点的中点
+    Vector3 pointLocal = (Vector3(closest[0], closest[1], closest[2]) +
+                          Vector3(local[0], local[1], local[2]) - normal * radius) * 0.5f;
+    Vector3 point = b.center + b.axes[0] * pointLocal.getX() + b.axes[1] * pointLocal.getY() +
+                    b.axes[2] * pointLocal.getZ();
+    Vector3 worldNormal = b.axes[0] * normal.getX() + b.axes[1] * normal.getY() + b.axes[2] * normal.getZ();
+    out.push_back({pair, box, sphere, point, worldNormal, depth});
+}
+
+/**
+ * @brief 面接触: 把入射盒子上最反向的面裁剪到参考面的矩形内
+ * @param refBox 参考盒子
+ * @param incBox 入射盒子
+ * @param k 参考面所在的轴
+ * @param nRef 从参考盒子指向入射盒子的法线
+ */
+void boxBoxFace(const Box& refBox, const Box& incBox, int k, const Vector3& nRef,
+                std::vector<Candidate>& candidates) {
+    Vector3 faceCenter = refBox.center + nRef * refBox.half[k];
+    Vector3 t1 = refBox.axes[(k + 1) % 3];
+    Vector3 t2 = refBox.axes[(k + 2) % 3];
+    float extent[2] = {refBox.half[(k + 1) % 3], refBox.half[(k + 2) % 3]};
+
+    // 入射面: 法线与nRef最反向的面
+    int j = 0;
+    for (int i = 1; i < 3; ++i) {
+        if (std::fabs(incBox.axes[i].dot(nRef)) > std::fabs(incBox.axes[j].dot(nRef))) {
+            j = i;
+        }
+    }
+    Vector3 nInc = incBox.axes[j] * -sign(incBox.axes[j].dot(nRef));
+    Vector3 incCenter = incBox.center + nInc * incBox.half[j];
+    Vector3 u = incBox.axes[(j + 1) % 3] * incBox.half[(j + 1) % 3];
+    Vector3 v = incBox.axes[(j + 2) % 3] * incBox.half[(j + 2) % 3];
+
+    // 投影到参考面的二维坐标和高度(沿nRef，负值表示穿透)
+    Vector3 quad[4];
+    float q[4][2];
+    float height[4];
+    for (int i = 0; i < 4; ++i) {
+        quad[i] = incCenter + u * FACE_CORNERS[i][0] + v * FACE_CORNERS[i][1];
+        Vector3 rel = quad[i] - faceCenter;
+        q[i][0] = rel.dot(t1);
+        q[i][1] = rel.dot(t2);
+        height[i] = rel.dot(nRef);
+    }
+
+    auto add = [&](const Vector3& point, float h) {
+        float depth = -h;
+        if (depth >= -CONTACT_MARGIN) {
+            // 入射面上的点沿nRef移动半个深度，得到两表面的中点
+            candidates.push_back({point + nRef * (0.5f * depth), depth});
+        }
+    };
+
+    // 候选1: 落在参考矩形内的入射面顶点
+    for (int i = 0; i < 4; ++i) {
+        if (std::fabs(q[i][0]) <= extent[0] + CLIP_TOLERANCE && std::fabs(q[i][1]) <= extent[1] + CLIP_TOLERANCE) {
+            add(quad[i], height[i]);
+        }
+    }
+
+    // 候选2: 落在入射四边形内的参考矩形角点，高度取入射面所在平面
+    float edge[4][2];
+    float area = 0.0f;
+    for (int i = 0; i < 4; ++i) {
+        int next = (i + 1) % 4;
+        edge[i][0] = q[next][0] - q[i][0];
+        edge[i][1] = q[next][1] - q[i][1];
+        area += q[i][0] * q[next][1] - q[i][1] * q[next][0];
+    }
+    float orient = area >= 0.0f ? 1.0f : -1.0f;
+    float denom = nRef.dot(nInc);
+    if (std::fabs(denom) <= EPSILON) {
+        denom = -EPSILON;
+    }
+    for (int c = 0; c < 4; ++c) {
+        float cx = FACE_CORNERS[c][0] * extent[0];
+        float cy = FACE_CORNERS[c][1] * extent[1];
+        bool inside = true;
+        for (int i = 0; i < 4 && inside; ++i) {
+            float cross = edge[i][0] * (cy - q[i][1]) - edge[i][1] * (cx - q[i][0]);
+            float length = std::sqrt(edge[i][0] * edge[i][0] + edge[i][1] * edge[i][1]);
+            inside = cross * orient >= -CLIP_TOLERANCE * length;
+        }
+        if (inside) {
+            Vector3 onPlane = faceCenter + t1 * cx + t2 * cy;
+            float t = (incCenter - onPlane).dot(nInc) / denom;
+            add(onPlane + nRef * t, t);
+        }
+    }
+
+    // 候选3: 入射四边形的边与参考矩形边的交点
+    const int rectAxes[4] = {0, 0, 1, 1};
+    const float rectSigns[4] = {1.0f, -1.0f, 1.0f, -1.0f};
+    for (int r = 0; r < 4; ++r) {
+        int coordinate = rectAxes[r];
+        int other = 1 - coordinate;
+        float bound = rectSigns[r] * extent[coordinate];
+        for (int i = 0; i < 4; ++i) {
+            int next = (i + 1) % 4;
+            float delta = edge[i][coordinate];
+            if (std::fabs(delta) <= EPSILON) {
+                continue;
+            }
+            float t = (bound - q[i][coordinate]) / delta;
+            float crossValue = q[i][other] + t * edge[i][other];
+            if (t >= 0.0f && t <= 1.0f && std::fabs(crossValue) <= extent[other] + CLIP_TOLERANCE) {
+                add(quad[i] + (quad[next] - quad[i]) * t, height[i] + (height[next] - height[i]) * t);
+            }
+        }
+    }
+}
+
+void boxBox(const BodyArrays& bodies, std::size_t pair, std::int32_t a, std::int32_t b,
+            std::vector<Contact>& out) {
+    Box boxA(bodies, a);
+    Box boxB(bodies, b);
+    Vector3 d = boxB.center - boxA.center;
+
+    // 15个候选分离轴: A的3个面法线、B的3个面法线、9个边叉积
+    Vector3 axes[15];
+    float separation[15];
+    float maxSeparation = -1e30f;
+    for (int i = 0; i < 3; ++i) {
+        axes[i] = boxA.axes[i];
+        axes[3 + i] = boxB.axes[i];
+        for (int j = 0; j < 3; ++j) {
+            axes[6 + i * 3 + j] = boxA.axes[i].cross(boxB.axes[j]);
+        }
+    }
+    for (int i = 0; i < 15; ++i) {
+        float length = axes[i].length();
+        if (length < 1e-5f) {
+            separation[i] = -1e30f;
+            continue;
+        }
+        axes[i] = axes[i] / length;
+        separation[i] = std::fabs(axes[i].dot(d)) - boxA.radius(axes[i]) - boxB.radius(axes[i]);
+        maxSeparation = std::max(maxSeparation, separation[i]);
+    }
+    if (maxSeparation > CONTACT_MARGIN) {
+        return;
+    }
+
+    // 选轴时偏向面轴(先A后B)，避免帧间在几乎相等的轴之间来回切换
+    auto best = [&](int begin, int end) {
+        int index = begin;
+        for (int i = begin + 1; i < end; ++i) {
+            if (separation[i] > separation[index]) {
+                index = i;
+            }
+        }
+        return index;
+    };
+    int faceA = best(0, 3);
+    int faceB = best(3, 6);
+    int edge = best(6, 15);
+    int face = separation[faceB] > 0.98f * separation[faceA] + 0.001f ? faceB : faceA;
+    bool useEdge = separation[edge] > 0.98f * separation[face] + 0.001f;
+    int axis = useEdge ? edge : face;
+    // 法线从A指向B
+    Vector3 normal = axes[axis] * (axes[axis].dot(d) >= 0.0f ? 1.0f : -1.0f);
+
+    if (!useEdge) {
+        std::vector<Candidate> candidates;
+        if (face >= 3) {
+            boxBoxFace(boxB, boxA, face - 3, normal * -1.0f, candidates);
+        } else {
+            boxBoxFace(boxA, boxB, face, normal, candidates);
+        }
+        addManifold(out, pair, a, b, candidates, normal);
+        return;
+    }
+
+    // 边-边接触: 取两条支撑边上最近点的中点
+    int i = (edge - 6) / 3;
+    int j = (edge - 6) % 3;
+    Vector3 pointA = boxA.center;
+    Vector3 pointB = boxB.center;
+    for (int k = 0; k < 3; ++k) {
+        if (k != i) {
+            pointA = pointA + boxA.axes[k] * (sign(boxA.axes[k].dot(normal)) * boxA.half[k]);
+        }
+        if (k != j) {
+            pointB = pointB + boxB.axes[k] * (-sign(boxB.axes[k].dot(normal)) * boxB.half[k]);
+        }
+    }
+    const Vector3& dirA = boxA.axes[i];
+    const Vector3& dirB = boxB.axes[j];
+    Vector3 r = pointA - pointB;
+    float cosine = dirA.dot(dirB);
+    float c = dirA.dot(r);
+    float f = dirB.dot(r);
+    float denom = std::max(1.0f - cosine * cosine, EPSILON);
+    float s = std::max(-boxA.half[i], std::min(boxA.half[i], (cosine * f - c) / denom));
+    float t = std::max(-boxB.half[j], std::min(boxB.half[j], (f - cosine * c) / denom));
+    Vector3 point = (pointA + dirA * s + pointB + dirB * t) * 0.5f;
+    out.push_back({pair, a, b, point, normal, -separation[edge]});
+}
+
+typedef void (*PairHandler)(const BodyArrays&, std::size_t, std::int32_t, std::int32_t, std::vector<Contact>&);
+
+/**
+ * @brief 形状组合及其处理函数，组合中形状类型数值较小的在前
+ */
+struct PairGroup {
+    ShapeType first;
+    ShapeType second;
+    PairHandler handler;
+};
+
+const PairGroup PAIR_GROUPS[] = {
+    {ShapeType::BOX, ShapeType::BOX, boxBox},
+    {ShapeType::BOX, ShapeType::SPHERE, boxSphere},
+    {ShapeType::BOX, ShapeType::PLANE, boxPlane},
+    {ShapeType::SPHERE, ShapeType::SPHERE, sphereSphere},
+    {ShapeType::SPHERE, ShapeType::PLANE, spherePlane},
+};
+
+} // namespace
+
+Narrowphase::Narrowphase() : m_buildTime(0.0) {
+}
+
+void Narrowphase::update(const BodyArrays& bodies, const std::int32_t* pairs, std::size_t pairCount,
+                         TaskPool& pool) {
+    auto start = std::chrono::steady_clock::now();
+
+    // 按形状组合分组，形状类型较小的一方在前
+    const std::size_t groupCount = sizeof(PAIR_GROUPS) / sizeof(PAIR_GROUPS[0]);
+    std::vector<std::vector<std::size_t>> groups(groupCount);
+    for (std::size_t p = 0; p < pairCount; ++p) {
+        std::int32_t a = pairs[p * 2];
+        std::int32_t b = pairs[p * 2 + 1];
+        // 两端都不活动(休眠或静态)的候选对跳过
+        if (!isActiveBody(bodies, a) && !isActiveBody(bodies, b)) {
+            continue;
+        }
+        ShapeType typeA = static_cast<ShapeType>(std::min(bodies.shapeTypes[a], bodies.shapeTypes[b]));
+        ShapeType typeB = static_cast<ShapeType>(std::max(bodies.shapeTypes[a], bodies.shapeTypes[b]));
+        for (std::size_t g = 0; g < groupCount; ++g) {
+            if (PAIR_GROUPS[g].first == typeA && PAIR_GROUPS[g].second == typeB) {
+                groups[g].push_back(p);
+                break;
+            }
+        }
+    }
+
+    // 各组首尾相接，分块并行处理，各块的接触按块号合并，结果与线程数无关
+    std::vector<std::size_t> work;
+    std::vector<PairHandler> handlers;
+    for (std::size_t g = 0; g < groupCount; ++g) {
+        work.insert(work.end(), groups[g].begin(), groups[g].end());
+        handlers.insert(handlers.end(), groups[g].size(), PAIR_GROUPS[g].handler);
+    }
+    std::vector<std::vector<Contact>> chunkContacts(TaskPool::chunkCount(work.size(), PAIR_GRAIN));
+    pool.parallelFor(work.size(), PAIR_GRAIN, [&](std::size_t begin, std::size_t end) {
+        std::vector<Contact>& out = chunkContacts[begin / PAIR_GRAIN];
+        for (std::size_t w = begin; w < end; ++w) {
+            std::size_t p = work[w];
+            std::int32_t a = pairs[p * 2];
+            std::int32_t b = pairs[p * 2 + 1];
+            if (bodies.shapeTypes[a] > bodies.shapeTypes[b]) {
+                std::swap(a, b);
+            }
+            handlers[w](bodies, p, a, b, out);
+        }
+    });
+    std::vector<Contact> contacts;
+    for (const std::vector<Contact>& chunk : chunkContacts) {
+        contacts.insert(contacts.end(), chunk.begin(), chunk.end());
+    }
+
+    // 按候选对顺序排列，同一对的接触点相邻
+    std::stable_sort(contacts.begin(), contacts.end(),
+                     [](const Contact& x, const Contact& y) { return x.pair < y.pair; });
+
+    std::size_t n = contacts.size();
+    m_bodyA.resize(n);
+    m_bodyB.resize(n);
+    m_points.resize(n * 3);
+    m_normals.resize(n * 3);
+    m_depths.resize(n);
+    for (std::size_t i = 0; i < n; ++i) {
+        const Contact& c = contacts[i];
+        m_bodyA[i] = c.bodyA;
+        m_bodyB[i] = c.bodyB;
+        m_points[i * 3] = c.point.getX();
+        m_points[i * 3 + 1] = c.point.getY();
+        m_points[i * 3 + 2] = c.point.getZ();
+        m_normals[i * 3] = c.normal.getX();
+        m_normals[i * 3 + 1] = c.normal.getY();
+        m_normals[i * 3 + 2] = c.normal.getZ();
+        m_depths[i] = c.depth;
+    }
+
+    m_buildTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+std::size_t Narrowphase::getContactCount() const {
+    return m_depths.size();
+}
+
+std::int32_t* Narrowphase::getBodyA() {
+    return m_bodyA.data();
+}
+
+std::int32_t* Narrowphase::getBodyB() {
+    return m_bodyB.data();
+}
+
+float* Narrowphase::getPoints() {
+    return m_points.data();
+}
+
+float* Narrowphase::getNormals() {
+    return m_normals.data();
+}
+
+float* Narrowphase::getDepths() {
+    return m_depths.data();
+}
+
+double Narrowphase::getBuildTime() const {
+    return m_buildTime;
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,92 @@
+#include "Logger.h"
+#include <cstdlib>
+#include <iostream>
+#include <mutex>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// 缓冲区超过该大小时输出
+constexpr std::size_t FLUSH_SIZE = 64 * 1024;
+
+const char* const CATEGORY_NAMES[LOG_CATEGORY_COUNT] = {"world", "body", "solver"};
+const char* const LEVEL_NAMES[] = {"", "错误", "警告", "信息", "调试", "跟踪"};
+
+int initialLevel() {
+    const char* value = std::getenv("PS_LOG_LEVEL");
+    if (value == nullptr || *value == '\0') {
+        return LOG_WARN;
+    }
+    int level = std::atoi(value);
+    return level < LOG_OFF ? LOG_OFF : (level > LOG_TRACE ? LOG_TRACE : level);
+}
+
+/**
+ * @brief 日志缓冲区，程序退出时输出剩余的消息
+ */
+struct LogBuffer {
+    std::mutex mutex;
+    std::string text;
+
+    ~LogBuffer() {
+        flushLocked();
+    }
+
+    void flushLocked() {
+        if (!text.empty()) {
+            std::cout.write(text.data(), static_cast<std::streamsize>(text.size()));
+            std::cout.flush();
+            text.clear();
+        }
+    }
+};
+
+LogBuffer& buffer() {
+    static LogBuffer instance;
+    return instance;
+}
+
+} // namespace
+
+std::atomic<int> Logger::s_levels[LOG_CATEGORY_COUNT] = {
+    {initialLevel()}, {initialLevel()}, {initialLevel()}
+};
+
+void Logger::setLevel(LogCategory category, LogLevel level) {
+    flush();
+    if (category == LOG_CATEGORY_COUNT) {
+        for (std::atomic<int>& value : s_levels) {
+            value.store(level, std::memory_order_relaxed);
+        }
+    } else {
+        s_levels[category].store(level, std::memory_order_relaxed);
+    }
+}
+
+LogLevel Logger::getLevel(LogCategory category) {
+    return static_cast<LogLevel>(s_levels[category].load(std::memory_order_relaxed));
+}
+
+void Logger::write(LogCategory category, LogLevel level, const std::string& message) {
+    LogBuffer& log = buffer();
+    std::lock_guard<std::mutex> lock(log.mutex);
+    log.text += '[';
+    log.text += CATEGORY_NAMES[category];
+    log.text += "][";
+    log.text += LEVEL_NAMES[level];
+    log.text += "] ";
+    log.text += message;
+    log.text += '\n';
+    if (level <= LOG_WARN || log.text.size() >= FLUSH_SIZE) {
+        log.flushLocked();
+    }
+}
+
+void Logger::flush() {
+    LogBuffer& log = buffer();
+    std::lock_guard<std::mutex> lock(log.mutex);
+    log.flushLocked();
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,502 @@
+#include "PhysicsCApi.h"
+#include "PhysicsWorld.h"
+#include "RigidBody.h"
+#include "Broadphase.h"
+#include "Narrowphase.h"
+#include "ContactSolver.h"
+#include "IslandManager.h"
+#include "Profiler.h"
+#include "Logger.h"
+#include "Quaternion.h"
+#include <algorithm>
+#include <cstdint>
+#include <stdexcept>
+#include <vector>
+
+using namespace PhysicsSimulator;
+
+namespace {
+
+PhysicsWorld* toWorld(void* world) {
+    return static_cast<PhysicsWorld*>(world);
+}
+
+/**
+ * @brief 句柄 -> 刚体，无效或过期的句柄返回nullptr
+ */
+RigidBody* toBody(int64_t handle) {
+    if (handle <= 0 || handle > static_cast<int64_t>(UINT32_MAX)) {
+        return nullptr;
+    }
+    return RigidBody::fromHandle(static_cast<std::uint32_t>(handle));
+}
+
+/**
+ * @brief 句柄数组 -> 刚体指针数组，跳过无效的句柄
+ */
+std::vector<RigidBody*> toBodies(const int64_t* handles, int count) {
+    std::vector<RigidBody*> bodies;
+    bodies.reserve(static_cast<std::size_t>(count));
+    for (int i = 0; i < count; ++i) {
+        if (RigidBody* body = toBody(handles[i])) {
+            bodies.push_back(body);
+        }
+    }
+    return bodies;
+}
+
+/**
+ * @brief 创建刚体并返回句柄，刚体池已满时返回0
+ */
+template <typename Create>
+int64_t createHandle(Create create) {
+    try {
+        return create()->getHandle();
+    } catch (const std::length_error&) {
+        return 0;
+    }
+}
+
+Vector3 vec3(const float* v, int i) {
+    return Vector3(v[i * 3], v[i * 3 + 1], v[i * 3 + 2]);
+}
+
+void store(const Vector3& v, float* out) {
+    out[0] = v.getX();
+    out[1] = v.getY();
+    out[2] = v.getZ();
+}
+
+} // namespace
+
+extern "C" {
+
+void* ps_world_create(void) {
+    return new PhysicsWorld();
+}
+
+void ps_world_destroy(void* world) {
+    delete toWorld(world);
+}
+
+void ps_world_initialize(void* world, float gravity_x, float gravity_y, float gravity_z) {
+    toWorld(world)->initialize(gravity_x, gravity_y, gravity_z);
+}
+
+int ps_world_step(void* world, float time_step, int max_sub_steps, float fixed_time_step) {
+    return toWorld(world)->stepSimulation(time_step, max_sub_steps, fixed_time_step);
+}
+
+int ps_world_body_count(void* world) {
+    return static_cast<int>(toWorld(world)->getBodyCount());
+}
+
+int ps_world_body_capacity(void* world) {
+    return static_cast<int>(toWorld(world)->getBodyCapacity());
+}
+
+void* ps_world_column(void* world, int column) {
+    PhysicsWorld* w = toWorld(world);
+    switch (column) {
+        case PS_COLUMN_HANDLES: return w->getHandles();
+        case PS_COLUMN_POSITIONS: return w->getPositions();
+        case PS_COLUMN_ROTATIONS: return w->getRotations();
+        case PS_COLUMN_LINEAR_VELOCITIES: return w->getLinearVelocities();
+        case PS_COLUMN_ANGULAR_VELOCITIES: return w->getAngularVelocities();
+        case PS_COLUMN_MASSES: return w->getMasses();
+        case PS_COLUMN_SHAPE_TYPES: return w->getShapeTypes();
+        case PS_COLUMN_BODY_TYPES: return w->getBodyTypes();
+        case PS_COLUMN_SHAPE_PARAMS: return w->getShapeParams();
+        case PS_COLUMN_FORCES: return w->getForces();
+        case PS_COLUMN_TORQUES: return w->getTorques();
+        case PS_COLUMN_INVERSE_INERTIAS: return w->getInverseInertias();
+        case PS_COLUMN_FRICTIONS: return w->getFrictions();
+        case PS_COLUMN_RESTITUTIONS: return w->getRestitutions();
+        case PS_COLUMN_SLEEP_ISLANDS: return w->getSleepIslands();
+        case PS_COLUMN_SLEEP_TIMES: return w->getSleepTimes();
+        case PS_COLUMN_CCD_THRESHOLDS: return w->getCcdThresholds();
+        default: return nullptr;
+    }
+}
+
+void ps_world_set_broadphase(void* world, int algorithm, float cell_size) {
+    toWorld(world)->getBroadphase().setAlgorithm(static_cast<BroadphaseAlgorithm>(algorithm), cell_size);
+}
+
+int ps_world_pair_count(void* world) {
+    return static_cast<int>(toWorld(world)->getBroadphase().getPairCount());
+}
+
+const int32_t* ps_world_pairs(void* world) {
+    return toWorld(world)->getBroadphase().getPairs().data();
+}
+
+double ps_world_broadphase_time(void* world) {
+    return toWorld(world)->getBroadphase().getBuildTime();
+}
+
+int ps_world_contact_count(void* world) {
+    return static_cast<int>(toWorld(world)->getNarrowphase().getContactCount());
+}
+
+void* ps_world_contact_column(void* world, int column) {
+    Narrowphase& narrowphase = toWorld(world)->getNarrowphase();
+    switch (column) {
+        case PS_CONTACT_BODY_A: return narrowphase.getBodyA();
+        case PS_CONTACT_BODY_B: return narrowphase.getBodyB();
+        case PS_CONTACT_POINTS: return narrowphase.getPoints();
+        case PS_CONTACT_NORMALS: return narrowphase.getNormals();
+        case PS_CONTACT_DEPTHS: return narrowphase.getDepths();
+        default: return nullptr;
+    }
+}
+
+double ps_world_narrowphase_time(void* world) {
+    return toWorld(world)->getNarrowphase().getBuildTime();
+}
+
+void* ps_world_interpolated_column(void* world, int column) {
+    PhysicsWorld* w = toWorld(world);
+    switch (column) {
+        case PS_COLUMN_POSITIONS: return w->getInterpolatedPositions();
+        case PS_COLUMN_ROTATIONS: return w->getInterpolatedRotations();
+        default: return nullptr;
+    }
+}
+
+float ps_world_interpolation_alpha(void* world) {
+    return toWorld(world)->getInterpolationAlpha();
+}
+
+void ps_world_set_solver_iterations(void* world, int iterations) {
+    toWorld(world)->getContactSolver().setIterations(iterations);
+}
+
+void ps_world_set_warm_starting(void* world, int enabled) {
+    toWorld(world)->getContactSolver().setWarmStarting(enabled != 0);
+}
+
+int ps_world_manifold_count(void* world) {
+    return static_cast<int>(toWorld(world)->getContactSolver().getManifoldCount());
+}
+
+int ps_world_warm_started_count(void* world) {
+    return static_cast<int>(toWorld(world)->getContactSolver().getWarmStartedCount());
+}
+
+int ps_world_batch_count(void* world) {
+    return static_cast<int>(toWorld(world)->getContactSolver().getBatchCount());
+}
+
+double ps_world_solver_time(void* world) {
+    return toWorld(world)->getContactSolver().getSolveTime();
+}
+
+int ps_world_cache_point_count(void* world) {
+    return static_cast<int>(toWorld(world)->getContactSolver().getCachedPointCount());
+}
+
+void ps_world_save_cache(void* world, int64_t* handles, float* anchors, float* impulses) {
+    toWorld(world)->getContactSolver().saveCache(handles, anchors, impulses);
+}
+
+void ps_world_load_cache(void* world, int count, const int64_t* handles, const float* anchors,
+                         const float* impulses) {
+    toWorld(world)->getContactSolver().loadCache(static_cast<std::size_t>(count), handles, anchors, impulses);
+}
+
+double ps_world_accumulator(void* world) {
+    return toWorld(world)->getAccumulator();
+}
+
+void ps_world_set_accumulator(void* world, double accumulator) {
+    toWorld(world)->setAccumulator(accumulator);
+}
+
+int ps_world_next_island(void* world) {
+    return toWorld(world)->getIslandManager().getNextIsland();
+}
+
+void ps_world_set_next_island(void* world, int island) {
+    toWorld(world)->getIslandManager().setNextIsland(island);
+}
+
+void ps_world_set_sleeping(void* world, int enabled) {
+    toWorld(world)->setSleepingEnabled(enabled != 0);
+}
+
+void ps_world_set_sleep_parameters(void* world, float linear_threshold, float angular_threshold,
+                                   float time_to_sleep) {
+    toWorld(world)->getIslandManager().setSleepParameters(linear_threshold, angular_threshold, time_to_sleep);
+}
+
+void ps_world_wake_all(void* world) {
+    toWorld(world)->wakeAll();
+}
+
+void ps_world_set_thread_count(void* world, int count) {
+    toWorld(world)->setThreadCount(count);
+}
+
+int ps_world_thread_count(void* world) {
+    return toWorld(world)->getThreadCount();
+}
+
+int ps_world_island_count(void* world) {
+    return static_cast<int>(toWorld(world)->getIslandManager().getIslandCount());
+}
+
+double ps_world_island_time(void* world) {
+    return toWorld(world)->getIslandManager().getBuildTime();
+}
+
+void ps_world_set_profiling(void* world, int enabled, int capacity) {
+    toWorld(world)->getProfiler().setEnabled(enabled != 0, static_cast<std::size_t>(capacity > 0 ? capacity : 1));
+}
+
+int ps_world_profile_count(void* world) {
+    return static_cast<int>(toWorld(world)->getProfiler().getSampleCount());
+}
+
+int ps_world_profile_copy(void* world, int max_count, float* times, int32_t* counters) {
+    std::size_t maxCount = static_cast<std::size_t>(max_count > 0 ? max_count : 0);
+    return static_cast<int>(toWorld(world)->getProfiler().copySamples(times, counters, maxCount));
+}
+
+int ps_world_add_bodies(void* world, const int64_t* handles, int count) {
+    PhysicsWorld* w = toWorld(world);
+    std::size_t before = w->getBodyCount();
+    std::vector<RigidBody*> bodies = toBodies(handles, count);
+    w->addRigidBodies(bodies.data(), bodies.size());
+    return static_cast<int>(w->getBodyCount() - before);
+}
+
+int ps_world_remove_bodies(void* world, const int64_t* handles, int count) {
+    PhysicsWorld* w = toWorld(world);
+    std::size_t before = w->getBodyCount();
+    std::vector<RigidBody*> bodies = toBodies(handles, count);
+    w->removeRigidBodies(bodies.data(), bodies.size());
+    return static_cast<int>(before - w->getBodyCount());
+}
+
+int ps_world_add_joints(void* world, int count, const int32_t* types, const int64_t* bodies,
+                        const float* local_anchors, const float* local_axes, const float* references,
+                        const float* lengths, int64_t* out_handles) {
+    return static_cast<int>(toWorld(world)->addJoints(static_cast<std::size_t>(count), types, bodies, local_anchors,
+                                                      local_axes, references, lengths, out_handles));
+}
+
+int ps_world_remove_joints(void* world, const int64_t* handles, int count) {
+    return static_cast<int>(toWorld(world)->removeJoints(handles, static_cast<std::size_t>(count)));
+}
+
+int ps_world_joint_count(void* world) {
+    return static_cast<int>(toWorld(world)->getJointCount());
+}
+
+int ps_world_joint_capacity(void* world) {
+    return static_cast<int>(toWorld(world)->getJointCapacity());
+}
+
+void* ps_world_joint_column(void* world, int column) {
+    PhysicsWorld* w = toWorld(world);
+    switch (column) {
+        case PS_JOINT_HANDLES: return w->getJointHandles();
+        case PS_JOINT_TYPES: return w->getJointTypes();
+        case PS_JOINT_BODIES: return w->getJointBodies();
+        case PS_JOINT_LOCAL_ANCHORS: return w->getJointLocalAnchors();
+        case PS_JOINT_LOCAL_AXES: return w->getJointLocalAxes();
+        case PS_JOINT_REFERENCES: return w->getJointReferences();
+        case PS_JOINT_LENGTHS: return w->getJointLengths();
+        case PS_JOINT_IMPULSES: return w->getJointImpulses();
+        default: return nullptr;
+    }
+}
+
+void ps_world_joint_rows(void* world, const int64_t* handles, int count, int32_t* out_rows) {
+    PhysicsWorld* w = toWorld(world);
+    for (int i = 0; i < count; ++i) {
+        bool valid = handles[i] > 0 && handles[i] <= static_cast<int64_t>(UINT32_MAX);
+        out_rows[i] = valid ? w->getJointIndex(static_cast<std::uint32_t>(handles[i])) : -1;
+    }
+}
+
+void ps_create_boxes(int count, const float* masses, const float* positions,
+                     const float* half_extents, int64_t* out_handles) {
+    for (int i = 0; i < count; ++i) {
+        out_handles[i] = createHandle([&] { return RigidBody::createBox(masses[i], vec3(positions, i), vec3(half_extents, i)); });
+    }
+}
+
+void ps_create_spheres(int count, const float* masses, const float* positions,
+                       const float* radii, int64_t* out_handles) {
+    for (int i = 0; i < count; ++i) {
+        out_handles[i] = createHandle([&] { return RigidBody::createSphere(masses[i], vec3(positions, i), radii[i]); });
+    }
+}
+
+void ps_create_planes(int count, const float* normals, const float* constants,
+                      int64_t* out_handles) {
+    for (int i = 0; i < count; ++i) {
+        out_handles[i] = createHandle([&] { return RigidBody::createPlane(vec3(normals, i), constants[i]); });
+    }
+}
+
+void ps_destroy_bodies(const int64_t* handles, int count) {
+    for (int i = 0; i < count; ++i) {
+        RigidBody::destroy(toBody(handles[i]));
+    }
+}
+
+int ps_body_is_valid(int64_t handle) {
+    return toBody(handle) != nullptr;
+}
+
+int ps_body_live_count(void) {
+    return static_cast<int>(RigidBody::getLiveCount());
+}
+
+void ps_world_body_rows(void* world, const int64_t* handles, int count, int32_t* out_rows) {
+    PhysicsWorld* w = toWorld(world);
+    for (int i = 0; i < count; ++i) {
+        bool valid = handles[i] > 0 && handles[i] <= static_cast<int64_t>(UINT32_MAX);
+        out_rows[i] = valid ? w->getBodyIndex(static_cast<std::uint32_t>(handles[i])) : -1;
+    }
+}
+
+void ps_body_get(int64_t handle, int column, float* out) {
+    RigidBody* body = toBody(handle);
+    if (!body) {
+        return;
+    }
+    switch (column) {
+        case PS_COLUMN_POSITIONS:
+            store(body->getPosition(), out);
+            break;
+        case PS_COLUMN_ROTATIONS: {
+            Quaternion q = body->getRotation();
+            out[0] = q.getX();
+            out[1] = q.getY();
+            out[2] = q.getZ();
+            out[3] = q.getW();
+            break;
+        }
+        case PS_COLUMN_LINEAR_VELOCITIES:
+            store(body->getLinearVelocity(), out);
+            break;
+        case PS_COLUMN_ANGULAR_VELOCITIES:
+            store(body->getAngularVelocity(), out);
+            break;
+        case PS_COLUMN_MASSES:
+            out[0] = body->getMass();
+            break;
+        case PS_COLUMN_SHAPE_PARAMS:
+            body->getShapeParams(out);
+            break;
+        case PS_COLUMN_FRICTIONS:
+            out[0] = body->getFriction();
+            break;
+        case PS_COLUMN_RESTITUTIONS:
+            out[0] = body->getRestitution();
+            break;
+        case PS_COLUMN_CCD_THRESHOLDS:
+            out[0] = body->getCcdMotionThreshold();
+            break;
+        default:
+            break;
+    }
+}
+
+void ps_body_set(int64_t handle, int column, const float* values) {
+    RigidBody* body = toBody(handle);
+    if (!body) {
+        return;
+    }
+    switch (column) {
+        case PS_COLUMN_POSITIONS:
+            body->setPosition(vec3(values, 0));
+            break;
+        case PS_COLUMN_ROTATIONS:
+            body->setRotation(Quaternion(values[0], values[1], values[2], values[3]));
+            break;
+        case PS_COLUMN_LINEAR_VELOCITIES:
+            body->setLinearVelocity(vec3(values, 0));
+            break;
+        case PS_COLUMN_ANGULAR_VELOCITIES:
+            body->setAngularVelocity(vec3(values, 0));
+            break;
+        case PS_COLUMN_FRICTIONS:
+            body->setFriction(values[0]);
+            break;
+        case PS_COLUMN_RESTITUTIONS:
+            body->setRestitution(values[0]);
+            break;
+        case PS_COLUMN_CCD_THRESHOLDS:
+            body->setCcdMotionThreshold(values[0]);
+            break;
+        default:
+            break;
+    }
+}
+
+int ps_body_get_shape_type(int64_t handle) {
+    RigidBody* body = toBody(handle);
+    return body ? static_cast<int>(body->getShapeType()) : -1;
+}
+
+int ps_body_get_body_type(int64_t handle) {
+    RigidBody* body = toBody(handle);
+    return body ? static_cast<int>(body->getBodyType()) : -1;
+}
+
+void ps_body_set_body_type(int64_t handle, int body_type) {
+    if (RigidBody* body = toBody(handle)) {
+        body->setBodyType(static_cast<BodyType>(body_type));
+    }
+}
+
+void ps_body_apply_force(int64_t handle, const float* force, const float* rel_pos) {
+    RigidBody* body = toBody(handle);
+    if (!body) {
+        return;
+    }
+    if (rel_pos) {
+        body->applyForce(vec3(force, 0), vec3(rel_pos, 0));
+    } else {
+        body->applyForce(vec3(force, 0));
+    }
+}
+
+void ps_body_apply_impulse(int64_t handle, const float* impulse, const float* rel_pos) {
+    RigidBody* body = toBody(handle);
+    if (!body) {
+        return;
+    }
+    if (rel_pos) {
+        body->applyImpulse(vec3(impulse, 0), vec3(rel_pos, 0));
+    } else {
+        body->applyImpulse(vec3(impulse, 0));
+    }
+}
+
+void ps_log_set_level(int category, int level) {
+    if (category >= LOG_CATEGORY_COUNT) {
+        return;
+    }
+    level = std::max(static_cast<int>(LOG_OFF), std::min(level, static_cast<int>(LOG_TRACE)));
+    Logger::setLevel(category < 0 ? LOG_CATEGORY_COUNT : static_cast<LogCategory>(category),
+                     static_cast<LogLevel>(level));
+}
+
+int ps_log_get_level(int category) {
+    if (category < 0 || category >= LOG_CATEGORY_COUNT) {
+        return LOG_OFF;
+    }
+    return Logger::getLevel(static_cast<LogCategory>(category));
+}
+
+void ps_log_flush(void) {
+    Logger::flush();
+}
+
+} // extern "C"
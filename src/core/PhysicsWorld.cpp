@@ -1,70 +1,860 @@
 #include "PhysicsWorld.h"
 #include "RigidBody.h"
-#include <iostream>
+#include "Integrator.h"
+#include "Broadphase.h"
+#include "Narrowphase.h"
+#include "ContinuousCollision.h"
+#include "ContactSolver.h"
+#include "IslandManager.h"
+#include "Profiler.h"
+#include "Logger.h"
+#include "SlotMap.h"
+#include "TaskPool.h"
+#include "Joints.h"
+#include "Quaternion.h"
+#include <algorithm>
+#include <cmath>
+#include <stdexcept>
+#include <unordered_set>
 
 namespace PhysicsSimulator {
 
 class PhysicsWorld::PhysicsWorldImpl {
 public:
-    PhysicsWorldImpl() {
-        std::cout << "物理世界实现已创建" << std::endl;
+    PhysicsWorldImpl() : m_gravity(0.0f, -9.81f, 0.0f) {
+        PS_LOG(LOG_WORLD, LOG_DEBUG, "物理世界实现已创建");
     }
-    
+
     ~PhysicsWorldImpl() {
-        std::cout << "物理世界实现已销毁" << std::endl;
+        PS_LOG(LOG_WORLD, LOG_DEBUG, "物理世界实现已销毁");
     }
-    
+
     void initialize(float gravityX, float gravityY, float gravityZ) {
-        std::cout << "初始化物理世界，重力: (" 
-                  << gravityX << ", " 
-                  << gravityY << ", " 
-                  << gravityZ << ")" << std::endl;
+        PS_LOG(LOG_WORLD, LOG_INFO, "初始化物理世界，重力: ("
+                  << gravityX << ", "
+                  << gravityY << ", "
+                  << gravityZ << ")");
+        m_gravity.set(gravityX, gravityY, gravityZ);
+    }
+
+    BodyArrays arrays() {
+        BodyArrays bodies;
+        bodies.count = m_handles.size();
+        bodies.handles = m_handles.data();
+        bodies.bodyTypes = m_bodyTypes.data();
+        bodies.masses = m_masses.data();
+        bodies.inverseInertias = m_inverseInertias.data();
+        bodies.shapeTypes = m_shapeTypes.data();
+        bodies.shapeParams = m_shapeParams.data();
+        bodies.frictions = m_frictions.data();
+        bodies.restitutions = m_restitutions.data();
+        bodies.ccdThresholds = m_ccdThresholds.data();
+        bodies.positions = m_positions.data();
+        bodies.rotations = m_rotations.data();
+        bodies.linearVelocities = m_linearVelocities.data();
+        bodies.angularVelocities = m_angularVelocities.data();
+        bodies.forces = m_forces.data();
+        bodies.torques = m_torques.data();
+        bodies.sleepIslands = m_sleepIslands.data();
+        bodies.sleepTimes = m_sleepTimes.data();
+        return bodies;
+    }
+
+    /**
+     * @brief 关节数组，同时按句柄更新两端刚体的行号
+     */
+    JointArrays jointArrays() {
+        std::size_t count = m_jointHandles.size();
+        m_jointRows.resize(count * 2);
+        for (std::size_t i = 0; i < count * 2; ++i) {
+            m_jointRows[i] = getBodyIndex(static_cast<std::uint32_t>(m_jointBodies[i]));
+        }
+        JointArrays joints;
+        joints.count = count;
+        joints.handles = m_jointHandles.data();
+        joints.types = m_jointTypes.data();
+        joints.bodies = m_jointBodies.data();
+        joints.localAnchors = m_jointAnchors.data();
+        joints.localAxes = m_jointAxes.data();
+        joints.references = m_jointReferences.data();
+        joints.lengths = m_jointLengths.data();
+        joints.impulses = m_jointImpulses.data();
+        joints.bodyRows = m_jointRows.data();
+        return joints;
+    }
+
+    int stepSimulation(float timeStep, int maxSubSteps, float fixedTimeStep) {
+        PS_LOG(LOG_WORLD, LOG_TRACE, "步进模拟，时间步长: " << timeStep
+                  << ", 最大子步数: " << maxSubSteps);
+
+        int subSteps = 0;
+        if (maxSubSteps > 0) {
+            m_accumulator += timeStep;
+            if (fixedTimeStep > 0.0f && m_accumulator >= fixedTimeStep) {
+                subSteps = static_cast<int>(m_accumulator / fixedTimeStep);
+                m_accumulator -= subSteps * static_cast<double>(fixedTimeStep);
+            }
+        } else {
+            // 可变步长
+            fixedTimeStep = timeStep;
+            m_accumulator = 0.0;
+            subSteps = timeStep > 0.0f ? 1 : 0;
+            maxSubSteps = 1;
+        }
+
+        // 超出最大子步数的时间直接丢弃
+        int clamped = std::min(subSteps, maxSubSteps);
+        bool profiling = m_profiler.isEnabled();
+        if (profiling) {
+            m_profiler.beginSample();
+        }
+        {
+            ScopedTimer total(m_profiler, PROFILE_TOTAL);
+            for (int i = 0; i < clamped; ++i) {
+                if (i == clamped - 1) {
+                    ScopedTimer sync(m_profiler, PROFILE_SYNC);
+                    m_previousPositions = m_positions;
+                    m_previousRotations = m_rotations;
+                }
+                singleStep(fixedTimeStep);
+            }
+
+            m_alpha = fixedTimeStep > 0.0f ? static_cast<float>(m_accumulator / fixedTimeStep) : 0.0f;
+            ScopedTimer sync(m_profiler, PROFILE_SYNC);
+            interpolate();
+        }
+        if (profiling) {
+            m_profiler.setCounter(PROFILE_BODIES, static_cast<std::int32_t>(m_handles.size()));
+            m_profiler.setCounter(PROFILE_SUBSTEPS, clamped);
+            m_profiler.endSample();
+        }
+        return clamped;
+    }
+
+    void singleStep(float timeStep) {
+        BodyArrays bodies = arrays();
+        JointArrays joints = jointArrays();
+        {
+            ScopedTimer timer(m_profiler, PROFILE_INTEGRATE);
+            integrateVelocities(bodies, m_gravity, timeStep, m_pool);
+        }
+        {
+            ScopedTimer timer(m_profiler, PROFILE_BROADPHASE);
+            m_broadphase.update(bodies, m_pool, timeStep);
+        }
+        bool woken;
+        {
+            ScopedTimer timer(m_profiler, PROFILE_NARROWPHASE);
+            m_narrowphase.update(bodies, m_broadphase.getPairs().data(), m_broadphase.getPairCount(), m_pool);
+        }
+        {
+            ScopedTimer timer(m_profiler, PROFILE_ISLANDS);
+            woken = m_islands.wake(bodies, m_narrowphase, joints);
+        }
+        if (woken) {
+            // 被唤醒的刚体之间及其与静态刚体的接触需要重新生成
+            ScopedTimer timer(m_profiler, PROFILE_NARROWPHASE);
+            m_narrowphase.update(bodies, m_broadphase.getPairs().data(), m_broadphase.getPairCount(), m_pool);
+        }
+        {
+            ScopedTimer timer(m_profiler, PROFILE_SOLVE);
+            m_solver.solve(bodies, m_narrowphase, joints, timeStep, m_pool);
+        }
+        {
+            ScopedTimer timer(m_profiler, PROFILE_ISLANDS);
+            m_islands.update(bodies, m_narrowphase, joints, timeStep);
+        }
+        {
+            ScopedTimer timer(m_profiler, PROFILE_INTEGRATE);
+            m_ccd.update(bodies, m_broadphase.getPairs().data(), m_broadphase.getPairCount(), timeStep, m_pool);
+            integratePositions(bodies, timeStep, m_pool);
+        }
+        if (m_profiler.isEnabled()) {
+            m_profiler.setCounter(PROFILE_PAIRS, static_cast<std::int32_t>(m_broadphase.getPairCount()));
+            m_profiler.setCounter(PROFILE_CONTACTS, static_cast<std::int32_t>(m_narrowphase.getContactCount()));
+            m_profiler.addCounter(PROFILE_ITERATIONS, m_solver.getIterations());
+        }
+        PS_LOG(LOG_SOLVER, LOG_TRACE, "候选对: " << m_broadphase.getPairCount()
+                  << ", 接触点: " << m_narrowphase.getContactCount()
+                  << ", 迭代次数: " << m_solver.getIterations());
+    }
+
+    /**
+     * @brief 在最后一个子步前后的状态之间插值，旋转使用归一化线性插值
+     */
+    void interpolate() {
+        std::size_t count = m_handles.size();
+        if (m_previousPositions.size() != count * 3) {
+            resetInterpolation();
+            return;
+        }
+        m_interpolatedPositions.resize(count * 3);
+        m_interpolatedRotations.resize(count * 4);
+        float alpha = m_alpha;
+        for (std::size_t i = 0; i < count * 3; ++i) {
+            m_interpolatedPositions[i] = m_previousPositions[i] + (m_positions[i] - m_previousPositions[i]) * alpha;
+        }
+        for (std::size_t i = 0; i < count; ++i) {
+            const float* from = &m_previousRotations[i * 4];
+            const float* to = &m_rotations[i * 4];
+            float* out = &m_interpolatedRotations[i * 4];
+            float sign = from[0] * to[0] + from[1] * to[1] + from[2] * to[2] + from[3] * to[3] < 0.0f ? -1.0f : 1.0f;
+            float length = 0.0f;
+            for (int k = 0; k < 4; ++k) {
+                out[k] = from[k] + (sign * to[k] - from[k]) * alpha;
+                length += out[k] * out[k];
+            }
+            length = std::sqrt(length);
+            for (int k = 0; k < 4; ++k) {
+                out[k] = length > 0.0f ? out[k] / length : to[k];
+            }
+        }
+    }
+
+    /**
+     * @brief 上一状态失效时（如重设累加器），插值结果直接取当前状态
+     */
+    void resetInterpolation() {
+        m_previousPositions = m_positions;
+        m_previousRotations = m_rotations;
+        m_interpolatedPositions = m_positions;
+        m_interpolatedRotations = m_rotations;
+    }
+
+    void addRigidBodies(RigidBody* const* bodies, std::size_t count) {
+        PS_LOG(LOG_WORLD, LOG_INFO, "添加刚体到物理世界，数量: " << count);
+        std::size_t first = m_handles.size();
+        reserve(first + count);
+        for (std::size_t i = 0; i < count; ++i) {
+            RigidBody* body = bodies[i];
+            if (body->getWorld() || getBodyIndex(body->getHandle()) >= 0) {
+                continue;
+            }
+
+            Vector3 position = body->getPosition();
+            Quaternion rotation = body->getRotation();
+            Vector3 linearVelocity = body->getLinearVelocity();
+            Vector3 angularVelocity = body->getAngularVelocity();
+            float shapeParams[4];
+            body->getShapeParams(shapeParams);
+            float force[3];
+            float torque[3];
+            float inverseInertia[3];
+            body->getAccumulatedForce(force, torque);
+            body->getInverseInertia(inverseInertia);
+
+            std::uint32_t slot = slotIndex(body->getHandle());
+            if (slot >= m_slotRows.size()) {
+                m_slotRows.resize(std::max<std::size_t>(slot + 1, m_slotRows.size() * 2), -1);
+            }
+            m_slotRows[slot] = static_cast<std::int32_t>(m_handles.size());
+            m_handles.push_back(body->getHandle());
+            push(m_positions, position);
+            m_rotations.insert(m_rotations.end(),
+                               {rotation.getX(), rotation.getY(), rotation.getZ(), rotation.getW()});
+            push(m_linearVelocities, linearVelocity);
+            push(m_angularVelocities, angularVelocity);
+            m_masses.push_back(body->getMass());
+            m_shapeTypes.push_back(static_cast<std::int32_t>(body->getShapeType()));
+            m_bodyTypes.push_back(static_cast<std::int32_t>(body->getBodyType()));
+            m_shapeParams.insert(m_shapeParams.end(), shapeParams, shapeParams + 4);
+            m_forces.insert(m_forces.end(), force, force + 3);
+            m_torques.insert(m_torques.end(), torque, torque + 3);
+            m_inverseInertias.insert(m_inverseInertias.end(), inverseInertia, inverseInertia + 3);
+            m_frictions.push_back(body->getFriction());
+            m_restitutions.push_back(body->getRestitution());
+            m_ccdThresholds.push_back(body->getCcdMotionThreshold());
+            m_sleepIslands.push_back(0);
+            m_sleepTimes.push_back(0.0f);
+        }
+        // 新刚体的上一状态和插值结果取当前状态，已有刚体的插值不受影响
+        if (interpolationRows() == first) {
+            appendRows(m_previousPositions, m_positions, first, 3);
+            appendRows(m_previousRotations, m_rotations, first, 4);
+            appendRows(m_interpolatedPositions, m_positions, first, 3);
+            appendRows(m_interpolatedRotations, m_rotations, first, 4);
+        } else {
+            resetInterpolation();
+        }
     }
-    
-    void stepSimulation(float timeStep, int maxSubSteps) {
-        std::cout << "步进模拟，时间步长: " << timeStep 
-                  << ", 最大子步数: " << maxSubSteps << std::endl;
+
+    void removeRigidBodies(RigidBody* const* bodies, std::size_t count) {
+        PS_LOG(LOG_WORLD, LOG_INFO, "从物理世界移除刚体，数量: " << count);
+        bool interpolated = interpolationRows() == m_handles.size();
+        bool wake = false;
+        for (std::size_t i = 0; i < count; ++i) {
+            std::uint32_t handle = bodies[i]->getHandle();
+            int row = getBodyIndex(handle);
+            if (row < 0) {
+                continue;
+            }
+            // 活动的动态刚体只与活动的刚体接触，移除它不影响休眠的岛屿；
+            // 移除静态、运动学或休眠的刚体时不知道哪些休眠的刚体依靠它支撑，之后全部唤醒
+            bool dynamic = m_bodyTypes[row] == static_cast<std::int32_t>(BodyType::DYNAMIC) && m_masses[row] > 0.0f;
+            wake = wake || !dynamic || m_sleepIslands[row] != 0;
+
+            // 最后一行移到被移除的行，其余行不动
+            std::size_t last = m_handles.size() - 1;
+            swapRemove(m_handles, row, last, 1);
+            swapRemove(m_positions, row, last, 3);
+            swapRemove(m_rotations, row, last, 4);
+            swapRemove(m_linearVelocities, row, last, 3);
+            swapRemove(m_angularVelocities, row, last, 3);
+            swapRemove(m_masses, row, last, 1);
+            swapRemove(m_shapeTypes, row, last, 1);
+            swapRemove(m_bodyTypes, row, last, 1);
+            swapRemove(m_shapeParams, row, last, 4);
+            swapRemove(m_forces, row, last, 3);
+            swapRemove(m_torques, row, last, 3);
+            swapRemove(m_inverseInertias, row, last, 3);
+            swapRemove(m_frictions, row, last, 1);
+            swapRemove(m_restitutions, row, last, 1);
+            swapRemove(m_ccdThresholds, row, last, 1);
+            swapRemove(m_sleepIslands, row, last, 1);
+            swapRemove(m_sleepTimes, row, last, 1);
+            if (interpolated) {
+                swapRemove(m_previousPositions, row, last, 3);
+                swapRemove(m_previousRotations, row, last, 4);
+                swapRemove(m_interpolatedPositions, row, last, 3);
+                swapRemove(m_interpolatedRotations, row, last, 4);
+            }
+            if (static_cast<std::size_t>(row) != last) {
+                m_slotRows[slotIndex(static_cast<std::uint32_t>(m_handles[row]))] = row;
+            }
+            m_slotRows[slotIndex(handle)] = -1;
+        }
+        if (wake) {
+            m_islands.wakeAll(arrays());
+        }
+        if (!interpolated) {
+            resetInterpolation();
+        }
+    }
+
+    std::size_t addJoints(std::size_t count, const std::int32_t* types, const std::int64_t* bodies,
+                          const float* localAnchors, const float* localAxes, const float* references,
+                          const float* lengths, std::int64_t* handles) {
+        PS_LOG(LOG_WORLD, LOG_INFO, "添加关节，数量: " << count);
+        if (!m_jointSlots) {
+            m_jointSlots = std::make_unique<SlotMap<std::int32_t>>();
+        }
+        reserveJoints(m_jointHandles.size() + count);
+        std::unordered_set<std::int32_t> islands;
+        std::size_t added = 0;
+        for (std::size_t i = 0; i < count; ++i) {
+            std::int32_t row = static_cast<std::int32_t>(m_jointHandles.size());
+            try {
+                handles[i] = m_jointSlots->emplace(row).first;
+            } catch (const std::length_error&) {
+                handles[i] = 0;
+                continue;
+            }
+            m_jointHandles.push_back(handles[i]);
+            m_jointTypes.push_back(types[i]);
+            m_jointBodies.insert(m_jointBodies.end(), bodies + i * 2, bodies + i * 2 + 2);
+            m_jointAnchors.insert(m_jointAnchors.end(), localAnchors + i * 6, localAnchors + i * 6 + 6);
+            m_jointAxes.insert(m_jointAxes.end(), localAxes + i * 6, localAxes + i * 6 + 6);
+            m_jointReferences.insert(m_jointReferences.end(), references + i * 4, references + i * 4 + 4);
+            m_jointLengths.push_back(lengths[i]);
+            m_jointImpulses.insert(m_jointImpulses.end(), JOINT_MAX_ROWS, 0.0f);
+            collectIslands(bodies + i * 2, islands);
+            ++added;
+        }
+        wakeIslands(islands);
+        return added;
     }
-    
-    void addRigidBody(RigidBody* body) {
-        std::cout << "添加刚体到物理世界" << std::endl;
+
+    std::size_t removeJoints(const std::int64_t* handles, std::size_t count) {
+        PS_LOG(LOG_WORLD, LOG_INFO, "移除关节，数量: " << count);
+        std::unordered_set<std::int32_t> islands;
+        std::size_t removed = 0;
+        for (std::size_t i = 0; i < count; ++i) {
+            int row = getJointIndex(handles[i]);
+            if (row < 0) {
+                continue;
+            }
+            collectIslands(&m_jointBodies[row * 2], islands);
+            std::size_t last = m_jointHandles.size() - 1;
+            swapRemove(m_jointHandles, row, last, 1);
+            swapRemove(m_jointTypes, row, last, 1);
+            swapRemove(m_jointBodies, row, last, 2);
+            swapRemove(m_jointAnchors, row, last, 6);
+            swapRemove(m_jointAxes, row, last, 6);
+            swapRemove(m_jointReferences, row, last, 4);
+            swapRemove(m_jointLengths, row, last, 1);
+            swapRemove(m_jointImpulses, row, last, JOINT_MAX_ROWS);
+            m_jointSlots->erase(static_cast<SlotHandle>(handles[i]));
+            if (static_cast<std::size_t>(row) != last) {
+                *m_jointSlots->get(static_cast<SlotHandle>(m_jointHandles[row])) = row;
+            }
+            ++removed;
+        }
+        wakeIslands(islands);
+        return removed;
     }
-    
-    void removeRigidBody(RigidBody* body) {
-        std::cout << "从物理世界移除刚体" << std::endl;
+
+    int getJointIndex(std::int64_t handle) const {
+        if (!m_jointSlots || handle <= 0 || handle > static_cast<std::int64_t>(UINT32_MAX)) {
+            return -1;
+        }
+        const std::int32_t* row = m_jointSlots->get(static_cast<SlotHandle>(handle));
+        return row ? *row : -1;
     }
-    
+
+    std::size_t getJointCapacity() const {
+        return m_jointCapacity;
+    }
+
     void setGravity(float x, float y, float z) {
-        std::cout << "设置重力: (" << x << ", " << y << ", " << z << ")" << std::endl;
+        PS_LOG(LOG_WORLD, LOG_INFO, "设置重力: (" << x << ", " << y << ", " << z << ")");
+        m_gravity.set(x, y, z);
     }
-    
+
     Vector3 getGravity() const {
-        return Vector3(0.0f, -9.81f, 0.0f);
+        return m_gravity;
+    }
+
+    std::size_t getBodyCount() const {
+        return m_handles.size();
+    }
+
+    std::size_t getBodyCapacity() const {
+        return m_capacity;
+    }
+
+    std::size_t countDynamic(bool sleeping) const {
+        std::size_t count = 0;
+        for (std::size_t i = 0; i < m_handles.size(); ++i) {
+            bool dynamic = m_bodyTypes[i] == static_cast<std::int32_t>(BodyType::DYNAMIC) && m_masses[i] > 0.0f;
+            if (dynamic && (m_sleepIslands[i] != 0) == sleeping) {
+                ++count;
+            }
+        }
+        return count;
+    }
+
+    int getBodyIndex(std::uint32_t handle) const {
+        std::uint32_t slot = slotIndex(handle);
+        if (slot >= m_slotRows.size()) {
+            return -1;
+        }
+        // 槽号相同的过期句柄与该行当前的句柄不一致
+        std::int32_t row = m_slotRows[slot];
+        return row >= 0 && m_handles[row] == handle ? row : -1;
+    }
+
+    // 结构数组(SoA)存储，第i行对应第i个刚体
+    std::vector<std::int64_t> m_handles;
+    std::vector<float> m_positions;
+    std::vector<float> m_rotations;
+    std::vector<float> m_linearVelocities;
+    std::vector<float> m_angularVelocities;
+    std::vector<float> m_masses;
+    std::vector<std::int32_t> m_shapeTypes;
+    std::vector<std::int32_t> m_bodyTypes;
+    std::vector<float> m_shapeParams;
+    std::vector<float> m_forces;
+    std::vector<float> m_torques;
+    std::vector<float> m_inverseInertias;
+    std::vector<float> m_frictions;
+    std::vector<float> m_restitutions;
+    std::vector<float> m_ccdThresholds;
+    std::vector<std::int32_t> m_sleepIslands;
+    std::vector<float> m_sleepTimes;
+
+    // 固定步长的累加器和渲染插值状态
+    double m_accumulator = 0.0;
+    float m_alpha = 0.0f;
+    std::vector<float> m_previousPositions;
+    std::vector<float> m_previousRotations;
+    std::vector<float> m_interpolatedPositions;
+    std::vector<float> m_interpolatedRotations;
+
+    // 关节结构数组，第i行对应第i个关节，列的布局见JointArrays
+    std::vector<std::int64_t> m_jointHandles;
+    std::vector<std::int32_t> m_jointTypes;
+    std::vector<std::int64_t> m_jointBodies;
+    std::vector<float> m_jointAnchors;
+    std::vector<float> m_jointAxes;
+    std::vector<float> m_jointReferences;
+    std::vector<float> m_jointLengths;
+    std::vector<float> m_jointImpulses;
+    // 两端刚体的行号，每步按句柄重新查找
+    std::vector<std::int32_t> m_jointRows;
+
+    Broadphase m_broadphase;
+    Narrowphase m_narrowphase;
+    ContinuousCollision m_ccd;
+    ContactSolver m_solver;
+    IslandManager m_islands;
+    Profiler m_profiler;
+    TaskPool m_pool;
+
+private:
+    void reserve(std::size_t count) {
+        if (count <= m_capacity) {
+            return;
+        }
+        // 按倍数扩容，逐个添加刚体时均摊O(1)
+        count = std::max(count, m_capacity * 2);
+        m_capacity = count;
+        m_handles.reserve(count);
+        m_positions.reserve(count * 3);
+        m_rotations.reserve(count * 4);
+        m_linearVelocities.reserve(count * 3);
+        m_angularVelocities.reserve(count * 3);
+        m_masses.reserve(count);
+        m_shapeTypes.reserve(count);
+        m_bodyTypes.reserve(count);
+        m_shapeParams.reserve(count * 4);
+        m_forces.reserve(count * 3);
+        m_torques.reserve(count * 3);
+        m_inverseInertias.reserve(count * 3);
+        m_frictions.reserve(count);
+        m_restitutions.reserve(count);
+        m_ccdThresholds.reserve(count);
+        m_sleepIslands.reserve(count);
+        m_sleepTimes.reserve(count);
+    }
+
+    void reserveJoints(std::size_t count) {
+        if (count <= m_jointCapacity) {
+            return;
+        }
+        count = std::max(count, m_jointCapacity * 2);
+        m_jointCapacity = count;
+        m_jointHandles.reserve(count);
+        m_jointTypes.reserve(count);
+        m_jointBodies.reserve(count * 2);
+        m_jointAnchors.reserve(count * 6);
+        m_jointAxes.reserve(count * 6);
+        m_jointReferences.reserve(count * 4);
+        m_jointLengths.reserve(count);
+        m_jointImpulses.reserve(count * JOINT_MAX_ROWS);
+    }
+
+    /**
+     * @brief 记录关节两端刚体所在的休眠岛屿
+     */
+    void collectIslands(const std::int64_t* bodies, std::unordered_set<std::int32_t>& islands) const {
+        for (int k = 0; k < 2; ++k) {
+            int row = getBodyIndex(static_cast<std::uint32_t>(bodies[k]));
+            if (row >= 0 && m_sleepIslands[row] != 0) {
+                islands.insert(m_sleepIslands[row]);
+            }
+        }
+    }
+
+    /**
+     * @brief 唤醒这些休眠岛屿中的所有刚体
+     */
+    void wakeIslands(const std::unordered_set<std::int32_t>& islands) {
+        if (islands.empty()) {
+            return;
+        }
+        for (std::size_t i = 0; i < m_sleepIslands.size(); ++i) {
+            if (m_sleepIslands[i] != 0 && islands.count(m_sleepIslands[i])) {
+                m_sleepIslands[i] = 0;
+                m_sleepTimes[i] = 0.0f;
+            }
+        }
+    }
+
+    static void push(std::vector<float>& column, const Vector3& v) {
+        column.insert(column.end(), {v.getX(), v.getY(), v.getZ()});
     }
+
+    /**
+     * @brief 上一状态和插值结果的行数，与刚体数量不一致时说明它们已失效
+     */
+    std::size_t interpolationRows() const {
+        std::size_t rows = m_previousPositions.size() / 3;
+        bool consistent = m_previousRotations.size() == rows * 4 && m_interpolatedPositions.size() == rows * 3 &&
+                          m_interpolatedRotations.size() == rows * 4;
+        return consistent ? rows : static_cast<std::size_t>(-1);
+    }
+
+    /**
+     * @brief 把from中从第first行开始的行追加到to
+     */
+    static void appendRows(std::vector<float>& to, const std::vector<float>& from, std::size_t first,
+                           std::size_t width) {
+        to.insert(to.end(), from.begin() + first * width, from.end());
+    }
+
+    /**
+     * @brief 用最后一行覆盖第row行并删除最后一行
+     */
+    template <typename T>
+    static void swapRemove(std::vector<T>& column, std::size_t row, std::size_t last, std::size_t width) {
+        if (row != last) {
+            std::copy_n(column.begin() + last * width, width, column.begin() + row * width);
+        }
+        column.resize(last * width);
+    }
+
+    // 刚体池槽号 -> 行号，不在本世界中的槽为-1
+    std::vector<std::int32_t> m_slotRows;
+    // 各列预留的行数，列数组只在reserve()中重新分配
+    std::size_t m_capacity = 0;
+    // 关节句柄 -> 行号，第一次添加关节时创建
+    std::unique_ptr<SlotMap<std::int32_t>> m_jointSlots;
+    std::size_t m_jointCapacity = 0;
+    Vector3 m_gravity;
 };
 
 PhysicsWorld::PhysicsWorld() : m_impl(std::make_unique<PhysicsWorldImpl>()) {
-    std::cout << "物理世界已创建" << std::endl;
+    PS_LOG(LOG_WORLD, LOG_DEBUG, "物理世界已创建");
 }
 
 PhysicsWorld::~PhysicsWorld() {
-    std::cout << "物理世界已销毁" << std::endl;
+    // 让仍在世界中的刚体取回自己的状态
+    for (std::int64_t handle : m_impl->m_handles) {
+        RigidBody::fromHandle(static_cast<std::uint32_t>(handle))->setWorld(nullptr);
+    }
+    PS_LOG(LOG_WORLD, LOG_DEBUG, "物理世界已销毁");
 }
 
 void PhysicsWorld::initialize(float gravityX, float gravityY, float gravityZ) {
     m_impl->initialize(gravityX, gravityY, gravityZ);
 }
 
-void PhysicsWorld::stepSimulation(float timeStep, int maxSubSteps) {
-    m_impl->stepSimulation(timeStep, maxSubSteps);
+int PhysicsWorld::stepSimulation(float timeStep, int maxSubSteps, float fixedTimeStep) {
+    return m_impl->stepSimulation(timeStep, maxSubSteps, fixedTimeStep);
+}
+
+float* PhysicsWorld::getInterpolatedPositions() {
+    return m_impl->m_interpolatedPositions.data();
+}
+
+float* PhysicsWorld::getInterpolatedRotations() {
+    return m_impl->m_interpolatedRotations.data();
+}
+
+float PhysicsWorld::getInterpolationAlpha() const {
+    return m_impl->m_alpha;
+}
+
+double PhysicsWorld::getAccumulator() const {
+    return m_impl->m_accumulator;
+}
+
+void PhysicsWorld::setAccumulator(double accumulator) {
+    m_impl->m_accumulator = accumulator;
+    m_impl->m_alpha = 0.0f;
+    m_impl->resetInterpolation();
 }
 
 void PhysicsWorld::addRigidBody(RigidBody* body) {
-    m_impl->addRigidBody(body);
+    addRigidBodies(&body, 1);
 }
 
 void PhysicsWorld::removeRigidBody(RigidBody* body) {
-    m_impl->removeRigidBody(body);
+    removeRigidBodies(&body, 1);
+}
+
+void PhysicsWorld::addRigidBodies(RigidBody* const* bodies, std::size_t count) {
+    m_impl->addRigidBodies(bodies, count);
+    for (std::size_t i = 0; i < count; ++i) {
+        if (!bodies[i]->getWorld() && m_impl->getBodyIndex(bodies[i]->getHandle()) >= 0) {
+            bodies[i]->setWorld(this);
+        }
+    }
+}
+
+void PhysicsWorld::removeRigidBodies(RigidBody* const* bodies, std::size_t count) {
+    for (std::size_t i = 0; i < count; ++i) {
+        if (bodies[i]->getWorld() == this) {
+            bodies[i]->setWorld(nullptr);
+        }
+    }
+    m_impl->removeRigidBodies(bodies, count);
+}
+
+std::size_t PhysicsWorld::getBodyCount() const {
+    return m_impl->getBodyCount();
+}
+
+std::size_t PhysicsWorld::getBodyCapacity() const {
+    return m_impl->getBodyCapacity();
+}
+
+int PhysicsWorld::getBodyIndex(const RigidBody* body) const {
+    return m_impl->getBodyIndex(body->getHandle());
+}
+
+int PhysicsWorld::getBodyIndex(std::uint32_t handle) const {
+    return m_impl->getBodyIndex(handle);
+}
+
+float* PhysicsWorld::getPositions() {
+    return m_impl->m_positions.data();
+}
+
+float* PhysicsWorld::getRotations() {
+    return m_impl->m_rotations.data();
+}
+
+float* PhysicsWorld::getLinearVelocities() {
+    return m_impl->m_linearVelocities.data();
+}
+
+float* PhysicsWorld::getAngularVelocities() {
+    return m_impl->m_angularVelocities.data();
+}
+
+float* PhysicsWorld::getMasses() {
+    return m_impl->m_masses.data();
+}
+
+std::int32_t* PhysicsWorld::getShapeTypes() {
+    return m_impl->m_shapeTypes.data();
+}
+
+std::int32_t* PhysicsWorld::getBodyTypes() {
+    return m_impl->m_bodyTypes.data();
+}
+
+float* PhysicsWorld::getShapeParams() {
+    return m_impl->m_shapeParams.data();
+}
+
+float* PhysicsWorld::getForces() {
+    return m_impl->m_forces.data();
+}
+
+float* PhysicsWorld::getTorques() {
+    return m_impl->m_torques.data();
+}
+
+float* PhysicsWorld::getInverseInertias() {
+    return m_impl->m_inverseInertias.data();
+}
+
+float* PhysicsWorld::getFrictions() {
+    return m_impl->m_frictions.data();
+}
+
+float* PhysicsWorld::getRestitutions() {
+    return m_impl->m_restitutions.data();
+}
+
+float* PhysicsWorld::getCcdThresholds() {
+    return m_impl->m_ccdThresholds.data();
+}
+
+std::int32_t* PhysicsWorld::getSleepIslands() {
+    return m_impl->m_sleepIslands.data();
+}
+
+float* PhysicsWorld::getSleepTimes() {
+    return m_impl->m_sleepTimes.data();
+}
+
+std::int64_t* PhysicsWorld::getHandles() {
+    return m_impl->m_handles.data();
+}
+
+std::size_t PhysicsWorld::addJoints(std::size_t count, const std::int32_t* types, const std::int64_t* bodies,
+                                    const float* localAnchors, const float* localAxes, const float* references,
+                                    const float* lengths, std::int64_t* handles) {
+    return m_impl->addJoints(count, types, bodies, localAnchors, localAxes, references, lengths, handles);
+}
+
+std::size_t PhysicsWorld::removeJoints(const std::int64_t* handles, std::size_t count) {
+    return m_impl->removeJoints(handles, count);
+}
+
+std::size_t PhysicsWorld::getJointCount() const {
+    return m_impl->m_jointHandles.size();
+}
+
+std::size_t PhysicsWorld::getJointCapacity() const {
+    return m_impl->getJointCapacity();
+}
+
+int PhysicsWorld::getJointIndex(std::uint32_t handle) const {
+    return m_impl->getJointIndex(handle);
+}
+
+std::int64_t* PhysicsWorld::getJointHandles() {
+    return m_impl->m_jointHandles.data();
+}
+
+std::int32_t* PhysicsWorld::getJointTypes() {
+    return m_impl->m_jointTypes.data();
+}
+
+std::int64_t* PhysicsWorld::getJointBodies() {
+    return m_impl->m_jointBodies.data();
+}
+
+float* PhysicsWorld::getJointLocalAnchors() {
+    return m_impl->m_jointAnchors.data();
+}
+
+float* PhysicsWorld::getJointLocalAxes() {
+    return m_impl->m_jointAxes.data();
+}
+
+float* PhysicsWorld::getJointReferences() {
+    return m_impl->m_jointReferences.data();
+}
+
+float* PhysicsWorld::getJointLengths() {
+    return m_impl->m_jointLengths.data();
+}
+
+float* PhysicsWorld::getJointImpulses() {
+    return m_impl->m_jointImpulses.data();
+}
+
+Broadphase& PhysicsWorld::getBroadphase() {
+    return m_impl->m_broadphase;
+}
+
+Narrowphase& PhysicsWorld::getNarrowphase() {
+    return m_impl->m_narrowphase;
+}
+
+ContactSolver& PhysicsWorld::getContactSolver() {
+    return m_impl->m_solver;
+}
+
+IslandManager& PhysicsWorld::getIslandManager() {
+    return m_impl->m_islands;
+}
+
+Profiler& PhysicsWorld::getProfiler() {
+    return m_impl->m_profiler;
+}
+
+void PhysicsWorld::setSleepingEnabled(bool enabled) {
+    m_impl->m_islands.setEnabled(enabled);
+    if (!enabled) {
+        wakeAll();
+    }
+}
+
+void PhysicsWorld::wakeAll() {
+    m_impl->m_islands.wakeAll(m_impl->arrays());
+}
+
+std::size_t PhysicsWorld::getAwakeCount() const {
+    return m_impl->countDynamic(false);
+}
+
+std::size_t PhysicsWorld::getSleepingCount() const {
+    return m_impl->countDynamic(true);
+}
+
+void PhysicsWorld::setThreadCount(int count) {
+    PS_LOG(LOG_WORLD, LOG_INFO, "设置线程数: " << count);
+    m_impl->m_pool.setThreadCount(count);
+}
+
+int PhysicsWorld::getThreadCount() const {
+    return m_impl->m_pool.getThreadCount();
 }
 
 void PhysicsWorld::setGravity(float x, float y, float z) {
@@ -75,4 +865,4 @@ Vector3 PhysicsWorld::getGravity() const {
     return m_impl->getGravity();
 }
 
-} // namespace PhysicsSimulator
\ No newline at end of file
+} // namespace PhysicsSimulator
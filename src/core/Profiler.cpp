@@ -0,0 +1,44 @@
+#include "Profiler.h"
+#include <algorithm>
+
+namespace PhysicsSimulator {
+
+Profiler::Profiler() : m_enabled(false), m_current(), m_next(0), m_count(0) {
+}
+
+void Profiler::setEnabled(bool enabled, std::size_t capacity) {
+    m_enabled = enabled;
+    m_samples.assign(enabled ? std::max<std::size_t>(capacity, 1) : 0, Sample());
+    m_next = 0;
+    m_count = 0;
+}
+
+void Profiler::beginSample() {
+    m_current = Sample();
+}
+
+void Profiler::endSample() {
+    if (m_samples.empty()) {
+        return;
+    }
+    m_samples[m_next] = m_current;
+    m_next = (m_next + 1) % m_samples.size();
+    m_count = std::min(m_count + 1, m_samples.size());
+}
+
+std::size_t Profiler::getSampleCount() const {
+    return m_count;
+}
+
+std::size_t Profiler::copySamples(float* times, std::int32_t* counters, std::size_t maxCount) const {
+    std::size_t count = std::min(m_count, maxCount);
+    std::size_t first = (m_next + m_samples.size() - count) % std::max<std::size_t>(m_samples.size(), 1);
+    for (std::size_t i = 0; i < count; ++i) {
+        const Sample& sample = m_samples[(first + i) % m_samples.size()];
+        std::copy_n(sample.times, PROFILE_PHASE_COUNT, times + i * PROFILE_PHASE_COUNT);
+        std::copy_n(sample.counters, PROFILE_COUNTER_COUNT, counters + i * PROFILE_COUNTER_COUNT);
+    }
+    return count;
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,121 @@
+#include "TaskPool.h"
+#include <algorithm>
+
+namespace PhysicsSimulator {
+
+TaskPool::TaskPool()
+    : m_generation(0), m_busy(0), m_stopping(false), m_task(nullptr), m_count(0), m_grain(1), m_chunks(0),
+      m_next(0) {
+}
+
+TaskPool::~TaskPool() {
+    stopWorkers();
+}
+
+void TaskPool::setThreadCount(int count) {
+    if (count <= 0) {
+        count = static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    }
+    if (count == getThreadCount()) {
+        return;
+    }
+    stopWorkers();
+    m_stopping = false;
+    for (int i = 1; i < count; ++i) {
+        m_workers.emplace_back(&TaskPool::workerLoop, this, m_generation);
+    }
+}
+
+int TaskPool::getThreadCount() const {
+    return static_cast<int>(m_workers.size()) + 1;
+}
+
+void TaskPool::stopWorkers() {
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_stopping = true;
+    }
+    m_start.notify_all();
+    for (std::thread& worker : m_workers) {
+        worker.join();
+    }
+    m_workers.clear();
+}
+
+void TaskPool::parallelFor(std::size_t count, std::size_t grain, const Task& task) {
+    if (count == 0) {
+        return;
+    }
+    grain = std::max<std::size_t>(grain, 1);
+    std::size_t chunks = chunkCount(count, grain);
+    if (m_workers.empty() || chunks == 1) {
+        for (std::size_t begin = 0; begin < count; begin += grain) {
+            task(begin, std::min(begin + grain, count));
+        }
+        return;
+    }
+
+    {
+        std::lock_guard<std::mutex> lock(m_mutex);
+        m_task = &task;
+        m_count = count;
+        m_grain = grain;
+        m_chunks = chunks;
+        m_next.store(0, std::memory_order_relaxed);
+        m_error = nullptr;
+        m_busy = m_workers.size();
+        ++m_generation;
+    }
+    m_start.notify_all();
+    runChunks();
+
+    // 等所有工作线程离开本次任务后才能释放task
+    std::unique_lock<std::mutex> lock(m_mutex);
+    m_done.wait(lock, [this] { return m_busy == 0; });
+    m_task = nullptr;
+    if (m_error) {
+        std::exception_ptr error = m_error;
+        m_error = nullptr;
+        std::rethrow_exception(error);
+    }
+}
+
+void TaskPool::runChunks() {
+    for (;;) {
+        std::size_t chunk = m_next.fetch_add(1, std::memory_order_relaxed);
+        if (chunk >= m_chunks) {
+            return;
+        }
+        std::size_t begin = chunk * m_grain;
+        try {
+            (*m_task)(begin, std::min(begin + m_grain, m_count));
+        } catch (...) {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            if (!m_error) {
+                m_error = std::current_exception();
+            }
+        }
+    }
+}
+
+void TaskPool::workerLoop(std::size_t seen) {
+    for (;;) {
+        {
+            std::unique_lock<std::mutex> lock(m_mutex);
+            m_start.wait(lock, [this, seen] { return m_stopping || m_generation != seen; });
+            if (m_stopping) {
+                return;
+            }
+            seen = m_generation;
+        }
+        runChunks();
+        {
+            std::lock_guard<std::mutex> lock(m_mutex);
+            if (--m_busy == 0) {
+                m_done.notify_one();
+            }
+        }
+    }
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,706 @@
+#include "ContactSolver.h"
+#include "Narrowphase.h"
+#include "Integrator.h"
+#include "IslandManager.h"
+#include "RigidBody.h"
+#include "TaskPool.h"
+#include "Vector3.h"
+#include <algorithm>
+#include <chrono>
+#include <cmath>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// 位置修正系数和允许的穿透量
+const float BAUMGARTE = 0.2f;
+const float PENETRATION_SLOP = 0.005f;
+// 法向相对速度低于该值时才产生反弹
+const float RESTITUTION_THRESHOLD = 1.0f;
+// 两帧接触点在刚体A局部坐标中的距离小于该值时视为同一个点
+const float MATCH_DISTANCE = 0.05f;
+// 关节的warm starting冲量按该比例施加，完全施加时刚性链条中由位置修正带入的冲量会逐步放大
+const float JOINT_WARM_STARTING = 0.85f;
+// 并行构建约束时每块的接触数量
+const std::size_t CONTACT_GRAIN = 256;
+
+/**
+ * @brief 单个接触点的约束数据，方向0为法线，1、2为切向
+ */
+struct ContactConstraint {
+    std::int32_t a;
+    std::int32_t b;
+    Vector3 directions[3];
+    Vector3 raCrossD[3];
+    Vector3 rbCrossD[3];
+    Vector3 angularA[3];
+    Vector3 angularB[3];
+    float effectiveMass[3];
+    float inverseMassA;
+    float inverseMassB;
+    float target;
+    float friction;
+    float impulses[3];
+};
+
+/**
+ * @brief 关节的一个约束行：线性部分沿linear，角度部分为jacobianA/B（角度行的linear为0）
+ *
+ * 相对速度为 (vB - vA)·linear + wB·jacobianB - wA·jacobianA，
+ * 每个关节占JOINT_MAX_ROWS个行位置，未使用的行的有效质量为0。
+ */
+struct JointRow {
+    std::int32_t a;
+    std::int32_t b;
+    Vector3 linear;
+    Vector3 jacobianA;
+    Vector3 jacobianB;
+    Vector3 angularA;
+    Vector3 angularB;
+    float effectiveMass;
+    float inverseMassA;
+    float inverseMassB;
+    float target;
+    float impulse;
+};
+
+Vector3 load(const float* v) {
+    return Vector3(v[0], v[1], v[2]);
+}
+
+void accumulate(float* out, const Vector3& v, float scale) {
+    out[0] += v.getX() * scale;
+    out[1] += v.getY() * scale;
+    out[2] += v.getZ() * scale;
+}
+
+/**
+ * @brief 用四元数旋转向量，sign为-1时用它的逆旋转（世界坐标转局部坐标）
+ */
+Vector3 rotate(const float q[4], const Vector3& v, float sign) {
+    Vector3 u(q[0] * sign, q[1] * sign, q[2] * sign);
+    Vector3 t = u.cross(v) * 2.0f;
+    return v + t * q[3] + u.cross(t);
+}
+
+Vector3 rotateInverse(const float q[4], const Vector3& v) {
+    return rotate(q, v, -1.0f);
+}
+
+/**
+ * @brief 四元数乘法 out = a * b，conjugateB为true时b取共轭
+ */
+void multiply(const float a[4], const float b[4], bool conjugateB, float out[4]) {
+    float s = conjugateB ? -1.0f : 1.0f;
+    float bx = b[0] * s;
+    float by = b[1] * s;
+    float bz = b[2] * s;
+    float bw = b[3];
+    out[0] = a[3] * bx + a[0] * bw + a[1] * bz - a[2] * by;
+    out[1] = a[3] * by - a[0] * bz + a[1] * bw + a[2] * bx;
+    out[2] = a[3] * bz + a[0] * by - a[1] * bx + a[2] * bw;
+    out[3] = a[3] * bw - a[0] * bx - a[1] * by - a[2] * bz;
+}
+
+/**
+ * @brief 由法线构造两个正交的切向量
+ */
+void tangentBasis(const Vector3& n, Vector3& t1, Vector3& t2) {
+    if (std::fabs(n.getX()) > 0.57f) {
+        t1.set(n.getY(), -n.getX(), 0.0f);
+    } else {
+        t1.set(0.0f, n.getZ(), -n.getY());
+    }
+    t1.normalize();
+    t2 = n.cross(t1);
+}
+
+float relativeVelocity(const BodyArrays& bodies, const ContactConstraint& c, int d) {
+    Vector3 va = load(bodies.linearVelocities + c.a * 3);
+    Vector3 wa = load(bodies.angularVelocities + c.a * 3);
+    Vector3 vb = load(bodies.linearVelocities + c.b * 3);
+    Vector3 wb = load(bodies.angularVelocities + c.b * 3);
+    return (vb - va).dot(c.directions[d]) + wb.dot(c.rbCrossD[d]) - wa.dot(c.raCrossD[d]);
+}
+
+void applyImpulse(const BodyArrays& bodies, const ContactConstraint& c, int d, float impulse) {
+    // 非动态刚体的冲量为0，不写入它们的速度：它们被多个岛屿共享，并行求解时不能写
+    if (c.inverseMassA > 0.0f) {
+        accumulate(bodies.linearVelocities + c.a * 3, c.directions[d], -c.inverseMassA * impulse);
+        accumulate(bodies.angularVelocities + c.a * 3, c.angularA[d], -impulse);
+    }
+    if (c.inverseMassB > 0.0f) {
+        accumulate(bodies.linearVelocities + c.b * 3, c.directions[d], c.inverseMassB * impulse);
+        accumulate(bodies.angularVelocities + c.b * 3, c.angularB[d], impulse);
+    }
+}
+
+void solveNormal(const BodyArrays& bodies, ContactConstraint& c) {
+    float old = c.impulses[0];
+    float impulse = std::max(old + c.effectiveMass[0] * (c.target - relativeVelocity(bodies, c, 0)), 0.0f);
+    c.impulses[0] = impulse;
+    applyImpulse(bodies, c, 0, impulse - old);
+}
+
+void solveFriction(const BodyArrays& bodies, ContactConstraint& c) {
+    float limit = c.friction * c.impulses[0];
+    for (int d = 1; d < 3; ++d) {
+        float old = c.impulses[d];
+        float impulse = std::max(-limit, std::min(limit, old - c.effectiveMass[d] * relativeVelocity(bodies, c, d)));
+        c.impulses[d] = impulse;
+        applyImpulse(bodies, c, d, impulse - old);
+    }
+}
+
+float relativeVelocity(const BodyArrays& bodies, const JointRow& r) {
+    Vector3 va = load(bodies.linearVelocities + r.a * 3);
+    Vector3 wa = load(bodies.angularVelocities + r.a * 3);
+    Vector3 vb = load(bodies.linearVelocities + r.b * 3);
+    Vector3 wb = load(bodies.angularVelocities + r.b * 3);
+    return (vb - va).dot(r.linear) + wb.dot(r.jacobianB) - wa.dot(r.jacobianA);
+}
+
+void applyImpulse(const BodyArrays& bodies, const JointRow& r, float impulse) {
+    if (r.inverseMassA > 0.0f) {
+        accumulate(bodies.linearVelocities + r.a * 3, r.linear, -r.inverseMassA * impulse);
+        accumulate(bodies.angularVelocities + r.a * 3, r.angularA, -impulse);
+    }
+    if (r.inverseMassB > 0.0f) {
+        accumulate(bodies.linearVelocities + r.b * 3, r.linear, r.inverseMassB * impulse);
+        accumulate(bodies.angularVelocities + r.b * 3, r.angularB, impulse);
+    }
+}
+
+/**
+ * @brief 求解一个关节的所有约束行（双边约束，冲量不限制范围）
+ */
+void solveJoint(const BodyArrays& bodies, JointRow* rows) {
+    for (int k = 0; k < JOINT_MAX_ROWS; ++k) {
+        JointRow& r = rows[k];
+        if (r.effectiveMass == 0.0f) {
+            continue;
+        }
+        float delta = r.effectiveMass * (r.target - relativeVelocity(bodies, r));
+        r.impulse += delta;
+        applyImpulse(bodies, r, delta);
+    }
+}
+
+/**
+ * @brief 构建第j个关节的约束行，目标速度按Baumgarte系数消除位置误差
+ *
+ * 点对点和铰链约束两个锚点的世界坐标之差；铰链另外约束两端的轴平行；
+ * 滑块约束相对旋转等于reference，并约束锚点之差垂直于轴的分量；
+ * 距离关节约束锚点间距离等于长度。
+ */
+void buildJointRows(const BodyArrays& bodies, const JointArrays& joints, std::size_t j,
+                    const std::vector<float>& inverseMass, const std::vector<char>& dynamic, float dt,
+                    bool warmStarting, JointRow* rows) {
+    const float zero[3] = {0.0f, 0.0f, 0.0f};
+    std::int32_t a = joints.bodyRows[j * 2];
+    std::int32_t b = joints.bodyRows[j * 2 + 1];
+    const float* qa = bodies.rotations + a * 4;
+    const float* qb = bodies.rotations + b * 4;
+    const float* invIa = dynamic[a] ? bodies.inverseInertias + a * 3 : zero;
+    const float* invIb = dynamic[b] ? bodies.inverseInertias + b * 3 : zero;
+    Vector3 xa = load(bodies.positions + a * 3);
+    Vector3 xb = load(bodies.positions + b * 3);
+    Vector3 ra = rotate(qa, load(joints.localAnchors + j * 6), 1.0f);
+    Vector3 rb = rotate(qb, load(joints.localAnchors + j * 6 + 3), 1.0f);
+    Vector3 separation = (xb + rb) - (xa + ra);
+    float bias = -BAUMGARTE / dt;
+
+    int count = 0;
+    auto addRow = [&](const Vector3& linear, const Vector3& jacobianA, const Vector3& jacobianB, float error) {
+        JointRow& r = rows[count];
+        r.a = a;
+        r.b = b;
+        r.linear = linear;
+        r.jacobianA = jacobianA;
+        r.jacobianB = jacobianB;
+        r.angularA = applyWorldInverseInertia(qa, invIa, jacobianA);
+        r.angularB = applyWorldInverseInertia(qb, invIb, jacobianB);
+        r.inverseMassA = inverseMass[a];
+        r.inverseMassB = inverseMass[b];
+        float k = (r.inverseMassA + r.inverseMassB) * linear.lengthSquared() + jacobianA.dot(r.angularA) +
+                  jacobianB.dot(r.angularB);
+        r.effectiveMass = k > 0.0f ? 1.0f / k : 0.0f;
+        r.target = bias * error;
+        r.impulse = warmStarting && r.effectiveMass > 0.0f
+                        ? JOINT_WARM_STARTING * joints.impulses[j * JOINT_MAX_ROWS + count] : 0.0f;
+        ++count;
+    };
+    auto linearRow = [&](const Vector3& n, const Vector3& leverA, float error) {
+        addRow(n, leverA.cross(n), rb.cross(n), error);
+    };
+    auto angularRow = [&](const Vector3& u, float error) {
+        addRow(Vector3(), u, u, error);
+    };
+    const Vector3 axes[3] = {Vector3(1.0f, 0.0f, 0.0f), Vector3(0.0f, 1.0f, 0.0f), Vector3(0.0f, 0.0f, 1.0f)};
+
+    switch (static_cast<JointType>(joints.types[j])) {
+        case JointType::POINT:
+        case JointType::HINGE: {
+            linearRow(axes[0], ra, separation.getX());
+            linearRow(axes[1], ra, separation.getY());
+            linearRow(axes[2], ra, separation.getZ());
+            if (static_cast<JointType>(joints.types[j]) == JointType::HINGE) {
+                // 两端的轴保持平行：只约束绕两个垂直于轴的方向的相对转动
+                Vector3 axisA = rotate(qa, load(joints.localAxes + j * 6), 1.0f);
+                Vector3 axisB = rotate(qb, load(joints.localAxes + j * 6 + 3), 1.0f);
+                Vector3 t1;
+                Vector3 t2;
+                tangentBasis(axisA, t1, t2);
+                Vector3 error = axisA.cross(axisB);
+                angularRow(t1, error.dot(t1));
+                angularRow(t2, error.dot(t2));
+            }
+            break;
+        }
+        case JointType::SLIDER: {
+            // 姿态误差 qB * conj(reference) * conj(qA)，取w非负的一半
+            float target[4];
+            float error[4];
+            multiply(qb, joints.references + j * 4, true, target);
+            multiply(target, qa, true, error);
+            float sign = error[3] < 0.0f ? -2.0f : 2.0f;
+            angularRow(axes[0], sign * error[0]);
+            angularRow(axes[1], sign * error[1]);
+            angularRow(axes[2], sign * error[2]);
+            // 锚点之差垂直于轴的分量为0，A的力臂取到B的锚点
+            Vector3 axis = rotate(qa, load(joints.localAxes + j * 6), 1.0f);
+            Vector3 t1;
+            Vector3 t2;
+            tangentBasis(axis, t1, t2);
+            Vector3 leverA = separation + ra;
+            linearRow(t1, leverA, separation.dot(t1));
+            linearRow(t2, leverA, separation.dot(t2));
+            break;
+        }
+        case JointType::DISTANCE: {
+            float distance = separation.length();
+            Vector3 n = distance > 1e-6f ? separation / distance : axes[0];
+            linearRow(n, ra, distance - joints.lengths[j]);
+            break;
+        }
+    }
+    for (; count < JOINT_MAX_ROWS; ++count) {
+        rows[count].effectiveMass = 0.0f;
+        rows[count].impulse = 0.0f;
+    }
+}
+
+/**
+ * @brief 按岛屿分组：offsets为各岛屿的起止位置，byIndex按下标顺序、byBatch按批次顺序
+ */
+void groupByIsland(const std::vector<std::int32_t>& islandOf, const std::vector<std::vector<std::size_t>>& batches,
+                   std::vector<std::size_t>& offsets, std::vector<std::size_t>& byIndex,
+                   std::vector<std::size_t>& byBatch) {
+    std::size_t islandCount = offsets.size() - 1;
+    for (std::int32_t island : islandOf) {
+        ++offsets[island + 1];
+    }
+    for (std::size_t k = 0; k < islandCount; ++k) {
+        offsets[k + 1] += offsets[k];
+    }
+    std::vector<std::size_t> fill(offsets.begin(), offsets.end() - 1);
+    for (std::size_t i = 0; i < islandOf.size(); ++i) {
+        byIndex[fill[islandOf[i]]++] = i;
+    }
+    std::copy(offsets.begin(), offsets.end() - 1, fill.begin());
+    for (const std::vector<std::size_t>& batch : batches) {
+        for (std::size_t i : batch) {
+            byBatch[fill[islandOf[i]]++] = i;
+        }
+    }
+}
+
+} // namespace
+
+void partitionContacts(const std::int32_t* bodyA, const std::int32_t* bodyB, std::size_t count,
+                       const std::vector<char>& dynamic, std::vector<std::vector<std::size_t>>& batches) {
+    batches.clear();
+    std::vector<std::size_t> remaining(count);
+    for (std::size_t i = 0; i < count; ++i) {
+        remaining[i] = i;
+    }
+    std::vector<std::size_t> owner(dynamic.size(), count);
+    std::vector<std::size_t> next;
+
+    while (!remaining.empty()) {
+        // 每个动态刚体分配给剩余接触中最靠前的一个
+        for (std::size_t c : remaining) {
+            if (dynamic[bodyA[c]] && owner[bodyA[c]] == count) {
+                owner[bodyA[c]] = c;
+            }
+            if (dynamic[bodyB[c]] && owner[bodyB[c]] == count) {
+                owner[bodyB[c]] = c;
+            }
+        }
+
+        std::vector<std::size_t> batch;
+        next.clear();
+        for (std::size_t c : remaining) {
+            bool ownsA = !dynamic[bodyA[c]] || owner[bodyA[c]] == c;
+            bool ownsB = !dynamic[bodyB[c]] || owner[bodyB[c]] == c;
+            (ownsA && ownsB ? batch : next).push_back(c);
+        }
+        for (std::size_t c : remaining) {
+            owner[bodyA[c]] = count;
+            owner[bodyB[c]] = count;
+        }
+        batches.push_back(std::move(batch));
+        remaining.swap(next);
+    }
+}
+
+ContactSolver::ContactSolver()
+    : m_iterations(10), m_warmStarting(true), m_warmStarted(0), m_batchCount(0), m_islandCount(0),
+      m_solveTime(0.0) {
+}
+
+void ContactSolver::setIterations(int iterations) {
+    m_iterations = iterations;
+}
+
+int ContactSolver::getIterations() const {
+    return m_iterations;
+}
+
+void ContactSolver::setWarmStarting(bool enabled) {
+    m_warmStarting = enabled;
+    if (!enabled) {
+        clearCache();
+    }
+}
+
+bool ContactSolver::getWarmStarting() const {
+    return m_warmStarting;
+}
+
+void ContactSolver::clearCache() {
+    m_cache.clear();
+}
+
+std::size_t ContactSolver::getCachedPointCount() const {
+    std::size_t count = 0;
+    for (const auto& entry : m_cache) {
+        count += entry.second.points.size();
+    }
+    return count;
+}
+
+void ContactSolver::saveCache(std::int64_t* handles, float* anchors, float* impulses) const {
+    std::size_t row = 0;
+    for (const auto& entry : m_cache) {
+        for (const CachedPoint& point : entry.second.points) {
+            handles[row * 2] = entry.first.a;
+            handles[row * 2 + 1] = entry.first.b;
+            std::copy_n(point.anchor, 3, anchors + row * 3);
+            impulses[row * 4] = point.normalImpulse;
+            std::copy_n(point.frictionImpulse, 3, impulses + row * 4 + 1);
+            ++row;
+        }
+    }
+}
+
+void ContactSolver::loadCache(std::size_t count, const std::int64_t* handles, const float* anchors,
+                              const float* impulses) {
+    m_cache.clear();
+    for (std::size_t row = 0; row < count; ++row) {
+        CachedPoint point;
+        std::copy_n(anchors + row * 3, 3, point.anchor);
+        point.normalImpulse = impulses[row * 4];
+        std::copy_n(impulses + row * 4 + 1, 3, point.frictionImpulse);
+        m_cache[PairKey{handles[row * 2], handles[row * 2 + 1]}].points.push_back(point);
+    }
+}
+
+std::size_t ContactSolver::getManifoldCount() const {
+    return m_cache.size();
+}
+
+std::size_t ContactSolver::getWarmStartedCount() const {
+    return m_warmStarted;
+}
+
+std::size_t ContactSolver::getBatchCount() const {
+    return m_batchCount;
+}
+
+std::size_t ContactSolver::getIslandCount() const {
+    return m_islandCount;
+}
+
+double ContactSolver::getSolveTime() const {
+    return m_solveTime;
+}
+
+void ContactSolver::solve(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints, float dt,
+                          TaskPool& pool) {
+    auto start = std::chrono::steady_clock::now();
+    std::size_t count = contacts.getContactCount();
+    m_warmStarted = 0;
+    m_batchCount = 0;
+    m_islandCount = 0;
+    if (count == 0 || dt <= 0.0f) {
+        clearCache();
+    }
+    if ((count == 0 && joints.count == 0) || dt <= 0.0f) {
+        m_solveTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+        return;
+    }
+
+    const std::int32_t dynamicType = static_cast<std::int32_t>(BodyType::DYNAMIC);
+    std::vector<char> dynamic(bodies.count);
+    std::vector<float> inverseMass(bodies.count);
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        dynamic[i] = bodies.bodyTypes[i] == dynamicType && bodies.masses[i] > 0.0f && bodies.sleepIslands[i] == 0;
+        inverseMass[i] = dynamic[i] ? 1.0f / bodies.masses[i] : 0.0f;
+    }
+    const float zero[3] = {0.0f, 0.0f, 0.0f};
+
+    // 参与求解的关节：两端都在世界中且至少一端是活动的动态刚体
+    std::vector<std::size_t> jointIds;
+    std::vector<std::int32_t> jointA;
+    std::vector<std::int32_t> jointB;
+    for (std::size_t j = 0; j < joints.count; ++j) {
+        std::int32_t a = joints.bodyRows[j * 2];
+        std::int32_t b = joints.bodyRows[j * 2 + 1];
+        if (a >= 0 && b >= 0 && a != b && (dynamic[a] || dynamic[b])) {
+            jointIds.push_back(j);
+            jointA.push_back(a);
+            jointB.push_back(b);
+        }
+    }
+    std::size_t jointCount = jointIds.size();
+    std::vector<JointRow> jointRows(jointCount * JOINT_MAX_ROWS);
+    pool.parallelFor(jointCount, CONTACT_GRAIN, [&](std::size_t begin, std::size_t end) {
+        for (std::size_t n = begin; n < end; ++n) {
+            buildJointRows(bodies, joints, jointIds[n], inverseMass, dynamic, dt, m_warmStarting,
+                           &jointRows[n * JOINT_MAX_ROWS]);
+        }
+    });
+
+    const std::int32_t* bodyA = contacts.getBodyA();
+    const std::int32_t* bodyB = contacts.getBodyB();
+    const float* points = contacts.getPoints();
+    const float* normals = contacts.getNormals();
+    const float* depths = contacts.getDepths();
+    // 各接触的约束互不依赖，分块并行构建；缓存只读
+    std::vector<ContactConstraint> constraints(count);
+    std::vector<Vector3> anchors(count);
+    std::vector<char> warmStarted(count, 0);
+    pool.parallelFor(count, CONTACT_GRAIN, [&](std::size_t begin, std::size_t end) {
+        for (std::size_t i = begin; i < end; ++i) {
+            ContactConstraint& c = constraints[i];
+            c.a = bodyA[i];
+            c.b = bodyB[i];
+            const float* qa = bodies.rotations + c.a * 4;
+            const float* qb = bodies.rotations + c.b * 4;
+            const float* invIa = dynamic[c.a] ? bodies.inverseInertias + c.a * 3 : zero;
+            const float* invIb = dynamic[c.b] ? bodies.inverseInertias + c.b * 3 : zero;
+            c.inverseMassA = inverseMass[c.a];
+            c.inverseMassB = inverseMass[c.b];
+
+            Vector3 point = load(points + i * 3);
+            Vector3 ra = point - load(bodies.positions + c.a * 3);
+            Vector3 rb = point - load(bodies.positions + c.b * 3);
+            c.directions[0] = load(normals + i * 3);
+            tangentBasis(c.directions[0], c.directions[1], c.directions[2]);
+            for (int d = 0; d < 3; ++d) {
+                c.raCrossD[d] = ra.cross(c.directions[d]);
+                c.rbCrossD[d] = rb.cross(c.directions[d]);
+                c.angularA[d] = applyWorldInverseInertia(qa, invIa, c.raCrossD[d]);
+                c.angularB[d] = applyWorldInverseInertia(qb, invIb, c.rbCrossD[d]);
+                float k = c.inverseMassA + c.inverseMassB + c.raCrossD[d].dot(c.angularA[d]) +
+                          c.rbCrossD[d].dot(c.angularB[d]);
+                c.effectiveMass[d] = k > 0.0f ? 1.0f / k : 0.0f;
+                c.impulses[d] = 0.0f;
+            }
+
+            // 摩擦系数取几何平均，恢复系数取较大值
+            c.friction = std::sqrt(bodies.frictions[c.a] * bodies.frictions[c.b]);
+            float restitution = std::max(bodies.restitutions[c.a], bodies.restitutions[c.b]);
+
+            // 法向目标速度: 穿透时做位置修正；有间隙时允许在本步内恰好闭合；
+            // 碰撞速度足够大且本步会接触时按恢复系数反弹
+            float depth = depths[i];
+            float vn = relativeVelocity(bodies, c, 0);
+            c.target = depth > 0.0f ? BAUMGARTE / dt * std::max(depth - PENETRATION_SLOP, 0.0f) : depth / dt;
+            if (vn < -RESTITUTION_THRESHOLD && vn * dt <= depth) {
+                c.target = std::max(c.target, -restitution * vn);
+            }
+
+            // 在上一帧的同一刚体对中找最近的接触点
+            anchors[i] = rotateInverse(qa, ra);
+            if (!m_warmStarting) {
+                continue;
+            }
+            auto it = m_cache.find(PairKey{bodies.handles[c.a], bodies.handles[c.b]});
+            if (it == m_cache.end()) {
+                continue;
+            }
+            const CachedPoint* best = nullptr;
+            float bestDistance = MATCH_DISTANCE * MATCH_DISTANCE;
+            for (const CachedPoint& cached : it->second.points) {
+                float distance = (load(cached.anchor) - anchors[i]).lengthSquared();
+                if (distance < bestDistance) {
+                    bestDistance = distance;
+                    best = &cached;
+                }
+            }
+            if (best) {
+                Vector3 friction = load(best->frictionImpulse);
+                c.impulses[0] = best->normalImpulse;
+                c.impulses[1] = friction.dot(c.directions[1]);
+                c.impulses[2] = friction.dot(c.directions[2]);
+                warmStarted[i] = 1;
+            }
+        }
+    });
+
+    std::unordered_map<PairKey, Manifold, PairKeyHash> cache;
+    for (std::size_t i = 0; i < count; ++i) {
+        m_warmStarted += warmStarted[i];
+        CachedPoint cached;
+        cached.anchor[0] = anchors[i].getX();
+        cached.anchor[1] = anchors[i].getY();
+        cached.anchor[2] = anchors[i].getZ();
+        cache[PairKey{bodies.handles[bodyA[i]], bodies.handles[bodyB[i]]}].points.push_back(cached);
+    }
+
+    std::vector<std::vector<std::size_t>> batches;
+    partitionContacts(bodyA, bodyB, count, dynamic, batches);
+    std::vector<std::vector<std::size_t>> jointBatches;
+    partitionContacts(jointA.data(), jointB.data(), jointCount, dynamic, jointBatches);
+    m_batchCount = batches.size() + jointBatches.size();
+
+    // 按动态刚体的连通分量划分岛屿，不同岛屿的接触和关节不共享动态刚体，可以并行求解。
+    // 岛屿内按全局的顺序和批次顺序求解，结果与串行求解完全相同
+    std::vector<std::int32_t> edgeA;
+    std::vector<std::int32_t> edgeB;
+    for (std::size_t i = 0; i < count; ++i) {
+        if (dynamic[bodyA[i]] && dynamic[bodyB[i]]) {
+            edgeA.push_back(bodyA[i]);
+            edgeB.push_back(bodyB[i]);
+        }
+    }
+    for (std::size_t n = 0; n < jointCount; ++n) {
+        if (dynamic[jointA[n]] && dynamic[jointB[n]]) {
+            edgeA.push_back(jointA[n]);
+            edgeB.push_back(jointB[n]);
+        }
+    }
+    std::vector<std::int32_t> roots;
+    unionFind(bodies.count, edgeA.data(), edgeB.data(), edgeA.size(), roots);
+
+    std::vector<std::int32_t> islandOfRoot(bodies.count, -1);
+    std::size_t islandCount = 0;
+    auto islandOfBody = [&](std::int32_t a, std::int32_t b) {
+        std::int32_t root = roots[dynamic[a] ? a : b];
+        if (islandOfRoot[root] < 0) {
+            islandOfRoot[root] = static_cast<std::int32_t>(islandCount++);
+        }
+        return islandOfRoot[root];
+    };
+    std::vector<std::int32_t> islandOf(count);
+    std::vector<std::int32_t> jointIslandOf(jointCount);
+    for (std::size_t i = 0; i < count; ++i) {
+        islandOf[i] = islandOfBody(bodyA[i], bodyB[i]);
+    }
+    for (std::size_t n = 0; n < jointCount; ++n) {
+        jointIslandOf[n] = islandOfBody(jointA[n], jointB[n]);
+    }
+    m_islandCount = islandCount;
+
+    // 每个岛屿的接触和关节按下标顺序(warm starting)和按批次顺序(迭代)各存一份
+    std::vector<std::size_t> offsets(islandCount + 1, 0);
+    std::vector<std::size_t> jointOffsets(islandCount + 1, 0);
+    std::vector<std::size_t> byIndex(count);
+    std::vector<std::size_t> byBatch(count);
+    std::vector<std::size_t> jointByIndex(jointCount);
+    std::vector<std::size_t> jointByBatch(jointCount);
+    groupByIsland(islandOf, batches, offsets, byIndex, byBatch);
+    groupByIsland(jointIslandOf, jointBatches, jointOffsets, jointByIndex, jointByBatch);
+
+    // 大岛屿先领取，减少最后只剩一个线程在工作的时间
+    std::vector<std::size_t> islandOrder(islandCount);
+    for (std::size_t k = 0; k < islandCount; ++k) {
+        islandOrder[k] = k;
+    }
+    auto islandSize = [&](std::size_t k) {
+        return offsets[k + 1] - offsets[k] + jointOffsets[k + 1] - jointOffsets[k];
+    };
+    std::stable_sort(islandOrder.begin(), islandOrder.end(), [&](std::size_t x, std::size_t y) {
+        return islandSize(x) > islandSize(y);
+    });
+
+    bool warmStarting = m_warmStarted > 0;
+    int iterations = m_iterations;
+    pool.parallelFor(islandCount, 1, [&](std::size_t begin, std::size_t end) {
+        for (std::size_t k = begin; k < end; ++k) {
+            std::size_t island = islandOrder[k];
+            std::size_t first = offsets[island];
+            std::size_t last = offsets[island + 1];
+            std::size_t firstJoint = jointOffsets[island];
+            std::size_t lastJoint = jointOffsets[island + 1];
+            // 先施加warm starting的冲量
+            for (std::size_t n = firstJoint; n < lastJoint; ++n) {
+                for (int r = 0; r < JOINT_MAX_ROWS; ++r) {
+                    const JointRow& row = jointRows[jointByIndex[n] * JOINT_MAX_ROWS + r];
+                    if (row.impulse != 0.0f) {
+                        applyImpulse(bodies, row, row.impulse);
+                    }
+                }
+            }
+            if (warmStarting) {
+                for (std::size_t n = first; n < last; ++n) {
+                    const ContactConstraint& c = constraints[byIndex[n]];
+                    for (int d = 0; d < 3; ++d) {
+                        if (c.impulses[d] != 0.0f) {
+                            applyImpulse(bodies, c, d, c.impulses[d]);
+                        }
+                    }
+                }
+            }
+            // 每次迭代先求解关节，再求解全部法向约束，最后求解摩擦，摩擦上限使用本次迭代的法向冲量
+            for (int iteration = 0; iteration < iterations; ++iteration) {
+                for (std::size_t n = firstJoint; n < lastJoint; ++n) {
+                    solveJoint(bodies, &jointRows[jointByBatch[n] * JOINT_MAX_ROWS]);
+                }
+                for (std::size_t n = first; n < last; ++n) {
+                    solveNormal(bodies, constraints[byBatch[n]]);
+                }
+                for (std::size_t n = first; n < last; ++n) {
+                    solveFriction(bodies, constraints[byBatch[n]]);
+                }
+            }
+        }
+    });
+
+    // 关节的累积冲量写回关节数组，作为下一步的初值
+    for (std::size_t n = 0; n < jointCount; ++n) {
+        for (int r = 0; r < JOINT_MAX_ROWS; ++r) {
+            joints.impulses[jointIds[n] * JOINT_MAX_ROWS + r] = jointRows[n * JOINT_MAX_ROWS + r].impulse;
+        }
+    }
+
+    // 更新缓存(本帧没有接触的刚体对被移除)
+    std::unordered_map<PairKey, std::size_t, PairKeyHash> filled;
+    for (const ContactConstraint& c : constraints) {
+        PairKey key = {bodies.handles[c.a], bodies.handles[c.b]};
+        CachedPoint& cached = cache[key].points[filled[key]++];
+        Vector3 friction = c.directions[1] * c.impulses[1] + c.directions[2] * c.impulses[2];
+        cached.normalImpulse = c.impulses[0];
+        cached.frictionImpulse[0] = friction.getX();
+        cached.frictionImpulse[1] = friction.getY();
+        cached.frictionImpulse[2] = friction.getZ();
+    }
+    m_cache.swap(cache);
+
+    m_solveTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,154 @@
+#include "Integrator.h"
+#include "RigidBody.h"
+#include "TaskPool.h"
+#include <cmath>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+// 并行积分时每块的刚体数量
+const std::size_t INTEGRATE_GRAIN = 1024;
+
+/**
+ * @brief 用四元数旋转向量，sign为-1时做逆旋转
+ */
+Vector3 rotate(const float q[4], const Vector3& v, float sign) {
+    Vector3 u(q[0] * sign, q[1] * sign, q[2] * sign);
+    Vector3 t = u.cross(v) * 2.0f;
+    return v + t * q[3] + u.cross(t);
+}
+
+} // namespace
+
+void computeInverseInertia(int shapeType, float mass, const float shapeParams[4], float inverseInertia[3]) {
+    float inertia[3] = {0.0f, 0.0f, 0.0f};
+    float x2 = shapeParams[0] * shapeParams[0];
+    float y2 = shapeParams[1] * shapeParams[1];
+    float z2 = shapeParams[2] * shapeParams[2];
+
+    switch (static_cast<ShapeType>(shapeType)) {
+        case ShapeType::BOX:
+            inertia[0] = mass / 3.0f * (y2 + z2);
+            inertia[1] = mass / 3.0f * (x2 + z2);
+            inertia[2] = mass / 3.0f * (x2 + y2);
+            break;
+        case ShapeType::SPHERE:
+            inertia[0] = inertia[1] = inertia[2] = 0.4f * mass * x2;
+            break;
+        case ShapeType::CYLINDER:
+        case ShapeType::CAPSULE:
+            // 沿Y轴，参数为(半径, 半高)；胶囊体按圆柱体近似
+            inertia[0] = inertia[2] = mass * (3.0f * x2 + 4.0f * y2) / 12.0f;
+            inertia[1] = 0.5f * mass * x2;
+            break;
+        case ShapeType::CONE:
+            // 沿Y轴，参数为(半径, 半高)，相对质心
+            inertia[0] = inertia[2] = mass * (0.15f * x2 + 0.0375f * 4.0f * y2);
+            inertia[1] = 0.3f * mass * x2;
+            break;
+        default:
+            break;
+    }
+
+    for (int i = 0; i < 3; ++i) {
+        inverseInertia[i] = inertia[i] > 0.0f ? 1.0f / inertia[i] : 0.0f;
+    }
+}
+
+Vector3 applyWorldInverseInertia(const float rotation[4], const float inverseInertia[3], const Vector3& v) {
+    Vector3 local = rotate(rotation, v, -1.0f);
+    local.set(local.getX() * inverseInertia[0],
+              local.getY() * inverseInertia[1],
+              local.getZ() * inverseInertia[2]);
+    return rotate(rotation, local, 1.0f);
+}
+
+void integrateVelocities(const BodyArrays& bodies, const Vector3& gravity, float dt, TaskPool& pool) {
+    pool.parallelFor(bodies.count, INTEGRATE_GRAIN, [&](std::size_t begin, std::size_t end) {
+        integrateVelocities(bodies, gravity, dt, begin, end);
+    });
+}
+
+void integratePositions(const BodyArrays& bodies, float dt, TaskPool& pool) {
+    pool.parallelFor(bodies.count, INTEGRATE_GRAIN, [&](std::size_t begin, std::size_t end) {
+        integratePositions(bodies, dt, begin, end);
+    });
+}
+
+void integrateVelocities(const BodyArrays& bodies, const Vector3& gravity, float dt, std::size_t begin,
+                         std::size_t end) {
+    const std::int32_t dynamicType = static_cast<std::int32_t>(BodyType::DYNAMIC);
+    const std::int32_t kinematicType = static_cast<std::int32_t>(BodyType::KINEMATIC);
+
+    for (std::size_t i = begin; i < end; ++i) {
+        if (bodies.sleepIslands[i] != 0) {
+            continue;
+        }
+        const float* q = bodies.rotations + i * 4;
+        float* v = bodies.linearVelocities + i * 3;
+        float* w = bodies.angularVelocities + i * 3;
+        const float* f = bodies.forces + i * 3;
+        const float* t = bodies.torques + i * 3;
+
+        bool dynamic = bodies.bodyTypes[i] == dynamicType && bodies.masses[i] > 0.0f;
+        if (dynamic) {
+            float invMass = 1.0f / bodies.masses[i];
+            v[0] += (gravity.getX() + f[0] * invMass) * dt;
+            v[1] += (gravity.getY() + f[1] * invMass) * dt;
+            v[2] += (gravity.getZ() + f[2] * invMass) * dt;
+
+            Vector3 dw = applyWorldInverseInertia(q, bodies.inverseInertias + i * 3, Vector3(t[0], t[1], t[2]));
+            w[0] += dw.getX() * dt;
+            w[1] += dw.getY() * dt;
+            w[2] += dw.getZ() * dt;
+        } else if (bodies.bodyTypes[i] != kinematicType) {
+            v[0] = v[1] = v[2] = 0.0f;
+            w[0] = w[1] = w[2] = 0.0f;
+        }
+    }
+}
+
+void integratePositions(const BodyArrays& bodies, float dt, std::size_t begin, std::size_t end) {
+    for (std::size_t i = begin; i < end; ++i) {
+        float* f = bodies.forces + i * 3;
+        float* t = bodies.torques + i * 3;
+        f[0] = f[1] = f[2] = 0.0f;
+        t[0] = t[1] = t[2] = 0.0f;
+        if (bodies.sleepIslands[i] != 0) {
+            continue;
+        }
+
+        float* p = bodies.positions + i * 3;
+        float* q = bodies.rotations + i * 4;
+        const float* v = bodies.linearVelocities + i * 3;
+        const float* w = bodies.angularVelocities + i * 3;
+
+        p[0] += v[0] * dt;
+        p[1] += v[1] * dt;
+        p[2] += v[2] * dt;
+
+        // dq/dt = 0.5 * (w,0) * q
+        float h = 0.5f * dt;
+        float qx = q[0], qy = q[1], qz = q[2], qw = q[3];
+        q[0] += h * (w[0] * qw + w[1] * qz - w[2] * qy);
+        q[1] += h * (w[1] * qw + w[2] * qx - w[0] * qz);
+        q[2] += h * (w[2] * qw + w[0] * qy - w[1] * qx);
+        q[3] -= h * (w[0] * qx + w[1] * qy + w[2] * qz);
+        float len = std::sqrt(q[0] * q[0] + q[1] * q[1] + q[2] * q[2] + q[3] * q[3]);
+        if (len > 0.0f) {
+            q[0] /= len;
+            q[1] /= len;
+            q[2] /= len;
+            q[3] /= len;
+        }
+    }
+}
+
+void integrateBodies(const BodyArrays& bodies, const Vector3& gravity, float dt, TaskPool& pool) {
+    // 先更新速度，再用新速度更新位置
+    integrateVelocities(bodies, gravity, dt, pool);
+    integratePositions(bodies, dt, pool);
+}
+
+} // namespace PhysicsSimulator
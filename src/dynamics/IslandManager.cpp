@@ -0,0 +1,235 @@
+#include "IslandManager.h"
+#include "Narrowphase.h"
+#include "RigidBody.h"
+#include <algorithm>
+#include <chrono>
+#include <limits>
+#include <unordered_map>
+#include <unordered_set>
+
+namespace PhysicsSimulator {
+
+namespace {
+
+bool isDynamic(const BodyArrays& bodies, std::size_t i) {
+    return bodies.bodyTypes[i] == static_cast<std::int32_t>(BodyType::DYNAMIC) && bodies.masses[i] > 0.0f;
+}
+
+float lengthSquared(const float* v) {
+    return v[0] * v[0] + v[1] * v[1] + v[2] * v[2];
+}
+
+std::int32_t findRoot(std::vector<std::int32_t>& parent, std::int32_t x) {
+    // 路径减半
+    while (parent[x] != x) {
+        parent[x] = parent[parent[x]];
+        x = parent[x];
+    }
+    return x;
+}
+
+} // namespace
+
+bool isActiveBody(const BodyArrays& bodies, std::size_t i) {
+    if (bodies.bodyTypes[i] == static_cast<std::int32_t>(BodyType::KINEMATIC)) {
+        return true;
+    }
+    return isDynamic(bodies, i) && bodies.sleepIslands[i] == 0;
+}
+
+void unionFind(std::size_t count, const std::int32_t* edgeA, const std::int32_t* edgeB,
+               std::size_t edgeCount, std::vector<std::int32_t>& roots) {
+    roots.resize(count);
+    for (std::size_t i = 0; i < count; ++i) {
+        roots[i] = static_cast<std::int32_t>(i);
+    }
+    for (std::size_t e = 0; e < edgeCount; ++e) {
+        std::int32_t ra = findRoot(roots, edgeA[e]);
+        std::int32_t rb = findRoot(roots, edgeB[e]);
+        // 较大的根挂到较小的根上，代表始终是分量中最小的下标
+        if (ra < rb) {
+            roots[rb] = ra;
+        } else if (rb < ra) {
+            roots[ra] = rb;
+        }
+    }
+    for (std::size_t i = 0; i < count; ++i) {
+        roots[i] = findRoot(roots, static_cast<std::int32_t>(i));
+    }
+}
+
+IslandManager::IslandManager()
+    : m_enabled(true), m_linearThreshold(0.05f), m_angularThreshold(0.05f), m_timeToSleep(0.5f),
+      m_nextIsland(1), m_islandCount(0), m_buildTime(0.0) {
+}
+
+void IslandManager::setEnabled(bool enabled) {
+    m_enabled = enabled;
+}
+
+bool IslandManager::isEnabled() const {
+    return m_enabled;
+}
+
+void IslandManager::setSleepParameters(float linearThreshold, float angularThreshold, float timeToSleep) {
+    m_linearThreshold = linearThreshold;
+    m_angularThreshold = angularThreshold;
+    m_timeToSleep = timeToSleep;
+}
+
+std::int32_t IslandManager::getNextIsland() const {
+    return m_nextIsland;
+}
+
+void IslandManager::setNextIsland(std::int32_t island) {
+    m_nextIsland = std::max<std::int32_t>(island, 1);
+}
+
+std::size_t IslandManager::getIslandCount() const {
+    return m_islandCount;
+}
+
+double IslandManager::getBuildTime() const {
+    return m_buildTime;
+}
+
+bool IslandManager::isMovingKinematic(const BodyArrays& bodies, std::size_t i) const {
+    return bodies.bodyTypes[i] == static_cast<std::int32_t>(BodyType::KINEMATIC) &&
+           (lengthSquared(bodies.linearVelocities + i * 3) > m_linearThreshold * m_linearThreshold ||
+            lengthSquared(bodies.angularVelocities + i * 3) > m_angularThreshold * m_angularThreshold);
+}
+
+bool IslandManager::wake(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints) {
+    if (!m_enabled) {
+        return false;
+    }
+
+    // 活动刚体(未休眠的动态刚体或运动中的运动学刚体)接触到的或由关节连接的休眠岛屿
+    std::unordered_set<std::int32_t> hit;
+    auto visit = [&](std::int32_t a, std::int32_t b) {
+        std::int32_t ends[2] = {a, b};
+        for (int k = 0; k < 2; ++k) {
+            std::int32_t self = ends[k];
+            std::int32_t other = ends[1 - k];
+            bool source = (isDynamic(bodies, self) && bodies.sleepIslands[self] == 0) ||
+                          isMovingKinematic(bodies, self);
+            if (source && bodies.sleepIslands[other] != 0) {
+                hit.insert(bodies.sleepIslands[other]);
+            }
+        }
+    };
+    const std::int32_t* bodyA = contacts.getBodyA();
+    const std::int32_t* bodyB = contacts.getBodyB();
+    for (std::size_t c = 0; c < contacts.getContactCount(); ++c) {
+        visit(bodyA[c], bodyB[c]);
+    }
+    for (std::size_t j = 0; j < joints.count; ++j) {
+        if (joints.bodyRows[j * 2] >= 0 && joints.bodyRows[j * 2 + 1] >= 0) {
+            visit(joints.bodyRows[j * 2], joints.bodyRows[j * 2 + 1]);
+        }
+    }
+    if (hit.empty()) {
+        return false;
+    }
+
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        if (bodies.sleepIslands[i] != 0 && hit.count(bodies.sleepIslands[i])) {
+            bodies.sleepIslands[i] = 0;
+            bodies.sleepTimes[i] = 0.0f;
+        }
+    }
+    return true;
+}
+
+void IslandManager::wakeAll(const BodyArrays& bodies) {
+    std::fill(bodies.sleepIslands, bodies.sleepIslands + bodies.count, 0);
+    std::fill(bodies.sleepTimes, bodies.sleepTimes + bodies.count, 0.0f);
+}
+
+void IslandManager::update(const BodyArrays& bodies, Narrowphase& contacts, const JointArrays& joints, float dt) {
+    auto start = std::chrono::steady_clock::now();
+    m_islandCount = 0;
+    if (!m_enabled || bodies.count == 0) {
+        m_buildTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+        return;
+    }
+
+    std::vector<char> awake(bodies.count);
+    std::vector<char> restless(bodies.count);
+    float linearLimit = m_linearThreshold * m_linearThreshold;
+    float angularLimit = m_angularThreshold * m_angularThreshold;
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        awake[i] = isDynamic(bodies, i) && bodies.sleepIslands[i] == 0;
+        restless[i] = lengthSquared(bodies.linearVelocities + i * 3) > linearLimit ||
+                      lengthSquared(bodies.angularVelocities + i * 3) > angularLimit;
+    }
+
+    // 岛屿只由两端都是动态刚体的接触和关节连接；与运动中的运动学刚体相连的刚体不能休眠
+    std::vector<std::int32_t> edgeA;
+    std::vector<std::int32_t> edgeB;
+    auto link = [&](std::int32_t a, std::int32_t b) {
+        if (awake[a] && awake[b]) {
+            edgeA.push_back(a);
+            edgeB.push_back(b);
+        }
+        if (isMovingKinematic(bodies, a)) {
+            restless[b] = 1;
+        }
+        if (isMovingKinematic(bodies, b)) {
+            restless[a] = 1;
+        }
+    };
+    const std::int32_t* bodyA = contacts.getBodyA();
+    const std::int32_t* bodyB = contacts.getBodyB();
+    for (std::size_t c = 0; c < contacts.getContactCount(); ++c) {
+        link(bodyA[c], bodyB[c]);
+    }
+    for (std::size_t j = 0; j < joints.count; ++j) {
+        if (joints.bodyRows[j * 2] >= 0 && joints.bodyRows[j * 2 + 1] >= 0) {
+            link(joints.bodyRows[j * 2], joints.bodyRows[j * 2 + 1]);
+        }
+    }
+
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        if (awake[i]) {
+            bodies.sleepTimes[i] = restless[i] ? 0.0f : bodies.sleepTimes[i] + dt;
+        }
+    }
+
+    std::vector<std::int32_t> roots;
+    unionFind(bodies.count, edgeA.data(), edgeB.data(), edgeA.size(), roots);
+
+    // 岛屿中休眠计时的最小值，按代表(最小行号)的顺序编号
+    std::vector<float> shortest(bodies.count, std::numeric_limits<float>::infinity());
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        if (awake[i]) {
+            shortest[roots[i]] = std::min(shortest[roots[i]], bodies.sleepTimes[i]);
+        }
+    }
+
+    std::vector<std::int32_t> islandIds(bodies.count, 0);
+    for (std::size_t r = 0; r < bodies.count; ++r) {
+        if (!awake[r] || roots[r] != static_cast<std::int32_t>(r)) {
+            continue;
+        }
+        ++m_islandCount;
+        if (shortest[r] >= m_timeToSleep) {
+            islandIds[r] = m_nextIsland++;
+        }
+    }
+
+    for (std::size_t i = 0; i < bodies.count; ++i) {
+        std::int32_t id = awake[i] ? islandIds[roots[i]] : 0;
+        if (id != 0) {
+            bodies.sleepIslands[i] = id;
+            float* v = bodies.linearVelocities + i * 3;
+            float* w = bodies.angularVelocities + i * 3;
+            v[0] = v[1] = v[2] = 0.0f;
+            w[0] = w[1] = w[2] = 0.0f;
+        }
+    }
+
+    m_buildTime = std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+}
+
+} // namespace PhysicsSimulator
@@ -1,142 +1,374 @@
 #include "RigidBody.h"
+#include "PhysicsWorld.h"
+#include "Integrator.h"
 #include "Quaternion.h"
-#include <iostream>
+#include "Logger.h"
+#include "SlotMap.h"
+#include <algorithm>
 
 namespace PhysicsSimulator {
 
 class RigidBody::RigidBodyImpl {
 public:
-    RigidBodyImpl(ShapeType shapeType, float mass) 
-        : m_shapeType(shapeType), m_mass(mass), m_bodyType(BodyType::DYNAMIC) {
-        std::cout << "刚体实现已创建，形状类型: " << static_cast<int>(shapeType) 
-                  << ", 质量: " << mass << std::endl;
+    RigidBodyImpl(ShapeType shapeType, float mass, const float shapeParams[4])
+        : m_handle(0), m_world(nullptr), m_shapeType(shapeType), m_mass(mass),
+          m_bodyType(mass > 0.0f ? BodyType::DYNAMIC : BodyType::STATIC),
+          m_friction(0.5f), m_restitution(0.0f), m_ccdThreshold(0.0f),
+          m_position{0.0f, 0.0f, 0.0f}, m_rotation{0.0f, 0.0f, 0.0f, 1.0f},
+          m_linearVelocity{0.0f, 0.0f, 0.0f}, m_angularVelocity{0.0f, 0.0f, 0.0f},
+          m_force{0.0f, 0.0f, 0.0f}, m_torque{0.0f, 0.0f, 0.0f} {
+        for (int i = 0; i < 4; ++i) {
+            m_shapeParams[i] = shapeParams[i];
+        }
+        computeInverseInertia(static_cast<int>(shapeType), mass, shapeParams, m_inverseInertia);
+        PS_LOG(LOG_BODY, LOG_DEBUG, "刚体实现已创建，形状类型: " << static_cast<int>(shapeType)
+                  << ", 质量: " << mass);
     }
-    
+
     ~RigidBodyImpl() {
-        std::cout << "刚体实现已销毁" << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "刚体实现已销毁");
     }
-    
+
     void setPosition(const Vector3& position) {
-        std::cout << "设置刚体位置: (" 
-                  << position.getX() << ", " 
-                  << position.getY() << ", " 
-                  << position.getZ() << ")" << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置刚体位置: ("
+                  << position.getX() << ", "
+                  << position.getY() << ", "
+                  << position.getZ() << ")");
+        wakeUp();
+        store(position, field(m_position, &PhysicsWorld::getPositions, 3));
     }
-    
+
     Vector3 getPosition() const {
-        return Vector3(0.0f, 0.0f, 0.0f);
+        return load(field(m_position, &PhysicsWorld::getPositions, 3));
     }
-    
+
     void setRotation(const Quaternion& rotation) {
-        std::cout << "设置刚体旋转: (" 
-                  << rotation.getX() << ", " 
-                  << rotation.getY() << ", " 
-                  << rotation.getZ() << ", " 
-                  << rotation.getW() << ")" << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置刚体旋转: ("
+                  << rotation.getX() << ", "
+                  << rotation.getY() << ", "
+                  << rotation.getZ() << ", "
+                  << rotation.getW() << ")");
+        wakeUp();
+        float* q = field(m_rotation, &PhysicsWorld::getRotations, 4);
+        q[0] = rotation.getX();
+        q[1] = rotation.getY();
+        q[2] = rotation.getZ();
+        q[3] = rotation.getW();
     }
-    
+
     Quaternion getRotation() const {
-        return Quaternion(0.0f, 0.0f, 0.0f, 1.0f);
-    }
-    
-    void applyForce(const Vector3& force) {
-        std::cout << "应用力: (" 
-                  << force.getX() << ", " 
-                  << force.getY() << ", " 
-                  << force.getZ() << ")" << std::endl;
-    }
-    
-    void applyImpulse(const Vector3& impulse) {
-        std::cout << "应用冲量: (" 
-                  << impulse.getX() << ", " 
-                  << impulse.getY() << ", " 
-                  << impulse.getZ() << ")" << std::endl;
-    }
-    
+        const float* q = field(m_rotation, &PhysicsWorld::getRotations, 4);
+        return Quaternion(q[0], q[1], q[2], q[3]);
+    }
+
+    void applyForce(const Vector3& force, const Vector3* relPos) {
+        PS_LOG(LOG_BODY, LOG_DEBUG, "应用力: ("
+                  << force.getX() << ", "
+                  << force.getY() << ", "
+                  << force.getZ() << ")");
+        wakeUp();
+        accumulate(field(m_force, &PhysicsWorld::getForces, 3), force);
+        if (relPos) {
+            accumulate(field(m_torque, &PhysicsWorld::getTorques, 3), relPos->cross(force));
+        }
+    }
+
+    void applyImpulse(const Vector3& impulse, const Vector3* relPos) {
+        PS_LOG(LOG_BODY, LOG_DEBUG, "应用冲量: ("
+                  << impulse.getX() << ", "
+                  << impulse.getY() << ", "
+                  << impulse.getZ() << ")");
+        if (getBodyType() != BodyType::DYNAMIC || m_mass <= 0.0f) {
+            return;
+        }
+        wakeUp();
+        accumulate(field(m_linearVelocity, &PhysicsWorld::getLinearVelocities, 3), impulse / m_mass);
+        if (relPos) {
+            const float* rotation = field(m_rotation, &PhysicsWorld::getRotations, 4);
+            accumulate(field(m_angularVelocity, &PhysicsWorld::getAngularVelocities, 3),
+                       applyWorldInverseInertia(rotation, m_inverseInertia, relPos->cross(impulse)));
+        }
+    }
+
     void setLinearVelocity(const Vector3& velocity) {
-        std::cout << "设置线速度: (" 
-                  << velocity.getX() << ", " 
-                  << velocity.getY() << ", " 
-                  << velocity.getZ() << ")" << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置线速度: ("
+                  << velocity.getX() << ", "
+                  << velocity.getY() << ", "
+                  << velocity.getZ() << ")");
+        wakeUp();
+        store(velocity, field(m_linearVelocity, &PhysicsWorld::getLinearVelocities, 3));
     }
-    
+
     Vector3 getLinearVelocity() const {
-        return Vector3(0.0f, 0.0f, 0.0f);
+        return load(field(m_linearVelocity, &PhysicsWorld::getLinearVelocities, 3));
     }
-    
+
     void setAngularVelocity(const Vector3& velocity) {
-        std::cout << "设置角速度: (" 
-                  << velocity.getX() << ", " 
-                  << velocity.getY() << ", " 
-                  << velocity.getZ() << ")" << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置角速度: ("
+                  << velocity.getX() << ", "
+                  << velocity.getY() << ", "
+                  << velocity.getZ() << ")");
+        wakeUp();
+        store(velocity, field(m_angularVelocity, &PhysicsWorld::getAngularVelocities, 3));
     }
-    
+
     Vector3 getAngularVelocity() const {
-        return Vector3(0.0f, 0.0f, 0.0f);
+        return load(field(m_angularVelocity, &PhysicsWorld::getAngularVelocities, 3));
     }
-    
+
     void setFriction(float friction) {
-        std::cout << "设置摩擦系数: " << friction << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置摩擦系数: " << friction);
+        *field(&m_friction, &PhysicsWorld::getFrictions, 1) = friction;
+    }
+
+    float getFriction() const {
+        return *field(&m_friction, &PhysicsWorld::getFrictions, 1);
     }
-    
+
     void setRestitution(float restitution) {
-        std::cout << "设置恢复系数: " << restitution << std::endl;
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置恢复系数: " << restitution);
+        *field(&m_restitution, &PhysicsWorld::getRestitutions, 1) = restitution;
     }
-    
+
+    float getRestitution() const {
+        return *field(&m_restitution, &PhysicsWorld::getRestitutions, 1);
+    }
+
+    void setCcdMotionThreshold(float threshold) {
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置连续碰撞检测阈值: " << threshold);
+        *field(&m_ccdThreshold, &PhysicsWorld::getCcdThresholds, 1) = std::max(threshold, 0.0f);
+    }
+
+    float getCcdMotionThreshold() const {
+        return *field(&m_ccdThreshold, &PhysicsWorld::getCcdThresholds, 1);
+    }
+
+    void wakeUp() {
+        if (m_world) {
+            std::size_t row = static_cast<std::size_t>(m_world->getBodyIndex(m_handle));
+            m_world->getSleepIslands()[row] = 0;
+            m_world->getSleepTimes()[row] = 0.0f;
+        }
+    }
+
+    bool isSleeping() const {
+        return m_world && m_world->getSleepIslands()[m_world->getBodyIndex(m_handle)] != 0;
+    }
+
     void setBodyType(BodyType type) {
         m_bodyType = type;
-        std::cout << "设置刚体类型: " << static_cast<int>(type) << std::endl;
+        wakeUp();
+        if (m_world) {
+            m_world->getBodyTypes()[m_world->getBodyIndex(m_handle)] = static_cast<std::int32_t>(type);
+        }
+        PS_LOG(LOG_BODY, LOG_DEBUG, "设置刚体类型: " << static_cast<int>(type));
     }
-    
+
     BodyType getBodyType() const {
+        if (m_world) {
+            return static_cast<BodyType>(m_world->getBodyTypes()[m_world->getBodyIndex(m_handle)]);
+        }
         return m_bodyType;
     }
-    
+
     ShapeType getShapeType() const {
         return m_shapeType;
     }
-    
+
     float getMass() const {
         return m_mass;
     }
-    
+
+    void getShapeParams(float params[4]) const {
+        for (int i = 0; i < 4; ++i) {
+            params[i] = m_shapeParams[i];
+        }
+    }
+
+    void getInverseInertia(float inverseInertia[3]) const {
+        copy(m_inverseInertia, inverseInertia, 3);
+    }
+
+    void getAccumulatedForce(float force[3], float torque[3]) const {
+        copy(field(m_force, &PhysicsWorld::getForces, 3), force, 3);
+        copy(field(m_torque, &PhysicsWorld::getTorques, 3), torque, 3);
+    }
+
+    PhysicsWorld* getWorld() const {
+        return m_world;
+    }
+
+    std::uint32_t getHandle() const {
+        return m_handle;
+    }
+
+    void setHandle(std::uint32_t handle) {
+        m_handle = handle;
+    }
+
+    void setWorld(PhysicsWorld* world) {
+        if (m_world && !world) {
+            // 离开世界前把世界中的状态拷贝回本地
+            std::size_t row = static_cast<std::size_t>(m_world->getBodyIndex(m_handle));
+            copy(m_world->getPositions() + row * 3, m_position, 3);
+            copy(m_world->getRotations() + row * 4, m_rotation, 4);
+            copy(m_world->getLinearVelocities() + row * 3, m_linearVelocity, 3);
+            copy(m_world->getAngularVelocities() + row * 3, m_angularVelocity, 3);
+            copy(m_world->getForces() + row * 3, m_force, 3);
+            copy(m_world->getTorques() + row * 3, m_torque, 3);
+            m_friction = m_world->getFrictions()[row];
+            m_restitution = m_world->getRestitutions()[row];
+            m_ccdThreshold = m_world->getCcdThresholds()[row];
+            m_bodyType = static_cast<BodyType>(m_world->getBodyTypes()[row]);
+        }
+        m_world = world;
+    }
+
 private:
+    /**
+     * @brief 获取某个状态字段的存储位置：在世界中时指向世界的结构数组，否则指向本地
+     */
+    float* field(float* local, float* (PhysicsWorld::*column)(), std::size_t width) const {
+        if (m_world) {
+            std::size_t row = static_cast<std::size_t>(m_world->getBodyIndex(m_handle));
+            return (m_world->*column)() + row * width;
+        }
+        return local;
+    }
+
+    const float* field(const float* local, float* (PhysicsWorld::*column)(), std::size_t width) const {
+        return field(const_cast<float*>(local), column, width);
+    }
+
+    static void store(const Vector3& v, float* out) {
+        out[0] = v.getX();
+        out[1] = v.getY();
+        out[2] = v.getZ();
+    }
+
+    static void accumulate(float* out, const Vector3& v) {
+        out[0] += v.getX();
+        out[1] += v.getY();
+        out[2] += v.getZ();
+    }
+
+    static Vector3 load(const float* v) {
+        return Vector3(v[0], v[1], v[2]);
+    }
+
+    static void copy(const float* from, float* to, std::size_t n) {
+        for (std::size_t i = 0; i < n; ++i) {
+            to[i] = from[i];
+        }
+    }
+
+    std::uint32_t m_handle;
+    PhysicsWorld* m_world;
     ShapeType m_shapeType;
     float m_mass;
     BodyType m_bodyType;
+    float m_friction;
+    float m_restitution;
+    float m_ccdThreshold;
+    float m_shapeParams[4];
+    float m_position[3];
+    float m_rotation[4];
+    float m_linearVelocity[3];
+    float m_angularVelocity[3];
+    float m_force[3];
+    float m_torque[3];
+    float m_inverseInertia[3];
 };
 
+/**
+ * @brief 刚体池中的一个槽：刚体和它的实现存放在一起，创建刚体不单独分配内存
+ *
+ * 实现先于刚体构造、后于刚体析构（刚体析构时要通过实现离开物理世界）。
+ */
+struct BodySlot {
+    BodySlot(ShapeType shapeType, float mass, const float shapeParams[4])
+        : impl(shapeType, mass, shapeParams), body(&impl) {
+    }
+
+    RigidBody::RigidBodyImpl impl;
+    RigidBody body;
+};
+
+namespace {
+
+/**
+ * @brief 全局刚体池；进程退出时不析构，与之前new出的刚体一样由操作系统回收
+ */
+SlotMap<BodySlot>& bodyPool() {
+    static SlotMap<BodySlot>* pool = new SlotMap<BodySlot>();
+    return *pool;
+}
+
+} // namespace
+
 RigidBody* RigidBody::createBox(float mass, const Vector3& position, const Vector3& halfExtents) {
-    RigidBody* body = new RigidBody(ShapeType::BOX, mass);
+    const float params[4] = {halfExtents.getX(), halfExtents.getY(), halfExtents.getZ(), 0.0f};
+    RigidBody* body = create(ShapeType::BOX, mass, params);
     body->setPosition(position);
     return body;
 }
 
 RigidBody* RigidBody::createSphere(float mass, const Vector3& position, float radius) {
-    RigidBody* body = new RigidBody(ShapeType::SPHERE, mass);
+    const float params[4] = {radius, 0.0f, 0.0f, 0.0f};
+    RigidBody* body = create(ShapeType::SPHERE, mass, params);
     body->setPosition(position);
     return body;
 }
 
 RigidBody* RigidBody::createCylinder(float mass, const Vector3& position, const Vector3& halfExtents) {
-    RigidBody* body = new RigidBody(ShapeType::CYLINDER, mass);
+    const float params[4] = {halfExtents.getX(), halfExtents.getY(), halfExtents.getZ(), 0.0f};
+    RigidBody* body = create(ShapeType::CYLINDER, mass, params);
     body->setPosition(position);
     return body;
 }
 
 RigidBody* RigidBody::createPlane(const Vector3& normal, float constant) {
-    RigidBody* body = new RigidBody(ShapeType::PLANE, 0.0f);
+    const float params[4] = {normal.getX(), normal.getY(), normal.getZ(), constant};
+    RigidBody* body = create(ShapeType::PLANE, 0.0f, params);
     body->setBodyType(BodyType::STATIC);
+    body->setPosition(normal * constant);
     return body;
 }
 
-RigidBody::RigidBody(ShapeType shapeType, float mass) 
-    : m_impl(std::make_unique<RigidBodyImpl>(shapeType, mass)) {
-    std::cout << "刚体已创建" << std::endl;
+RigidBody* RigidBody::create(ShapeType shapeType, float mass, const float shapeParams[4]) {
+    std::pair<SlotHandle, BodySlot*> created = bodyPool().emplace(shapeType, mass, shapeParams);
+    created.second->impl.setHandle(created.first);
+    return &created.second->body;
+}
+
+void RigidBody::destroy(RigidBody* body) {
+    if (body) {
+        bodyPool().erase(body->getHandle());
+    }
+}
+
+RigidBody* RigidBody::fromHandle(std::uint32_t handle) {
+    BodySlot* slot = bodyPool().get(handle);
+    return slot ? &slot->body : nullptr;
+}
+
+std::size_t RigidBody::getLiveCount() {
+    return bodyPool().size();
+}
+
+std::uint32_t RigidBody::getHandle() const {
+    return m_impl->getHandle();
+}
+
+RigidBody::RigidBody(RigidBodyImpl* impl) : m_impl(impl) {
+    PS_LOG(LOG_BODY, LOG_DEBUG, "刚体已创建");
 }
 
 RigidBody::~RigidBody() {
-    std::cout << "刚体已销毁" << std::endl;
+    if (PhysicsWorld* world = m_impl->getWorld()) {
+        world->removeRigidBody(this);
+    }
+    PS_LOG(LOG_BODY, LOG_DEBUG, "刚体已销毁");
 }
 
 void RigidBody::setPosition(const Vector3& position) {
@@ -156,11 +388,19 @@ Quaternion RigidBody::getRotation() const {
 }
 
 void RigidBody::applyForce(const Vector3& force) {
-    m_impl->applyForce(force);
+    m_impl->applyForce(force, nullptr);
+}
+
+void RigidBody::applyForce(const Vector3& force, const Vector3& relPos) {
+    m_impl->applyForce(force, &relPos);
 }
 
 void RigidBody::applyImpulse(const Vector3& impulse) {
-    m_impl->applyImpulse(impulse);
+    m_impl->applyImpulse(impulse, nullptr);
+}
+
+void RigidBody::applyImpulse(const Vector3& impulse, const Vector3& relPos) {
+    m_impl->applyImpulse(impulse, &relPos);
 }
 
 void RigidBody::setLinearVelocity(const Vector3& velocity) {
@@ -183,10 +423,26 @@ void RigidBody::setFriction(float friction) {
     m_impl->setFriction(friction);
 }
 
+float RigidBody::getFriction() const {
+    return m_impl->getFriction();
+}
+
 void RigidBody::setRestitution(float restitution) {
     m_impl->setRestitution(restitution);
 }
 
+float RigidBody::getRestitution() const {
+    return m_impl->getRestitution();
+}
+
+void RigidBody::setCcdMotionThreshold(float threshold) {
+    m_impl->setCcdMotionThreshold(threshold);
+}
+
+float RigidBody::getCcdMotionThreshold() const {
+    return m_impl->getCcdMotionThreshold();
+}
+
 void RigidBody::setBodyType(BodyType type) {
     m_impl->setBodyType(type);
 }
@@ -195,6 +451,14 @@ BodyType RigidBody::getBodyType() const {
     return m_impl->getBodyType();
 }
 
+void RigidBody::wakeUp() {
+    m_impl->wakeUp();
+}
+
+bool RigidBody::isSleeping() const {
+    return m_impl->isSleeping();
+}
+
 ShapeType RigidBody::getShapeType() const {
     return m_impl->getShapeType();
 }
@@ -203,4 +467,24 @@ float RigidBody::getMass() const {
     return m_impl->getMass();
 }
 
-} // namespace PhysicsSimulator
\ No newline at end of file
+void RigidBody::getShapeParams(float params[4]) const {
+    m_impl->getShapeParams(params);
+}
+
+void RigidBody::getInverseInertia(float inverseInertia[3]) const {
+    m_impl->getInverseInertia(inverseInertia);
+}
+
+void RigidBody::getAccumulatedForce(float force[3], float torque[3]) const {
+    m_impl->getAccumulatedForce(force, torque);
+}
+
+PhysicsWorld* RigidBody::getWorld() const {
+    return m_impl->getWorld();
+}
+
+void RigidBody::setWorld(PhysicsWorld* world) {
+    m_impl->setWorld(world);
+}
+
+} // namespace PhysicsSimulator
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from python import physics_binding
+from python.core.enums import JointType
+
+
+@pytest.fixture(params=['native', 'python'])
+def binding(request, monkeypatch):
+    """分别在原生库和纯Python实现下运行，原生库未构建时跳过native"""
+    if request.param == 'native':
+        if physics_binding.native_library() is None:
+            pytest.skip("物理引擎库未构建")
+    else:
+        physics_binding.native_library()
+        monkeypatch.setattr(physics_binding, '_lib', None)
+    return physics_binding
+
+
+@pytest.fixture
+def native():
+    """只在原生库下运行"""
+    if physics_binding.native_library() is None:
+        pytest.skip("物理引擎库未构建")
+    return physics_binding
+
+
+def build_chain(binding, links: int = 8, joint_type: int = JointType.DISTANCE, backend: str = 'auto'):
+    """一端固定、水平放置的链条，在重力作用下摆动；返回(世界, 各节的句柄(包括固定端))"""
+    world = binding.PhysicsWorld(backend)
+    world.initialize()
+    positions = [(float(i), 10.0, 0.0) for i in range(links + 1)]
+    masses = [0.0] + [1.0] * links
+    handles = binding.RigidBody.create_spheres(masses, positions, [0.2] * (links + 1))
+    world.add_bodies(handles)
+    if joint_type == JointType.DISTANCE:
+        # 距离关节的锚点取在两端的球心，长度为1
+        world.add_constraints(JointType.DISTANCE, handles[:-1], handles[1:], positions[:-1], positions[1:])
+    else:
+        anchors = [(i + 0.5, 10.0, 0.0) for i in range(links)]
+        world.add_constraints(joint_type, handles[:-1], handles[1:], anchors)
+    return world, handles
+
+
+@pytest.fixture
+def make_chain(binding):
+    """build_chain()的工厂"""
+    return lambda **kwargs: build_chain(binding, **kwargs)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from benchmarks.scenes import box_stack, domino_line, sphere_pile, space
+
+STATE_COLUMNS = ('positions', 'rotations', 'linear_velocities', 'angular_velocities')
+
+
+def state(world):
+    """刚体状态的字节，用于逐位比较"""
+    return {name: world._storage.view(name).tobytes() for name in STATE_COLUMNS}
+
+
+def run(world, steps=120):
+    for _ in range(steps):
+        world.step_simulation(1.0 / 60.0)
+    return world
+
+
+@pytest.mark.parametrize('scene, count, tolerance', [
+    (space, 50, 1e-5),
+    (sphere_pile, 27, 1e-3),
+    (domino_line, 10, 1e-3),
+    (box_stack, 10, 0.05),
+])
+def test_backends_agree(native, scene, count, tolerance):
+    native_world = run(scene(count, 'native'))
+    numpy_world = run(scene(count, 'numpy'))
+    np.testing.assert_allclose(native_world.get_positions(), numpy_world.get_positions(), atol=tolerance)
+
+
+def test_pure_python_matches_numpy_backend(native, monkeypatch):
+    # numpy后端在C++数组和纯Python存储上的结果一致
+    expected = state(run(sphere_pile(27, 'numpy')))
+    monkeypatch.setattr(native, '_lib', None)
+    assert state(run(sphere_pile(27, 'numpy'))) == expected
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+
+def make_spheres(binding, count):
+    positions = np.arange(count * 3, dtype=np.float32).reshape(count, 3)
+    return binding.RigidBody.create_spheres(np.ones(count), positions, np.full(count, 0.5))
+
+
+def test_destroy_bodies_in_world(binding):
+    world = binding.PhysicsWorld()
+    world.initialize()
+    handles = make_spheres(binding, 4)
+    world.add_bodies(handles)
+    binding.RigidBody.destroy_bodies(handles[:2])
+
+    assert world.get_body_count() == 2
+    assert sorted(world.get_handles().tolist()) == sorted(handles[2:].tolist())
+    world.step_simulation(1.0 / 60.0)
+    assert world.get_positions().shape == (2, 3)
+
+    # 两种实现中被销毁的句柄都过期
+    body = binding.RigidBody(int(handles[0]), world)
+    assert not body.is_valid()
+    with pytest.raises(RuntimeError):
+        body.get_position()
+    assert binding.RigidBody(int(handles[2]), world).is_valid()
+    binding.RigidBody.destroy_bodies(handles[2:])
+
+
+def test_getters_outlive_growth_and_world(binding):
+    world = binding.PhysicsWorld()
+    handles = make_spheres(binding, 4)
+    world.add_bodies(handles)
+    positions = world.get_positions()
+    expected = positions.copy()
+
+    # 扩容会让C++端的数组换地址，之前取得的数组不能受影响
+    world.add_bodies(make_spheres(binding, 1000))
+    np.testing.assert_array_equal(positions, expected)
+    np.testing.assert_array_equal(world.get_positions()[:4], expected)
+    del world
+    np.testing.assert_array_equal(positions, expected)
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from benchmarks.scenes import domino_line, sphere_pile
+
+
+def fire_ball(binding, threshold):
+    """50m/s的小球射向一块0.1厚的墙，返回(世界, 球)"""
+    world = binding.PhysicsWorld()
+    world.initialize(binding.Vector3(0.0, 0.0, 0.0))
+    wall = binding.RigidBody.create_box(0.0, binding.Vector3(0.0, 0.0, 0.0), binding.Vector3(0.05, 2.0, 2.0))
+    ball = binding.RigidBody.create_sphere(1.0, binding.Vector3(-3.0, 0.0, 0.0), 0.25)
+    world.add_rigid_body(wall)
+    world.add_rigid_body(ball)
+    ball.set_linear_velocity(binding.Vector3(50.0, 0.0, 0.0))
+    ball.set_ccd_motion_threshold(threshold)
+    for _ in range(30):
+        world.step_simulation(1.0 / 60.0)
+    return world, ball
+
+
+def test_ccd_prevents_tunnelling(binding):
+    _, ball = fire_ball(binding, 0.0)
+    assert ball.get_position().x > 0.0
+    world, ball = fire_ball(binding, 0.25)
+    assert ball.get_position().x < 0.0
+    assert ball.get_ccd_motion_threshold() == 0.25
+
+
+def test_slow_ccd_bodies_do_not_change_results(binding):
+    # 位移没有超过阈值的刚体不做连续碰撞检测，结果与关闭时逐位相同
+    for scene in (sphere_pile, domino_line):
+        plain = scene(20)
+        slow = scene(20)
+        for handle in slow.get_handles():
+            binding.RigidBody(int(handle), slow).set_ccd_motion_threshold(100.0)
+        for _ in range(60):
+            plain.step_simulation(1.0 / 60.0)
+            slow.step_simulation(1.0 / 60.0)
+        np.testing.assert_array_equal(slow.get_positions(), plain.get_positions())
+        np.testing.assert_array_equal(slow.get_velocities(), plain.get_velocities())
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+import pytest
+
+from python import ensemble
+
+run_scenario = ensemble.run_scenario
+
+
+def crash_on_bad(index, params, offset):
+    """名为bad的场景让工作进程直接退出，其余场景正常运行"""
+    if params['name'] == 'bad':
+        os._exit(1)
+    return run_scenario(index, params, offset)
+
+
+def write_spec(tmp_path, runs):
+    path = tmp_path / 'spec.json'
+    path.write_text(json.dumps({'defaults': {'bodies': 4, 'steps': 120, 'record_every': 30}, 'runs': runs}))
+    return str(path)
+
+
+def test_crash_fails_only_its_run(tmp_path, monkeypatch):
+    # 崩溃的场景排在最前，同一进程池中其余的场景都还没有完成
+    runs = ensemble.load_spec(write_spec(tmp_path, [{'name': 'bad'}] + [{'name': f"ok{i}"} for i in range(8)]))
+    monkeypatch.setattr(ensemble, 'run_scenario', crash_on_bad)
+    results = ensemble.run_ensemble(runs, workers=2, progress=lambda message: None)
+    failed = [summary['name'] for summary in results['summaries'] if not summary['ok']]
+    assert failed == ['bad']
+    assert sorted(results['trajectories']) == sorted(f"ok{i}" for i in range(8))
+
+
+def test_duplicate_names_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ensemble.load_spec(write_spec(tmp_path, [{'name': 'a'}, {'name': 'a'}]))
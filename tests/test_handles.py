@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from python.core.handles import HandlePool, handle_generation, handle_index
+
+
+def test_one_at_a_time_grows_geometrically():
+    pool = HandlePool()
+    handles = np.concatenate([pool.allocate(1) for _ in range(1000)])
+    assert len(np.unique(handles)) == 1000 and len(pool) == 1000
+    # 预留的槽按倍数增长，而不是每次分配都复制
+    assert len(pool._generations) < 2048
+    assert pool.is_valid(handles).all()
+
+
+def test_released_slots_are_reused_with_new_generation():
+    pool = HandlePool()
+    handles = pool.allocate(10)
+    pool.release(handles[:4])
+    assert not pool.is_valid(handles[:4]).any() and pool.is_valid(handles[4:]).all()
+    reused = pool.allocate(6)
+    # 先重用释放的4个槽(先进先出)，再分配新槽
+    np.testing.assert_array_equal(handle_index(reused[:4]), handle_index(handles[:4]))
+    assert (handle_generation(reused[:4]) == 2).all()
+    assert len(pool) == 12
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+from python.core.enums import JointType
+from python.dynamics.integrator import quaternion_to_matrix
+
+
+def anchor_gaps(world):
+    """各关节两端锚点在世界坐标中的距离"""
+    joints = world.get_constraints()
+    handles = world.get_handles()
+    order = np.argsort(handles)
+    anchors = []
+    for end in range(2):
+        rows = order[np.searchsorted(handles[order], joints['bodies'][:, end])]
+        matrices = quaternion_to_matrix(world.get_rotations()[rows])
+        local = joints['local_anchors'][:, end * 3:end * 3 + 3]
+        anchors.append(world.get_positions()[rows] + np.einsum('njk,nk->nj', matrices, local))
+    return np.linalg.norm(anchors[1] - anchors[0], axis=1)
+
+
+@pytest.mark.parametrize('joint_type, length', [(JointType.DISTANCE, 1.0), (JointType.POINT, 0.0)])
+def test_chain_holds_anchors(make_chain, joint_type, length):
+    world, handles = make_chain(joint_type=joint_type)
+    for _ in range(120):
+        world.step_simulation(1.0 / 60.0)
+    # 链条确实摆动了，而锚点之间的距离保持不变
+    assert world.get_positions()[:, 1].min() < 8.0
+    np.testing.assert_allclose(anchor_gaps(world), length, atol=0.1)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+
+import time
+
+import numpy as np
+
+from python.simulation_loop import SimulationLoop
+
+
+def make_world(binding):
+    world = binding.PhysicsWorld()
+    world.initialize()
+    world.add_bodies(binding.RigidBody.create_planes([(0, 1, 0)], [0.0]))
+    world.add_bodies(binding.RigidBody.create_boxes(np.ones(8), [(0, 0.5 + i, 0) for i in range(8)],
+                                                    np.full((8, 3), 0.5)))
+    return world
+
+
+def test_profile_keeps_latest_samples(binding):
+    world = make_world(binding)
+    world.set_profiling(True, 8)
+    for _ in range(20):
+        world.step_simulation(1.0 / 60.0)
+    profile = world.get_profile()
+    assert len(profile['total']) == 8
+    assert (profile['bodies'] == 9).all()
+
+
+def test_profile_is_published_with_frames(binding):
+    world = make_world(binding)
+    loop = SimulationLoop(world)
+    loop.submit(world.set_profiling, True)
+    loop.start()
+    try:
+        deadline = time.perf_counter() + 5.0
+        while time.perf_counter() < deadline:
+            frame = loop.frames.acquire()
+            if frame is not None and frame.profile is not None and len(frame.profile['total']):
+                break
+            time.sleep(0.01)
+    finally:
+        loop.stop()
+    assert frame.profile is not None and len(frame.profile['total']) > 0
+    assert frame.profile['bodies'][-1] == frame.count
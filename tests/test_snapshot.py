@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+from benchmarks.scenes import sphere_pile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_fork_alive_at_exit(binding):
+    # 解释器退出时仍然存活的fork()结果不能在__del__中报错
+    script = textwrap.dedent(f"""
+        import numpy as np
+        from python import physics_binding
+        if {binding._lib is None}:
+            physics_binding._lib, physics_binding._lib_loaded = None, True
+        from python.physics_binding import PhysicsWorld, RigidBody
+        class Holder:
+            pass
+        world = PhysicsWorld()
+        world.add_bodies(RigidBody.create_spheres(np.ones(3), np.zeros((3, 3)), np.ones(3)))
+        # 引用环只在退出时的垃圾回收中释放
+        holder = Holder()
+        holder.cycle, holder.fork = holder, world.fork()
+    """)
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            env={**os.environ, 'PYTHONPATH': PROJECT_ROOT})
+    assert result.returncode == 0, result.stderr
+    assert 'Exception ignored' not in result.stderr, result.stderr
+
+
+def positions_after(world, steps=60):
+    for _ in range(steps):
+        world.step_simulation(1.0 / 60.0)
+    return world.get_positions()
+
+
+def test_restore_replays_identically(binding):
+    world = sphere_pile(64)
+    positions_after(world, 30)
+    snapshot = world.snapshot()
+    expected = positions_after(world)
+    world.restore(snapshot)
+    np.testing.assert_array_equal(positions_after(world), expected)
+
+
+def test_fork_matches_original(binding):
+    world = sphere_pile(27)
+    positions_after(world, 30)
+    fork = world.fork()
+    assert not np.intersect1d(fork.get_handles(), world.get_handles()).size
+    np.testing.assert_array_equal(positions_after(fork, 30), positions_after(world, 30))
+
+
+def test_fork_copies_joints(make_chain):
+    world, _ = make_chain()
+    positions_after(world, 30)
+    fork = world.fork()
+    assert fork.get_constraint_count() == world.get_constraint_count()
+    np.testing.assert_array_equal(positions_after(fork), positions_after(world))
+
+
+def test_restore_drops_cache_of_removed_bodies(binding):
+    world = binding.PhysicsWorld()
+    world.initialize()
+    world.add_bodies(binding.RigidBody.create_planes([(0, 1, 0)], [0.0]))
+    box = binding.RigidBody.create_boxes([1.0], [(0, 0.5, 0)], [(0.5, 0.5, 0.5)])
+    sphere = binding.RigidBody.create_spheres([1.0], [(3, 0.5, 0)], [0.5])
+    world.add_bodies(box)
+    world.add_bodies(sphere)
+    positions_after(world, 10)
+    world.remove_bodies(box)
+
+    # 盒子与地面的流形被丢弃，不能被接到别的刚体上
+    world.restore(world.snapshot())
+    cache = world.solver._cache
+    # 只剩球与地面的一个接触点
+    assert len(cache['handle_a']) == 1 and int(sphere[0]) in (cache['handle_a'][0], cache['handle_b'][0])
+    expected = positions_after(world)
+    world.restore(world.snapshot())
+    np.testing.assert_array_equal(positions_after(world), expected)
+
+
+def test_restore_replays_joints(make_chain):
+    world, _ = make_chain()
+    positions_after(world, 30)
+    snapshot = world.snapshot()
+    expected = positions_after(world)
+    world.restore(snapshot)
+    np.testing.assert_array_equal(positions_after(world), expected)
+
+
+def test_restore_rejects_other_joints(make_chain):
+    world, handles = make_chain()
+    snapshot = world.snapshot()
+    world.remove_constraints(world.get_constraints()['handles'][:1])
+    with pytest.raises(ValueError):
+        world.restore(snapshot)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from benchmarks.scenes import box_stack, domino_line, sphere_pile
+
+STATE_COLUMNS = ('positions', 'rotations', 'linear_velocities', 'angular_velocities')
+
+
+def state(world):
+    """刚体状态的字节，用于逐位比较"""
+    return {name: world._storage.view(name).tobytes() for name in STATE_COLUMNS}
+
+
+def run(world, steps=120):
+    for _ in range(steps):
+        world.step_simulation(1.0 / 60.0)
+    return world
+
+
+@pytest.mark.parametrize('scene, count', [(sphere_pile, 200), (box_stack, 40), (domino_line, 20)])
+def test_thread_count_does_not_change_results(native, scene, count):
+    results = []
+    for threads in (1, 2, 4, 8):
+        world = scene(count, 'native')
+        world.set_thread_count(threads)
+        results.append(state(run(world)))
+    assert all(result == results[0] for result in results[1:])
+
+
+@pytest.mark.parametrize('binding', ['native'], indirect=True)
+def test_thread_count_with_joints(make_chain):
+    results = []
+    for threads in (1, 4):
+        world, _ = make_chain(backend='native')
+        world.set_thread_count(threads)
+        results.append(state(run(world)))
+    assert results[0] == results[1]